@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Parser performance benchmarks for WoW combat logs.
+
+Run against a real WoWCombatLog.txt to compare parser modes:
+
+    python scripts/benchmark_parser.py tokenizer path/to/WoWCombatLog.txt
+    python scripts/benchmark_parser.py timestamps path/to/WoWCombatLog.txt
+    python scripts/benchmark_parser.py events path/to/WoWCombatLog.txt
+    python scripts/benchmark_parser.py memory path/to/WoWCombatLog.txt
+    python scripts/benchmark_parser.py batch path/to/WoWCombatLog.txt
+    python scripts/benchmark_parser.py metrics path/to/WoWCombatLog.txt
+    python scripts/benchmark_parser.py scaling path/to/WoWCombatLog.txt --max-workers 16
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.parser.columnar import KIND_DAMAGE
+from src.parser.events import DamageEvent, EventFactory
+from src.parser.parser import BatchParser, CombatLogParser
+from src.parser.timestamps import TimestampDecoder
+from src.parser.tokenizer import LineTokenizer
+
+
+def read_lines(log_path: Path, max_lines: Optional[int] = None) -> List[str]:
+    """Read up to max_lines lines of a combat log into memory."""
+    lines = []
+    with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            lines.append(line)
+            if max_lines and len(lines) >= max_lines:
+                break
+    return lines
+
+
+def print_results(title: str, rows: List[Dict[str, Any]], baseline_key: str):
+    """Print benchmark rows with speedup relative to the first row."""
+    print(f"\n{title}")
+    print("-" * len(title))
+    baseline = rows[0][baseline_key] if rows else 0
+    for row in rows:
+        speedup = row[baseline_key] / baseline if baseline else 0
+        print(
+            f"{row['name']:<32} {row[baseline_key]:>14,.0f} {baseline_key:<14} "
+            f"{row['seconds']:>8.2f}s  x{speedup:.2f}"
+        )
+
+
+def bench_tokenizer(args: argparse.Namespace):
+    """Compare the character-walking tokenizer against the single-pass fast path."""
+    lines = read_lines(Path(args.log_file), args.max_lines)
+    print(f"Loaded {len(lines):,} lines from {args.log_file}")
+
+    rows = []
+    for name, fast_mode in (("slow path (char walk)", False), ("fast path (single pass)", True)):
+        best = None
+        for _ in range(args.repeat):
+            tokenizer = LineTokenizer(fast_mode=fast_mode)
+            start = time.perf_counter()
+            for line in lines:
+                tokenizer.parse_line(line)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        stats = tokenizer.get_stats()
+        rows.append({"name": name, "seconds": best, "lines/sec": len(lines) / best})
+        print(
+            f"  {name}: fast={stats['fast_path_lines']:,} slow={stats['slow_path_lines']:,} "
+            f"errors={stats['errors']:,}"
+        )
+
+    print_results("Tokenizer throughput (best of %d)" % args.repeat, rows, "lines/sec")
+
+
+def bench_timestamps(args: argparse.Namespace):
+    """Compare per-line strptime against the cached TimestampDecoder."""
+    lines = read_lines(Path(args.log_file), args.max_lines)
+    timestamps = [line.split("  ", 1)[0] for line in lines if "  " in line]
+    print(f"Loaded {len(timestamps):,} timestamps from {args.log_file}")
+
+    def run_strptime():
+        for ts in timestamps:
+            clean = ts.rsplit("-", 1)[0] if "-" in ts[-3:] else ts.rsplit("+", 1)[0]
+            datetime.strptime(clean, "%m/%d/%Y %H:%M:%S.%f")
+
+    decoder = TimestampDecoder()
+
+    def run_decoder():
+        for ts in timestamps:
+            decoder.decode(ts)
+
+    rows = []
+    for name, func in (("strptime per line", run_strptime), ("cached decoder", run_decoder)):
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        rows.append({"name": name, "seconds": best, "lines/sec": len(timestamps) / best})
+
+    stats = decoder.get_stats()
+    print(f"  decoder cache: hits={stats['cache_hits']:,} misses={stats['cache_misses']:,}")
+    print_results("Timestamp decoding (best of %d)" % args.repeat, rows, "lines/sec")
+
+
+def bench_events(args: argparse.Namespace):
+    """Compare eager and lazy event creation for a type/GUID filter pass."""
+    lines = read_lines(Path(args.log_file), args.max_lines)
+    tokenizer = LineTokenizer()
+    parsed_lines = [parsed for parsed in map(tokenizer.parse_line, lines) if parsed]
+    print(f"Tokenized {len(parsed_lines):,} lines from {args.log_file}")
+
+    rows = []
+    for name, lazy in (("eager events", False), ("lazy events", True)):
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            player_damage = 0
+            for parsed in parsed_lines:
+                event = EventFactory.create_event(parsed, lazy=lazy)
+                # Typical boundary/segmentation filter: only type and GUIDs
+                if event.event_type.endswith("_DAMAGE") and event.is_player_source():
+                    player_damage += 1
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        rows.append({"name": name, "seconds": best, "events/sec": len(parsed_lines) / best})
+        print(f"  {name}: {player_damage:,} player damage events")
+
+    print_results("Event creation + filter (best of %d)" % args.repeat, rows, "events/sec")
+
+
+def _segment_file_peak_rss(log_file: str, parser_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse and segment a log in this process, returning peak RSS (run in a fresh process)."""
+    from src.segmentation.unified_segmenter import UnifiedSegmenter
+
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+
+    parser = CombatLogParser(**parser_options)
+    segmenter = UnifiedSegmenter()
+    for event in parser.parse_file(log_file):
+        segmenter.process_event(event)
+    encounters = segmenter.get_encounters()
+
+    return {
+        "seconds": time.perf_counter() - start,
+        "events": parser.events_processed,
+        "encounters": len(encounters),
+        # ru_maxrss is in KB on Linux
+        "start_rss_mb": start_rss / 1024,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def bench_memory(args: argparse.Namespace):
+    """Compare UnifiedSegmenter peak RSS across event layouts, raw_line modes and interning."""
+    compact = {"compact_events": True, "raw_line_mode": "offset"}
+    modes = [
+        ("dataclass + raw_line", {"intern_strings": False}),
+        ("dataclass + raw_line, interned", {"intern_strings": True}),
+        ("slotted + raw_line", {"compact_events": True, "intern_strings": False}),
+        ("slotted, raw_line dropped", {**compact, "raw_line_mode": "drop", "intern_strings": False}),
+        ("slotted, raw_line offset", {**compact, "intern_strings": False}),
+        ("slotted, offset, interned", {**compact, "intern_strings": True}),
+    ]
+
+    rows = []
+    context = multiprocessing.get_context("spawn")
+    for name, options in modes:
+        # Fresh process per mode so peak RSS is not shared between runs
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(_segment_file_peak_rss, args.log_file, options).result()
+
+        rows.append({"name": name, "seconds": result["seconds"], "peak MB": result["peak_rss_mb"]})
+        print(
+            f"  {name}: {result['events']:,} events, {result['encounters']} encounters, "
+            f"start {result['start_rss_mb']:.0f} MB, peak {result['peak_rss_mb']:.0f} MB"
+        )
+
+    print_results("UnifiedSegmenter peak RSS", rows, "peak MB")
+
+
+def bench_batch(args: argparse.Namespace):
+    """Compare per-object damage totals with a columnar BatchParser reduction."""
+    rows = []
+
+    start = time.perf_counter()
+    object_totals: Dict[str, int] = {}
+    object_events = 0
+    for event in CombatLogParser().parse_file(args.log_file):
+        object_events += 1
+        if isinstance(event, DamageEvent) and event.source_guid:
+            object_totals[event.source_guid] = (
+                object_totals.get(event.source_guid, 0) + event.amount
+            )
+    elapsed = time.perf_counter() - start
+    rows.append(
+        {"name": "objects + dict totals", "seconds": elapsed, "events/sec": object_events / elapsed}
+    )
+
+    import numpy as np
+
+    start = time.perf_counter()
+    batch_parser = BatchParser(batch_size=args.batch_size)
+    batch_totals = None
+    for batch in batch_parser.iter_batches(args.log_file):
+        damage = batch.select(batch.kind_mask(KIND_DAMAGE) & (batch.source_id >= 0))
+        totals = np.bincount(damage.source_id, weights=damage.amount, minlength=len(batch.guids))
+        if batch_totals is None:
+            batch_totals = totals
+        else:
+            batch_totals = np.pad(batch_totals, (0, len(totals) - len(batch_totals))) + totals
+    elapsed = time.perf_counter() - start
+    batch_events = batch_parser.events_processed
+    rows.append(
+        {"name": "BatchParser + bincount", "seconds": elapsed, "events/sec": batch_events / elapsed}
+    )
+
+    object_total = sum(object_totals.values())
+    batch_total = int(batch_totals.sum()) if batch_totals is not None else 0
+    print(f"  objects: {object_events:,} events, damage {object_total:,}")
+    print(
+        f"  batches: {batch_events:,} events in {batch_parser.batches_emitted} batches, "
+        f"damage {batch_total:,}"
+    )
+    print_results("Damage totals by source", rows, "events/sec")
+
+
+def bench_metrics(args: argparse.Namespace):
+    """Compare post-parse metric calculation: object routing vs batch group-bys."""
+    from src.analyzer.batch_metrics import BatchMetricsCalculator, encounter_row_ranges
+    from src.segmentation.unified_segmenter import UnifiedSegmenter
+
+    events = list(CombatLogParser().parse_file(args.log_file))
+    batch = BatchParser().parse_file(args.log_file)
+    print(f"Parsed {len(events):,} events from {args.log_file}")
+
+    rows = []
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        segmenter = UnifiedSegmenter()
+        for event in events:
+            segmenter.process_event(event)
+        encounters = segmenter.get_encounters()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    object_damage = sum(
+        char.total_damage_done for enc in encounters for char in enc.characters.values()
+    )
+    rows.append(
+        {"name": "UnifiedSegmenter + metrics", "seconds": best, "events/sec": len(events) / best}
+    )
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        results = []
+        for first, last in encounter_row_ranges(batch):
+            duration = float(batch.timestamp[last] - batch.timestamp[first])
+            encounter = batch.select(slice(first + 1, last))
+            results.append(BatchMetricsCalculator(encounter).calculate(duration))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    batch_damage = sum(m.total_damage_done for result in results for m in result.values())
+    rows.append(
+        {"name": "BatchMetricsCalculator", "seconds": best, "events/sec": len(batch) / best}
+    )
+
+    print(f"  objects: {len(encounters)} encounters, player damage {object_damage:,}")
+    print(f"  batches: {len(results)} encounters, player damage {batch_damage:,}")
+    print_results("Encounter metrics (best of %d)" % args.repeat, rows, "events/sec")
+
+
+def bench_scaling(args: argparse.Namespace):
+    """Compare UnifiedParallelProcessor thread and process pools by worker count."""
+    from src.processing.unified_parallel_processor import UnifiedParallelProcessor
+
+    max_workers = args.max_workers or os.cpu_count()
+    worker_counts = []
+    count = 1
+    while count < max_workers:
+        worker_counts.append(count)
+        count *= 2
+    worker_counts.append(max_workers)
+
+    rows = []
+    for executor_type in ("thread", "process"):
+        for workers in worker_counts:
+            processor = UnifiedParallelProcessor(
+                max_workers=workers, persist_index=False, executor_type=executor_type
+            )
+            start = time.perf_counter()
+            encounters = processor.process_file(Path(args.log_file))
+            elapsed = time.perf_counter() - start
+
+            name = f"{executor_type} x{workers}"
+            rows.append(
+                {"name": name, "seconds": elapsed, "events/sec": processor.total_events / elapsed}
+            )
+            print(
+                f"  {name}: {processor.total_events:,} events, {len(encounters)} encounters, "
+                f"{processor.result_bytes / 1024 / 1024:.1f} MB pickled, "
+                f"{processor.shared_bytes / 1024 / 1024:.1f} MB in shared memory"
+            )
+
+    print_results(f"Parallel scaling ({os.cpu_count()} CPUs)", rows, "events/sec")
+
+
+def main():
+    """Entry point for the benchmark script."""
+    parser = argparse.ArgumentParser(description="WoW combat log parser benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    tokenizer_parser = subparsers.add_parser("tokenizer", help="LineTokenizer lines/sec")
+    tokenizer_parser.add_argument("log_file", help="Path to a combat log file")
+    tokenizer_parser.add_argument("--max-lines", type=int, default=None)
+    tokenizer_parser.add_argument("--repeat", type=int, default=3)
+    tokenizer_parser.set_defaults(func=bench_tokenizer)
+
+    timestamps_parser = subparsers.add_parser("timestamps", help="Timestamp decoding lines/sec")
+    timestamps_parser.add_argument("log_file", help="Path to a combat log file")
+    timestamps_parser.add_argument("--max-lines", type=int, default=None)
+    timestamps_parser.add_argument("--repeat", type=int, default=3)
+    timestamps_parser.set_defaults(func=bench_timestamps)
+
+    events_parser = subparsers.add_parser("events", help="Eager vs lazy event creation")
+    events_parser.add_argument("log_file", help="Path to a combat log file")
+    events_parser.add_argument("--max-lines", type=int, default=None)
+    events_parser.add_argument("--repeat", type=int, default=3)
+    events_parser.set_defaults(func=bench_events)
+
+    memory_parser = subparsers.add_parser("memory", help="UnifiedSegmenter peak RSS")
+    memory_parser.add_argument("log_file", help="Path to a combat log file")
+    memory_parser.set_defaults(func=bench_memory)
+
+    batch_parser = subparsers.add_parser("batch", help="Object vs columnar damage totals")
+    batch_parser.add_argument("log_file", help="Path to a combat log file")
+    batch_parser.add_argument("--batch-size", type=int, default=100000)
+    batch_parser.set_defaults(func=bench_batch)
+
+    metrics_parser = subparsers.add_parser("metrics", help="Object vs vectorized metrics")
+    metrics_parser.add_argument("log_file", help="Path to a combat log file")
+    metrics_parser.add_argument("--repeat", type=int, default=3)
+    metrics_parser.set_defaults(func=bench_metrics)
+
+    scaling_parser = subparsers.add_parser("scaling", help="Thread vs process pool by workers")
+    scaling_parser.add_argument("log_file", help="Path to a combat log file")
+    scaling_parser.add_argument("--max-workers", type=int, default=None)
+    scaling_parser.set_defaults(func=bench_scaling)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+"""
+Vectorized metric calculation over columnar event batches.
+
+Computes the same per-character numbers as UnifiedSegmenter routing followed by
+EnhancedCharacter.calculate_ability_metrics and calculate_combat_metrics, but
+with NumPy group-by reductions over an EventBatch instead of per-event loops.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.models.character import parse_character_name
+from src.models.combat_periods import CombatPeriod, CombatPeriodDetector
+from src.models.enhanced_character import AbilityMetrics
+from src.parser.columnar import (
+    HAS_NUMPY,
+    KIND_ABSORB,
+    KIND_AURA,
+    KIND_DAMAGE,
+    KIND_HEAL,
+    KIND_META,
+    EventBatch,
+)
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+# Routing rules mirrored from UnifiedSegmenter
+SWING_EVENTS = ("SWING_DAMAGE", "SWING_DAMAGE_LANDED")
+TRACKED_AURA_EVENTS = ("SPELL_AURA_APPLIED", "SPELL_AURA_REMOVED")
+PET_GUID_PREFIXES = ("Pet-", "Creature-")
+GCD_SECONDS = 1.5
+
+
+@dataclass
+class CharacterMetrics:
+    """
+    Metrics for one character, named after the CharacterEventStream and
+    EnhancedCharacter fields they reproduce.
+    """
+
+    character_guid: str
+    character_name: str
+
+    total_damage_done: int = 0
+    total_healing_done: int = 0
+    total_damage_taken: int = 0
+    total_healing_received: int = 0
+    total_overhealing: int = 0
+    total_overkill_done: int = 0
+    total_overkill_taken: int = 0
+    death_count: int = 0
+
+    # Number of routed events per category
+    damage_done_count: int = 0
+    healing_done_count: int = 0
+    damage_taken_count: int = 0
+    healing_received_count: int = 0
+
+    activity_percentage: float = 0.0
+    time_alive: float = 0.0
+    combat_time: float = 0.0
+
+    ability_damage: Dict[int, AbilityMetrics] = field(default_factory=dict)
+    ability_healing: Dict[int, AbilityMetrics] = field(default_factory=dict)
+    ability_damage_taken: Dict[int, AbilityMetrics] = field(default_factory=dict)
+    dps_by_ability: Dict[int, float] = field(default_factory=dict)
+    hps_by_ability: Dict[int, float] = field(default_factory=dict)
+
+    # Damage done and effective healing inside each combat period
+    damage_by_period: List[int] = field(default_factory=list)
+    healing_by_period: List[int] = field(default_factory=list)
+
+    def get_dps(self, duration: float) -> float:
+        """Calculate DPS over a duration."""
+        if duration <= 0:
+            return 0.0
+        return round(self.total_damage_done / duration, 2)
+
+    def get_hps(self, duration: float) -> float:
+        """Calculate HPS over a duration."""
+        if duration <= 0:
+            return 0.0
+        return round(self.total_healing_done / duration, 2)
+
+    def get_combat_dps(self, combat_time: Optional[float] = None) -> float:
+        """Calculate DPS during combat periods only."""
+        return self.get_dps(combat_time if combat_time is not None else self.combat_time)
+
+    def get_combat_hps(self, combat_time: Optional[float] = None) -> float:
+        """Calculate HPS during combat periods only."""
+        return self.get_hps(combat_time if combat_time is not None else self.combat_time)
+
+
+def encounter_row_ranges(batch: EventBatch) -> List[Tuple[int, int]]:
+    """
+    Find the rows of each raid encounter in a batch.
+
+    Args:
+        batch: Event batch in log order
+
+    Returns:
+        List of (ENCOUNTER_START row, ENCOUNTER_END row) pairs
+    """
+    starts = np.flatnonzero(batch.event_type_mask("ENCOUNTER_START"))
+    ends = np.flatnonzero(batch.event_type_mask("ENCOUNTER_END"))
+
+    ranges = []
+    for start in starts:
+        following = ends[np.searchsorted(ends, start) :]
+        if len(following):
+            ranges.append((int(start), int(following[0])))
+    return ranges
+
+
+def _to_ms(timestamps: "np.ndarray") -> "np.ndarray":
+    """Convert epoch seconds to integer milliseconds (the log's resolution)."""
+    return np.rint(timestamps * 1000.0).astype(np.int64)
+
+
+def detect_combat_periods(
+    batch: EventBatch, detector: Optional[CombatPeriodDetector] = None
+) -> List[CombatPeriod]:
+    """
+    Vectorized equivalent of CombatPeriodDetector.detect_periods for a fixed gap.
+
+    Args:
+        batch: Event batch, e.g. the rows of one encounter
+        detector: Detector whose combat types, suffixes and gap threshold to use
+
+    Returns:
+        List of combat periods sorted by start time
+    """
+    detector = detector or CombatPeriodDetector(gap_threshold=5.0)
+    combat_codes = [
+        code
+        for code, event_type in enumerate(batch.event_types)
+        if event_type in detector.combat_types
+        or any(suffix in event_type for suffix in detector.combat_suffixes)
+    ]
+    times = np.sort(_to_ms(batch.timestamp[np.isin(batch.event_type, combat_codes)]))
+    if not len(times):
+        return []
+
+    gap_ms = detector.gap_threshold * 1000.0
+    breaks = np.flatnonzero(np.diff(times) > gap_ms) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(times)]))
+
+    return [
+        CombatPeriod(
+            start_time=datetime.fromtimestamp(times[start] / 1000.0),
+            end_time=datetime.fromtimestamp(times[end - 1] / 1000.0),
+            event_count=int(end - start),
+        )
+        for start, end in zip(starts, ends)
+    ]
+
+
+class BatchMetricsCalculator:
+    """
+    Calculates character metrics for one encounter from a columnar batch.
+
+    Events are attributed the way UnifiedSegmenter routes them: pets and
+    guardians count for the player that summoned them (from the summon on),
+    duplicate swing lines are counted once, and only Player- GUIDs become
+    characters.
+    """
+
+    def __init__(self, batch: EventBatch, pet_owners: Optional[Dict[str, str]] = None):
+        """
+        Initialize the calculator.
+
+        Args:
+            batch: Rows of one encounter, in log order
+            pet_owners: Optional pet GUID -> owner GUID mapping for pets summoned
+                before the first row of the batch
+        """
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for batch metrics")
+
+        self.batch = batch
+        self.pet_owners = pet_owners or {}
+
+    def calculate(
+        self, encounter_duration: float, combat_periods: Optional[List[CombatPeriod]] = None
+    ) -> Dict[str, CharacterMetrics]:
+        """
+        Calculate metrics for every character in the batch.
+
+        Args:
+            encounter_duration: Total encounter duration in seconds
+            combat_periods: Sorted, non-overlapping combat periods; detected
+                from the batch if not given
+
+        Returns:
+            Dictionary of character GUID -> CharacterMetrics
+        """
+        batch = self.batch
+        if combat_periods is None:
+            combat_periods = detect_combat_periods(batch)
+
+        rows = len(batch)
+        if not rows:
+            return {}
+
+        guids = batch.guids
+        n_guids = len(guids)
+        event_type = batch.event_type
+        timestamp_ms = _to_ms(batch.timestamp)
+
+        # Per event type flags, indexed by event type code
+        kinds = np.asarray(batch.event_kinds, dtype=np.uint8)
+        names = batch.event_types
+        damage_like = np.array(["_DAMAGE" in t for t in names]) | (kinds == KIND_DAMAGE)
+        heal_like = ~damage_like & (np.array(["_HEAL" in t for t in names]) | (kinds == KIND_HEAL))
+        routable = (kinds != KIND_META) & (kinds != KIND_ABSORB)
+        swing = np.array([t in SWING_EVENTS for t in names]) & (kinds == KIND_DAMAGE)
+        tracked_aura = np.array([t in TRACKED_AURA_EVENTS for t in names]) & (kinds == KIND_AURA)
+
+        row_routable = routable[event_type]
+        row_scored = row_routable & (damage_like | heal_like)[event_type]
+        row_damage = row_routable & (kinds == KIND_DAMAGE)[event_type]
+        row_heal = row_routable & (kinds == KIND_HEAL)[event_type]
+
+        source_id = self._resolve_owners(batch.source_id)
+        dest_id = self._resolve_owners(batch.dest_id)
+
+        # Index -1 (no GUID) maps to the trailing False entry
+        is_player = np.array([g.startswith("Player-") for g in guids] + [False])
+        player_source = row_routable & is_player[source_id]
+        player_dest = row_routable & is_player[dest_id]
+
+        # Swing lines repeated with the same timestamp, source and dest count once,
+        # and only for the first character they are routed to
+        swing_rows = np.flatnonzero(row_routable & swing[event_type])
+        duplicate_swing = np.zeros(rows, dtype=bool)
+        if len(swing_rows):
+            keys = np.stack(
+                (
+                    timestamp_ms[swing_rows],
+                    batch.source_id[swing_rows].astype(np.int64),
+                    batch.dest_id[swing_rows].astype(np.int64),
+                ),
+                axis=1,
+            )
+            _, first = np.unique(keys, axis=0, return_index=True)
+            duplicate_swing[swing_rows] = True
+            duplicate_swing[swing_rows[first]] = False
+
+        done = player_source & row_scored & ~duplicate_swing
+        taken = player_dest & row_scored & ~duplicate_swing
+        taken &= ~(swing[event_type] & player_source)
+        aura = player_dest & tracked_aura[event_type]
+
+        amount = batch.amount
+        effective = np.maximum(amount - batch.overhealing, 0)
+
+        def group_sum(ids, mask, weights=None):
+            selected = None if weights is None else weights[mask]
+            sums = np.bincount(ids[mask], weights=selected, minlength=n_guids)
+            return np.rint(sums).astype(np.int64)
+
+        damage_done = done & row_damage
+        healing_done = done & row_heal
+        damage_taken = taken & row_damage
+        healing_received = taken & row_heal
+
+        totals = {
+            "total_damage_done": group_sum(source_id, damage_done, amount),
+            "total_overkill_done": group_sum(source_id, damage_done, np.maximum(batch.overkill, 0)),
+            "total_healing_done": group_sum(source_id, healing_done, effective),
+            "total_overhealing": group_sum(source_id, healing_done, batch.overhealing),
+            "total_damage_taken": group_sum(dest_id, damage_taken, amount),
+            "total_overkill_taken": group_sum(dest_id, damage_taken, np.maximum(batch.overkill, 0)),
+            "total_healing_received": group_sum(dest_id, healing_received, effective),
+            "damage_done_count": group_sum(source_id, damage_done),
+            "healing_done_count": group_sum(source_id, healing_done),
+            "damage_taken_count": group_sum(dest_id, damage_taken),
+            "healing_received_count": group_sum(dest_id, healing_received),
+        }
+
+        # Characters are created for every routed player, with or without scored events
+        character_ids = np.union1d(source_id[player_source], dest_id[player_dest])
+
+        # Rows that land in each character's all_events list
+        row_index = np.arange(rows)
+        stream_ids = np.concatenate((source_id[done], dest_id[taken], dest_id[aura]))
+        stream_rows = np.concatenate((row_index[done], row_index[taken], row_index[aura]))
+        last_row = np.full(n_guids, -1, dtype=np.int64)
+        np.maximum.at(last_row, stream_ids, stream_rows)
+
+        # Combat period index of each row (-1 outside all periods)
+        period_starts = np.array(
+            [round(p.start_time.timestamp() * 1000) for p in combat_periods], dtype=np.int64
+        )
+        period_ends = np.array(
+            [round(p.end_time.timestamp() * 1000) for p in combat_periods], dtype=np.int64
+        )
+        period_index = np.searchsorted(period_starts, timestamp_ms, side="right") - 1
+        inside = period_index >= 0
+        inside[inside] = timestamp_ms[inside] <= period_ends[period_index[inside]]
+        period_index[~inside] = -1
+
+        combat_events = group_sum(source_id, done & inside)
+        total_combat_time = sum(period.duration for period in combat_periods)
+
+        n_periods = len(combat_periods)
+        damage_by_period = self._group_by_period(
+            source_id, period_index, damage_done & inside, amount, n_guids, n_periods
+        )
+        healing_by_period = self._group_by_period(
+            source_id, period_index, healing_done & inside, effective, n_guids, n_periods
+        )
+
+        deaths = self._find_deaths(source_id, dest_id, player_source, player_dest)
+
+        results = {}
+        for guid_id in character_ids.tolist():
+            guid = guids[guid_id]
+            metrics = CharacterMetrics(
+                character_guid=guid,
+                character_name=parse_character_name(batch.names.get(guid_id))["name"],
+            )
+            for name, values in totals.items():
+                setattr(metrics, name, int(values[guid_id]))
+            metrics.death_count = len(deaths.get(guid_id, ()))
+            metrics.damage_by_period = damage_by_period[guid_id].tolist()
+            metrics.healing_by_period = healing_by_period[guid_id].tolist()
+
+            if last_row[guid_id] >= 0:
+                self._apply_combat_metrics(
+                    metrics,
+                    deaths.get(guid_id, []),
+                    batch.timestamp[last_row[guid_id]],
+                    int(combat_events[guid_id]),
+                    combat_periods,
+                    total_combat_time,
+                    encounter_duration,
+                )
+            results[guid] = metrics
+
+        self._apply_ability_metrics(
+            results,
+            source_id,
+            dest_id,
+            damage_done,
+            healing_done,
+            damage_taken,
+            encounter_duration,
+        )
+        return results
+
+    def _resolve_owners(self, ids: "np.ndarray") -> "np.ndarray":
+        """Map pet/guardian GUID ids to their owner from the summon row onwards."""
+        batch = self.batch
+        rows = len(batch)
+        guids = batch.guids
+
+        pet_ids = []
+        owner_ids = []
+        summon_rows = []
+
+        # Pets summoned before the batch apply from its first row
+        for pet_guid, owner_guid in self.pet_owners.items():
+            pet_id = batch.guid_id(pet_guid)
+            owner_id = batch.guid_id(owner_guid)
+            if pet_id >= 0 and owner_id >= 0:
+                pet_ids.append(pet_id)
+                owner_ids.append(owner_id)
+                summon_rows.append(0)
+
+        summons = np.flatnonzero(batch.event_type_mask("SPELL_SUMMON"))
+        for row in summons.tolist():
+            pet_id = int(batch.dest_id[row])
+            owner_id = int(batch.source_id[row])
+            if pet_id >= 0 and owner_id >= 0 and guids[pet_id].startswith(PET_GUID_PREFIXES):
+                pet_ids.append(pet_id)
+                owner_ids.append(owner_id)
+                summon_rows.append(row)
+
+        resolved = ids.astype(np.int64)
+        if not pet_ids:
+            return resolved
+
+        # Latest summon of the same GUID at or before each row
+        stride = rows + 1
+        summon_keys = np.array(pet_ids, dtype=np.int64) * stride + np.array(summon_rows)
+        order = np.argsort(summon_keys, kind="stable")
+        summon_keys = summon_keys[order]
+        summon_pets = np.array(pet_ids, dtype=np.int64)[order]
+        summon_owners = np.array(owner_ids, dtype=np.int64)[order]
+
+        row_keys = resolved * stride + np.arange(rows)
+        position = np.searchsorted(summon_keys, row_keys, side="right") - 1
+        matched = position >= 0
+        matched[matched] = summon_pets[position[matched]] == resolved[matched]
+        resolved[matched] = summon_owners[position[matched]]
+        return resolved
+
+    def _find_deaths(
+        self,
+        source_id: "np.ndarray",
+        dest_id: "np.ndarray",
+        player_source: "np.ndarray",
+        player_dest: "np.ndarray",
+    ) -> Dict[int, List[float]]:
+        """Get death timestamps per character id, counting characters already seen."""
+        batch = self.batch
+        death_rows = np.flatnonzero(batch.event_type_mask("UNIT_DIED") & player_dest)
+        if not len(death_rows):
+            return {}
+
+        # A death only counts once the character exists from an earlier row
+        row_index = np.arange(len(batch))
+        seen_rows = np.concatenate((row_index[player_source], row_index[player_dest]))
+        seen_ids = np.concatenate((source_id[player_source], dest_id[player_dest]))
+        first_row = np.full(len(batch.guids), len(batch), dtype=np.int64)
+        np.minimum.at(first_row, seen_ids, seen_rows)
+
+        deaths: Dict[int, List[float]] = {}
+        for row in death_rows.tolist():
+            guid_id = int(dest_id[row])
+            if first_row[guid_id] < row:
+                deaths.setdefault(guid_id, []).append(float(batch.timestamp[row]))
+        return deaths
+
+    @staticmethod
+    def _group_by_period(
+        ids: "np.ndarray",
+        period_index: "np.ndarray",
+        mask: "np.ndarray",
+        weights: "np.ndarray",
+        n_guids: int,
+        n_periods: int,
+    ) -> "np.ndarray":
+        """Sum weights per (character id, combat period)."""
+        if not n_periods:
+            return np.zeros((n_guids, 0), dtype=np.int64)
+        flat = ids[mask] * n_periods + period_index[mask]
+        sums = np.bincount(flat, weights=weights[mask], minlength=n_guids * n_periods)
+        return np.rint(sums).astype(np.int64).reshape(n_guids, n_periods)
+
+    @staticmethod
+    def _apply_combat_metrics(
+        metrics: CharacterMetrics,
+        deaths: List[float],
+        last_event_time: float,
+        combat_events: int,
+        combat_periods: List[CombatPeriod],
+        total_combat_time: float,
+        encounter_duration: float,
+    ):
+        """Set combat time, time alive and activity as calculate_combat_metrics does."""
+        metrics.combat_time = total_combat_time
+
+        # Deaths without a resurrection last until the character's last event
+        time_dead = sum(last_event_time - death_time for death_time in deaths)
+        metrics.time_alive = encounter_duration - time_dead
+
+        if total_combat_time <= 0:
+            metrics.activity_percentage = 0.0
+            return
+
+        combat_time_alive = total_combat_time
+        for death_time in deaths:
+            for period in combat_periods:
+                overlap_start = max(death_time, period.start_time.timestamp())
+                overlap_end = min(last_event_time, period.end_time.timestamp())
+                if overlap_start < overlap_end:
+                    combat_time_alive -= overlap_end - overlap_start
+
+        possible_gcds = max(0, combat_time_alive) / GCD_SECONDS
+        metrics.activity_percentage = (
+            min(100, (combat_events / possible_gcds) * 100) if possible_gcds > 0 else 0
+        )
+
+    def _apply_ability_metrics(
+        self,
+        results: Dict[str, CharacterMetrics],
+        source_id: "np.ndarray",
+        dest_id: "np.ndarray",
+        damage_done: "np.ndarray",
+        healing_done: "np.ndarray",
+        damage_taken: "np.ndarray",
+        encounter_duration: float,
+    ):
+        """Build per-ability breakdowns as EnhancedCharacter.calculate_ability_metrics does."""
+        batch = self.batch
+        spell_id = batch.spell_id
+
+        groups = (
+            ("ability_damage", source_id, damage_done, "Melee", True),
+            ("ability_healing", source_id, healing_done & (spell_id != 0), "Unknown", True),
+            ("ability_damage_taken", dest_id, damage_taken, "Melee", False),
+        )
+        for attribute, ids, mask, default_name, count_crits in groups:
+            keys = (ids[mask] << 32) | (spell_id[mask].astype(np.int64) & 0xFFFFFFFF)
+            if not len(keys):
+                continue
+
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            totals = np.bincount(inverse, weights=batch.amount[mask])
+            hits = np.bincount(inverse)
+            crits = np.bincount(inverse, weights=batch.critical[mask])
+
+            for key, total, hit_count, crit_count in zip(
+                unique_keys.tolist(), totals.tolist(), hits.tolist(), crits.tolist()
+            ):
+                guid_id, spell = key >> 32, key & 0xFFFFFFFF
+                if spell >= 0x80000000:
+                    spell -= 1 << 32
+                ability = AbilityMetrics(
+                    spell_id=spell,
+                    spell_name=batch.spell_names.get(spell) or default_name,
+                    hit_count=hit_count,
+                    crit_count=int(crit_count) if count_crits else 0,
+                )
+                if attribute == "ability_healing":
+                    ability.total_healing = int(round(total))
+                else:
+                    ability.total_damage = int(round(total))
+                getattr(results[batch.guids[guid_id]], attribute)[spell] = ability
+
+        for metrics in results.values():
+            for ability in metrics.ability_damage.values():
+                ability.calculate_metrics(total_damage=metrics.total_damage_done)
+                if encounter_duration > 0:
+                    metrics.dps_by_ability[ability.spell_id] = (
+                        ability.total_damage / encounter_duration
+                    )
+
+            for ability in metrics.ability_healing.values():
+                ability.calculate_metrics(total_healing=metrics.total_healing_done)
+                if encounter_duration > 0:
+                    metrics.hps_by_ability[ability.spell_id] = (
+                        ability.total_healing / encounter_duration
+                    )
+
+            total_damage_taken = sum(a.total_damage for a in metrics.ability_damage_taken.values())
+            for ability in metrics.ability_damage_taken.values():
+                ability.calculate_metrics(total_damage=total_damage_taken)
@@ -80,7 +80,7 @@ class DeathAnalyzer:
         # Calculate damage spikes
         damage_by_second = {}
         for event in death_event.recent_damage_taken:
-            second = int(event.timestamp.timestamp())
+            second = int(event.get_epoch())
             if second not in damage_by_second:
                 damage_by_second[second] = 0
             damage_by_second[second] += event.amount
@@ -83,9 +83,13 @@ def create_unified_app(db_path: str = "combat_logs.db") -> FastAPI:
     db = HybridDatabaseManager()
 
     # Initialize cache manager
-    from ..cache import get_cache_manager
+    from ..cache import get_cache_manager, get_shared_query_cache
     cache_manager = get_cache_manager()
 
+    # Share query results between requests and worker processes; QueryAPI
+    # instances created from here on use this cache
+    get_shared_query_cache()
+
     # Create streaming app and mount its endpoints
     streaming_app = create_streaming_app(db_path)
 
@@ -599,6 +599,23 @@ def create_app(db_path: str = "combat_logs.db") -> FastAPI:
                 f"loothing_database_uncompressed_bytes {db_stats.get('total_uncompressed_bytes', 0)}"
             )
 
+        # Query cache metrics
+        cache_stats = db_stats.get("cache")
+        if cache_stats:
+            metrics.append(f"loothing_query_cache_entries {cache_stats['size']}")
+            metrics.append(f"loothing_query_cache_bytes {cache_stats['bytes']}")
+            metrics.append(f"loothing_query_cache_max_bytes {cache_stats['max_bytes']}")
+            metrics.append(f"loothing_query_cache_hits_total {cache_stats['hits']}")
+            metrics.append(f"loothing_query_cache_misses_total {cache_stats['misses']}")
+            metrics.append(f"loothing_query_cache_evictions_total {cache_stats['evictions']}")
+            metrics.append(f"loothing_query_cache_expirations_total {cache_stats['expirations']}")
+
+        shared_stats = db_stats.get("shared_cache")
+        if shared_stats:
+            metrics.append(f"loothing_shared_cache_hits_total {shared_stats['hits']}")
+            metrics.append(f"loothing_shared_cache_misses_total {shared_stats['misses']}")
+            metrics.append(f"loothing_shared_cache_coalesced_total {shared_stats['coalesced']}")
+
         # Authentication metrics
         auth_stats = stats["authentication"]
         metrics.append(f"loothing_auth_api_keys_total {auth_stats['total_api_keys']}")
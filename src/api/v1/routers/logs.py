@@ -1,16 +1,21 @@
 """
 Log processing and upload API endpoints for v1.
 
-Provides endpoints for log file upload, processing status tracking,
-and batch log operations with real-time progress notifications.
+Provides endpoints for log file upload (whole or in resumable chunks),
+processing status tracking, and batch log operations with real-time
+progress notifications.
 """
 
 from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Query, Path
+from fastapi import (
+    APIRouter, HTTPException, Depends, UploadFile, File, Query, Path, Header, Request
+)
 from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 
 from src.database.schema import DatabaseManager
 from ..services.upload_service import UploadService, UploadStatus
+from ..services.chunked_upload import ChunkedUpload
 from ..dependencies import get_authenticated_user
 from ...models import AuthResponse
 
@@ -39,7 +44,7 @@ async def upload_log_file(
     Upload a combat log file for processing.
 
     Args:
-        file: Combat log file (.txt or .log)
+        file: Combat log file (.txt or .log, optionally .gz, .zst or .zip compressed)
         process_async: Whether to process asynchronously (recommended for large files)
         auth: Authenticated user with guild context
 
@@ -76,6 +81,177 @@ async def upload_log_file(
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+class ChunkedUploadRequest(BaseModel):
+    """Request model for starting a chunked upload."""
+
+    file_name: str = Field(..., description="Name of the combat log file")
+    file_size: int = Field(..., gt=0, description="Total file size in bytes")
+    file_hash: Optional[str] = Field(
+        None,
+        pattern="^[0-9a-fA-F]{64}$",
+        description=(
+            "SHA-256 of the whole file. Lets a duplicate be detected before any data is "
+            "sent, and encounters be processed while the upload is in progress"
+        ),
+    )
+
+
+def _chunked_upload_state(upload: ChunkedUpload) -> Dict[str, Any]:
+    """Describe where a chunked upload stands, for resuming it."""
+    session = upload.session
+    return {
+        "upload_id": session.upload_id,
+        "file_name": session.file_name,
+        "file_size": session.file_size,
+        "received_bytes": session.received_bytes,
+        "remaining_bytes": upload.remaining_bytes,
+        "chunks_received": len(session.chunks),
+    }
+
+
+@router.post("/logs/uploads")
+async def init_chunked_upload(
+    request: ChunkedUploadRequest,
+    auth: AuthResponse = Depends(get_authenticated_user),
+    upload_service: UploadService = Depends(get_upload_service),
+) -> Dict[str, Any]:
+    """
+    Start a chunked, resumable upload of a combat log file.
+
+    Send the file with PUT /logs/uploads/{upload_id}/chunks in order, then call
+    POST /logs/uploads/{upload_id}/complete. After a disconnect, GET the upload
+    to find the offset to continue at.
+
+    Args:
+        request: File name, size and optional SHA-256 of the whole file
+        auth: Authenticated user with guild context
+
+    Returns:
+        Upload ID and suggested chunk size, or the earlier upload if the file is a duplicate
+    """
+    if auth.guild_id is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Guild ID is required. Please ensure your API key is associated with a guild.",
+        )
+
+    status = await upload_service.init_chunked_upload(
+        request.file_name,
+        request.file_size,
+        guild_id=auth.guild_id,
+        file_hash=request.file_hash,
+    )
+    duplicate = status.status == "completed"
+
+    return {
+        "upload_id": status.upload_id,
+        "guild_id": auth.guild_id,
+        "guild_name": auth.guild_name,
+        "file_name": status.file_name,
+        "file_size": status.file_size,
+        "status": status.status,
+        "chunk_size": upload_service.DEFAULT_CHUNK_SIZE,
+        "max_chunk_size": upload_service.MAX_CHUNK_SIZE,
+        "received_bytes": status.file_size if duplicate else 0,
+        "duplicate": duplicate,
+    }
+
+
+@router.get("/logs/uploads/{upload_id}")
+async def get_chunked_upload(
+    upload_id: str = Path(..., description="Upload ID"),
+    auth: AuthResponse = Depends(get_authenticated_user),
+    upload_service: UploadService = Depends(get_upload_service),
+) -> Dict[str, Any]:
+    """
+    Get the progress of a chunked upload, e.g. to resume it after a disconnect.
+
+    Args:
+        upload_id: Upload ID returned when the upload was started
+        auth: Authenticated user with guild context
+
+    Returns:
+        Bytes received so far; the next chunk starts at received_bytes
+    """
+    upload = upload_service.get_chunked_upload(upload_id, guild_id=auth.guild_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found or already complete")
+
+    return _chunked_upload_state(upload)
+
+
+@router.put("/logs/uploads/{upload_id}/chunks")
+async def upload_chunk(
+    request: Request,
+    upload_id: str = Path(..., description="Upload ID"),
+    offset: int = Query(..., ge=0, description="Byte offset of the chunk in the file"),
+    checksum: str = Header(..., alias="X-Chunk-SHA256", description="SHA-256 of the chunk"),
+    auth: AuthResponse = Depends(get_authenticated_user),
+    upload_service: UploadService = Depends(get_upload_service),
+) -> Dict[str, Any]:
+    """
+    Append a chunk to a chunked upload.
+
+    The request body is the raw chunk. Chunks must be sent in order; resending
+    a chunk that was already received is accepted and changes nothing.
+
+    Args:
+        upload_id: Upload ID returned when the upload was started
+        offset: Byte offset of the chunk, equal to received_bytes so far
+        checksum: SHA-256 hex digest of the chunk
+        auth: Authenticated user with guild context
+
+    Returns:
+        Bytes received so far
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > upload_service.MAX_CHUNK_SIZE:
+        raise HTTPException(status_code=413, detail="Chunk too large")
+
+    data = await request.body()
+    upload = await upload_service.append_chunk(
+        upload_id, offset, data, checksum, guild_id=auth.guild_id
+    )
+
+    return _chunked_upload_state(upload)
+
+
+@router.post("/logs/uploads/{upload_id}/complete")
+async def complete_chunked_upload(
+    upload_id: str = Path(..., description="Upload ID"),
+    process_async: bool = Query(True, description="Process file asynchronously"),
+    auth: AuthResponse = Depends(get_authenticated_user),
+    upload_service: UploadService = Depends(get_upload_service),
+) -> Dict[str, Any]:
+    """
+    Finish a chunked upload after its last chunk.
+
+    Args:
+        upload_id: Upload ID returned when the upload was started
+        process_async: Whether to process asynchronously
+        auth: Authenticated user with guild context
+
+    Returns:
+        Upload status with ID for tracking progress
+    """
+    status = await upload_service.complete_chunked_upload(
+        upload_id, guild_id=auth.guild_id, process_async=process_async
+    )
+
+    return {
+        "upload_id": status.upload_id,
+        "guild_id": auth.guild_id,
+        "guild_name": auth.guild_name,
+        "file_name": status.file_name,
+        "file_size": status.file_size,
+        "file_hash": status.file_hash,
+        "status": status.status,
+        "progress": status.progress,
+        "duplicate": status.upload_id != upload_id,
+        "message": f"File uploaded successfully for {auth.guild_name}. Upload ID: {status.upload_id}",
+    }
+
+
 @router.get("/logs/{upload_id}/status")
 async def get_log_status(
     upload_id: str = Path(..., description="Upload ID"),
@@ -108,6 +284,7 @@ async def get_log_status(
         "status": status.status,
         "progress": status.progress,
         "encounters_found": status.encounters_found,
+        "encounters_skipped": status.encounters_skipped,
         "characters_found": status.characters_found,
         "events_processed": status.events_processed,
         "error_message": status.error_message,
@@ -155,6 +332,7 @@ async def get_log_progress(
         "status": status.status,
         "progress": status.progress,
         "encounters_found": status.encounters_found,
+        "encounters_skipped": status.encounters_skipped,
         "characters_found": status.characters_found,
         "events_processed": status.events_processed,
         "processing_rate_percent_per_second": round(processing_rate, 2),
@@ -0,0 +1,249 @@
+"""
+Chunked, resumable uploads of combat log files.
+
+A log is sent as a series of chunks appended in order, each with its own
+SHA-256 checksum. The session state is kept in a JSON sidecar next to the
+partial file, so a client that lost its connection (or a restarted server)
+can continue at received_bytes. The whole-file SHA-256 is updated as chunks
+arrive, so completing an upload never re-reads the file.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.models.unified_encounter import UnifiedEncounter
+from src.processing.live_parser import LiveLogParser
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkError(ValueError):
+    """A chunk that cannot be appended to its upload."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class ChunkedUploadSession:
+    """Persisted state of a chunked upload."""
+
+    upload_id: str
+    file_name: str
+    file_size: int  # Total size declared by the client
+    guild_id: Optional[int] = None
+    file_hash: Optional[str] = None  # Whole-file SHA-256 declared by the client
+    received_bytes: int = 0
+    chunks: List[List[Any]] = field(default_factory=list)  # [offset, length, sha256]
+    completed: bool = False
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChunkedUploadSession":
+        """Create a session from a dictionary."""
+        return cls(**data)
+
+    def save(self, session_file: Path):
+        """Write the session to a JSON file, replacing it atomically."""
+        session_file = Path(session_file)
+        tmp_file = session_file.with_suffix(session_file.suffix + ".tmp")
+        tmp_file.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        os.replace(tmp_file, session_file)
+
+    @classmethod
+    def load(cls, session_file: Path) -> Optional["ChunkedUploadSession"]:
+        """Read a session file, or None if it does not exist or is invalid."""
+        try:
+            return cls.from_dict(json.loads(Path(session_file).read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f"No usable upload session in {session_file}: {e}")
+            return None
+
+
+class ChunkedUpload:
+    """
+    A chunked upload in progress: its session, partial file and rolling hash.
+
+    Chunks must be appended at received_bytes. Sending a chunk that was
+    already received again (e.g. because the response was lost) is accepted
+    if its checksum matches, so clients can safely retry.
+    """
+
+    # Seconds the encounter iterator waits for new data before polling again
+    POLL_INTERVAL = 0.5
+
+    # Seconds without new data after which an upload being processed is failed
+    IDLE_TIMEOUT = 30 * 60
+
+    def __init__(self, session: ChunkedUploadSession, upload_dir: Path):
+        """
+        Initialize an upload, resuming its partial file if one exists.
+
+        Args:
+            session: Upload session (new, or loaded from its sidecar)
+            upload_dir: Directory holding partial files and session sidecars
+        """
+        self.session = session
+        self.file_path = Path(upload_dir) / f"{session.upload_id}_{session.file_name}"
+        self.session_file = Path(upload_dir) / f"{session.upload_id}.upload.json"
+
+        # Set when more data was appended, and when the upload is finished
+        self.data_appended = threading.Event()
+        self.finished = threading.Event()
+        self.error: Optional[str] = None
+        self.last_activity = time.monotonic()
+
+        self._hasher = hashlib.sha256()
+        self._resume()
+
+    def _resume(self):
+        """Rebuild the rolling hash from the bytes received so far."""
+        received = self.session.received_bytes
+        if not self.file_path.exists():
+            if received:
+                raise ChunkError(f"Partial file for upload {self.session.upload_id} is gone", 410)
+            self.file_path.touch()
+            return
+
+        with open(self.file_path, "r+b") as f:
+            # Drop bytes of a chunk whose write was interrupted before it was recorded
+            f.truncate(received)
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                self._hasher.update(block)
+
+    @property
+    def remaining_bytes(self) -> int:
+        """Bytes still to be received."""
+        return self.session.file_size - self.session.received_bytes
+
+    def append(self, offset: int, data: bytes, checksum: str) -> bool:
+        """
+        Append one chunk.
+
+        Args:
+            offset: Byte offset of the chunk in the file
+            data: Chunk contents
+            checksum: SHA-256 hex digest of data
+
+        Returns:
+            True if the chunk was appended, False if it had already been received
+
+        Raises:
+            ChunkError: If the checksum is wrong or the chunk does not fit
+        """
+        session = self.session
+        if session.completed:
+            raise ChunkError("Upload is already complete", 409)
+
+        if hashlib.sha256(data).hexdigest() != checksum.lower():
+            raise ChunkError("Chunk checksum mismatch", 422)
+
+        if offset < session.received_bytes:
+            for chunk_offset, length, chunk_hash in session.chunks:
+                if chunk_offset == offset and length == len(data) and chunk_hash == checksum.lower():
+                    return False
+            raise ChunkError(
+                f"Chunk at {offset} overlaps received data; resume at {session.received_bytes}",
+                409,
+            )
+        if offset > session.received_bytes:
+            raise ChunkError(f"Missing data before {offset}; resume at {session.received_bytes}", 409)
+        if offset + len(data) > session.file_size:
+            raise ChunkError("Chunk extends past the declared file size", 413)
+
+        with open(self.file_path, "ab") as f:
+            f.write(data)
+
+        self._hasher.update(data)
+        self.last_activity = time.monotonic()
+        session.received_bytes += len(data)
+        session.chunks.append([offset, len(data), checksum.lower()])
+        session.save(self.session_file)
+
+        self.data_appended.set()
+        return True
+
+    def complete(self) -> str:
+        """
+        Mark all data as received.
+
+        Returns:
+            SHA-256 hex digest of the whole file
+
+        Raises:
+            ChunkError: If data is missing or the file does not match its declared hash
+        """
+        session = self.session
+        if self.remaining_bytes:
+            raise ChunkError(
+                f"Upload incomplete: {session.received_bytes} of {session.file_size} bytes received",
+                409,
+            )
+
+        file_hash = self._hasher.hexdigest()
+        if session.file_hash and file_hash != session.file_hash.lower():
+            self.fail("File hash does not match the hash declared for the upload")
+            raise ChunkError(self.error, 422)
+
+        session.completed = True
+        session.save(self.session_file)
+        self.finished.set()
+        return file_hash
+
+    def fail(self, message: str):
+        """Abort the upload; encounters still being iterated raise an error."""
+        self.error = message
+        self.finished.set()
+
+    def discard(self):
+        """Remove the partial file and session sidecar."""
+        self.file_path.unlink(missing_ok=True)
+        self.session_file.unlink(missing_ok=True)
+
+    def iter_encounters(self) -> Iterator[UnifiedEncounter]:
+        """
+        Yield encounters from the file while it is still being uploaded.
+
+        Each encounter is yielded as soon as the chunk containing its end has
+        arrived. Runs until complete() or fail() is called; after fail() it
+        raises, so the upload's processing ends with an error. An upload that
+        receives no data for IDLE_TIMEOUT seconds is failed.
+
+        Yields:
+            UnifiedEncounter objects in file order
+        """
+        live = LiveLogParser(str(self.file_path), poll_interval=self.POLL_INTERVAL)
+
+        while True:
+            # Checked before polling, so the last poll sees every chunk
+            done = self.finished.is_set()
+            self.data_appended.clear()
+            live.poll(include_partial=done and self.error is None)
+
+            completed = live.completed_encounters
+            yield from completed
+            # Stored encounters are not kept alive by the segmenter
+            completed.clear()
+
+            if done:
+                break
+            self.data_appended.wait(self.POLL_INTERVAL)
+
+            if time.monotonic() - self.last_activity > self.IDLE_TIMEOUT:
+                self.fail(f"No data received for {self.IDLE_TIMEOUT} seconds")
+
+        if self.error:
+            raise ValueError(self.error)
+        yield from live.finish()
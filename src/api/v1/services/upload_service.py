@@ -6,21 +6,25 @@ Handles file uploads validation processing and real-time progress tracking.
 
 import os
 import uuid
-import hashlib
 import logging
 import asyncio
 import tempfile
+import threading
 import time
 from pathlib import Path
-from typing import Dict, Any, Optional, Callable, List
+from typing import Dict, Any, Optional, Callable, Iterable, List, Set
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from fastapi import UploadFile, HTTPException
 
+from src.cache.query_results import get_shared_query_cache
 from src.database.schema import DatabaseManager, create_tables
-from src.database.storage import EventStorage
+from src.database.storage import EventStorage, calculate_file_hash
+from src.parser.compressed import COMPRESSED_SUFFIXES
+from src.processing.pipeline import BoundedPipeline
 from src.processing.unified_parallel_processor import UnifiedParallelProcessor
 from src.models.unified_encounter import UnifiedEncounter
+from .chunked_upload import ChunkedUpload, ChunkedUploadSession, ChunkError
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +38,10 @@ class UploadStatus:
     file_size: int
     file_hash: Optional[str] = None
     guild_id: Optional[int] = None
-    status: str = "pending"  # pending processing completed error
+    status: str = "pending"  # pending uploading processing completed error
     progress: float = 0.0
     encounters_found: int = 0
+    encounters_skipped: int = 0  # Already stored for the guild, e.g. from an earlier upload
     characters_found: int = 0
     events_processed: int = 0
     error_message: Optional[str] = None
@@ -49,18 +54,32 @@ class UploadService:
     Service for handling combat log file uploads and processing.
 
     Features:
-    - File validation and duplicate detection
+    - File validation and duplicate detection, per file and per encounter
+    - Chunked, resumable uploads with encounters stored while data arrives
+      (chunked uploads are tracked per process, so the API must run a single
+      worker, WORKER_COUNT=1, while they are in use)
     - Asynchronous processing with progress tracking
     - Real-time WebSocket notifications
     - Database storage and querying
     """
 
+    # Completed encounters that may wait between parsing and storage
+    PIPELINE_QUEUE_SIZE = 4
+
+    # Compressed logs are stored as uploaded and decompressed while parsing
+    ALLOWED_SUFFIXES = (".txt", ".log") + COMPRESSED_SUFFIXES
+
+    # Suggested and maximum chunk sizes for chunked uploads
+    DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+    MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
     def __init__(
         self,
         db: DatabaseManager,
         upload_dir: Optional[Path] = None,
         max_file_size: int = 2 * 1024 * 1024 * 1024,  # 2GB
         progress_callback: Optional[Callable[[str, UploadStatus], None]] = None,
+        max_decompressed_size: int = 20 * 1024 * 1024 * 1024,  # 20GB
     ):
         """
         Initialize upload service.
@@ -70,6 +89,8 @@ class UploadService:
             upload_dir: Directory for temporary file storage
             max_file_size: Maximum allowed file size in bytes
             progress_callback: Callback for progress updates
+            max_decompressed_size: Maximum size in bytes a compressed log may
+                inflate to while it is parsed
         """
         self.db = db
 
@@ -80,8 +101,11 @@ class UploadService:
         self._ensure_default_guild(db)
 
         self.storage = EventStorage(db)
-        self.processor = UnifiedParallelProcessor()
+        # Uploads are stored on worker threads but share one database connection,
+        # so their storage transactions (one per encounter) must not interleave
+        self._storage_lock = threading.Lock()
         self.max_file_size = max_file_size
+        self.max_decompressed_size = max_decompressed_size
         self.progress_callback = progress_callback
 
         # Set up upload directory
@@ -94,6 +118,8 @@ class UploadService:
 
         # Track active uploads
         self.active_uploads: Dict[str, UploadStatus] = {}
+        self.chunked_uploads: Dict[str, ChunkedUpload] = {}
+        self._chunked_tasks: Dict[str, "asyncio.Task"] = {}
 
         # Initialize database schema
         self._init_upload_tables()
@@ -144,27 +170,30 @@ class UploadService:
             logger.error(f"Failed to initialize upload tables: {e}")
             raise
 
-    def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate SHA-256 hash of file for duplicate detection."""
-        hash_sha256 = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
-
     def _validate_file(self, file: UploadFile) -> None:
         """Validate uploaded file."""
-        if not file.filename:
+        self._validate_file_name(file.filename)
+
+        # Note: file.size might not be available in all cases
+        # We'll check size after saving the file
+
+    def _validate_file_name(self, file_name: Optional[str]) -> None:
+        """Validate the name of an uploaded file."""
+        if not file_name:
             raise HTTPException(status_code=400, detail="No filename provided")
 
-        if not file.filename.lower().endswith((".txt", ".log")):
+        if Path(file_name).name != file_name:
+            raise HTTPException(status_code=400, detail="Filename must not contain a path")
+
+        if not file_name.lower().endswith(self.ALLOWED_SUFFIXES):
             raise HTTPException(
-                status_code=400, detail="Invalid file type. Only .txt and .log files are supported"
+                status_code=400,
+                detail=(
+                    "Invalid file type. Only .txt and .log files, optionally compressed "
+                    "(.gz, .zst, .zip), are supported"
+                ),
             )
 
-        # Note: file.size might not be available in all cases
-        # We'll check size after saving the file
-
     async def _save_upload_file(self, file: UploadFile) -> Path:
         """Save uploaded file to temporary directory."""
         upload_id = str(uuid.uuid4())
@@ -303,8 +332,26 @@ class UploadService:
         except Exception as e:
             logger.error(f"Failed to notify progress: {e}")
 
-    async def _process_file_async(self, upload_id: str, file_path: Path, status: UploadStatus):
-        """Process uploaded file asynchronously."""
+    async def _process_file_async(
+        self,
+        upload_id: str,
+        file_path: Path,
+        status: UploadStatus,
+        encounters: Optional[Iterable[UnifiedEncounter]] = None,
+        delete_file: bool = True,
+    ):
+        """
+        Process uploaded file asynchronously.
+
+        Args:
+            upload_id: Upload ID
+            file_path: Uploaded log file
+            status: Upload status to update
+            encounters: Encounters to store instead of parsing file_path with the
+                parallel processor (e.g. from a file that is still being uploaded)
+            delete_file: Delete file_path once processing ended; False leaves
+                that to the caller
+        """
         try:
             logger.info(f"Starting async processing of {file_path}")
 
@@ -313,28 +360,60 @@ class UploadService:
             status.start_time = datetime.now()
             self._notify_progress(upload_id, status)
 
-            # Process with UnifiedParallelProcessor
-            encounters = self.processor.process_file(file_path)
+            # Parse with UnifiedParallelProcessor and store encounters in the
+            # database as they are completed, instead of after the whole log
+            guild_id = status.guild_id or 1
+            processor = None
+            if encounters is None:
+                # One processor per upload, so concurrent uploads do not share its state.
+                # The upload is deleted after processing, so its index is not persisted
+                processor = UnifiedParallelProcessor(
+                    persist_index=False, max_log_bytes=self.max_decompressed_size
+                )
+                encounters = processor.iter_encounters(
+                    file_path,
+                    known_fingerprints=lambda fingerprints: self._known_fingerprints(
+                        guild_id, fingerprints
+                    ),
+                )
+
+            def store(stream):
+                # The lock is only held per write, never while parsing or waiting
+                # for chunks. The whole-file hash, so a log with appended
+                # encounters is not taken for the earlier upload it starts with
+                return self.storage.store_unified_encounter_stream(
+                    encounters=stream,
+                    log_file_path=str(file_path),
+                    guild_id=status.guild_id,
+                    file_hash=status.file_hash,
+                    lock=self._storage_lock,
+                )
 
-            # Store encounters in database
-            storage_result = self.storage.store_unified_encounters(
-                encounters=encounters,
-                log_file_path=str(file_path),
-                guild_id=status.guild_id, 
+            pipeline = BoundedPipeline(queue_size=self.PIPELINE_QUEUE_SIZE)
+            # Run on a worker thread so the event loop keeps accepting requests
+            # (and chunks of an upload whose encounters are being stored)
+            storage_result = await asyncio.get_event_loop().run_in_executor(
+                None, lambda: pipeline.run(encounters, store)
             )
+            logger.debug(f"Pipeline stats for {file_path}: {pipeline.get_stats()}")
+            if storage_result.get("encounters_stored"):
+                self._invalidate_query_results()
 
             # Update final status
             status.status = "completed"
             status.progress = 100.0
-            status.encounters_found = len(encounters)
+            status.encounters_found = storage_result.get("encounters_stored", 0)
             status.characters_found = storage_result.get("characters_stored", 0)
             status.events_processed = storage_result.get("events_stored", 0)
+            if processor is not None:
+                status.encounters_skipped = processor.encounters_skipped
             status.end_time = datetime.now()
 
             self._notify_progress(upload_id, status)
 
             logger.info(
-                f"Completed processing {file_path}: {len(encounters)} encounters "
+                f"Completed processing {file_path}: {status.encounters_found} encounters "
+                f"({status.encounters_skipped} already stored) "
                 f"{status.characters_found} characters, {status.events_processed} events"
             )
 
@@ -350,11 +429,24 @@ class UploadService:
         finally:
             # Clean up temporary file
             try:
-                file_path.unlink(missing_ok=True)
-                logger.debug(f"Cleaned up temporary file: {file_path}")
+                if delete_file:
+                    file_path.unlink(missing_ok=True)
+                    logger.debug(f"Cleaned up temporary file: {file_path}")
             except Exception as e:
                 logger.warning(f"Failed to clean up temporary file {file_path}: {e}")
 
+    def _invalidate_query_results(self):
+        """Drop query results shared between API workers, now that new encounters are stored."""
+        try:
+            get_shared_query_cache().invalidate()
+        except Exception as e:
+            logger.warning(f"Failed to invalidate shared query results: {e}")
+
+    def _known_fingerprints(self, guild_id: int, fingerprints: List[str]) -> Set[str]:
+        """Get the encounter fingerprints a guild already has stored."""
+        with self._storage_lock:
+            return self.storage.get_known_fingerprints(guild_id, fingerprints)
+
     def _ensure_default_guild(self, db: DatabaseManager) -> None:
         """Ensure a default guild exists for backward compatibility."""
         try:
@@ -399,7 +491,7 @@ class UploadService:
 
         try:
             # Calculate file hash for duplicate detection
-            file_hash = self._calculate_file_hash(file_path)
+            file_hash = calculate_file_hash(file_path)
 
             # Check for duplicates
             existing = self._check_duplicate(file_hash)
@@ -438,6 +530,279 @@ class UploadService:
             logger.error(f"Upload failed: {e}")
             raise
 
+    async def init_chunked_upload(
+        self,
+        file_name: str,
+        file_size: int,
+        guild_id: Optional[int] = None,
+        file_hash: Optional[str] = None,
+    ) -> UploadStatus:
+        """
+        Start a chunked upload.
+
+        If the client declares the SHA-256 of the whole file, a file that was
+        already processed is recognized before any data is sent, and
+        encounters are stored while the remaining chunks are still arriving.
+
+        Args:
+            file_name: Name of the log file
+            file_size: Total size of the file in bytes
+            guild_id: Guild ID for multi-tenant isolation
+            file_hash: Optional SHA-256 hex digest of the whole file
+
+        Returns:
+            Upload status; status "completed" means the file is a duplicate
+        """
+        self._validate_file_name(file_name)
+
+        if file_size <= 0:
+            raise HTTPException(status_code=400, detail="File size must be positive")
+        if file_size > self.max_file_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {self.max_file_size // (1024*1024)}MB"
+            )
+
+        if file_hash:
+            file_hash = file_hash.lower()
+            existing = self._check_duplicate(file_hash)
+            if existing and existing.status == "completed":
+                logger.info(f"Duplicate file declared: {file_name} (hash: {file_hash[:8]})")
+                return existing
+
+        upload_id = str(uuid.uuid4())
+        session = ChunkedUploadSession(
+            upload_id=upload_id,
+            file_name=file_name,
+            file_size=file_size,
+            guild_id=guild_id,
+            file_hash=file_hash,
+        )
+        upload = ChunkedUpload(session, self.upload_dir)
+        session.save(upload.session_file)
+        self.chunked_uploads[upload_id] = upload
+
+        status = UploadStatus(
+            upload_id=upload_id,
+            file_name=file_name,
+            file_size=file_size,
+            file_hash=file_hash,
+            guild_id=guild_id,
+            status="uploading",
+        )
+        self._notify_progress(upload_id, status)
+        self._start_chunked_processing(upload, status)
+
+        logger.info(f"Started chunked upload {upload_id} for {file_name} ({file_size} bytes)")
+        return status
+
+    def _start_chunked_processing(self, upload: ChunkedUpload, status: UploadStatus):
+        """Store encounters of a chunked upload while its data arrives, if possible."""
+        # Without a declared hash a duplicate is only known once all data is in,
+        # and compressed logs cannot be parsed before they are complete
+        if not upload.session.file_hash or upload.session.file_name.lower().endswith(
+            COMPRESSED_SUFFIXES
+        ):
+            return
+
+        upload_id = upload.session.upload_id
+        task = asyncio.create_task(
+            self._process_file_async(
+                upload_id,
+                upload.file_path,
+                status,
+                encounters=upload.iter_encounters(),
+                delete_file=False,
+            )
+        )
+        task.add_done_callback(lambda _: self._chunked_processing_done(upload))
+        self._chunked_tasks[upload_id] = task
+        logger.info(f"Processing chunked upload {upload_id} while it is uploaded")
+
+    def _chunked_processing_done(self, upload: ChunkedUpload):
+        """Clean up after processing of a chunked upload ended."""
+        upload_id = upload.session.upload_id
+        self._chunked_tasks.pop(upload_id, None)
+        if upload.finished.is_set():
+            self._forget_chunked_upload(upload_id, discard=True)
+        else:
+            # Storage failed while data was still arriving; the upload can still
+            # be completed, and is then processed from its file
+            status = self._chunked_upload_status(upload)
+            status.status = "uploading"
+            self._notify_progress(upload_id, status)
+            logger.warning(f"Chunked upload {upload_id} is processed once it is complete")
+
+    def _forget_chunked_upload(self, upload_id: str, discard: bool = False):
+        """Stop tracking a chunked upload and remove its session sidecar."""
+        self._chunked_tasks.pop(upload_id, None)
+        upload = self.chunked_uploads.pop(upload_id, None)
+        if upload is None:
+            return
+        if discard:
+            upload.discard()
+        else:
+            # The file itself is still needed for processing
+            upload.session_file.unlink(missing_ok=True)
+
+    def get_chunked_upload(
+        self, upload_id: str, guild_id: Optional[int] = None
+    ) -> Optional[ChunkedUpload]:
+        """
+        Get a chunked upload that is still receiving data.
+
+        Uploads interrupted by a server restart are resumed from their session
+        sidecar, so clients can continue at the last received byte.
+
+        Args:
+            upload_id: Upload ID returned by init_chunked_upload
+            guild_id: Guild the upload must belong to, if given
+
+        Returns:
+            The upload, or None if it does not exist or is already complete
+        """
+        upload = self.chunked_uploads.get(upload_id)
+        if upload is None:
+            try:
+                uuid.UUID(upload_id)
+            except ValueError:
+                return None
+
+            session = ChunkedUploadSession.load(self.upload_dir / f"{upload_id}.upload.json")
+            if session is None or session.completed:
+                return None
+            try:
+                upload = ChunkedUpload(session, self.upload_dir)
+            except ChunkError as e:
+                logger.warning(f"Cannot resume chunked upload {upload_id}: {e}")
+                return None
+
+            self.chunked_uploads[upload_id] = upload
+            status = self._chunked_upload_status(upload)
+            status.status = "uploading"
+            status.error_message = None
+            self._notify_progress(upload_id, status)
+            self._start_chunked_processing(upload, status)
+            logger.info(f"Resumed chunked upload {upload_id} at {session.received_bytes} bytes")
+
+        if guild_id is not None and upload.session.guild_id != guild_id:
+            return None
+        return upload
+
+    def _chunked_upload_status(self, upload: ChunkedUpload) -> UploadStatus:
+        """Get the status of a chunked upload, or a new one if none was saved."""
+        session = upload.session
+        return self.get_upload_status(session.upload_id) or UploadStatus(
+            upload_id=session.upload_id,
+            file_name=session.file_name,
+            file_size=session.file_size,
+            file_hash=session.file_hash,
+            guild_id=session.guild_id,
+            status="uploading",
+        )
+
+    async def append_chunk(
+        self,
+        upload_id: str,
+        offset: int,
+        data: bytes,
+        checksum: str,
+        guild_id: Optional[int] = None,
+    ) -> ChunkedUpload:
+        """
+        Append one chunk to a chunked upload.
+
+        Args:
+            upload_id: Upload ID returned by init_chunked_upload
+            offset: Byte offset of the chunk in the file
+            data: Chunk contents
+            checksum: SHA-256 hex digest of the chunk
+            guild_id: Guild the upload must belong to, if given
+
+        Returns:
+            The upload, with received_bytes updated
+        """
+        if len(data) > self.MAX_CHUNK_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Chunk too large. Maximum size is {self.MAX_CHUNK_SIZE // (1024*1024)}MB"
+            )
+
+        upload = self.get_chunked_upload(upload_id, guild_id)
+        if upload is None:
+            raise HTTPException(status_code=404, detail="Upload not found or already complete")
+
+        # No await between the offset check and the write, so concurrent
+        # requests for the same upload cannot interleave their chunks
+        try:
+            upload.append(offset, data, checksum)
+        except ChunkError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+
+        return upload
+
+    async def complete_chunked_upload(
+        self, upload_id: str, guild_id: Optional[int] = None, process_async: bool = True
+    ) -> UploadStatus:
+        """
+        Finish a chunked upload once all of its data was received.
+
+        Args:
+            upload_id: Upload ID returned by init_chunked_upload
+            guild_id: Guild the upload must belong to, if given
+            process_async: Whether to process asynchronously
+
+        Returns:
+            Upload status; for a duplicate, the status of the earlier upload
+        """
+        upload = self.get_chunked_upload(upload_id, guild_id)
+        if upload is None:
+            raise HTTPException(status_code=404, detail="Upload not found or already complete")
+
+        status = self._chunked_upload_status(upload)
+        task = self._chunked_tasks.get(upload_id)
+
+        try:
+            file_hash = upload.complete()
+        except ChunkError as e:
+            if upload.error and task is None:
+                # The upload is unusable; a running task reports its own error
+                status.status = "error"
+                status.error_message = upload.error
+                status.end_time = datetime.now()
+                self._notify_progress(upload_id, status)
+                self._forget_chunked_upload(upload_id, discard=True)
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+
+        status.file_hash = file_hash
+
+        if task is not None:
+            # Encounters are already being stored; the task now reads the rest
+            if not process_async:
+                await task
+            return status
+
+        existing = self._check_duplicate(file_hash)
+        if existing and existing.status == "completed":
+            logger.info(f"Duplicate file detected: {status.file_name} (hash: {file_hash[:8]})")
+            self._forget_chunked_upload(upload_id, discard=True)
+            self.active_uploads.pop(upload_id, None)
+            self.db.execute("DELETE FROM uploads WHERE upload_id = %s", (upload_id,))
+            return existing
+
+        status.status = "pending"
+        status.error_message = None
+        self._notify_progress(upload_id, status)
+        self._forget_chunked_upload(upload_id)
+
+        if process_async:
+            asyncio.create_task(self._process_file_async(upload_id, upload.file_path, status))
+            logger.info(f"Started async processing for upload {upload_id}")
+        else:
+            await self._process_file_async(upload_id, upload.file_path, status)
+
+        return status
+
     def get_upload_status(self, upload_id: str, guild_id: Optional[int] = None) -> Optional[UploadStatus]:
         """Get current status of an upload."""
         # Check in-memory first
@@ -1,8 +1,9 @@
 """
 Cache module for WoW Combat Log Parser API.
 
-Provides Redis-based caching with automatic fallback to in-memory caching
-for improved performance and session management.
+Provides Redis-based caching with automatic fallback to on-disk or in-memory
+caching for improved performance and session management, and a query result
+cache shared by all API workers.
 """
 
 from .redis_client import (
@@ -10,15 +11,25 @@ from .redis_client import (
     CacheBackend,
     RedisBackend,
     MemoryBackend,
+    DiskBackend,
     get_cache_manager,
     close_cache_manager
 )
+from .query_results import (
+    SharedQueryCache,
+    get_shared_query_cache,
+    close_shared_query_cache
+)
 
 __all__ = [
     "CacheManager",
     "CacheBackend",
     "RedisBackend",
     "MemoryBackend",
+    "DiskBackend",
     "get_cache_manager",
-    "close_cache_manager"
+    "close_cache_manager",
+    "SharedQueryCache",
+    "get_shared_query_cache",
+    "close_shared_query_cache"
 ]
\ No newline at end of file
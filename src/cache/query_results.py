@@ -0,0 +1,290 @@
+"""
+Query result cache shared by all API worker processes.
+
+Each uvicorn worker has its own in-memory QueryCache, and routers that build
+a QueryAPI per request start with an empty one on every call. SharedQueryCache
+adds a second level on the cache manager's backend (Redis, or the on-disk
+backend when Redis is not configured), so a result computed by one worker is
+served to all of them.
+
+Identical queries running at the same time are coalesced: threads of one
+process wait for the first caller's result, and across processes the first
+caller holds a short lock key in the backend while the others poll briefly
+for the result it stores.
+
+Entries are signed with a secret shared by the workers (CACHE_SECRET), and
+entries whose signature does not match are ignored, so whoever can write to
+Redis or the cache directory cannot make the workers unpickle their data.
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .redis_client import CacheBackend, get_cache_manager
+
+logger = logging.getLogger(__name__)
+
+# Marks a missing entry, since None is a valid cached result
+_MISSING = object()
+
+# Length of the HMAC-SHA256 signature in front of each stored value
+_SIGNATURE_BYTES = hashlib.sha256().digest_size
+
+
+class _Flight:
+    """A computation in progress that other threads of the process can wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = _MISSING
+
+
+class SharedQueryCache:
+    """
+    Result cache on a CacheBackend with request coalescing.
+
+    Values are pickled, prefixed with their HMAC-SHA256 and stored base64
+    encoded, so any backend that stores strings works. Only values signed
+    with the cache's secret are unpickled. invalidate() drops every entry at
+    once by moving to a new key generation, without having to enumerate keys.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str = "query",
+        lock_ttl: float = 30.0,
+        poll_interval: float = 0.05,
+        max_wait: float = 1.0,
+        max_value_bytes: int = 8 * 1024 * 1024,
+        secret: Optional[bytes] = None,
+    ):
+        """
+        Initialize shared query cache.
+
+        Args:
+            backend: Cache backend with synchronous string access
+            namespace: Prefix for all keys stored in the backend
+            lock_ttl: Seconds after which the lock of a query in progress expires
+            poll_interval: Seconds between checks for another process's result
+            max_wait: Seconds to wait for another process's result before
+                running the query here; callers may be blocking a request
+            max_value_bytes: Results larger than this when serialized are not stored
+            secret: Key signing the stored values; processes only share results
+                when they use the same secret (if None, a random key is used and
+                results are only shared within this process)
+        """
+        self.backend = backend
+        self.namespace = namespace
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+        self.max_value_bytes = max_value_bytes
+        self._secret = secret or os.urandom(32)
+
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.skipped = 0
+
+    def _generation(self) -> str:
+        """Get the current key generation."""
+        return self.backend.get_raw(f"{self.namespace}:generation") or "0"
+
+    def _backend_key(self, key: str, generation: str) -> str:
+        """Build the backend key for a cache key."""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{generation}:{digest}"
+
+    def _sign(self, data: bytes) -> bytes:
+        """Compute the signature of serialized data."""
+        return hmac.new(self._secret, data, hashlib.sha256).digest()
+
+    def _load(self, backend_key: str) -> Any:
+        """Load, verify and unpickle a value, or _MISSING."""
+        raw = self.backend.get_raw(backend_key)
+        if raw is None:
+            return _MISSING
+        try:
+            signed = base64.b64decode(raw)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable shared cache entry {backend_key}: {e}")
+            return _MISSING
+
+        signature, data = signed[:_SIGNATURE_BYTES], signed[_SIGNATURE_BYTES:]
+        if not hmac.compare_digest(signature, self._sign(data)):
+            # Written with another secret, or not by a worker at all
+            logger.debug(f"Ignoring shared cache entry {backend_key} with a wrong signature")
+            return _MISSING
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable shared cache entry {backend_key}: {e}")
+            return _MISSING
+
+    def _store(self, backend_key: str, value: Any, ttl: Optional[float]) -> bool:
+        """Pickle, sign and store a value."""
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Result for {backend_key} cannot be shared: {e}")
+            self.skipped += 1
+            return False
+
+        if len(data) > self.max_value_bytes:
+            self.skipped += 1
+            return False
+        signed = self._sign(data) + data
+        return self.backend.set_raw(backend_key, base64.b64encode(signed).decode("ascii"), ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached value, or None if it is not cached."""
+        value = self._load(self._backend_key(key, self._generation()))
+        return None if value is _MISSING else value
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Cache a value for all processes."""
+        return self._store(self._backend_key(key, self._generation()), value, ttl)
+
+    def invalidate(self):
+        """Drop all cached values by starting a new key generation."""
+        self.backend.set_raw(f"{self.namespace}:generation", str(time.time_ns()))
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Get a cached value, or compute and cache it once for all concurrent callers.
+
+        None results are returned to every waiting caller but not stored.
+
+        Args:
+            key: Cache key
+            compute: Function that runs the query
+            ttl: Time to live in seconds
+
+        Returns:
+            Cached or newly computed value
+        """
+        backend_key = self._backend_key(key, self._generation())
+        value = self._load(backend_key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        with self._lock:
+            flight = self._flights.get(backend_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[backend_key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.value is not _MISSING:
+                self.coalesced += 1
+                return flight.value
+            # The first caller failed; run the query ourselves
+            return compute()
+
+        try:
+            flight.value = self._compute_once(backend_key, compute, ttl)
+            return flight.value
+        finally:
+            with self._lock:
+                del self._flights[backend_key]
+            flight.done.set()
+
+    def _compute_once(self, backend_key: str, compute: Callable[[], Any], ttl: Optional[float]) -> Any:
+        """Run compute unless another process is already running the same query."""
+        lock_key = f"{backend_key}:lock"
+        locked = self.backend.add_raw(lock_key, str(os.getpid()), self.lock_ttl)
+        if not locked:
+            value = self._wait_for(backend_key, lock_key)
+            if value is not _MISSING:
+                self.coalesced += 1
+                return value
+
+        self.misses += 1
+        try:
+            value = compute()
+            if value is not None:
+                self._store(backend_key, value, ttl)
+            return value
+        finally:
+            if locked:
+                self.backend.delete_raw(lock_key)
+
+    def _wait_for(self, backend_key: str, lock_key: str) -> Any:
+        """Poll for the result of another process's query until its lock is gone, for up to max_wait."""
+        deadline = time.monotonic() + min(self.max_wait, self.lock_ttl)
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            value = self._load(backend_key)
+            if value is not _MISSING:
+                return value
+            if self.backend.get_raw(lock_key) is None:
+                return self._load(backend_key)
+        return _MISSING
+
+    def stats(self) -> Dict[str, Any]:
+        """Get shared cache statistics."""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "skipped": self.skipped,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            "in_flight": len(self._flights),
+        }
+
+
+# Global shared query cache instance
+_shared_query_cache: Optional[SharedQueryCache] = None
+
+
+def get_shared_query_cache() -> SharedQueryCache:
+    """Get the global shared query cache, on the global cache manager's backend."""
+    global _shared_query_cache
+
+    if _shared_query_cache is None:
+        from ..config import get_settings
+
+        cache_manager = get_cache_manager()
+        secret = get_settings().redis.cache_secret
+        if not cache_manager.shared_between_processes:
+            logger.info(
+                "Query results are shared between requests but not between workers; "
+                "configure Redis or CACHE_DIR to share them across workers"
+            )
+        elif not secret:
+            logger.warning(
+                "Query results are shared between requests but not between workers; "
+                "set CACHE_SECRET to share them across workers"
+            )
+        _shared_query_cache = SharedQueryCache(
+            cache_manager.backend, secret=secret.encode("utf-8") if secret else None
+        )
+
+    return _shared_query_cache
+
+
+def current_shared_query_cache() -> Optional[SharedQueryCache]:
+    """Get the global shared query cache if it has been created, else None."""
+    return _shared_query_cache
+
+
+def close_shared_query_cache():
+    """Forget the global shared query cache."""
+    global _shared_query_cache
+    _shared_query_cache = None
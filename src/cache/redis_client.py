@@ -7,8 +7,11 @@ when Redis is not available.
 
 import json
 import logging
+import sqlite3
+import threading
 import time
-from typing import Optional, Any, Dict, Union
+from pathlib import Path
+from typing import Optional, Any, Dict, List, Union
 from abc import ABC, abstractmethod
 
 try:
@@ -49,6 +52,29 @@ class CacheBackend(ABC):
         """Check backend health."""
         pass
 
+    # Synchronous string access for callers outside the event loop, such as
+    # QueryAPI running in worker threads. Values are stored as given.
+
+    @abstractmethod
+    def get_raw(self, key: str) -> Optional[str]:
+        """Get a string value by key."""
+        pass
+
+    @abstractmethod
+    def set_raw(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a string value with optional TTL."""
+        pass
+
+    @abstractmethod
+    def add_raw(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a string value only if the key does not exist; True if it was set."""
+        pass
+
+    @abstractmethod
+    def delete_raw(self, key: str) -> bool:
+        """Delete key."""
+        pass
+
 
 class RedisBackend(CacheBackend):
     """Redis cache backend."""
@@ -160,6 +186,40 @@ class RedisBackend(CacheBackend):
             logger.error(f"Redis health check failed: {e}")
             return False
 
+    def get_raw(self, key: str) -> Optional[str]:
+        """Get a string value by key."""
+        try:
+            return self.client.get(key)
+        except Exception as e:
+            logger.warning(f"Redis GET failed for key '{key}': {e}")
+            return None
+
+    def set_raw(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a string value with optional TTL."""
+        try:
+            px = int(ttl * 1000) if ttl else None
+            return bool(self.client.set(key, value, px=px))
+        except Exception as e:
+            logger.warning(f"Redis SET failed for key '{key}': {e}")
+            return False
+
+    def add_raw(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a string value only if the key does not exist; True if it was set."""
+        try:
+            px = int(ttl * 1000) if ttl else None
+            return bool(self.client.set(key, value, px=px, nx=True))
+        except Exception as e:
+            logger.warning(f"Redis SET NX failed for key '{key}': {e}")
+            return False
+
+    def delete_raw(self, key: str) -> bool:
+        """Delete key."""
+        try:
+            return self.client.delete(key) > 0
+        except Exception as e:
+            logger.warning(f"Redis DELETE failed for key '{key}': {e}")
+            return False
+
     def close(self):
         """Close Redis connection."""
         try:
@@ -181,6 +241,7 @@ class MemoryBackend(CacheBackend):
         """
         self.cache: Dict[str, Dict[str, Any]] = {}
         self.max_size = max_size
+        self.lock = threading.Lock()
         logger.info("Memory cache backend initialized")
 
     async def get(self, key: str) -> Optional[Any]:
@@ -235,12 +296,243 @@ class MemoryBackend(CacheBackend):
         """Memory backend is always healthy."""
         return True
 
+    def get_raw(self, key: str) -> Optional[str]:
+        """Get a string value by key."""
+        with self.lock:
+            entry = self.cache.get(key)
+            if not entry:
+                return None
+            if entry.get("expires") and entry["expires"] < time.time():
+                del self.cache[key]
+                return None
+            return entry["value"]
+
+    def set_raw(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a string value with optional TTL."""
+        with self.lock:
+            if len(self.cache) >= self.max_size and key not in self.cache:
+                del self.cache[next(iter(self.cache))]
+
+            entry = {"value": value}
+            if ttl:
+                entry["expires"] = time.time() + ttl
+            self.cache[key] = entry
+            return True
+
+    def add_raw(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a string value only if the key does not exist; True if it was set."""
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry and not (entry.get("expires") and entry["expires"] < time.time()):
+                return False
+
+            entry = {"value": value}
+            if ttl:
+                entry["expires"] = time.time() + ttl
+            self.cache[key] = entry
+            return True
+
+    def delete_raw(self, key: str) -> bool:
+        """Delete key."""
+        with self.lock:
+            return self.cache.pop(key, None) is not None
+
+
+class DiskBackend(CacheBackend):
+    """
+    On-disk cache backend shared by all processes on one host.
+
+    Stands in for Redis when several API workers run without one. Entries are
+    kept in a SQLite database in WAL mode, so workers read concurrently and
+    every write is atomic. Each thread uses its own connection.
+    """
+
+    # Expired and surplus entries are purged once every this many writes
+    PURGE_INTERVAL = 200
+
+    def __init__(self, cache_dir: Union[str, Path], max_size: int = 100000):
+        """
+        Initialize disk backend.
+
+        Args:
+            cache_dir: Directory for the cache database
+            max_size: Maximum number of items to store
+        """
+        self.path = Path(cache_dir) / "cache.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._writes = 0
+
+        self._connection().execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires REAL,
+                updated REAL NOT NULL
+            )
+            """
+        )
+        logger.info(f"Disk cache backend initialized at {self.path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=10.0, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def get_raw(self, key: str) -> Optional[str]:
+        """Get a string value by key."""
+        try:
+            row = (
+                self._connection()
+                .execute("SELECT value, expires FROM cache_entries WHERE key = ?", (key,))
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache GET failed for key '{key}': {e}")
+            return None
+
+        if row is None:
+            return None
+        if row[1] is not None and row[1] < time.time():
+            self.delete_raw(key)
+            return None
+        return row[0]
+
+    def set_raw(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a string value with optional TTL."""
+        now = time.time()
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires, updated) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl if ttl else None, now),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache SET failed for key '{key}': {e}")
+            return False
+
+        self._after_write()
+        return True
+
+    def add_raw(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """Set a string value only if the key does not exist; True if it was set."""
+        now = time.time()
+        connection = self._connection()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "DELETE FROM cache_entries WHERE key = ? AND expires < ?", (key, now)
+                )
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO cache_entries (key, value, expires, updated) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, now + ttl if ttl else None, now),
+                )
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache SET NX failed for key '{key}': {e}")
+            return False
+
+        return cursor.rowcount == 1
+
+    def delete_raw(self, key: str) -> bool:
+        """Delete key."""
+        try:
+            cursor = self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache DELETE failed for key '{key}': {e}")
+            return False
+
+    def _after_write(self):
+        """Purge expired entries, then the oldest ones above max_size, now and then."""
+        self._writes += 1
+        if self._writes % self.PURGE_INTERVAL:
+            return
+
+        try:
+            connection = self._connection()
+            connection.execute("DELETE FROM cache_entries WHERE expires < ?", (time.time(),))
+            connection.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM cache_entries ORDER BY updated DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache purge failed: {e}")
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value by key."""
+        value = self.get_raw(key)
+        if value is None:
+            return None
+
+        # Try to parse as JSON, fall back to string
+        try:
+            return json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set value with optional TTL."""
+        try:
+            serialized_value = value if isinstance(value, str) else json.dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Disk cache SET failed for key '{key}': {e}")
+            return False
+        return self.set_raw(key, serialized_value, ttl)
+
+    async def delete(self, key: str) -> bool:
+        """Delete key."""
+        return self.delete_raw(key)
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists."""
+        return self.get_raw(key) is not None
+
+    async def health_check(self) -> bool:
+        """Check that the cache database can be queried."""
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Disk cache health check failed: {e}")
+            return False
+
+    def close(self):
+        """Close all connections to the cache database."""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
 
 class CacheManager:
     """
     Cache manager with automatic backend selection.
 
-    Automatically selects Redis (if available) or falls back to in-memory caching.
+    Automatically selects Redis (if available), or falls back to an on-disk
+    cache shared by all worker processes when a cache directory is configured,
+    or to in-memory caching.
     """
 
     def __init__(
@@ -249,16 +541,19 @@ class CacheManager:
         redis_port: int = 6379,
         redis_password: Optional[str] = None,
         redis_db: int = 0,
+        cache_dir: Optional[str] = None,
         **kwargs
     ):
         """
         Initialize cache manager.
 
         Args:
-            redis_host: Redis host (if None, uses memory backend)
+            redis_host: Redis host (if None, uses the disk or memory backend)
             redis_port: Redis port
             redis_password: Redis password
             redis_db: Redis database number
+            cache_dir: Directory for the disk backend used without Redis
+                (if None, uses memory backend)
         """
         self.backend = None
         self.backend_type = None
@@ -279,6 +574,15 @@ class CacheManager:
                 logger.warning(f"Failed to initialize Redis backend: {e}")
                 logger.info("Falling back to memory cache backend")
 
+        # Fall back to disk backend, shared between worker processes
+        if not self.backend and cache_dir:
+            try:
+                self.backend = DiskBackend(cache_dir)
+                self.backend_type = "disk"
+                logger.info("Using disk cache backend")
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Failed to initialize disk backend: {e}")
+
         # Fall back to memory backend
         if not self.backend:
             self.backend = MemoryBackend()
@@ -304,6 +608,11 @@ class CacheManager:
         """Check cache backend health."""
         return await self.backend.health_check()
 
+    @property
+    def shared_between_processes(self) -> bool:
+        """Whether all worker processes see the same cache entries."""
+        return self.backend_type in ("redis", "disk")
+
     def close(self):
         """Close cache backend."""
         if hasattr(self.backend, 'close'):
@@ -371,10 +680,11 @@ def get_cache_manager() -> CacheManager:
                 redis_host=redis_settings.host,
                 redis_port=redis_settings.port,
                 redis_password=redis_settings.password,
-                redis_db=redis_settings.db
+                redis_db=redis_settings.db,
+                cache_dir=redis_settings.cache_dir or None,
             )
         else:
-            _cache_manager = CacheManager()
+            _cache_manager = CacheManager(cache_dir=redis_settings.cache_dir or None)
 
     return _cache_manager
 
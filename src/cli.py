@@ -15,12 +15,12 @@ from rich.logging import RichHandler
 from collections import Counter
 
 from .parser.parser import CombatLogParser
-from .parser.tokenizer import LineTokenizer
-from .parser.events import EventFactory
 from .segmentation.encounters import EncounterSegmenter, FightType
 from .segmentation.unified_segmenter import UnifiedSegmenter
 from .models.unified_encounter import UnifiedEncounter, EncounterType
 from .processing.unified_parallel_processor import UnifiedParallelProcessor
+from .processing.parse_cache import ParseCache, parse_log_file
+from .processing.encounter_index import EncounterIndex
 from .config.loader import load_and_apply_config
 
 
@@ -57,14 +57,26 @@ def cli(verbose):
     "--threads",
     default=None,
     type=int,
-    help="Number of threads for parallel processing (default: CPU count)",
+    help="Number of worker threads or processes (default: CPU count)",
+)
+@click.option(
+    "--processes",
+    is_flag=True,
+    help="Parse encounters in worker processes instead of threads (uses all cores)",
 )
 @click.option(
     "--no-parallel",
     is_flag=True,
     help="Disable parallel processing (force sequential)",
 )
-def parse(log_file, output, format, guild_id, guild_name, threads, no_parallel):
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Ignore and do not update the on-disk parse cache",
+)
+def parse(
+    log_file, output, format, guild_id, guild_name, threads, processes, no_parallel, no_cache
+):
     """Parse a combat log file and extract encounters using unified segmentation."""
     log_path = Path(log_file)
 
@@ -88,50 +100,18 @@ def parse(log_file, output, format, guild_id, guild_name, threads, no_parallel):
     parse_errors = []
     total_events = 0
 
-    if no_parallel:
-        # Sequential processing
-        console.print("[yellow]Using sequential processing (--no-parallel)[/yellow]")
+    cache = None if no_cache else ParseCache()
+    cached = cache.load(log_path) if cache else None
 
-        tokenizer = LineTokenizer()
-        event_factory = EventFactory()
-        segmenter = UnifiedSegmenter()
+    if no_parallel or cached is not None:
+        # Sequential processing, resuming from the parse cache when possible
+        if cached is None:
+            console.print("[yellow]Using sequential processing (--no-parallel)[/yellow]")
 
-        # Parse with progress bar
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-            TimeRemainingColumn(),
-            console=console,
-        ) as progress:
-            file_size = log_path.stat().st_size
-            task = progress.add_task(f"[cyan]Processing...", total=file_size)
-
-            with open(log_path, "rb") as f:
-                bytes_read = 0
-                for line in f:
-                    bytes_read += len(line)
-                    if bytes_read % 10000 == 0:  # Update progress periodically
-                        progress.update(task, completed=bytes_read)
-
-                    try:
-                        line_str = line.decode("utf-8", errors="ignore").strip()
-                        if line_str and not line_str.startswith("#"):
-                            parsed = tokenizer.parse_line(line_str)
-                            if parsed:
-                                event = event_factory.create_event(parsed)
-                                if event:
-                                    segmenter.process_event(event)
-                                    total_events += 1
-                    except Exception as e:
-                        if len(parse_errors) < 100:
-                            parse_errors.append(str(e))
-
-                progress.update(task, completed=file_size)
-
-        # Get encounters
-        encounters = segmenter.get_encounters()
+        result = parse_with_progress(log_path, cache, cached)
+        encounters = result.encounters
+        total_events = result.total_events
+        parse_errors = result.parse_errors
 
         # Calculate metrics
         console.print("[cyan]Calculating encounter metrics...[/cyan]")
@@ -140,8 +120,13 @@ def parse(log_file, output, format, guild_id, guild_name, threads, no_parallel):
 
     else:
         # Parallel processing
-        processor = UnifiedParallelProcessor(max_workers=threads)
-        console.print(f"[cyan]Using parallel processing ({processor.max_workers} threads)[/cyan]")
+        processor = UnifiedParallelProcessor(
+            max_workers=threads, executor_type="process" if processes else "thread"
+        )
+        console.print(
+            f"[cyan]Using parallel processing ({processor.max_workers} "
+            f"{'processes' if processes else 'threads'})[/cyan]"
+        )
 
         with Progress(
             SpinnerColumn(),
@@ -151,11 +136,16 @@ def parse(log_file, output, format, guild_id, guild_name, threads, no_parallel):
             task = progress.add_task("[cyan]Detecting encounter boundaries...", total=None)
 
             try:
+                file_size = log_path.stat().st_size
                 encounters = processor.process_file(log_path)
                 total_events = processor.total_events
                 parse_errors = processor.parse_errors[:100]  # Limit errors
 
                 progress.update(task, description="[green]Parallel processing complete!")
+                if cache:
+                    cache.save(
+                        log_path, file_size, total_events, parse_errors, encounters=encounters
+                    )
 
             except Exception as e:
                 console.print(f"[red]Parallel processing failed: {e}[/red]")
@@ -174,6 +164,92 @@ def parse(log_file, output, format, guild_id, guild_name, threads, no_parallel):
         export_unified_csv(encounters, output or "output.csv")
 
 
+def parse_with_progress(log_path, cache, cached):
+    """Parse a log sequentially with a progress bar, using the parse cache if given."""
+    if cached is not None:
+        status = "resuming" if cached.resumable else "loaded"
+        console.print(
+            f"[cyan]Parse cache hit ({status}, {cached.parsed_bytes / 1024 / 1024:.1f} MB "
+            f"already parsed)[/cyan]"
+        )
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+        TimeRemainingColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task("[cyan]Processing...", total=None)
+
+        def update_progress(bytes_done, total_bytes):
+            progress.update(task, completed=bytes_done, total=total_bytes)
+
+        result = parse_log_file(log_path, cache, cached, progress_callback=update_progress)
+        progress.update(task, description="[green]Finalizing encounters...")
+
+    if result.cache_status == "extended":
+        console.print(f"[cyan]Parsed {result.bytes_parsed / 1024 / 1024:.1f} MB of new data[/cyan]")
+    return result
+
+
+def parse_indexed_encounter(log_path, index, entry):
+    """Parse the byte range of one indexed encounter into unified encounters."""
+    parser = CombatLogParser()
+    segmenter = UnifiedSegmenter()
+    segmenter.pet_owners.update(index.pet_owners_before(entry))
+    if entry.encounter_type == "ENCOUNTER":
+        # Keep the pull number the encounter has in the whole log
+        segmenter.raid_pull_counts[entry.encounter_id] = entry.pull_number - 1
+
+    for event in parser.parse_encounter(log_path, entry):
+        segmenter.process_event(event)
+
+    return segmenter.get_encounters(), parser.parse_errors[:100]
+
+
+def format_indexed_name(entry):
+    """Display name of an indexed encounter."""
+    if entry.encounter_type == "CHALLENGE_MODE":
+        return f"{entry.name} +{entry.keystone_level}"
+    return f"{entry.name} (Pull {entry.pull_number})"
+
+
+def display_encounter_index(entries):
+    """Display the encounters of an encounter index."""
+    table = Table(title="Encounters")
+    table.add_column("#", justify="right")
+    table.add_column("Encounter")
+    table.add_column("Type")
+    table.add_column("Difficulty", justify="right")
+    table.add_column("Start")
+    table.add_column("Duration", justify="right")
+    table.add_column("Players", justify="right")
+    table.add_column("Size", justify="right")
+
+    for number, entry in enumerate(entries, 1):
+        if entry.encounter_type == "CHALLENGE_MODE":
+            encounter_type = "Mythic+"
+            difficulty = f"+{entry.keystone_level}"
+        else:
+            encounter_type = "Raid"
+            difficulty = str(entry.difficulty_id or "")
+        table.add_row(
+            str(number),
+            format_indexed_name(entry),
+            encounter_type,
+            difficulty,
+            entry.start_time.strftime("%H:%M:%S") if entry.start_time else "",
+            f"{entry.duration:.0f}s",
+            str(len(entry.participants)),
+            f"{(entry.end_byte - entry.start_byte) / 1024 / 1024:.1f} MB",
+        )
+
+    console.print(table)
+    console.print("\n[dim]Use --encounter <#> to analyze a single encounter[/dim]")
+
+
 def display_unified_summary(encounters, total_events, parse_errors, processing_time):
     """Display summary for unified encounters."""
     console.print("\n[bold cyan]═══ Parsing Complete ═══[/bold cyan]")
@@ -531,19 +607,55 @@ def export_csv(fights, output_file):
     "--threads",
     default=None,
     type=int,
-    help="Number of threads for parallel processing (default: CPU count)",
+    help="Number of worker threads or processes (default: CPU count)",
+)
+@click.option(
+    "--processes",
+    is_flag=True,
+    help="Parse encounters in worker processes instead of threads (uses all cores)",
 )
 @click.option(
     "--no-parallel",
     is_flag=True,
     help="Disable parallel processing (force sequential)",
 )
-def analyze(log_file, interactive, guild_id, guild_name, threads, no_parallel):
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Ignore and do not update the on-disk parse cache",
+)
+@click.option(
+    "--encounter",
+    "encounter_number",
+    type=int,
+    help="Only parse this encounter (number from --list-encounters)",
+)
+@click.option(
+    "--list-encounters",
+    is_flag=True,
+    help="List the encounters in the log from its encounter index and exit",
+)
+def analyze(
+    log_file,
+    interactive,
+    guild_id,
+    guild_name,
+    threads,
+    processes,
+    no_parallel,
+    no_cache,
+    encounter_number,
+    list_encounters,
+):
     """Analyze a combat log file with interactive exploration using unified segmentation."""
     from .analyzer import InteractiveAnalyzer
 
     log_path = Path(log_file)
 
+    if list_encounters:
+        display_encounter_index(EncounterIndex(log_path).get_encounters())
+        return
+
     if interactive:
         # Full interactive analysis
         console.print(f"[bold green]Analyzing combat log:[/bold green] {log_path.name}")
@@ -554,47 +666,32 @@ def analyze(log_file, interactive, guild_id, guild_name, threads, no_parallel):
         encounters = []
         parse_errors = []
 
-        if no_parallel:
-            # Force sequential processing
-            console.print("[yellow]Using sequential processing (--no-parallel)[/yellow]")
+        cache = None if no_cache or encounter_number else ParseCache()
+        cached = cache.load(log_path) if cache else None
 
-            tokenizer = LineTokenizer()
-            event_factory = EventFactory()
-            segmenter = UnifiedSegmenter()
+        if encounter_number:
+            # Seek straight to one encounter using the encounter index
+            index = EncounterIndex(log_path)
+            indexed = index.get_encounters()
+            if not 1 <= encounter_number <= len(indexed):
+                console.print(
+                    f"[red]No encounter {encounter_number}; the log has {len(indexed)} "
+                    f"(see --list-encounters)[/red]"
+                )
+                return
 
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console,
-            ) as progress:
-                task = progress.add_task("[cyan]Processing events...", total=None)
-
-                event_count = 0
-                with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-                    for line_num, line in enumerate(f, 1):
-                        if line.strip() and not line.strip().startswith("#"):
-                            try:
-                                parsed_line = tokenizer.parse_line(line)
-                                if parsed_line:
-                                    event = event_factory.create_event(parsed_line)
-                                    if event:
-                                        segmenter.process_event(event)
-                                        event_count += 1
-
-                                        if event_count % 10000 == 0:
-                                            progress.update(
-                                                task,
-                                                description=f"[cyan]Processed {event_count:,} events...",
-                                            )
-
-                            except Exception as e:
-                                if len(parse_errors) < 100:
-                                    parse_errors.append(f"Line {line_num}: {str(e)}")
-
-                progress.update(task, description="[green]Finalizing encounters...")
-
-            # Get encounters
-            encounters = segmenter.get_encounters()
+            entry = indexed[encounter_number - 1]
+            console.print(f"[cyan]Parsing only {format_indexed_name(entry)}[/cyan]")
+            encounters, parse_errors = parse_indexed_encounter(log_path, index, entry)
+
+        elif no_parallel or cached is not None:
+            # Sequential processing, resuming from the parse cache when possible
+            if cached is None:
+                console.print("[yellow]Using sequential processing (--no-parallel)[/yellow]")
+
+            result = parse_with_progress(log_path, cache, cached)
+            encounters = result.encounters
+            parse_errors = result.parse_errors
 
             # Calculate metrics
             for encounter in encounters:
@@ -602,10 +699,13 @@ def analyze(log_file, interactive, guild_id, guild_name, threads, no_parallel):
 
         else:
             # Try parallel processing first
-            processor = UnifiedParallelProcessor(max_workers=threads)
+            processor = UnifiedParallelProcessor(
+                max_workers=threads, executor_type="process" if processes else "thread"
+            )
 
             console.print(
-                f"[cyan]Using parallel processing ({processor.max_workers} threads)[/cyan]"
+                f"[cyan]Using parallel processing ({processor.max_workers} "
+                f"{'processes' if processes else 'threads'})[/cyan]"
             )
 
             with Progress(
@@ -616,10 +716,19 @@ def analyze(log_file, interactive, guild_id, guild_name, threads, no_parallel):
                 task = progress.add_task("[cyan]Detecting encounter boundaries...", total=None)
 
                 try:
+                    file_size = log_path.stat().st_size
                     encounters = processor.process_file(log_path)
                     parse_errors = processor.parse_errors[:100]  # Limit errors
 
                     progress.update(task, description="[green]Parallel processing complete!")
+                    if cache:
+                        cache.save(
+                            log_path,
+                            file_size,
+                            processor.total_events,
+                            parse_errors,
+                            encounters=encounters,
+                        )
 
                 except Exception as e:
                     console.print(f"[red]Parallel processing failed: {e}[/red]")
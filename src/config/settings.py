@@ -61,6 +61,10 @@ class RedisSettings:
     password: str = ""
     db: int = 0
     enabled: bool = False
+    # Directory for the on-disk cache shared by workers when Redis is unavailable
+    cache_dir: str = ""
+    # Key signing query results shared between workers; unset, workers do not share them
+    cache_secret: str = ""
 
     @classmethod
     def from_env(cls) -> "RedisSettings":
@@ -73,7 +77,9 @@ class RedisSettings:
             port=int(os.getenv("REDIS_PORT", "6379")),
             password=os.getenv("REDIS_PASSWORD", ""),
             db=int(os.getenv("REDIS_DB", "0")),
-            enabled=redis_enabled
+            enabled=redis_enabled,
+            cache_dir=os.getenv("CACHE_DIR", ""),
+            cache_secret=os.getenv("CACHE_SECRET", ""),
         )
 
     @property
@@ -91,7 +97,7 @@ class ServerSettings:
     host: str = "0.0.0.0"
     port: int = 8000
     reload: bool = False
-    workers: int = 1
+    workers: int = 1  # Chunked uploads are tracked per process and need a single worker
     log_level: str = "info"
 
     @classmethod
@@ -0,0 +1,336 @@
+"""
+Typed binary column layout of version 2 event blocks.
+
+Version 1 blocks are a msgpack map of Python lists that is rebuilt value by
+value. Version 2 blocks store each column as a packed typed array, so a block
+decodes with a few NumPy operations per column instead of per-row Python work:
+
+- timestamps: microsecond offsets from the first event as zigzag varint
+  delta-of-deltas, or raw float64 values when microseconds do not round trip
+- low cardinality columns (event types, spell IDs, GUIDs, names, unit flags):
+  a zigzag varint table of the distinct values and a uint8/16/32 code per row
+- amounts: zigzag varints
+- critical/glancing/crushing: bitsets
+
+A block is a header followed by the columns in COLUMNS order. The header
+starts with 0xC1, a byte msgpack never emits, so version 1 and version 2
+blocks are told apart by their first byte.
+"""
+
+import struct
+from typing import Any, Dict, List, Tuple
+
+# Optional imports - handle missing dependencies gracefully
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+MARKER = 0xC1
+FORMAT_VERSION = 2
+
+# marker, version, event count, base timestamp, flags
+HEADER = struct.Struct("<BBIdB")
+
+FLAG_SHARED_STRINGS = 0x01
+FLAG_FLOAT_TIMESTAMPS = 0x02
+
+# Columns in block order, with their encoding
+COLUMNS = (
+    ("event_types", "codes"),
+    ("categories", "codes"),
+    ("source_guids", "codes"),
+    ("source_names", "codes"),
+    ("dest_guids", "codes"),
+    ("dest_names", "codes"),
+    ("source_flags", "codes"),
+    ("dest_flags", "codes"),
+    ("spell_ids", "codes"),
+    ("spell_names", "codes"),
+    ("amounts", "varints"),
+    ("critical", "bits"),
+    ("glancing", "bits"),
+    ("crushing", "bits"),
+)
+
+# Columns holding string IDs of the block's or encounter's string table
+STRING_COLUMNS = (
+    "event_types",
+    "categories",
+    "source_guids",
+    "source_names",
+    "dest_guids",
+    "dest_names",
+    "spell_names",
+)
+
+# Longest varint of a 64 bit value
+MAX_VARINT_BYTES = 10
+
+
+def is_v2_block(serialized: bytes) -> bool:
+    """Check whether serialized (decompressed) block data is in the version 2 layout."""
+    return len(serialized) > 0 and serialized[0] == MARKER
+
+
+def zigzag_encode(values: "np.ndarray") -> "np.ndarray":
+    """Map signed integers to unsigned ones, small magnitudes to small values."""
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def zigzag_decode(values: "np.ndarray") -> "np.ndarray":
+    """Invert zigzag_encode()."""
+    values = values.astype(np.uint64)
+    return ((values >> np.uint64(1)).astype(np.int64)) ^ -((values & np.uint64(1)).astype(np.int64))
+
+
+def encode_varints(values: "np.ndarray") -> bytes:
+    """Encode unsigned integers as LEB128 varints."""
+    values = np.asarray(values, dtype=np.uint64)
+    if len(values) == 0:
+        return b""
+
+    # Bytes per value: 7 bits each, at least one
+    bit_lengths = np.zeros(len(values), dtype=np.int64)
+    remaining = values.copy()
+    while remaining.any():
+        nonzero = remaining > 0
+        bit_lengths[nonzero] += 1
+        remaining >>= np.uint64(1)
+    sizes = np.maximum(1, (bit_lengths + 6) // 7)
+
+    offsets = np.cumsum(sizes) - sizes
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    for i in range(int(sizes.max())):
+        selected = sizes > i
+        chunk = (values[selected] >> np.uint64(7 * i)) & np.uint64(0x7F)
+        more = (sizes[selected] > i + 1).astype(np.uint64) << np.uint64(7)
+        out[offsets[selected] + i] = (chunk | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def decode_varints(data: bytes, count: int) -> "np.ndarray":
+    """Decode count LEB128 varints."""
+    if count == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = (raw & 0x80) == 0
+    if int(ends.sum()) != count:
+        raise ValueError(f"Expected {count} varints, found {int(ends.sum())}")
+
+    # Each byte's position within its varint gives its shift
+    starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+    value_index = np.cumsum(np.concatenate(([0], ends[:-1].astype(np.int64))))
+    shifts = (np.arange(len(raw)) - starts[value_index]) * 7
+    parts = (raw & 0x7F).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+
+def _code_dtype(distinct: int):
+    """Get the smallest code type that can index distinct values."""
+    if distinct <= 1 << 8:
+        return np.uint8
+    if distinct <= 1 << 16:
+        return np.uint16
+    return np.uint32
+
+
+class _Writer:
+    """Appends varints and sized sections to a block."""
+
+    def __init__(self):
+        self.out = bytearray()
+
+    def varint(self, value: int):
+        """Append one varint."""
+        while value > 0x7F:
+            self.out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        self.out.append(value)
+
+    def section(self, data: bytes):
+        """Append bytes prefixed by their length."""
+        self.varint(len(data))
+        self.out += data
+
+    def codes(self, values: "np.ndarray"):
+        """Append a column as a table of distinct values and per-row codes."""
+        distinct, codes = np.unique(np.asarray(values, dtype=np.int64), return_inverse=True)
+        self.varint(len(distinct))
+        self.section(encode_varints(zigzag_encode(distinct)))
+        self.out += codes.astype(_code_dtype(len(distinct))).tobytes()
+
+    def bits(self, values: "np.ndarray"):
+        """Append a boolean column as a bitset."""
+        self.out += np.packbits(np.asarray(values, dtype=bool), bitorder="little").tobytes()
+
+    def strings(self, values: List[str]):
+        """Append a list of strings as lengths and UTF-8 data."""
+        encoded = [s.encode("utf-8") for s in values]
+        self.varint(len(encoded))
+        self.section(encode_varints(np.array([len(b) for b in encoded], dtype=np.uint64)))
+        self.section(b"".join(encoded))
+
+
+class _Reader:
+    """Reads varints and sized sections of a block."""
+
+    def __init__(self, data: bytes, position: int):
+        self.data = memoryview(data)
+        self.position = position
+
+    def varint(self) -> int:
+        """Read one varint."""
+        value = shift = 0
+        while True:
+            byte = self.data[self.position]
+            self.position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def take(self, size: int) -> memoryview:
+        """Read size bytes."""
+        if self.position + size > len(self.data):
+            raise ValueError("Truncated event block")
+        chunk = self.data[self.position : self.position + size]
+        self.position += size
+        return chunk
+
+    def section(self) -> memoryview:
+        """Read bytes prefixed by their length."""
+        return self.take(self.varint())
+
+    def codes(self, count: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Read a code column as its distinct values and per-row codes."""
+        distinct_count = self.varint()
+        distinct = zigzag_decode(decode_varints(self.section(), distinct_count))
+        dtype = _code_dtype(distinct_count)
+        codes = np.frombuffer(self.take(count * np.dtype(dtype).itemsize), dtype=dtype)
+        return distinct, codes
+
+    def bits(self, count: int) -> "np.ndarray":
+        """Read a bitset column."""
+        packed = np.frombuffer(self.take((count + 7) // 8), dtype=np.uint8)
+        return np.unpackbits(packed, count=count, bitorder="little").astype(bool)
+
+    def strings(self) -> List[str]:
+        """Read a list of strings."""
+        count = self.varint()
+        lengths = decode_varints(self.section(), count).astype(np.int64)
+        data = bytes(self.section())
+        ends = np.cumsum(lengths).tolist()
+        starts = [0] + ends[:-1]
+        return [data[start:end].decode("utf-8") for start, end in zip(starts, ends)]
+
+
+def encode_block(
+    timestamps: "np.ndarray",
+    columns: Dict[str, "np.ndarray"],
+    raw_lines: List[Any],
+    string_table: List[str],
+    shared_strings: bool,
+) -> bytes:
+    """
+    Encode a block of events in the version 2 layout.
+
+    Args:
+        timestamps: Event timestamps in ascending order
+        columns: Arrays for every column in COLUMNS
+        raw_lines: Raw lines as strings (shared string tables) or string IDs
+        string_table: The block's strings (empty with shared string tables)
+        shared_strings: Whether string IDs refer to an encounter string table
+
+    Returns:
+        Serialized block
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    event_count = len(timestamps)
+    base_timestamp = float(timestamps[0]) if event_count else 0.0
+
+    # Microsecond offsets if they reproduce every timestamp exactly
+    offsets = np.rint((timestamps - base_timestamp) * 1e6).astype(np.int64)
+    float_timestamps = not np.array_equal(base_timestamp + offsets / 1e6, timestamps)
+
+    flags = (FLAG_SHARED_STRINGS if shared_strings else 0) | (
+        FLAG_FLOAT_TIMESTAMPS if float_timestamps else 0
+    )
+
+    writer = _Writer()
+    writer.out += HEADER.pack(MARKER, FORMAT_VERSION, event_count, base_timestamp, flags)
+    writer.strings(string_table)
+
+    if float_timestamps:
+        writer.section(timestamps.tobytes())
+    else:
+        deltas = np.diff(offsets, prepend=0)
+        writer.section(encode_varints(zigzag_encode(np.diff(deltas, prepend=0))))
+
+    for name, encoding in COLUMNS:
+        if encoding == "codes":
+            writer.codes(columns[name])
+        elif encoding == "varints":
+            writer.section(encode_varints(zigzag_encode(columns[name])))
+        else:
+            writer.bits(columns[name])
+
+    if shared_strings:
+        writer.strings(raw_lines)
+    else:
+        writer.codes(np.asarray(raw_lines, dtype=np.int64))
+
+    return bytes(writer.out)
+
+
+def decode_block(data: bytes) -> Dict[str, Any]:
+    """
+    Decode a version 2 block into NumPy columns.
+
+    Code columns are returned as (distinct values, codes) pairs so that
+    callers resolve strings once per distinct value.
+
+    Args:
+        data: Serialized block
+
+    Returns:
+        Dictionary with event_count, shared_strings, string_table, timestamps,
+        every column in COLUMNS and raw_lines
+    """
+    if not HAS_NUMPY:
+        raise ImportError("numpy is required to read version 2 event blocks")
+
+    marker, version, event_count, base_timestamp, flags = HEADER.unpack_from(data)
+    if marker != MARKER or version != FORMAT_VERSION:
+        raise ValueError(f"Not a version {FORMAT_VERSION} event block")
+
+    reader = _Reader(data, HEADER.size)
+    shared_strings = bool(flags & FLAG_SHARED_STRINGS)
+    block = {
+        "event_count": event_count,
+        "shared_strings": shared_strings,
+        "string_table": reader.strings(),
+    }
+
+    if flags & FLAG_FLOAT_TIMESTAMPS:
+        block["timestamps"] = np.frombuffer(reader.section(), dtype=np.float64)
+    else:
+        delta_of_deltas = zigzag_decode(decode_varints(reader.section(), event_count))
+        offsets = np.cumsum(np.cumsum(delta_of_deltas))
+        block["timestamps"] = base_timestamp + offsets / 1e6
+
+    for name, encoding in COLUMNS:
+        if encoding == "codes":
+            block[name] = reader.codes(event_count)
+        elif encoding == "varints":
+            block[name] = zigzag_decode(decode_varints(reader.section(), event_count))
+        else:
+            block[name] = reader.bits(event_count)
+
+    block["raw_lines"] = reader.strings() if shared_strings else reader.codes(event_count)
+    return block
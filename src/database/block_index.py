@@ -0,0 +1,307 @@
+"""
+Block-level index for compressed event blocks.
+
+Every row of event_blocks carries a small summary of the events inside its
+compressed BLOB: the time range it covers, a bitmap of its event types and a
+bloom filter of its spell IDs. A query compares its filters against these
+summaries first and only reads and decompresses the blocks that can contain
+a match, so a ten second window of a long encounter touches one or two
+blocks instead of all of them.
+
+Both summaries may report a match that is not there, never the reverse, so
+pruning never drops an event.
+"""
+
+import heapq
+import logging
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.models.character_events import TimestampedEvent
+from .schema import adapt_placeholders
+
+logger = logging.getLogger(__name__)
+
+# Event types hash into a 63 bit bitmap (fits a signed SQLite INTEGER)
+EVENT_TYPE_BITS = 63
+
+# Spell bloom filter size and hash count: under 0.3% false positives for the
+# ~100 distinct spells a 1000 event block typically holds
+SPELL_BLOOM_BYTES = 256
+SPELL_BLOOM_HASHES = 3
+
+
+def event_type_bit(event_type: str) -> int:
+    """Get the bitmap bit for an event type."""
+    return 1 << (zlib.crc32(event_type.encode("utf-8")) % EVENT_TYPE_BITS)
+
+
+def event_type_mask(event_types: Iterable[str]) -> int:
+    """Build the bitmap of a set of event types."""
+    mask = 0
+    for event_type in event_types:
+        if event_type:
+            mask |= event_type_bit(event_type)
+    return mask
+
+
+def _spell_bloom_positions(spell_id: int) -> List[int]:
+    """Get the bloom filter bit positions of a spell ID by double hashing."""
+    key = str(spell_id).encode("ascii")
+    h1 = zlib.crc32(key)
+    h2 = zlib.adler32(key) | 1
+    size = SPELL_BLOOM_BYTES * 8
+    return [(h1 + i * h2) % size for i in range(SPELL_BLOOM_HASHES)]
+
+
+def spell_bloom(spell_ids: Iterable[int]) -> bytes:
+    """Build the bloom filter of a set of spell IDs."""
+    bloom = bytearray(SPELL_BLOOM_BYTES)
+    for spell_id in set(spell_ids):
+        if spell_id:
+            for position in _spell_bloom_positions(spell_id):
+                bloom[position >> 3] |= 1 << (position & 7)
+    return bytes(bloom)
+
+
+def bloom_may_contain(bloom: Optional[bytes], spell_id: int) -> bool:
+    """Check whether a spell ID may be in a bloom filter (always True without one)."""
+    if not bloom or len(bloom) != SPELL_BLOOM_BYTES:
+        return True
+    return all(bloom[p >> 3] & (1 << (p & 7)) for p in _spell_bloom_positions(spell_id))
+
+
+def summarize_block(events: List[TimestampedEvent]) -> Dict[str, Any]:
+    """
+    Compute the index summary of a block of events.
+
+    Args:
+        events: Events in the block
+
+    Returns:
+        Dictionary with event_type_mask and spell_bloom
+    """
+    event_types = set()
+    spell_ids = set()
+    for ts_event in events:
+        event_types.add(ts_event.event.event_type)
+        spell_id = getattr(ts_event.event, "spell_id", None)
+        if spell_id:
+            spell_ids.add(spell_id)
+
+    return {
+        "event_type_mask": event_type_mask(event_types),
+        "spell_bloom": spell_bloom(spell_ids),
+    }
+
+
+def block_may_match(
+    block: Dict[str, Any],
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    type_mask: Optional[int] = None,
+    spell_ids: Optional[Set[int]] = None,
+) -> bool:
+    """
+    Check a block's summary against query filters.
+
+    Blocks written before the summaries existed have NULL mask and bloom
+    columns and always match on those filters.
+
+    Args:
+        block: Block row with start_time, end_time, event_type_mask, spell_bloom
+        start_time: Optional start timestamp filter
+        end_time: Optional end timestamp filter
+        type_mask: Optional bitmap of wanted event types
+        spell_ids: Optional set of wanted spell IDs
+
+    Returns:
+        False if the block cannot contain a matching event
+    """
+    if start_time is not None and block["end_time"] < start_time:
+        return False
+    if end_time is not None and block["start_time"] > end_time:
+        return False
+
+    block_mask = block.get("event_type_mask")
+    if type_mask is not None and block_mask is not None and not block_mask & type_mask:
+        return False
+
+    if spell_ids:
+        bloom = block.get("spell_bloom")
+        if not any(bloom_may_contain(bloom, spell_id) for spell_id in spell_ids):
+            return False
+
+    return True
+
+
+def _filter_block(
+    events: List[TimestampedEvent],
+    start_time: Optional[float],
+    end_time: Optional[float],
+    event_types: Optional[Set[str]],
+    spell_ids: Optional[Set[int]],
+) -> Iterator[TimestampedEvent]:
+    """Yield the events of one decompressed (timestamp ordered) block that match."""
+    for ts_event in events:
+        if start_time is not None and ts_event.timestamp < start_time:
+            continue
+        if end_time is not None and ts_event.timestamp > end_time:
+            break
+        if event_types and ts_event.event.event_type not in event_types:
+            continue
+        if spell_ids and getattr(ts_event.event, "spell_id", None) not in spell_ids:
+            continue
+        yield ts_event
+
+
+def iter_block_events(
+    blocks: Iterable[Dict[str, Any]],
+    load_block: Callable[[Dict[str, Any]], List[TimestampedEvent]],
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    event_types: Optional[Iterable[str]] = None,
+    spell_ids: Optional[Iterable[int]] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[TimestampedEvent]:
+    """
+    Stream matching events from event blocks in timestamp order.
+
+    Blocks are pruned on their summaries before load_block is called, and
+    surviving blocks are only loaded once the stream reaches their start
+    time. Blocks of one character rarely overlap, so usually a single block
+    is held in memory at a time; overlapping blocks are merged by timestamp.
+
+    Args:
+        blocks: Block rows without their compressed data
+        load_block: Function returning the decompressed events of a block row
+        start_time: Optional start timestamp filter
+        end_time: Optional end timestamp filter
+        event_types: Optional filter by event types
+        spell_ids: Optional filter by spell IDs
+        stats: Optional dictionary to count blocks_scanned, blocks_pruned
+            and events_decompressed in
+
+    Yields:
+        Matching TimestampedEvent objects
+    """
+    if stats is None:
+        stats = {}
+    for counter in ("blocks_scanned", "blocks_pruned", "events_decompressed"):
+        stats.setdefault(counter, 0)
+    event_types = set(event_types) if event_types else None
+    spell_ids = set(spell_ids) if spell_ids else None
+    type_mask = event_type_mask(event_types) if event_types else None
+
+    pending = []
+    for block in blocks:
+        stats["blocks_scanned"] += 1
+        if block_may_match(block, start_time, end_time, type_mask, spell_ids):
+            pending.append(block)
+        else:
+            stats["blocks_pruned"] += 1
+    pending.sort(key=lambda block: block["start_time"])
+
+    # Heap of (timestamp, sequence, event, iterator); the sequence keeps
+    # ordering stable and avoids comparing events
+    heap = []
+    sequence = 0
+    next_block = 0
+
+    while next_block < len(pending) or heap:
+        # Open every block that starts before the next event to emit
+        while next_block < len(pending) and (
+            not heap or pending[next_block]["start_time"] <= heap[0][0]
+        ):
+            events = load_block(pending[next_block])
+            next_block += 1
+            stats["events_decompressed"] += len(events)
+
+            iterator = _filter_block(events, start_time, end_time, event_types, spell_ids)
+            first = next(iterator, None)
+            if first is not None:
+                heapq.heappush(heap, (first.timestamp, sequence, first, iterator))
+                sequence += 1
+
+        if not heap:
+            continue
+
+        _, _, ts_event, iterator = heapq.heappop(heap)
+        yield ts_event
+
+        following = next(iterator, None)
+        if following is not None:
+            heapq.heappush(heap, (following.timestamp, sequence, following, iterator))
+            sequence += 1
+
+
+def store_event_blocks(
+    db,
+    encounter_id: int,
+    character_id: int,
+    events: List[TimestampedEvent],
+    compressor=None,
+    first_block_index: int = 0,
+) -> int:
+    """
+    Compress a character's events into event_blocks rows with their summaries.
+
+    Args:
+        db: SQLite database manager
+        encounter_id: Database encounter ID
+        character_id: Database character ID
+        events: Events of the character in the encounter
+        compressor: EventCompressor to use (the encounter's, from
+            CompressionDictionaryStore, when None)
+        first_block_index: block_index of the first block written
+
+    Returns:
+        Number of blocks written
+    """
+    from .dictionaries import CompressionDictionaryStore
+
+    if not events:
+        return 0
+
+    dictionaries = CompressionDictionaryStore(db)
+    compressor = compressor or dictionaries.compressor_for_encounter(encounter_id)
+    events = sorted(events, key=lambda e: e.timestamp)
+    block_size = compressor.BLOCK_SIZE
+
+    rows = []
+    for offset in range(0, len(events), block_size):
+        compressed, metadata = compressor.compress_events(events[offset : offset + block_size])
+        rows.append(
+            (
+                encounter_id,
+                character_id,
+                first_block_index + len(rows),
+                metadata["start_time"],
+                metadata["end_time"],
+                metadata["event_count"],
+                compressed,
+                metadata["uncompressed_size"],
+                metadata["compressed_size"],
+                metadata["compression_ratio"],
+                metadata["event_type_mask"],
+                metadata["spell_bloom"],
+            )
+        )
+
+    # Saved before the blocks, which are committed together with it
+    if compressor.shared_strings:
+        dictionaries.save_string_table(encounter_id, compressor.strings)
+
+    query = """
+        INSERT INTO event_blocks (
+            encounter_id, character_id, block_index, start_time, end_time,
+            event_count, compressed_data, uncompressed_size, compressed_size,
+            compression_ratio, event_type_mask, spell_bloom
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+    db.execute_many(adapt_placeholders(db, query), rows)
+    logger.debug(
+        f"Stored {len(events)} events in {len(rows)} blocks for "
+        f"encounter {encounter_id} character {character_id}"
+    )
+    return len(rows)
@@ -8,7 +8,7 @@ using zstd compression with event-specific optimizations.
 import struct
 import json
 import logging
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 from dataclasses import asdict
 from datetime import datetime
 import time
@@ -22,6 +22,16 @@ except ImportError:
     HAS_ZSTD = False
     zstd = None
 
+# Trained dictionaries need the zstandard bindings; without them blocks are
+# compressed without a dictionary
+try:
+    import zstandard
+
+    HAS_ZSTD_DICT = True
+except ImportError:
+    HAS_ZSTD_DICT = False
+    zstandard = None
+
 try:
     import msgpack
 
@@ -30,11 +40,131 @@ except ImportError:
     HAS_MSGPACK = False
     msgpack = None
 
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
 from src.models.character_events import TimestampedEvent, CharacterEventStream
-from src.parser.events import BaseEvent, DamageEvent, HealEvent, AuraEvent
+from src.parser.events import BaseEvent, DamageEvent, HealEvent, AuraEvent, SpellEvent
+from .block_format import COLUMNS, STRING_COLUMNS, decode_block, encode_block, is_v2_block
+from .block_index import summarize_block
 
 logger = logging.getLogger(__name__)
 
+# Size of trained compression dictionaries
+DICTIONARY_SIZE = 16 * 1024
+
+# Event classes rebuilt from blocks, by event type
+_DAMAGE_TYPES = {"SPELL_DAMAGE", "SWING_DAMAGE", "SPELL_PERIODIC_DAMAGE"}
+_HEAL_TYPES = {"SPELL_HEAL", "SPELL_PERIODIC_HEAL"}
+
+
+class StringTable:
+    """
+    Interning table for the strings of event blocks.
+
+    EventCompressor uses a fresh table per block by default and stores it in
+    the block. A table shared by all blocks of an encounter stores each GUID,
+    name and spell name once per encounter instead; it only ever grows, so
+    IDs already written to blocks stay valid.
+    """
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        """
+        Initialize string table.
+
+        Args:
+            strings: Strings with IDs 1, 2, ... in order
+        """
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for s in strings or []:
+            self.intern(s)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def intern(self, s: Optional[str]) -> int:
+        """Intern a string and return its ID (0 for None/empty strings)."""
+        if not s:
+            return 0
+
+        string_id = self.ids.get(s)
+        if string_id is None:
+            self.strings.append(s)
+            string_id = self.ids[s] = len(self.strings)
+        return string_id
+
+    def resolve(self, string_id: int) -> Optional[str]:
+        """Resolve a string ID back to its string."""
+        if not string_id or string_id > len(self.strings):
+            return None
+        return self.strings[string_id - 1]
+
+    def clear(self):
+        """Remove all strings."""
+        self.strings.clear()
+        self.ids.clear()
+
+    def to_dict(self) -> Dict[int, str]:
+        """Get the ID to string mapping stored in per-block tables."""
+        return {i: s for i, s in enumerate(self.strings, 1)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[int, str]) -> "StringTable":
+        """Rebuild a table from an ID to string mapping."""
+        table = cls()
+        table.strings = [data[string_id] for string_id in sorted(data, key=int)]
+        table.ids = {s: i for i, s in enumerate(table.strings, 1)}
+        return table
+
+    def to_bytes(self) -> bytes:
+        """Serialize the table for storage."""
+        if HAS_MSGPACK:
+            return msgpack.packb(self.strings, use_bin_type=True)
+        return json.dumps(self.strings).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StringTable":
+        """Load a table serialized with to_bytes()."""
+        if HAS_MSGPACK:
+            return cls(msgpack.unpackb(data, raw=False))
+        return cls(json.loads(data.decode("utf-8")))
+
+
+def dictionary_id(dictionary: bytes) -> int:
+    """Get the ID zstd stores in frames compressed with a trained dictionary."""
+    if not HAS_ZSTD_DICT:
+        return 0
+    return zstandard.ZstdCompressionDict(dictionary).dict_id()
+
+
+def train_dictionary(samples: List[bytes], dict_size: int = DICTIONARY_SIZE) -> Optional[bytes]:
+    """
+    Train a zstd dictionary on serialized event blocks.
+
+    Args:
+        samples: Blocks serialized with EventCompressor.serialize_events()
+        dict_size: Maximum dictionary size in bytes
+
+    Returns:
+        Dictionary bytes, or None if zstandard is not installed or the
+        samples are too few to train on
+    """
+    if not HAS_ZSTD_DICT:
+        logger.warning("zstandard not available, cannot train compression dictionaries")
+        return None
+
+    try:
+        return zstandard.train_dictionary(dict_size, samples).as_bytes()
+    except zstandard.ZstdError as e:
+        logger.info(f"Not enough sample data to train a dictionary on {len(samples)} blocks: {e}")
+        return None
+
 
 class EventCompressor:
     """
@@ -42,25 +172,47 @@ class EventCompressor:
 
     Uses zstd compression with event-specific optimizations:
     - String interning for repeated GUIDs/names
-    - Delta encoding for timestamps
+    - Delta-of-delta encoding for timestamps
     - Bit packing for flags and enums
-    - Columnar storage layout
+    - Typed binary columnar storage layout (version 2, see block_format);
+      version 1 msgpack blocks are still read
+    - Optional trained zstd dictionaries and per-encounter string tables
     """
 
     # Compression settings
     COMPRESSION_LEVEL = 3  # zstd level (balance of speed/ratio)
     BLOCK_SIZE = 1000  # Events per compression block
-    VERSION = 1  # Format version for future compatibility
+    VERSION = 2  # Format version for future compatibility
 
-    def __init__(self):
-        """Initialize compressor with trained dictionary."""
-        self.string_cache: Dict[str, int] = {}
-        self.reverse_string_cache: Dict[int, str] = {}
-        self.next_string_id = 0
+    def __init__(
+        self,
+        dictionary: Optional[bytes] = None,
+        string_table: Optional[StringTable] = None,
+        dictionary_lookup: Optional[Callable[[int], Optional[bytes]]] = None,
+    ):
+        """
+        Initialize compressor.
+
+        Args:
+            dictionary: Trained zstd dictionary to compress blocks with
+            string_table: String table shared by all blocks this compressor
+                writes and reads (a table per block when None)
+            dictionary_lookup: Function returning the dictionary with a given
+                ID, for reading blocks compressed with other dictionaries
+        """
+        self.strings = string_table if string_table is not None else StringTable()
+        self.shared_strings = string_table is not None
+        self.dictionary = dictionary if HAS_ZSTD_DICT else None
+        self.dictionary_id = dictionary_id(self.dictionary) if self.dictionary else 0
+        self.dictionary_lookup = dictionary_lookup
 
         # Store compression level for direct API usage
         self.compression_level = self.COMPRESSION_LEVEL
 
+        # zstandard contexts, created on first use
+        self._compressor = None
+        self._decompressors: Dict[int, Any] = {}
+
     def compress_events(self, events: List[TimestampedEvent]) -> Tuple[bytes, Dict[str, Any]]:
         """
         Compress a block of timestamped events.
@@ -76,22 +228,21 @@ class EventCompressor:
 
         start_time = time.time()
 
-        # Reset string cache for this block
-        self.string_cache.clear()
-        self.reverse_string_cache.clear()
-        self.next_string_id = 0
-
         # Sort events by timestamp for better compression
         sorted_events = sorted(events, key=lambda e: e.timestamp)
 
-        # Convert to columnar format for better compression
-        columnar_data = self._events_to_columnar(sorted_events)
-
-        # Serialize to bytes
-        serialized = self._serialize_columnar(columnar_data)
+        # Convert to columnar format and serialize to bytes
+        serialized = self.serialize_events(sorted_events)
 
         # Compress with zstd if available, otherwise use raw data
-        if HAS_ZSTD:
+        if self.dictionary:
+            if self._compressor is None:
+                self._compressor = zstandard.ZstdCompressor(
+                    level=self.compression_level,
+                    dict_data=zstandard.ZstdCompressionDict(self.dictionary),
+                )
+            compressed = self._compressor.compress(serialized)
+        elif HAS_ZSTD:
             compressed = zstd.compress(serialized, self.compression_level)
         else:
             logger.warning("zstd not available, storing uncompressed data")
@@ -111,8 +262,11 @@ class EventCompressor:
             "compression_time": compression_time,
             "start_time": sorted_events[0].timestamp,
             "end_time": sorted_events[-1].timestamp,
-            "string_count": len(self.string_cache),
+            "string_count": len(self.strings),
+            "dictionary_id": self.dictionary_id,
         }
+        # Block summaries let queries skip this block without decompressing it
+        metadata.update(summarize_block(sorted_events))
 
         logger.debug(
             f"Compressed {len(events)} events: "
@@ -122,12 +276,19 @@ class EventCompressor:
 
         return compressed, metadata
 
-    def decompress_events(self, compressed_data: bytes) -> List[TimestampedEvent]:
+    def decompress_events(
+        self,
+        compressed_data: bytes,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> List[TimestampedEvent]:
         """
         Decompress a block of events.
 
         Args:
             compressed_data: Compressed event data
+            start_time: Only rebuild events at or after this timestamp
+            end_time: Only rebuild events at or before this timestamp
 
         Returns:
             List of reconstructed TimestampedEvent objects
@@ -135,30 +296,342 @@ class EventCompressor:
         if not compressed_data:
             return []
 
-        start_time = time.time()
+        decompress_start = time.time()
+        serialized = self._decompress_bytes(compressed_data)
+
+        if is_v2_block(serialized):
+            events = self._block_to_events(decode_block(serialized), start_time, end_time)
+        else:
+            # Version 1 msgpack block
+            columnar_data = self._deserialize_columnar(serialized)
+            events = self._columnar_to_events(columnar_data)
+            if start_time is not None or end_time is not None:
+                events = [
+                    e
+                    for e in events
+                    if (start_time is None or e.timestamp >= start_time)
+                    and (end_time is None or e.timestamp <= end_time)
+                ]
+
+        decompression_time = time.time() - decompress_start
+        logger.debug(f"Decompressed {len(events)} events in {decompression_time:.3f}s")
+
+        return events
+
+    def decompress_columns(self, compressed_data: bytes) -> Dict[str, "np.ndarray"]:
+        """
+        Decompress a block into NumPy columns without creating event objects.
+
+        String columns are object arrays; spell_ids uses 0 and the unit flag
+        columns -1 for missing values. Version 1 blocks have no unit flags
+        or critical/glancing/crushing bits and return -1 and False for them.
+
+        Args:
+            compressed_data: Compressed event data
 
+        Returns:
+            Dictionary of timestamps, every column in block_format.COLUMNS
+            and raw_lines
+        """
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for columnar decompression")
+
+        serialized = self._decompress_bytes(compressed_data)
+        if is_v2_block(serialized):
+            block = decode_block(serialized)
+            strings = self._block_strings(block)
+            columns = {"timestamps": block["timestamps"]}
+            for name, encoding in COLUMNS:
+                if name in STRING_COLUMNS:
+                    distinct, codes = block[name]
+                    columns[name] = self._resolve_distinct(strings, distinct)[codes]
+                elif encoding == "codes":
+                    distinct, codes = block[name]
+                    columns[name] = distinct[codes]
+                else:
+                    columns[name] = block[name]
+            raw_lines = self._raw_lines(block, strings, 0, block["event_count"])
+            columns["raw_lines"] = np.array(raw_lines, dtype=object)
+            return columns
+
+        data = self._deserialize_columnar(serialized)
+        count = data["event_count"]
+        strings = self.strings if data.get("shared_strings") else StringTable.from_dict(
+            data.get("string_table") or {}
+        )
+        columns = {
+            "timestamps": data.get("base_timestamp", 0.0)
+            + np.array(data.get("timestamps", []), dtype=np.float64),
+            "source_flags": np.full(count, -1, dtype=np.int64),
+            "dest_flags": np.full(count, -1, dtype=np.int64),
+            "spell_ids": np.array(data.get("spell_ids", []), dtype=np.int64),
+            "amounts": np.array(data.get("amounts", []), dtype=np.int64),
+            "critical": np.zeros(count, dtype=bool),
+            "glancing": np.zeros(count, dtype=bool),
+            "crushing": np.zeros(count, dtype=bool),
+        }
+        for name in STRING_COLUMNS + ("raw_lines",):
+            values = data.get(name, [])
+            if name != "raw_lines" or not data.get("shared_strings"):
+                values = [strings.resolve(v) for v in values]
+            columns[name] = np.array(values, dtype=object)
+        return columns
+
+    def _decompress_bytes(self, compressed_data: bytes) -> bytes:
+        """Undo the zstd compression of a block."""
         # Decompress with zstd if available, otherwise assume raw data
+        frame_dictionary_id = self._frame_dictionary_id(compressed_data)
+        if frame_dictionary_id:
+            return self._decompressor(frame_dictionary_id).decompress(compressed_data)
         if HAS_ZSTD:
             try:
-                serialized = zstd.decompress(compressed_data)
+                return zstd.decompress(compressed_data)
             except Exception:
                 # Fallback: assume data is already uncompressed
                 logger.warning("Failed to decompress with zstd, assuming raw data")
-                serialized = compressed_data
-        else:
-            serialized = compressed_data
+                return compressed_data
+        return compressed_data
+
+    def _events_to_block(self, events: List[TimestampedEvent]) -> bytes:
+        """
+        Convert events to a version 2 typed column block.
 
-        # Deserialize from bytes
-        columnar_data = self._deserialize_columnar(serialized)
+        Args:
+            events: List of timestamped events
 
-        # Convert back to event objects
-        events = self._columnar_to_events(columnar_data)
+        Returns:
+            Serialized block
+        """
+        intern = self.strings.intern
+        timestamps = []
+        values = {name: [] for name, _ in COLUMNS}
+        raw_lines = []
 
-        decompression_time = time.time() - start_time
-        logger.debug(f"Decompressed {len(events)} events in {decompression_time:.3f}s")
+        for ts_event in events:
+            event = ts_event.event
+            timestamps.append(ts_event.timestamp)
+
+            values["event_types"].append(intern(event.event_type))
+            values["categories"].append(intern(ts_event.category))
+            values["source_guids"].append(intern(event.source_guid))
+            values["source_names"].append(intern(event.source_name))
+            values["dest_guids"].append(intern(event.dest_guid))
+            values["dest_names"].append(intern(event.dest_name))
+            values["source_flags"].append(-1 if event.source_flags is None else event.source_flags)
+            values["dest_flags"].append(-1 if event.dest_flags is None else event.dest_flags)
+            values["spell_ids"].append(getattr(event, "spell_id", None) or 0)
+            values["spell_names"].append(intern(getattr(event, "spell_name", None)))
+
+            if isinstance(event, (DamageEvent, HealEvent)):
+                values["amounts"].append(event.amount or 0)
+            else:
+                values["amounts"].append(0)
+            values["critical"].append(bool(getattr(event, "critical", False)))
+            values["glancing"].append(bool(getattr(event, "glancing", False)))
+            values["crushing"].append(bool(getattr(event, "crushing", False)))
+
+            # Raw lines are nearly all distinct, so they stay out of shared tables
+            raw_line = (event.raw_line or "")[:100]  # Truncate for space
+            raw_lines.append(raw_line if self.shared_strings else intern(raw_line))
+
+        return encode_block(
+            timestamps,
+            {name: np.asarray(column) for name, column in values.items()},
+            raw_lines,
+            [] if self.shared_strings else self.strings.strings,
+            self.shared_strings,
+        )
+
+    def _block_strings(self, block: Dict[str, Any]) -> StringTable:
+        """Get the string table a version 2 block's string IDs refer to."""
+        if block["shared_strings"]:
+            if not self.shared_strings:
+                raise ValueError("Event block uses a shared string table the compressor does not have")
+            return self.strings
+        return StringTable(block["string_table"])
+
+    @staticmethod
+    def _resolve_distinct(strings: StringTable, distinct: "np.ndarray") -> "np.ndarray":
+        """Resolve the distinct string IDs of a column to an object array."""
+        resolved = np.empty(len(distinct), dtype=object)
+        resolved[:] = [strings.resolve(string_id) for string_id in distinct.tolist()]
+        return resolved
+
+    def _raw_lines(self, block: Dict[str, Any], strings: StringTable, lo: int, hi: int) -> List[str]:
+        """Get the raw lines of rows lo to hi of a version 2 block."""
+        if block["shared_strings"]:
+            return block["raw_lines"][lo:hi]
+        distinct, codes = block["raw_lines"]
+        return self._resolve_distinct(strings, distinct)[codes[lo:hi]].tolist()
+
+    def _block_to_events(
+        self,
+        block: Dict[str, Any],
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> List[TimestampedEvent]:
+        """
+        Rebuild event objects from a decoded version 2 block.
+
+        Columns are resolved with array lookups over their distinct values;
+        the only per-row work left is creating the objects themselves.
+
+        Args:
+            block: Block decoded by block_format.decode_block()
+            start_time: Only rebuild events at or after this timestamp
+            end_time: Only rebuild events at or before this timestamp
+
+        Returns:
+            List of reconstructed events
+        """
+        strings = self._block_strings(block)
+        timestamps = block["timestamps"]
+
+        # Timestamps are sorted, so a time window is a slice
+        lo = 0 if start_time is None else int(np.searchsorted(timestamps, start_time, "left"))
+        hi = len(timestamps) if end_time is None else int(np.searchsorted(timestamps, end_time, "right"))
+        if lo >= hi:
+            return []
+
+        def strings_of(name):
+            distinct, codes = block[name]
+            return self._resolve_distinct(strings, distinct)[codes[lo:hi]].tolist()
+
+        def optional_of(name, missing):
+            distinct, codes = block[name]
+            resolved = np.empty(len(distinct), dtype=object)
+            resolved[:] = [None if v == missing else v for v in distinct.tolist()]
+            return resolved[codes[lo:hi]].tolist()
+
+        # Event class per distinct event type
+        distinct_types, type_codes = block["event_types"]
+        type_names = self._resolve_distinct(strings, distinct_types)
+        classes = np.empty(len(type_names), dtype=object)
+        classes[:] = [self._event_class(event_type or "") for event_type in type_names.tolist()]
+
+        rows = zip(
+            timestamps[lo:hi].tolist(),
+            type_names[type_codes[lo:hi]].tolist(),
+            classes[type_codes[lo:hi]].tolist(),
+            strings_of("categories"),
+            strings_of("source_guids"),
+            strings_of("source_names"),
+            strings_of("dest_guids"),
+            strings_of("dest_names"),
+            optional_of("source_flags", -1),
+            optional_of("dest_flags", -1),
+            optional_of("spell_ids", 0),
+            strings_of("spell_names"),
+            block["amounts"][lo:hi].tolist(),
+            block["critical"][lo:hi].tolist(),
+            block["glancing"][lo:hi].tolist(),
+            block["crushing"][lo:hi].tolist(),
+            self._raw_lines(block, strings, lo, hi),
+        )
+
+        events = []
+        for (
+            timestamp, event_type, event_class, category,
+            source_guid, source_name, dest_guid, dest_name, source_flags, dest_flags,
+            spell_id, spell_name, amount, critical, glancing, crushing, raw_line,
+        ) in rows:
+            moment = datetime.fromtimestamp(timestamp)
+            fields = {
+                "timestamp": moment,
+                "event_type": event_type,
+                "raw_line": raw_line or "",
+                "source_guid": source_guid,
+                "source_name": source_name,
+                "source_flags": source_flags,
+                "dest_guid": dest_guid,
+                "dest_name": dest_name,
+                "dest_flags": dest_flags,
+            }
+            if event_class is DamageEvent:
+                event = DamageEvent(
+                    **fields, spell_id=spell_id, spell_name=spell_name, amount=amount,
+                    critical=critical, glancing=glancing, crushing=crushing,
+                )
+            elif event_class is HealEvent:
+                event = HealEvent(
+                    **fields, spell_id=spell_id, spell_name=spell_name, amount=amount,
+                    critical=critical,
+                )
+            elif event_class is BaseEvent:
+                event = BaseEvent(**fields)
+            else:
+                event = event_class(**fields, spell_id=spell_id, spell_name=spell_name)
+
+            events.append(
+                TimestampedEvent(timestamp=timestamp, datetime=moment, event=event, category=category)
+            )
 
         return events
 
+    @staticmethod
+    def _event_class(event_type: str) -> type:
+        """Get the event class rebuilt for an event type."""
+        if event_type in _DAMAGE_TYPES:
+            return DamageEvent
+        if event_type in _HEAL_TYPES:
+            return HealEvent
+        if "AURA" in event_type:
+            return AuraEvent
+        if "SPELL" in event_type:
+            return SpellEvent
+        return BaseEvent
+
+    def serialize_events(self, events: List[TimestampedEvent]) -> bytes:
+        """
+        Serialize timestamp ordered events to an uncompressed block.
+
+        Blocks serialized this way are the samples dictionaries are trained on.
+
+        Args:
+            events: Events sorted by timestamp
+
+        Returns:
+            Serialized block
+        """
+        # A per-block string table starts empty for every block
+        if not self.shared_strings:
+            self.strings.clear()
+
+        if HAS_NUMPY:
+            return self._events_to_block(events)
+        return self._serialize_columnar(self._events_to_columnar(events))
+
+    def _frame_dictionary_id(self, compressed_data: bytes) -> int:
+        """Get the ID of the dictionary a zstd frame was compressed with (0 for none)."""
+        if not HAS_ZSTD_DICT:
+            return 0
+        try:
+            return zstandard.get_frame_parameters(compressed_data).dict_id
+        except zstandard.ZstdError:
+            return 0
+
+    def _decompressor(self, frame_dictionary_id: int):
+        """Get a zstandard decompressor for a dictionary ID."""
+        decompressor = self._decompressors.get(frame_dictionary_id)
+        if decompressor is None:
+            if frame_dictionary_id == self.dictionary_id:
+                dictionary = self.dictionary
+            elif self.dictionary_lookup:
+                dictionary = self.dictionary_lookup(frame_dictionary_id)
+            else:
+                dictionary = None
+
+            if dictionary is None:
+                raise ValueError(
+                    f"Event block was compressed with unknown dictionary {frame_dictionary_id}"
+                )
+
+            decompressor = zstandard.ZstdDecompressor(
+                dict_data=zstandard.ZstdCompressionDict(dictionary)
+            )
+            self._decompressors[frame_dictionary_id] = decompressor
+        return decompressor
+
     def _events_to_columnar(self, events: List[TimestampedEvent]) -> Dict[str, Any]:
         """
         Convert events to columnar format for better compression.
@@ -170,7 +643,7 @@ class EventCompressor:
             Dictionary with columnar data
         """
         if not events:
-            return {"version": self.VERSION, "event_count": 0}
+            return {"version": 1, "event_count": 0}
 
         # Extract common fields
         timestamps = []
@@ -221,13 +694,16 @@ class EventCompressor:
                 amounts.append(0)
 
             # Store minimal raw line info (can reconstruct from other fields if needed)
-            raw_lines.append(self._intern_string(event.raw_line[:100]))  # Truncate for space
+            # Raw lines are nearly all distinct, so they stay out of shared tables
+            raw_line = event.raw_line[:100]  # Truncate for space
+            raw_lines.append(raw_line if self.shared_strings else self._intern_string(raw_line))
 
         return {
-            "version": self.VERSION,
+            "version": 1,  # msgpack layout, written only without numpy
             "event_count": len(events),
             "base_timestamp": base_timestamp,
-            "string_table": self.reverse_string_cache,
+            "shared_strings": self.shared_strings,
+            "string_table": None if self.shared_strings else self.strings.to_dict(),
             # Columnar event data
             "timestamps": timestamps,
             "event_types": event_types,
@@ -255,9 +731,15 @@ class EventCompressor:
         if data["event_count"] == 0:
             return []
 
-        # Rebuild string cache
-        self.reverse_string_cache = data["string_table"]
-        self.string_cache = {v: k for k, v in self.reverse_string_cache.items()}
+        # Blocks with shared strings resolve them through this compressor's
+        # table; others carry their own
+        shared_strings = data.get("shared_strings", False)
+        if shared_strings:
+            if not self.shared_strings:
+                raise ValueError("Event block uses a shared string table the compressor does not have")
+            strings = self.strings
+        else:
+            strings = StringTable.from_dict(data["string_table"])
 
         events = []
         base_timestamp = data["base_timestamp"]
@@ -267,18 +749,20 @@ class EventCompressor:
             timestamp = base_timestamp + data["timestamps"][i]
 
             # Reconstruct event fields
-            event_type = self._resolve_string(data["event_types"][i])
-            category = self._resolve_string(data["categories"][i])
+            event_type = strings.resolve(data["event_types"][i])
+            category = strings.resolve(data["categories"][i])
 
-            source_guid = self._resolve_string(data["source_guids"][i])
-            source_name = self._resolve_string(data["source_names"][i])
-            dest_guid = self._resolve_string(data["dest_guids"][i])
-            dest_name = self._resolve_string(data["dest_names"][i])
+            source_guid = strings.resolve(data["source_guids"][i])
+            source_name = strings.resolve(data["source_names"][i])
+            dest_guid = strings.resolve(data["dest_guids"][i])
+            dest_name = strings.resolve(data["dest_names"][i])
 
             spell_id = data["spell_ids"][i] if data["spell_ids"][i] != 0 else None
-            spell_name = self._resolve_string(data["spell_names"][i])
+            spell_name = strings.resolve(data["spell_names"][i])
             amount = data["amounts"][i] if data["amounts"][i] != 0 else None
-            raw_line = self._resolve_string(data["raw_lines"][i])
+            raw_line = (
+                data["raw_lines"][i] if shared_strings else strings.resolve(data["raw_lines"][i])
+            )
 
             # Create appropriate event type
             event = self._create_event_from_data(
@@ -354,15 +838,7 @@ class EventCompressor:
         Returns:
             String ID (0 for None/empty strings)
         """
-        if not s:
-            return 0
-
-        if s not in self.string_cache:
-            self.next_string_id += 1
-            self.string_cache[s] = self.next_string_id
-            self.reverse_string_cache[self.next_string_id] = s
-
-        return self.string_cache[s]
+        return self.strings.intern(s)
 
     def _resolve_string(self, string_id: int) -> Optional[str]:
         """
@@ -374,9 +850,7 @@ class EventCompressor:
         Returns:
             Original string or None
         """
-        if string_id == 0:
-            return None
-        return self.reverse_string_cache.get(string_id)
+        return self.strings.resolve(string_id)
 
     def _create_event_from_data(
         self,
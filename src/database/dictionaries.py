@@ -0,0 +1,243 @@
+"""
+Trained compression dictionaries and encounter string tables for event blocks.
+
+Event blocks are small (a thousand events of one character), and zstd has
+little data within a block to learn the repeating msgpack layout from. A
+dictionary trained on sample blocks of a guild, or of a single long
+encounter, gives it that context up front. Dictionaries are versioned per
+scope and never deleted, since every block compressed with one names it by
+ID in its zstd frame header.
+
+The GUIDs, names and spell names of an encounter repeat in every block, so
+blocks written through this store share one string table per encounter
+instead of each carrying its own.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .compression import EventCompressor, StringTable, dictionary_id, train_dictionary
+
+logger = logging.getLogger(__name__)
+
+# Fewer sample blocks than this rarely train a useful dictionary
+MIN_TRAINING_SAMPLES = 8
+
+
+def guild_scope(guild_id: int) -> str:
+    """Get the dictionary scope of a guild."""
+    return f"guild:{guild_id}"
+
+
+def encounter_scope(encounter_id: int) -> str:
+    """Get the dictionary scope of a single encounter."""
+    return f"encounter:{encounter_id}"
+
+
+class CompressionDictionaryStore:
+    """
+    Stores compression dictionaries and encounter string tables in the database.
+
+    Blocks of one encounter must be written through a single compressor at a
+    time, since its string table is saved whole after each write.
+    """
+
+    def __init__(self, db):
+        """
+        Initialize dictionary store.
+
+        Args:
+            db: SQLite database manager
+        """
+        self.db = db
+        self._dictionaries: Dict[int, bytes] = {}
+
+    def get(self, dict_id: int) -> Optional[bytes]:
+        """Get a dictionary by the ID stored in frames compressed with it."""
+        dictionary = self._dictionaries.get(dict_id)
+        if dictionary is None:
+            rows = self.db.execute(
+                "SELECT dictionary FROM compression_dictionaries WHERE dict_id = ?", (dict_id,)
+            )
+            if not rows:
+                return None
+            dictionary = self._dictionaries[dict_id] = bytes(rows[0]["dictionary"])
+        return dictionary
+
+    def latest(self, scope: str) -> Optional[Tuple[int, bytes]]:
+        """Get the ID and bytes of the newest dictionary of a scope."""
+        rows = self.db.execute(
+            """
+            SELECT dict_id, dictionary FROM compression_dictionaries
+            WHERE scope = ? ORDER BY version DESC LIMIT 1
+            """,
+            (scope,),
+        )
+        if not rows:
+            return None
+        return rows[0]["dict_id"], bytes(rows[0]["dictionary"])
+
+    def save(self, scope: str, dictionary: bytes, sample_count: int) -> int:
+        """
+        Store a dictionary as the next version of its scope.
+
+        Args:
+            scope: Dictionary scope (guild_scope() or encounter_scope())
+            dictionary: Trained dictionary bytes
+            sample_count: Number of blocks it was trained on
+
+        Returns:
+            Dictionary ID (of the stored copy if the dictionary already exists)
+        """
+        dict_id = dictionary_id(dictionary)
+        if self.get(dict_id) is not None:
+            # Retraining on the same samples gives the same dictionary
+            return dict_id
+
+        rows = self.db.execute(
+            "SELECT MAX(version) AS version FROM compression_dictionaries WHERE scope = ?",
+            (scope,),
+        )
+        version = (rows[0]["version"] or 0) + 1 if rows else 1
+
+        self.db.execute(
+            """
+            INSERT INTO compression_dictionaries (dict_id, scope, version, dictionary, sample_count)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (dict_id, scope, version, dictionary, sample_count),
+            fetch_results=False,
+        )
+        self.db.commit()
+        self._dictionaries[dict_id] = dictionary
+
+        logger.info(
+            f"Stored {len(dictionary):,} byte compression dictionary {dict_id} "
+            f"as {scope} version {version} ({sample_count} samples)"
+        )
+        return dict_id
+
+    def train(self, scope: str, samples: List[bytes]) -> Optional[int]:
+        """
+        Train and store a new dictionary version for a scope.
+
+        Args:
+            scope: Dictionary scope
+            samples: Blocks serialized with EventCompressor.serialize_events()
+
+        Returns:
+            Dictionary ID, or None if no dictionary could be trained
+        """
+        if len(samples) < MIN_TRAINING_SAMPLES:
+            logger.info(f"Only {len(samples)} sample blocks for {scope}, not training a dictionary")
+            return None
+
+        dictionary = train_dictionary(samples)
+        if dictionary is None:
+            return None
+        return self.save(scope, dictionary, len(samples))
+
+    def train_from_stored_blocks(
+        self,
+        scope: str,
+        guild_id: Optional[int] = None,
+        encounter_id: Optional[int] = None,
+        max_samples: int = 500,
+    ) -> Optional[int]:
+        """
+        Train a dictionary on a random sample of stored event blocks.
+
+        Args:
+            scope: Dictionary scope to store the dictionary under
+            guild_id: Sample blocks of this guild's encounters
+            encounter_id: Sample blocks of this encounter
+            max_samples: Maximum number of blocks to sample
+
+        Returns:
+            Dictionary ID, or None if no dictionary could be trained
+        """
+        query = """
+            SELECT eb.encounter_id, eb.compressed_data
+            FROM event_blocks eb
+            JOIN encounters e ON eb.encounter_id = e.encounter_id
+        """
+        conditions = []
+        params = []
+
+        if guild_id is not None:
+            conditions.append("e.guild_id = ?")
+            params.append(guild_id)
+        if encounter_id is not None:
+            conditions.append("eb.encounter_id = ?")
+            params.append(encounter_id)
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY RANDOM() LIMIT ?"
+        params.append(max_samples)
+
+        rows = self.db.execute(query, tuple(params)) or []
+
+        # Re-serialize the way new blocks are written: strings go to a
+        # per-encounter table and stay out of the samples
+        readers: Dict[int, EventCompressor] = {}
+        writers: Dict[int, EventCompressor] = {}
+        samples = []
+        for row in rows:
+            block_encounter = row["encounter_id"]
+            if block_encounter not in readers:
+                readers[block_encounter] = self.compressor_for_encounter(block_encounter)
+                writers[block_encounter] = EventCompressor(string_table=StringTable())
+
+            events = readers[block_encounter].decompress_events(row["compressed_data"])
+            samples.append(writers[block_encounter].serialize_events(events))
+
+        return self.train(scope, samples)
+
+    def load_string_table(self, encounter_id: int) -> StringTable:
+        """Get the string table of an encounter (empty if it has none yet)."""
+        rows = self.db.execute(
+            "SELECT strings FROM encounter_string_tables WHERE encounter_id = ?", (encounter_id,)
+        )
+        if not rows:
+            return StringTable()
+        return StringTable.from_bytes(rows[0]["strings"])
+
+    def save_string_table(self, encounter_id: int, table: StringTable):
+        """Store the string table of an encounter."""
+        self.db.execute(
+            """
+            INSERT OR REPLACE INTO encounter_string_tables (encounter_id, string_count, strings)
+            VALUES (?, ?, ?)
+            """,
+            (encounter_id, len(table), table.to_bytes()),
+            fetch_results=False,
+        )
+
+    def compressor_for_encounter(self, encounter_id: int) -> EventCompressor:
+        """
+        Create a compressor for writing and reading an encounter's blocks.
+
+        New blocks use the encounter's own dictionary if one was trained, else
+        its guild's. Blocks written with older dictionaries are read through
+        this store.
+
+        Args:
+            encounter_id: Database encounter ID
+
+        Returns:
+            EventCompressor with the encounter's string table
+        """
+        latest = self.latest(encounter_scope(encounter_id))
+        if latest is None:
+            rows = self.db.execute(
+                "SELECT guild_id FROM encounters WHERE encounter_id = ?", (encounter_id,)
+            )
+            if rows and rows[0]["guild_id"] is not None:
+                latest = self.latest(guild_scope(rows[0]["guild_id"]))
+
+        return EventCompressor(
+            dictionary=latest[1] if latest else None,
+            string_table=self.load_string_table(encounter_id),
+            dictionary_lookup=self.get,
+        )
@@ -72,13 +72,34 @@ class HybridDatabaseManager:
             # Try to apply initial migration anyway
             self._apply_initial_migration()
 
+        self._apply_pending_migrations()
+
     def _apply_initial_migration(self):
         """Apply the initial schema migration."""
+        self._apply_migration("001_initial_schema.sql")
+
+    def _apply_pending_migrations(self):
+        """Apply the migrations numbered above the recorded schema version."""
+        try:
+            result = self.postgres.execute("SELECT MAX(version) AS version FROM schema_version")
+            current_version = (result[0]["version"] if result else None) or 1
+
+            migrations_dir = os.path.join(os.path.dirname(__file__), "migrations")
+            for migration_name in sorted(os.listdir(migrations_dir)):
+                version = migration_name.split("_", 1)[0]
+                if migration_name.endswith(".sql") and version.isdigit() and int(version) > current_version:
+                    self._apply_migration(migration_name)
+
+        except Exception as e:
+            logger.error(f"Failed to apply pending migrations: {e}")
+
+    def _apply_migration(self, migration_name: str):
+        """Apply one schema migration from the migrations directory."""
         try:
             migration_file = os.path.join(
                 os.path.dirname(__file__),
                 "migrations",
-                "001_initial_schema.sql",
+                migration_name,
             )
 
             if os.path.exists(migration_file):
@@ -91,12 +112,12 @@ class HybridDatabaseManager:
                     if statement:
                         self.postgres.execute(statement, fetch_results=False)
 
-                logger.info("Initial migration applied successfully")
+                logger.info(f"Migration {migration_name} applied successfully")
             else:
                 logger.warning(f"Migration file not found: {migration_file}")
 
         except Exception as e:
-            logger.error(f"Failed to apply initial migration: {e}")
+            logger.error(f"Failed to apply migration {migration_name}: {e}")
 
     def execute(self, query: str, params=None, fetch_results=True):
         """
@@ -0,0 +1,17 @@
+-- PostgreSQL Migration: Encounter fingerprints
+-- Fingerprints of the encounters each guild has stored, so encounters of
+-- overlapping log uploads are skipped instead of being stored again.
+-- encounter_id and log_file_id are the IDs EventStorage stored them under
+
+CREATE TABLE IF NOT EXISTS encounter_fingerprints (
+    guild_id INTEGER NOT NULL REFERENCES guilds(id) ON DELETE CASCADE,
+    fingerprint VARCHAR(64) NOT NULL,
+    encounter_id VARCHAR(50),
+    log_file_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (guild_id, fingerprint)
+);
+
+INSERT INTO schema_version (version, description)
+VALUES (2, 'Encounter fingerprints for deduplicating uploads')
+ON CONFLICT (version) DO NOTHING;
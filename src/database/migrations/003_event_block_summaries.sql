@@ -0,0 +1,12 @@
+-- PostgreSQL Migration: Event block summaries
+-- Per-block bitmap of event types and bloom filter of spell IDs, read to skip
+-- blocks that cannot match a query before their compressed data is fetched.
+-- Blocks written before this migration keep NULL summaries and are never
+-- skipped on event type or spell
+
+ALTER TABLE event_blocks ADD COLUMN IF NOT EXISTS event_type_mask BIGINT;
+ALTER TABLE event_blocks ADD COLUMN IF NOT EXISTS spell_bloom BYTEA;
+
+INSERT INTO schema_version (version, description)
+VALUES (3, 'Event block summaries for pruning event queries')
+ON CONFLICT (version) DO NOTHING;
@@ -5,17 +5,25 @@ Provides optimized queries with caching and efficient time-series queries
 for instant data retrieval from InfluxDB event storage and PostgreSQL metadata.
 """
 
+import functools
+import hashlib
+import sys
 import time
 import threading
 import logging
-from typing import List, Dict, Any, Optional, Tuple, Union
+from collections import OrderedDict
+from itertools import islice
+from typing import Iterator, List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from functools import lru_cache
 
-from .schema import DatabaseManager
+from .schema import DatabaseManager, adapt_placeholders
+from .block_index import iter_block_events
+from .dictionaries import CompressionDictionaryStore
 from .existing_schema_adapter import ExistingSchemaAdapter
 from .influxdb_direct_manager import InfluxDBDirectManager
+from src.cache.query_results import SharedQueryCache, current_shared_query_cache
 from src.models.character_events import TimestampedEvent, CharacterEventStream
 from src.models.encounter_models import RaidEncounter, MythicPlusRun
 
@@ -92,73 +100,221 @@ class SpellUsage:
     crit_percentage: float
 
 
+# Containers longer than this are sized from a sample of their items
+SIZE_SAMPLE = 16
+
+# Cache key prefix -> TTL in seconds for every prefix QueryAPI uses. Stored
+# encounters, their metrics and events never change; lists, counts and
+# rankings change whenever a log is uploaded (uploads also invalidate the
+# shared cache, these bound how stale per-instance results get).
+DEFAULT_PREFIX_TTLS: Dict[str, float] = {
+    "encounter": 1800,
+    "metrics": 1800,
+    "events": 1800,
+    "spells": 900,
+    "recent_encounters": 60,
+    "encounters": 60,
+    "guild_encounters": 60,
+    "search": 60,
+    "count": 60,
+    "char_count": 60,
+    "characters": 60,
+    "top": 120,
+    "guild": 600,
+    "guilds": 300,
+}
+
+
+def estimate_size(value: Any, depth: int = 0) -> int:
+    """
+    Approximate the memory used by a cached value in bytes.
+
+    Walks containers and the attributes of objects (dataclasses, slotted
+    events) a few levels deep. Long containers are sized from their first
+    SIZE_SAMPLE items.
+
+    Args:
+        value: Value to size
+        depth: Current nesting depth
+
+    Returns:
+        Approximate size in bytes
+    """
+    size = sys.getsizeof(value)
+    if depth >= 4 or isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return size
+
+    if isinstance(value, dict):
+        count = len(value) * 2
+        items = [item for pair in islice(value.items(), SIZE_SAMPLE // 2) for item in pair]
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        items = list(islice(value, SIZE_SAMPLE))
+    else:
+        attributes = dict(getattr(value, "__dict__", {}))
+        for name in getattr(type(value), "__slots__", ()):
+            if hasattr(value, name):
+                attributes[name] = getattr(value, name)
+        if not attributes:
+            return size
+        return size + estimate_size(attributes, depth + 1)
+
+    if not items:
+        return size
+
+    sampled = sum(estimate_size(item, depth + 1) for item in items)
+    return size + sampled * count // len(items)
+
+
 class QueryCache:
-    """LRU cache for query results with TTL support."""
+    """
+    LRU cache for query results with a byte budget and per-prefix TTLs.
 
-    def __init__(self, max_size: int = 1000, ttl_seconds: int = 300):
+    Entries are kept in an OrderedDict in recency order, so lookups, inserts
+    and evictions are O(1). Each entry is charged its approximate size in
+    bytes; least recently used entries are evicted when either the entry
+    count or the byte budget is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl_seconds: int = 300,
+        max_bytes: int = 64 * 1024 * 1024,
+        prefix_ttls: Optional[Dict[str, float]] = None,
+    ):
         """
         Initialize query cache.
 
         Args:
             max_size: Maximum number of cached items
             ttl_seconds: Time-to-live for cache entries
+            max_bytes: Approximate memory budget for all cached values; values
+                larger than a quarter of it are not cached
+            prefix_ttls: TTLs for keys by the prefix before their first ":"
+                (DEFAULT_PREFIX_TTLS if None)
         """
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self.cache: Dict[str, Tuple[Any, float]] = {}
-        self.access_order: List[str] = []
-        self.lock = threading.RLock()
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_bytes // 4
+        self.prefix_ttls = dict(DEFAULT_PREFIX_TTLS if prefix_ttls is None else prefix_ttls)
+
+        # key -> (value, expires_at, size), least recently used first
+        self.cache: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def ttl_for(self, key: str) -> float:
+        """Get the TTL for a key from its prefix."""
+        return self.prefix_ttls.get(key.split(":", 1)[0], self.ttl_seconds)
 
     def get(self, key: str) -> Optional[Any]:
         """Get cached value if not expired."""
         with self.lock:
-            if key not in self.cache:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
                 return None
 
-            value, timestamp = self.cache[key]
-            if time.time() - timestamp > self.ttl_seconds:
+            value, expires_at, size = entry
+            if time.time() > expires_at:
                 # Expired
                 del self.cache[key]
-                self.access_order.remove(key)
+                self.total_bytes -= size
+                self.expirations += 1
+                self.misses += 1
                 return None
 
             # Move to end (most recently used)
-            self.access_order.remove(key)
-            self.access_order.append(key)
+            self.cache.move_to_end(key)
+            self.hits += 1
             return value
 
     def put(self, key: str, value: Any):
         """Cache a value with current timestamp."""
+        size = estimate_size(value)
+
         with self.lock:
             # Remove if already exists
-            if key in self.cache:
-                self.access_order.remove(key)
+            old_entry = self.cache.pop(key, None)
+            if old_entry is not None:
+                self.total_bytes -= old_entry[2]
+
+            if size > self.max_entry_bytes:
+                self.rejections += 1
+                return
 
             # Add new entry
-            self.cache[key] = (value, time.time())
-            self.access_order.append(key)
+            self.cache[key] = (value, time.time() + self.ttl_for(key), size)
+            self.total_bytes += size
 
-            # Evict oldest if over capacity
-            while len(self.cache) > self.max_size:
-                oldest_key = self.access_order.pop(0)
-                del self.cache[oldest_key]
+            # Evict least recently used if over capacity
+            while len(self.cache) > self.max_size or self.total_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self.cache.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
 
     def clear(self):
         """Clear all cached entries."""
         with self.lock:
             self.cache.clear()
-            self.access_order.clear()
+            self.total_bytes = 0
 
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         with self.lock:
+            lookups = self.hits + self.misses
             return {
                 "size": len(self.cache),
                 "max_size": self.max_size,
                 "ttl_seconds": self.ttl_seconds,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "rejections": self.rejections,
             }
 
 
+def shared_query(prefix: str):
+    """
+    Serve a QueryAPI read method through the shared result cache.
+
+    Concurrent calls with the same arguments are coalesced into one query,
+    and the result is shared with other worker processes for the TTL of the
+    cache key prefix. Without a shared cache the method is called directly.
+
+    Args:
+        prefix: Cache key prefix of the method's results, used for the TTL
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.shared_cache is None:
+                return method(self, *args, **kwargs)
+
+            call = repr((args, sorted(kwargs.items())))
+            key = f"{prefix}:{method.__name__}:{hashlib.sha1(call.encode('utf-8')).hexdigest()}"
+            return self.shared_cache.get_or_compute(
+                key, lambda: method(self, *args, **kwargs), ttl=self.cache.ttl_for(prefix)
+            )
+
+        return wrapper
+
+    return decorator
+
+
 class QueryAPI:
     """
     High-performance query interface for combat log database with time-series support.
@@ -167,17 +323,28 @@ class QueryAPI:
     and efficient data retrieval patterns for common use cases.
     """
 
-    def __init__(self, db: DatabaseManager, cache_size: int = 1000):
+    def __init__(
+        self,
+        db: DatabaseManager,
+        cache_size: int = 1000,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        shared_cache: Optional[SharedQueryCache] = None,
+    ):
         """
         Initialize query API with existing schema adapter.
 
         Args:
             db: Database manager instance (hybrid manager with InfluxDB)
             cache_size: Maximum number of cached query results
+            cache_max_bytes: Approximate memory budget for cached query results
+            shared_cache: Result cache shared between QueryAPI instances and
+                worker processes (the global one from get_shared_query_cache(),
+                if it has been created, when None)
         """
         self.db = db
         self.adapter = ExistingSchemaAdapter(db.get_connection())
-        self.cache = QueryCache(max_size=cache_size)
+        self.cache = QueryCache(max_size=cache_size, max_bytes=cache_max_bytes)
+        self.shared_cache = shared_cache if shared_cache is not None else current_shared_query_cache()
 
         # Initialize time-series manager if available
         if hasattr(db, 'influxdb') and db.influxdb:
@@ -199,8 +366,12 @@ class QueryAPI:
             "total_query_time": 0.0,
             "time_series_queries": 0,
             "influxdb_query_time": 0.0,
+            "blocks_scanned": 0,
+            "blocks_pruned": 0,
+            "events_decompressed": 0,
         }
 
+    @shared_query("encounter")
     def get_encounter(
         self, encounter_id: int, guild_id: Optional[int] = None
     ) -> Optional[EncounterSummary]:
@@ -253,6 +424,7 @@ class QueryAPI:
         self.cache.put(cache_key, encounter)
         return encounter
 
+    @shared_query("recent_encounters")
     def get_recent_encounters(
         self, limit: int = 10, guild_id: Optional[int] = None
     ) -> List[EncounterSummary]:
@@ -317,6 +489,7 @@ class QueryAPI:
         self.cache.put(cache_key, encounters)
         return encounters
 
+    @shared_query("search")
     def search_encounters(
         self,
         boss_name: Optional[str] = None,
@@ -427,6 +600,7 @@ class QueryAPI:
         self.cache.put(cache_key, encounters)
         return encounters
 
+    @shared_query("metrics")
     def get_character_metrics(
         self,
         encounter_id: int,
@@ -482,6 +656,7 @@ class QueryAPI:
         self.cache.put(cache_key, metrics)
         return metrics
 
+    @shared_query("top")
     def get_top_performers(
         self,
         metric: str = "dps",
@@ -586,6 +761,7 @@ class QueryAPI:
         self.cache.put(cache_key, performers)
         return performers
 
+    @shared_query("events")
     def get_character_events(
         self,
         character_name: str,
@@ -593,6 +769,7 @@ class QueryAPI:
         start_time: Optional[float] = None,
         end_time: Optional[float] = None,
         event_types: Optional[List[str]] = None,
+        spell_ids: Optional[List[int]] = None,
     ) -> List[TimestampedEvent]:
         """
         Get detailed events for a character in an encounter.
@@ -603,11 +780,14 @@ class QueryAPI:
             start_time: Optional start timestamp filter
             end_time: Optional end timestamp filter
             event_types: Optional filter by event types
+            spell_ids: Optional filter by spell IDs
 
         Returns:
             List of decompressed TimestampedEvent objects
         """
-        cache_key = f"events:{character_name}:{encounter_id}:{start_time}:{end_time}:{event_types}"
+        cache_key = (
+            f"events:{character_name}:{encounter_id}:{start_time}:{end_time}:{event_types}:{spell_ids}"
+        )
         cached = self.cache.get(cache_key)
         if cached:
             self.stats["cache_hits"] += 1
@@ -616,20 +796,61 @@ class QueryAPI:
         start_query_time = time.time()
         self.stats["queries_executed"] += 1
 
-        # Get character ID
-        cursor = self.db.execute(
-            "SELECT character_id FROM characters WHERE character_name = %s",
+        events = list(
+            self.iter_character_events(
+                character_name, encounter_id, start_time, end_time, event_types, spell_ids
+            )
+        )
+
+        query_time = time.time() - start_query_time
+        self.stats["total_query_time"] += query_time
+        self.stats["cache_misses"] += 1
+
+        # Result sets too large for the cache's byte budget are not cached
+        self.cache.put(cache_key, events)
+
+        return events
+
+    def iter_character_events(
+        self,
+        character_name: str,
+        encounter_id: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        event_types: Optional[List[str]] = None,
+        spell_ids: Optional[List[int]] = None,
+    ) -> Iterator[TimestampedEvent]:
+        """
+        Stream events for a character in an encounter in timestamp order.
+
+        Block summaries are read first and blocks outside the time range, or
+        without the wanted event types or spells, are skipped before their
+        compressed data is read. The remaining blocks are fetched and
+        decompressed one at a time as the stream reaches them.
+
+        Args:
+            character_name: Character name
+            encounter_id: Encounter ID
+            start_time: Optional start timestamp filter
+            end_time: Optional end timestamp filter
+            event_types: Optional filter by event types
+            spell_ids: Optional filter by spell IDs
+
+        Yields:
+            Matching TimestampedEvent objects
+        """
+        rows = self.db.execute(
+            adapt_placeholders(self.db, "SELECT character_id FROM characters WHERE character_name = %s"),
             (character_name,)
         )
-        row = cursor.fetchone()
-        if not row:
-            return []
+        if not rows:
+            return
 
-        character_id = row[0]
+        character_id = rows[0]["character_id"]
 
-        # Get event blocks for this character/encounter
+        # Block summaries only; compressed_data is fetched per surviving block
         query = """
-            SELECT block_index, start_time, end_time, compressed_data
+            SELECT block_id, start_time, end_time, event_type_mask, spell_bloom
             FROM event_blocks
             WHERE encounter_id = %s AND character_id = %s
         """
@@ -645,53 +866,24 @@ class QueryAPI:
 
         query += " ORDER BY block_index"
 
-        cursor = self.db.execute(query, params)
-        blocks = cursor.fetchall()
-
-        if not blocks:
-            return []
-
-        # Decompress all blocks in parallel
-        def decompress_block(block_data):
-            compressed = block_data[3]  # compressed_data column
-            return self.decompressor.decompress_events(compressed)
-
-        # Use thread pool for parallel decompression
-        futures = [self.executor.submit(decompress_block, block) for block in blocks]
-        all_events = []
-
-        for future in futures:
-            block_events = future.result()
-            all_events.extend(block_events)
+        blocks = self.db.execute(adapt_placeholders(self.db, query), tuple(params)) or []
+        compressor = CompressionDictionaryStore(self.db).compressor_for_encounter(encounter_id)
 
-        # Apply filters
-        filtered_events = all_events
-
-        if start_time is not None or end_time is not None:
-            filtered_events = [
-                e
-                for e in filtered_events
-                if (start_time is None or e.timestamp >= start_time)
-                and (end_time is None or e.timestamp <= end_time)
-            ]
-
-        if event_types:
-            filtered_events = [e for e in filtered_events if e.event.event_type in event_types]
-
-        # Sort by timestamp
-        filtered_events.sort(key=lambda e: e.timestamp)
-
-        query_time = time.time() - start_query_time
-        self.stats["total_query_time"] += query_time
-        self.stats["cache_misses"] += 1
-        self.stats["events_decompressed"] += len(all_events)
-
-        # Cache smaller result sets only
-        if len(filtered_events) < 10000:
-            self.cache.put(cache_key, filtered_events)
+        def load_block(block: Dict[str, Any]) -> List[TimestampedEvent]:
+            data = self.db.execute(
+                adapt_placeholders(self.db, "SELECT compressed_data FROM event_blocks WHERE block_id = %s"),
+                (block["block_id"],)
+            )
+            if not data:
+                return []
+            # Only events inside the window are rebuilt from the block's columns
+            return compressor.decompress_events(data[0]["compressed_data"], start_time, end_time)
 
-        return filtered_events
+        yield from iter_block_events(
+            blocks, load_block, start_time, end_time, event_types, spell_ids, stats=self.stats
+        )
 
+    @shared_query("spells")
     def get_spell_usage(
         self,
         character_name: str,
@@ -775,6 +967,7 @@ class QueryAPI:
         self.cache.put(cache_key, spell_usages)
         return spell_usages
 
+    @shared_query("encounters")
     def get_encounters(
         self,
         limit: int = 10,
@@ -885,6 +1078,7 @@ class QueryAPI:
             self.cache.put(cache_key, encounters)
             return encounters
 
+    @shared_query("count")
     def get_encounters_count(
         self,
         filters: Optional[Dict[str, Any]] = None,
@@ -1007,6 +1201,7 @@ class QueryAPI:
             "total_deaths": total_deaths,
         }
 
+    @shared_query("characters")
     def get_characters(
         self,
         limit: int = 20,
@@ -1081,6 +1276,7 @@ class QueryAPI:
 
         return characters
 
+    @shared_query("char_count")
     def get_characters_count(
         self,
         filters: Optional[Dict[str, Any]] = None,
@@ -1135,6 +1331,7 @@ class QueryAPI:
         self.cache.put(cache_key, filtered_count)
         return filtered_count
 
+    @shared_query("guild")
     def get_guild(self, guild_id: int) -> Optional[Dict[str, Any]]:
         """
         Get guild by ID using existing schema adapter.
@@ -1166,6 +1363,7 @@ class QueryAPI:
 
         return guild
 
+    @shared_query("guilds")
     def get_guilds(
         self,
         limit: int = 20,
@@ -1239,7 +1437,7 @@ class QueryAPI:
         self.db.commit()
 
         # Clear guild-related caches
-        self.cache.clear()
+        self.clear_cache()
 
         return cursor.lastrowid
 
@@ -1302,7 +1500,7 @@ class QueryAPI:
         self.db.commit()
 
         # Clear guild-related caches
-        self.cache.clear()
+        self.clear_cache()
 
         return True
 
@@ -1363,7 +1561,7 @@ class QueryAPI:
         self.db.commit()
 
         # Clear guild-related caches
-        self.cache.clear()
+        self.clear_cache()
 
         return True
 
@@ -1388,10 +1586,11 @@ class QueryAPI:
         self.db.commit()
 
         # Clear guild-related caches
-        self.cache.clear()
+        self.clear_cache()
 
         return True
 
+    @shared_query("guild_encounters")
     def get_guild_encounters(
         self,
         guild_id: int,
@@ -2149,8 +2348,9 @@ class QueryAPI:
                 "total_characters": row[1] or 0,
                 "total_character_metrics": row[2] or 0,
             },
-            "query_api": self.stats,
+            "query_api": self.get_query_stats(),
             "cache": self.cache.stats(),
+            "shared_cache": self.shared_cache.stats() if self.shared_cache else None,
         }
 
         # Add InfluxDB stats if available
@@ -2166,9 +2366,26 @@ class QueryAPI:
 
         return stats
 
+    def get_query_stats(self) -> Dict[str, Any]:
+        """
+        Get query statistics, including the cache's own counters.
+
+        Returns:
+            Copy of self.stats with cache evictions, expirations and bytes used
+        """
+        cache_stats = self.cache.stats()
+        return {
+            **self.stats,
+            "cache_evictions": cache_stats["evictions"],
+            "cache_expirations": cache_stats["expirations"],
+            "cache_bytes": cache_stats["bytes"],
+        }
+
     def clear_cache(self):
-        """Clear all cached query results."""
+        """Clear all cached query results, including those shared with other workers."""
         self.cache.clear()
+        if self.shared_cache is not None:
+            self.shared_cache.invalidate()
 
     # Time-series query methods for InfluxDB integration
 
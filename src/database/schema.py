@@ -206,6 +206,27 @@ class DatabaseManager:
             return result is not None and len(result) > 0
 
 
+def adapt_placeholders(db: Any, query: str) -> str:
+    """
+    Adapt a query written with %s placeholders to a database's backend.
+
+    PostgreSQL (and the hybrid manager) take %s placeholders; SQLite takes ?.
+
+    Args:
+        db: Database manager or SQLite connection the query runs on
+        query: SQL query using %s placeholders
+
+    Returns:
+        The query with placeholders the backend accepts
+    """
+    if isinstance(db, sqlite3.Connection) or "sqlite" in (
+        getattr(db, "backend_type", None),
+        getattr(db, "db_type", None),
+    ):
+        return query.replace("%s", "?")
+    return query
+
+
 def _migrate_character_schema(db: DatabaseManager) -> None:
     """
     Migrate characters table to use server/region columns instead of realm.
@@ -268,6 +289,26 @@ def _migrate_character_schema(db: DatabaseManager) -> None:
         logger.info("Character schema migration completed")
 
 
+def _migrate_event_block_index(db: DatabaseManager) -> None:
+    """
+    Add the block summary columns used to prune event blocks at query time.
+
+    Blocks written before the migration keep NULL summaries and are never pruned
+    on event type or spell.
+
+    Args:
+        db: Database manager instance
+    """
+    table_info = db.execute("PRAGMA table_info(event_blocks)")
+    columns = {row['name'] for row in table_info} if table_info else set()
+
+    if "event_type_mask" not in columns:
+        logger.info("Adding block summary columns to event_blocks")
+        db.execute("ALTER TABLE event_blocks ADD COLUMN event_type_mask INTEGER", fetch_results=False)
+    if "spell_bloom" not in columns:
+        db.execute("ALTER TABLE event_blocks ADD COLUMN spell_bloom BLOB", fetch_results=False)
+
+
 def _migrate_to_v2_guilds(db: DatabaseManager) -> None:
     """
     Migrate database to version 2 with guild support.
@@ -449,6 +490,20 @@ def create_tables(db: DatabaseManager) -> None:
     """
     )
 
+    # Fingerprints of stored encounters, so uploads skip encounters a guild already has
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS encounter_fingerprints (
+            guild_id INTEGER NOT NULL REFERENCES guilds(guild_id),
+            fingerprint VARCHAR(64) NOT NULL,
+            encounter_id INTEGER REFERENCES encounters(encounter_id),
+            log_file_id INTEGER REFERENCES log_files(file_id),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (guild_id, fingerprint)
+        )
+    """
+    )
+
     # Character metadata
     db.execute(
         """
@@ -483,10 +538,41 @@ def create_tables(db: DatabaseManager) -> None:
             uncompressed_size INTEGER NOT NULL,
             compressed_size INTEGER NOT NULL,
             compression_ratio REAL NOT NULL,
+            event_type_mask INTEGER,
+            spell_bloom BLOB,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """
     )
+    # Tables created before block summaries existed
+    _migrate_event_block_index(db)
+
+    # Trained zstd dictionaries, versioned per guild or encounter scope
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS compression_dictionaries (
+            dict_id INTEGER PRIMARY KEY,
+            scope TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            dictionary BLOB NOT NULL,
+            sample_count INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(scope, version)
+        )
+    """
+    )
+
+    # String tables shared by the event blocks of an encounter
+    db.execute(
+        """
+        CREATE TABLE IF NOT EXISTS encounter_string_tables (
+            encounter_id INTEGER PRIMARY KEY REFERENCES encounters(encounter_id),
+            string_count INTEGER NOT NULL,
+            strings BLOB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+    )
 
     # Pre-computed character metrics (for fast dashboard queries)
     db.execute(
@@ -739,6 +825,9 @@ def create_tables(db: DatabaseManager) -> None:
         "CREATE INDEX IF NOT EXISTS idx_block_lookup ON event_blocks(encounter_id, character_id, block_index)"
     )
     db.execute("CREATE INDEX IF NOT EXISTS idx_block_time ON event_blocks(start_time, end_time)")
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_block_range ON event_blocks(encounter_id, character_id, start_time, end_time)"
+    )
     db.execute("CREATE INDEX IF NOT EXISTS idx_block_character ON event_blocks(character_id)")
     db.execute("CREATE INDEX IF NOT EXISTS idx_block_encounter ON event_blocks(encounter_id)")
 
@@ -9,12 +9,13 @@ import hashlib
 import logging
 import json
 import time
-from typing import List, Dict, Any, Optional, Set, Union
+from contextlib import nullcontext
+from typing import ContextManager, Iterable, List, Dict, Any, Optional, Set, Union
 from pathlib import Path
 from datetime import datetime
 from dataclasses import asdict
 
-from .schema import DatabaseManager
+from .schema import DatabaseManager, adapt_placeholders
 from .influxdb_direct_manager import InfluxDBDirectManager
 from src.models.character_events import CharacterEventStream
 from src.models.encounter_models import RaidEncounter, MythicPlusRun
@@ -23,6 +24,20 @@ from src.models.unified_encounter import UnifiedEncounter
 logger = logging.getLogger(__name__)
 
 
+def calculate_file_hash(file_path: Union[str, Path]) -> str:
+    """
+    Calculate the SHA-256 of a whole log file for duplicate detection.
+
+    This is the hash stored in log_files.file_hash for logs stored from the
+    command line and for uploads, whose clients send the same digest.
+    """
+    hash_sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hash_sha256.update(chunk)
+    return hash_sha256.hexdigest()
+
+
 def safe_param(value):
     """
     Convert parameter to SQLite-safe type.
@@ -59,7 +74,7 @@ class EventStorage:
     Features:
     - Direct event streaming to InfluxDB for time-series queries
     - Metadata storage in PostgreSQL for relational data
-    - Duplicate detection via file hashing
+    - Duplicate detection via file hashing and per-guild encounter fingerprints
     - Character/encounter metadata caching
     - Time-window based encounter definitions
     """
@@ -122,7 +137,7 @@ class EventStorage:
 
         try:
             # Check if file already processed
-            file_hash = self._calculate_file_hash(log_file_path)
+            file_hash = calculate_file_hash(log_file_path)
             if file_hash in self.file_cache:
                 logger.info(f"File {log_file_path} already processed skipping")
                 return {"status": "skipped", "reason": "already_processed"}
@@ -195,40 +210,104 @@ class EventStorage:
             encounters: List of unified encounters to store
             log_file_path: Path to source log file
 
+        Returns:
+            Dictionary with storage statistics
+        """
+        return self.store_unified_encounter_stream(encounters, log_file_path, guild_id)
+
+    def store_unified_encounter_stream(
+        self,
+        encounters: Iterable[UnifiedEncounter],
+        log_file_path: str,
+        guild_id: Optional[int] = None,
+        file_hash: Optional[str] = None,
+        lock: Optional[ContextManager] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store unified encounters in database as they arrive.
+
+        Each encounter is written and committed as soon as the iterable yields
+        it and no reference to it is kept, so encounters can be stored while
+        the rest of the log is still being parsed. No transaction is open
+        while waiting for the next encounter.
+
+        The log file is registered under a provisional hash and only claims
+        file_hash once every encounter is stored. If storing fails part way,
+        or the encounters raise (e.g. an upload that does not match its
+        declared hash), everything already stored from the log is deleted
+        again, so the log can be stored anew.
+
+        Args:
+            encounters: Unified encounters to store, e.g. from a pipeline
+            log_file_path: Path to source log file
+            file_hash: SHA-256 of the whole log, for a file that is still
+                growing (e.g. being uploaded); computed from the file if None
+            lock: Held around each write, for a database connection shared
+                with other threads
+
         Returns:
             Dictionary with storage statistics
         """
         start_time = time.time()
+        lock = lock or nullcontext()
 
         try:
             # Check if file already processed
-            file_hash = self._calculate_file_hash(log_file_path)
+            if file_hash is None:
+                file_hash = calculate_file_hash(log_file_path)
             if file_hash in self.file_cache:
                 logger.info(f"File {log_file_path} already processed skipping")
                 return {"status": "skipped", "reason": "already_processed"}
 
-            # Begin transaction
             total_events = 0
-            total_encounters = len(encounters)
-
-            logger.info(f"Storing {total_encounters} unified encounters from {log_file_path}")
-
-            # Register log file
-            log_file_id = self._register_log_file(log_file_path, file_hash, total_encounters, guild_id)
+            total_encounters = 0
+            character_guids: Set[str] = set()
 
-            # Store encounters
-            for encounter in encounters:
-                encounter_id = self._store_unified_encounter(encounter, log_file_id, guild_id or 1)
-                total_events += self._store_unified_character_streams(encounter_id, encounter, guild_id or 1)
+            logger.info(f"Storing unified encounters from {log_file_path}")
 
-            # Update log file with final counts
-            self.db.execute(
-                "UPDATE log_files SET event_count = %s, encounter_count = %s WHERE file_id = %s",
-                (total_events, total_encounters, log_file_id)
-            )
+            # Register log file (hash and counts are filled in once all encounters are stored)
+            partial_hash = f"partial:{log_file_path}"
+            with lock:
+                log_file_id = self._commit_or_rollback(
+                    lambda: self._register_partial_log_file(log_file_path, partial_hash, guild_id)
+                )
 
-            # Commit transaction
-            self.db.commit()
+            try:
+                # Store encounters, one transaction each
+                for encounter in encounters:
+                    with lock:
+                        total_events += self._commit_or_rollback(
+                            lambda: self._store_unified_encounter_with_streams(
+                                encounter, log_file_id, guild_id or 1
+                            )
+                        )
+                    total_encounters += 1
+                    character_guids.update(char.character_guid for char in encounter.characters.values())
+
+                # Update log file with its hash and final counts (and size, the file may have grown)
+                with lock:
+                    self._commit_or_rollback(
+                        lambda: self.db.execute(
+                            adapt_placeholders(
+                                self.db,
+                                "UPDATE log_files SET file_hash = %s, event_count = %s, "
+                                "encounter_count = %s, file_size = %s WHERE file_id = %s",
+                            ),
+                            (
+                                file_hash,
+                                total_events,
+                                total_encounters,
+                                Path(log_file_path).stat().st_size,
+                                log_file_id,
+                            )
+                        )
+                    )
+                    self.file_cache.discard(partial_hash)
+                    self.file_cache.add(file_hash)
+            except Exception:
+                with lock:
+                    self._discard_log_file(log_file_id, partial_hash)
+                raise
 
             # Update statistics
             storage_time = time.time() - start_time
@@ -247,20 +326,117 @@ class EventStorage:
                 "events_stored": total_events,
                 "storage_time": storage_time,
                 "file_hash": file_hash,
-                "characters_stored": len(
-                    set(
-                        char.character_guid
-                        for enc in encounters
-                        for char in enc.characters.values()
-                    )
-                ),
+                "characters_stored": len(character_guids),
             }
 
         except Exception as e:
+            # Failed writes were rolled back, and stored encounters deleted, while holding the lock
             logger.error(f"Error storing unified encounters: {e}")
+            raise
+
+    def _commit_or_rollback(self, write):
+        """Run one write in its own transaction and return its result."""
+        try:
+            result = write()
+            self.db.commit()
+            return result
+        except Exception:
             self.db.rollback()
             raise
 
+    def _store_unified_encounter_with_streams(
+        self, encounter: UnifiedEncounter, log_file_id: int, guild_id: int
+    ) -> int:
+        """Store one unified encounter, its fingerprint and character streams; return event count."""
+        encounter_id = self._store_unified_encounter(encounter, log_file_id, guild_id)
+        if encounter.fingerprint:
+            self._store_encounter_fingerprint(
+                guild_id, encounter.fingerprint, encounter_id, log_file_id
+            )
+        return self._store_unified_character_streams(encounter_id, encounter, guild_id)
+
+    def _register_partial_log_file(
+        self, log_file_path: str, partial_hash: str, guild_id: Optional[int] = None
+    ) -> int:
+        """
+        Register a log file whose encounters are about to be stored; return file_id.
+
+        A row left by an earlier store of the same file that never finished
+        (e.g. of a chunked upload resumed after a server restart) is reused,
+        once what that store wrote is deleted.
+        """
+        rows = self.db.execute(
+            adapt_placeholders(self.db, "SELECT file_id FROM log_files WHERE file_hash = %s"),
+            (partial_hash,)
+        )
+        if rows:
+            log_file_id = rows[0]["file_id"]
+            logger.info(f"Replacing partially stored log file {log_file_path}")
+            self._delete_log_file_encounters(log_file_id)
+            return log_file_id
+
+        return self._register_log_file(log_file_path, partial_hash, 0, guild_id)
+
+    def _discard_log_file(self, log_file_id: int, partial_hash: str):
+        """Delete a log file that was not stored completely, with everything stored from it."""
+        try:
+            self._commit_or_rollback(
+                lambda: self._delete_log_file_encounters(log_file_id, delete_log_file=True)
+            )
+        except Exception as e:
+            logger.error(f"Failed to delete partially stored log file {log_file_id}: {e}")
+        self.file_cache.discard(partial_hash)
+
+    def _delete_log_file_encounters(self, log_file_id: int, delete_log_file: bool = False):
+        """
+        Delete the encounters stored from a log file, with their metrics and fingerprints.
+
+        Characters only seen in those encounters are deleted too. Events already
+        streamed to InfluxDB are left in place.
+
+        Args:
+            log_file_id: Log file whose encounters to delete
+            delete_log_file: Also delete the log file row
+        """
+        encounter_ids = "SELECT encounter_id FROM combat_encounters WHERE log_file_id = %s"
+        rows = self.db.execute(
+            adapt_placeholders(
+                self.db,
+                f"SELECT DISTINCT character_id FROM character_metrics WHERE encounter_id IN ({encounter_ids})",
+            ),
+            (log_file_id,)
+        )
+        character_ids = [row["character_id"] for row in rows or []]
+
+        for query in (
+            "DELETE FROM encounter_fingerprints WHERE log_file_id = %s",
+            f"DELETE FROM character_metrics WHERE encounter_id IN ({encounter_ids})",
+            f"DELETE FROM mythic_plus_runs WHERE encounter_id IN ({encounter_ids})",
+            "DELETE FROM combat_encounters WHERE log_file_id = %s",
+        ):
+            self.db.execute(adapt_placeholders(self.db, query), (log_file_id,), fetch_results=False)
+
+        for character_id in character_ids:
+            self.db.execute(
+                adapt_placeholders(
+                    self.db,
+                    "DELETE FROM characters WHERE character_id = %s AND NOT EXISTS "
+                    "(SELECT 1 FROM character_metrics WHERE character_id = %s)",
+                ),
+                (character_id, character_id),
+                fetch_results=False
+            )
+
+        if delete_log_file:
+            self.db.execute(
+                adapt_placeholders(self.db, "DELETE FROM log_files WHERE file_id = %s"),
+                (log_file_id,),
+                fetch_results=False
+            )
+
+        # The cache may hold characters that were deleted, or whose insert was rolled back
+        self.character_cache.clear()
+
     def _store_encounter(
         self,
         encounter: Union[RaidEncounter, MythicPlusRun],
@@ -968,38 +1144,75 @@ class EventStorage:
         """Register log file and return file_id."""
         file_size = Path(file_path).stat().st_size
 
-        cursor = self.db.execute(
-            """
+        query = """
             INSERT INTO log_files (file_path, file_hash, file_size, encounter_count, guild_id)
             VALUES (%s, %s, %s, %s, %s)
-        """,
+        """
+        self.db.execute(
+            adapt_placeholders(self.db, query),
             (
                 safe_param(file_path),
                 safe_param(file_hash),
                 safe_param(file_size),
                 safe_param(encounter_count),
                 safe_param(guild_id),
-            )
+            ),
+            fetch_results=False
         )
 
-        file_id = cursor.lastrowid
+        rows = self.db.execute(
+            adapt_placeholders(self.db, "SELECT file_id FROM log_files WHERE file_hash = %s"),
+            (safe_param(file_hash),)
+        )
+        file_id = rows[0]["file_id"]
         self.file_cache.add(file_hash)
         return file_id
 
-    def _calculate_file_hash(self, file_path: str) -> str:
-        """Calculate MD5 hash of file for duplicate detection."""
-        hash_md5 = hashlib.md5()
+    def get_known_fingerprints(self, guild_id: int, fingerprints: Iterable[str]) -> Set[str]:
+        """
+        Find which encounter fingerprints a guild already has stored.
+
+        Args:
+            guild_id: Guild whose encounters to check
+            fingerprints: Fingerprints from an EncounterIndex
+
+        Returns:
+            The given fingerprints that are already stored
+        """
+        fingerprints = list(dict.fromkeys(fingerprints))
+        known: Set[str] = set()
         try:
-            with open(file_path, "rb") as f:
-                # Hash first 1MB for speed
-                chunk = f.read(1024 * 1024)
-                hash_md5.update(chunk)
-        except IOError:
-            # If can't read file use path + mtime
-            stat = Path(file_path).stat()
-            hash_md5.update(f"{file_path}:{stat.st_mtime}:{stat.st_size}".encode())
-
-        return hash_md5.hexdigest()
+            # Bounded batches keep the IN list below database parameter limits
+            for i in range(0, len(fingerprints), 500):
+                batch = fingerprints[i : i + 500]
+                query = f"""
+                    SELECT fingerprint FROM encounter_fingerprints
+                    WHERE guild_id = %s AND fingerprint IN ({", ".join(["%s"] * len(batch))})
+                """
+                rows = self.db.execute(adapt_placeholders(self.db, query), (guild_id, *batch))
+                known.update(row["fingerprint"] for row in rows or [])
+        except Exception as e:
+            logger.warning(f"Could not look up encounter fingerprints: {e}")
+        return known
+
+    def _store_encounter_fingerprint(
+        self, guild_id: int, fingerprint: str, encounter_id: int, log_file_id: int
+    ):
+        """Record the fingerprint of a stored encounter."""
+        query = """
+            INSERT INTO encounter_fingerprints (guild_id, fingerprint, encounter_id, log_file_id)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (guild_id, fingerprint) DO NOTHING
+        """
+        self.db.execute(
+            adapt_placeholders(self.db, query),
+            (
+                safe_param(guild_id),
+                safe_param(fingerprint),
+                safe_param(encounter_id),
+                safe_param(log_file_id),
+            )
+        )
 
     def _load_caches(self):
         """Load character and file caches from database."""
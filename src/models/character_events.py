@@ -171,7 +171,7 @@ class CharacterEventStream:
         """
         # Create timestamped wrapper
         ts_event = TimestampedEvent(
-            timestamp=event.timestamp.timestamp(),
+            timestamp=event.get_epoch(),
             datetime=event.timestamp,
             event=event,
             category=category,
@@ -282,6 +282,74 @@ class CharacterEventStream:
         self.deaths.append(death_event)
         self.death_count += 1
 
+    def merge(self, other: "CharacterEventStream"):
+        """
+        Append the stream of the same character from the next part of a log.
+
+        Used when an encounter was parsed in pieces; other must contain only
+        events that come after this stream's events.
+
+        Args:
+            other: Stream built from the following events
+        """
+        for name in (
+            "all_events",
+            "damage_done",
+            "healing_done",
+            "damage_taken",
+            "healing_received",
+            "buffs_gained",
+            "buffs_lost",
+            "buffs_refreshed",
+            "debuffs_gained",
+            "debuffs_lost",
+            "debuffs_refreshed",
+            "casts_started",
+            "casts_succeeded",
+            "casts_failed",
+            "interrupts_done",
+            "interrupts_received",
+            "dispels_done",
+            "deaths",
+            "resource_changes",
+            "absorption_provided",
+            "absorption_received",
+        ):
+            getattr(self, name).extend(getattr(other, name))
+
+        for name in (
+            "total_damage_done",
+            "total_healing_done",
+            "total_damage_taken",
+            "total_healing_received",
+            "total_overhealing",
+            "death_count",
+            "total_overkill_done",
+            "total_overkill_taken",
+            "total_damage_absorbed_by_shields",
+            "total_damage_absorbed_for_me",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+        # Talent data is set again by each COMBATANT_INFO, so the latest wins
+        self.class_name = other.class_name or self.class_name
+        self.spec_name = other.spec_name or self.spec_name
+        self.item_level = other.item_level or self.item_level
+
+        # Replay aura changes, since other could not remove auras applied before it
+        for ts_event in other.all_events:
+            spell_id = ts_event.event.spell_id if isinstance(ts_event.event, AuraEvent) else None
+            if not spell_id:
+                continue
+            if ts_event.category == "buff_gained":
+                self.active_buffs[spell_id] = ts_event.event
+            elif ts_event.category == "buff_lost":
+                self.active_buffs.pop(spell_id, None)
+            elif ts_event.category == "debuff_gained":
+                self.active_debuffs[spell_id] = ts_event.event
+            elif ts_event.category == "debuff_lost":
+                self.active_debuffs.pop(spell_id, None)
+
     def get_events_in_range(self, start: float, end: float) -> List[TimestampedEvent]:
         """
         Get all events within a time range.
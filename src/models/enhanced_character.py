@@ -231,6 +231,47 @@ class EnhancedCharacter(CharacterEventStream):
             self.spec_name = get_spec_name(combatant_info.spec_id)
             self.class_name = get_class_name(combatant_info.spec_id)
 
+    def merge(self, other: "EnhancedCharacter"):
+        """
+        Append the same character from the next part of a log.
+
+        Deaths in other only saw the recent events after the split, so their
+        recent damage and healing are completed with this character's events.
+
+        Args:
+            other: Character built from the following events
+        """
+        for death in other.enhanced_deaths:
+            recent_damage = list(self.recent_damage_taken) + death.recent_damage_taken
+            recent_healing = list(self.recent_healing_received) + death.recent_healing_received
+            death.recent_damage_taken = recent_damage[-self.recent_damage_taken.maxlen :]
+            death.recent_healing_received = recent_healing[-self.recent_healing_received.maxlen :]
+            death.damage_sources = {}
+            death.healing_sources = {}
+            death.analyze_death_contributors()
+
+        super().merge(other)
+
+        self.talent_data = other.talent_data or self.talent_data
+        self.recent_damage_taken.extend(other.recent_damage_taken)
+        self.recent_healing_received.extend(other.recent_healing_received)
+        self.enhanced_deaths.extend(other.enhanced_deaths)
+
+        for name in ("ability_damage", "ability_healing", "ability_damage_taken"):
+            abilities = getattr(self, name)
+            for spell_id, ability in getattr(other, name).items():
+                if spell_id not in abilities:
+                    abilities[spell_id] = ability
+                    continue
+                merged = abilities[spell_id]
+                merged.total_damage += ability.total_damage
+                merged.total_healing += ability.total_healing
+                merged.total_absorbed += ability.total_absorbed
+                merged.cast_count += ability.cast_count
+                merged.hit_count += ability.hit_count
+                merged.crit_count += ability.crit_count
+                merged.miss_count += ability.miss_count
+
     def calculate_ability_metrics(self, encounter_duration: float):
         """Calculate ability percentages and DPS/HPS."""
         # Calculate damage ability metrics
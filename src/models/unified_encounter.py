@@ -217,6 +217,9 @@ class UnifiedEncounter:
     # Pull tracking (for raids)
     pull_number: int = 1
 
+    # Content fingerprint from the EncounterIndex, for duplicate detection
+    fingerprint: Optional[str] = None
+
     # Participants - using EnhancedCharacter for comprehensive tracking
     characters: Dict[str, EnhancedCharacter] = field(default_factory=dict)
 
@@ -263,7 +263,7 @@ class EventCategorizer:
             # Create and add death event
             if dest_guid in self.character_streams:
                 death = DeathEvent(
-                    timestamp=event.timestamp.timestamp(),
+                    timestamp=event.get_epoch(),
                     datetime=event.timestamp,
                     killing_blow=event,
                 )
@@ -283,7 +283,7 @@ class EventCategorizer:
             if dest_guid in self.character_streams:
                 char_stream = self.character_streams[dest_guid]
                 if char_stream.deaths:
-                    char_stream.deaths[-1].resurrect_time = event.timestamp.timestamp()
+                    char_stream.deaths[-1].resurrect_time = event.get_epoch()
 
         return categories
 
@@ -0,0 +1,365 @@
+"""
+Columnar event batches for vectorized processing of combat logs.
+
+Instead of one Python object per event, an EventBatch stores each field as a
+NumPy array so totals, DPS/HPS and per-spell breakdowns can be computed with
+vectorized reductions.
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+# Optional imports - handle missing dependencies gracefully
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+from .events import AuraEvent, DamageEvent, EventFactory, HealEvent
+
+
+# Event kinds stored per event type code
+KIND_OTHER = 0
+KIND_DAMAGE = 1
+KIND_HEAL = 2
+KIND_AURA = 3
+KIND_ABSORB = 4
+KIND_META = 5  # encounter, challenge mode and combatant info lines
+
+# Advanced Combat Logging inserts 19 unit info fields before damage/heal params
+ADVANCED_PARAM_OFFSET = 19
+
+
+@dataclass
+class EventBatch:
+    """
+    A batch of events stored as parallel NumPy columns.
+
+    Row i of every column describes the same event. GUIDs and event types are
+    stored as integer codes into the shared guids/event_types tables, which are
+    the same objects for all batches produced by one builder, so codes can be
+    compared across batches.
+
+    Column meanings follow the event classes: amount/overkill/absorbed come from
+    DamageEvent, amount/overhealing/absorbed from HealEvent. For SPELL_ABSORBED
+    rows the source is the shield owner, the dest is the protected target,
+    spell_id is the shield spell and amount is the absorbed amount.
+    """
+
+    timestamp: "np.ndarray"  # float64 epoch seconds
+    event_type: "np.ndarray"  # uint16 code into event_types
+    source_id: "np.ndarray"  # int32 index into guids, -1 if none
+    dest_id: "np.ndarray"  # int32 index into guids, -1 if none
+    spell_id: "np.ndarray"  # int32, 0 if none
+    amount: "np.ndarray"  # int64
+    overkill: "np.ndarray"  # int64
+    overhealing: "np.ndarray"  # int64
+    absorbed: "np.ndarray"  # int64
+    critical: "np.ndarray"  # bool
+    source_flags: "np.ndarray"  # int64
+    dest_flags: "np.ndarray"  # int64
+
+    # Shared lookup tables
+    event_types: List[str] = field(default_factory=list)
+    event_kinds: List[int] = field(default_factory=list)  # per event type code
+    guids: List[str] = field(default_factory=list)
+    names: Dict[int, str] = field(default_factory=dict)  # guid id -> name
+    spell_names: Dict[int, str] = field(default_factory=dict)  # spell id -> name
+
+    COLUMNS = (
+        "timestamp",
+        "event_type",
+        "source_id",
+        "dest_id",
+        "spell_id",
+        "amount",
+        "overkill",
+        "overhealing",
+        "absorbed",
+        "critical",
+        "source_flags",
+        "dest_flags",
+    )
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def guid_id(self, guid: str) -> int:
+        """Get the integer id of a GUID, or -1 if it does not occur."""
+        try:
+            return self.guids.index(guid)
+        except ValueError:
+            return -1
+
+    def event_type_mask(self, *event_types: str) -> "np.ndarray":
+        """
+        Get a boolean mask of rows with any of the given event types.
+
+        Args:
+            event_types: Event type names, e.g. "SPELL_DAMAGE"
+
+        Returns:
+            Boolean array with one entry per row
+        """
+        codes = [self.event_types.index(t) for t in event_types if t in self.event_types]
+        return np.isin(self.event_type, codes)
+
+    def kind_mask(self, kind: int) -> "np.ndarray":
+        """
+        Get a boolean mask of rows of one event kind (KIND_DAMAGE, KIND_HEAL, ...).
+
+        Args:
+            kind: Event kind constant
+
+        Returns:
+            Boolean array with one entry per row
+        """
+        kinds = np.asarray(self.event_kinds, dtype=np.uint8)
+        if not len(kinds):
+            return np.zeros(len(self), dtype=bool)
+        return kinds[self.event_type] == kind
+
+    def select(self, mask: "np.ndarray") -> "EventBatch":
+        """
+        Get a new batch with only the rows selected by a mask or index array.
+
+        Args:
+            mask: Boolean mask or integer index array
+
+        Returns:
+            EventBatch sharing this batch's lookup tables
+        """
+        columns = {name: getattr(self, name)[mask] for name in self.COLUMNS}
+        return self._with_columns(columns)
+
+    @classmethod
+    def concatenate(cls, batches: Iterable["EventBatch"]) -> "EventBatch":
+        """
+        Concatenate batches produced by the same builder.
+
+        Args:
+            batches: Batches sharing lookup tables
+
+        Returns:
+            Single EventBatch with all rows
+        """
+        batches = list(batches)
+        if not batches:
+            return EventBatchBuilder().build()
+        if len(batches) == 1:
+            return batches[0]
+
+        columns = {
+            name: np.concatenate([getattr(batch, name) for batch in batches])
+            for name in cls.COLUMNS
+        }
+        return batches[-1]._with_columns(columns)
+
+    def _with_columns(self, columns: Dict[str, "np.ndarray"]) -> "EventBatch":
+        """Create a batch with new columns and this batch's lookup tables."""
+        return EventBatch(
+            event_types=self.event_types,
+            event_kinds=self.event_kinds,
+            guids=self.guids,
+            names=self.names,
+            spell_names=self.spell_names,
+            **columns,
+        )
+
+
+class EventBatchBuilder:
+    """
+    Accumulates tokenized lines into columnar EventBatch objects.
+
+    Fields are decoded straight from ParsedLine parameters with the same rules
+    as EventFactory, without creating event objects.
+    """
+
+    def __init__(self):
+        """Initialize an empty builder with fresh lookup tables."""
+        if not HAS_NUMPY:
+            raise ImportError("numpy is required for columnar event batches")
+
+        self.event_types: List[str] = []
+        self.event_kinds: List[int] = []
+        self.guids: List[str] = []
+        self.names: Dict[int, str] = {}
+        self.spell_names: Dict[int, str] = {}
+
+        self._event_type_codes: Dict[str, int] = {}
+        self._guid_ids: Dict[Optional[str], int] = {None: -1}
+        self.rows_built = 0
+        self._reset_columns()
+
+    def _reset_columns(self):
+        """Start new column buffers."""
+        self._timestamp = array("d")
+        self._event_type = array("H")
+        self._source_id = array("i")
+        self._dest_id = array("i")
+        self._spell_id = array("i")
+        self._amount = array("q")
+        self._overkill = array("q")
+        self._overhealing = array("q")
+        self._absorbed = array("q")
+        self._critical = array("b")
+        self._source_flags = array("q")
+        self._dest_flags = array("q")
+
+    def __len__(self) -> int:
+        """Number of rows buffered since the last build()."""
+        return len(self._timestamp)
+
+    def _get_event_type_code(self, event_type: str) -> int:
+        """Get (or assign) the code and kind for an event type."""
+        code = len(self.event_types)
+        self._event_type_codes[event_type] = code
+        self.event_types.append(event_type)
+
+        if event_type == "SPELL_ABSORBED":
+            kind = KIND_ABSORB
+        elif event_type in ("ENCOUNTER_START", "ENCOUNTER_END", "COMBATANT_INFO") or (
+            event_type.startswith("CHALLENGE_MODE_")
+        ):
+            kind = KIND_META
+        else:
+            event_class = EventFactory._get_combat_event_class(event_type)
+            if event_class is DamageEvent:
+                kind = KIND_DAMAGE
+            elif event_class is HealEvent:
+                kind = KIND_HEAL
+            elif event_class is AuraEvent:
+                kind = KIND_AURA
+            else:
+                kind = KIND_OTHER
+        self.event_kinds.append(kind)
+        return code
+
+    def _get_guid_id(self, guid: Any, name: Any) -> int:
+        """Get (or assign) the id for a GUID, remembering the first name seen."""
+        guid_id = self._guid_ids.get(guid)
+        if guid_id is None:
+            if not isinstance(guid, str):
+                return -1
+            guid_id = len(self.guids)
+            self._guid_ids[guid] = guid_id
+            self.guids.append(guid)
+            if isinstance(name, str):
+                self.names[guid_id] = name
+        return guid_id
+
+    def add(self, parsed_line) -> None:
+        """
+        Add one tokenized line as a row.
+
+        Args:
+            parsed_line: ParsedLine object from tokenizer
+        """
+        safe_int = EventFactory._safe_int
+        event_type = parsed_line.event_type
+        code = self._event_type_codes.get(event_type)
+        if code is None:
+            code = self._get_event_type_code(event_type)
+        kind = self.event_kinds[code]
+
+        base_params = parsed_line.base_params
+        source_id = dest_id = -1
+        source_flags = dest_flags = 0
+        if kind != KIND_META and len(base_params) >= 8:
+            source_id = self._get_guid_id(base_params[0], base_params[1])
+            dest_id = self._get_guid_id(base_params[4], base_params[5])
+            source_flags = safe_int(base_params[2])
+            dest_flags = safe_int(base_params[6])
+
+        spell_id = 0
+        if kind != KIND_ABSORB and event_type.startswith("SPELL_"):
+            prefix_params = parsed_line.prefix_params
+            if prefix_params and len(prefix_params) >= 3:
+                spell_id = safe_int(prefix_params[0])
+                if spell_id not in self.spell_names and isinstance(prefix_params[1], str):
+                    self.spell_names[spell_id] = prefix_params[1]
+
+        amount = overkill = overhealing = absorbed = 0
+        critical = False
+        params = parsed_line.suffix_params
+
+        if kind == KIND_DAMAGE:
+            offset = ADVANCED_PARAM_OFFSET if len(params) >= 25 else 0
+            if len(params) >= offset + 6:
+                amount = safe_int(params[offset])
+                overkill = safe_int(params[offset + 1])
+                absorbed = safe_int(params[offset + 5])
+                if len(params) >= offset + 9:
+                    critical = bool(params[offset + 6])
+        elif kind == KIND_HEAL:
+            offset = ADVANCED_PARAM_OFFSET if len(params) >= 25 else 0
+            if len(params) >= offset + 4:
+                amount = safe_int(params[offset])
+                overhealing = safe_int(params[offset + 1])
+                absorbed = safe_int(params[offset + 2])
+                critical = bool(params[offset + 3])
+            elif len(params) >= offset + 2:
+                amount = safe_int(params[offset])
+                overhealing = safe_int(params[offset + 1])
+        elif kind == KIND_ABSORB:
+            # Attribute the row to the shield owner protecting the target
+            # The tokenizer reads the absorber unit as the spell prefix
+            absorber = base_params[8:10] if len(base_params) >= 12 else parsed_line.prefix_params
+            source_id = -1
+            if absorber and len(absorber) >= 2:
+                source_id = self._get_guid_id(absorber[0], absorber[1])
+            if len(params) >= 5:
+                spell_id = safe_int(params[1])
+                amount = safe_int(params[4])
+                if spell_id not in self.spell_names and isinstance(params[2], str):
+                    self.spell_names[spell_id] = params[2]
+
+        epoch = parsed_line.epoch
+        self._timestamp.append(
+            epoch if epoch is not None else parsed_line.timestamp.timestamp()
+        )
+        self._event_type.append(code)
+        self._source_id.append(source_id)
+        self._dest_id.append(dest_id)
+        self._spell_id.append(spell_id)
+        self._amount.append(amount)
+        self._overkill.append(overkill)
+        self._overhealing.append(overhealing)
+        self._absorbed.append(absorbed)
+        self._critical.append(critical)
+        self._source_flags.append(source_flags)
+        self._dest_flags.append(dest_flags)
+
+    def build(self) -> EventBatch:
+        """
+        Turn the buffered rows into an EventBatch and start a new buffer.
+
+        Returns:
+            EventBatch with all rows added since the last build()
+        """
+        batch = EventBatch(
+            timestamp=np.frombuffer(self._timestamp, dtype=np.float64),
+            event_type=np.frombuffer(self._event_type, dtype=np.uint16),
+            source_id=np.frombuffer(self._source_id, dtype=np.int32),
+            dest_id=np.frombuffer(self._dest_id, dtype=np.int32),
+            spell_id=np.frombuffer(self._spell_id, dtype=np.int32),
+            amount=np.frombuffer(self._amount, dtype=np.int64),
+            overkill=np.frombuffer(self._overkill, dtype=np.int64),
+            overhealing=np.frombuffer(self._overhealing, dtype=np.int64),
+            absorbed=np.frombuffer(self._absorbed, dtype=np.int64),
+            critical=np.frombuffer(self._critical, dtype=np.bool_),
+            source_flags=np.frombuffer(self._source_flags, dtype=np.int64),
+            dest_flags=np.frombuffer(self._dest_flags, dtype=np.int64),
+            event_types=self.event_types,
+            event_kinds=self.event_kinds,
+            guids=self.guids,
+            names=self.names,
+            spell_names=self.spell_names,
+        )
+        self.rows_built += len(batch)
+        self._reset_columns()
+        return batch
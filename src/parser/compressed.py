@@ -0,0 +1,437 @@
+"""
+Streaming access to compressed combat logs.
+
+Logs may be gzip, zstd or zip compressed. open_log() returns a binary stream
+of the decompressed log that is inflated as it is read, so a compressed log
+never has to be written out uncompressed first.
+
+Seekable zstd logs (the zstd seekable format: independent frames followed by
+a seek table in a skippable frame) can also be read from any offset by
+decompressing only the frames covering it, which is what byte-range parsing
+of a single encounter needs. map_log() gives plain and seekable zstd logs the
+same random access. write_seekable_zstd() produces such logs.
+
+A small compressed file can inflate to an enormous log, so open_log() can
+limit the number of decompressed bytes read.
+"""
+
+import bisect
+import gzip
+import io
+import logging
+import mmap
+import struct
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+# Optional imports - handle missing dependencies gracefully
+try:
+    import zstd
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+    zstd = None
+
+try:
+    import zstandard
+
+    HAS_ZSTANDARD = True
+except ImportError:
+    HAS_ZSTANDARD = False
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+ZIP_MAGIC = b"PK\x03\x04"
+
+# Seek table of the zstd seekable format, stored in a trailing skippable frame
+SKIPPABLE_FRAME_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+SEEK_TABLE_FOOTER = struct.Struct("<IBI")  # Number_Of_Frames, descriptor, magic
+SEEK_TABLE_CHECKSUM_FLAG = 0x80
+
+# File name suffixes accepted for compressed logs
+COMPRESSED_SUFFIXES = (".gz", ".zst", ".zip")
+
+# Members of a zip archive that look like combat logs
+LOG_SUFFIXES = (".txt", ".log")
+
+
+class CompressedLogError(ValueError):
+    """A compressed log cannot be read."""
+
+
+def detect_compression(raw: BinaryIO) -> Optional[str]:
+    """
+    Detect how an open log file is compressed.
+
+    Args:
+        raw: Binary file object positioned anywhere; its position is restored
+
+    Returns:
+        "gzip", "zstd-seekable", "zstd", "zip", or None for a plain log
+    """
+    position = raw.tell()
+    try:
+        raw.seek(0)
+        head = raw.read(4)
+        if head.startswith(GZIP_MAGIC):
+            return "gzip"
+        if head == ZIP_MAGIC:
+            return "zip"
+        if head == ZSTD_MAGIC:
+            raw.seek(0, io.SEEK_END)
+            if raw.tell() >= SEEK_TABLE_FOOTER.size:
+                raw.seek(-SEEK_TABLE_FOOTER.size, io.SEEK_END)
+                _, _, magic = SEEK_TABLE_FOOTER.unpack(raw.read(SEEK_TABLE_FOOTER.size))
+                if magic == SEEKABLE_MAGIC:
+                    return "zstd-seekable"
+            return "zstd"
+        return None
+    finally:
+        raw.seek(position)
+
+
+def is_compressed(log_path: Union[str, Path]) -> bool:
+    """Check whether a log file is compressed."""
+    with open(log_path, "rb") as raw:
+        return detect_compression(raw) is not None
+
+
+def _decompress_frame(data: bytes, size: int) -> bytes:
+    """Decompress one zstd frame of known decompressed size."""
+    if HAS_ZSTANDARD:
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+    if HAS_ZSTD:
+        return zstd.decompress(data)
+    raise CompressedLogError("zstd logs need the zstd or zstandard package")
+
+
+def _compress_frame(data: bytes, level: int) -> bytes:
+    """Compress data into one zstd frame."""
+    if HAS_ZSTANDARD:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if HAS_ZSTD:
+        return zstd.compress(data, level)
+    raise CompressedLogError("zstd logs need the zstd or zstandard package")
+
+
+class SeekableZstdReader(io.RawIOBase):
+    """
+    Reader for zstd seekable-format logs.
+
+    Only the frame holding the current position is kept decompressed, so
+    memory use is bounded by the frame size and seeking costs at most one
+    frame of decompression.
+    """
+
+    def __init__(self, raw: BinaryIO):
+        """
+        Initialize the reader.
+
+        Args:
+            raw: Seekable binary file object of the compressed log
+        """
+        super().__init__()
+        self.raw = raw
+        # (compressed offset, compressed size, decompressed offset, decompressed size)
+        self.frames: List[Tuple[int, int, int, int]] = self._read_seek_table()
+        self.frame_starts = [frame[2] for frame in self.frames]
+        self.size = self.frames[-1][2] + self.frames[-1][3] if self.frames else 0
+        self.frames_decompressed = 0
+
+        self._position = 0
+        self._frame_index = -1
+        self._frame_data = b""
+
+    def _read_seek_table(self) -> List[Tuple[int, int, int, int]]:
+        """Read the frame sizes from the seek table at the end of the file."""
+        self.raw.seek(-SEEK_TABLE_FOOTER.size, io.SEEK_END)
+        footer_start = self.raw.tell()
+        frame_count, descriptor, magic = SEEK_TABLE_FOOTER.unpack(
+            self.raw.read(SEEK_TABLE_FOOTER.size)
+        )
+        if magic != SEEKABLE_MAGIC:
+            raise CompressedLogError("Missing zstd seek table")
+
+        entry_size = 12 if descriptor & SEEK_TABLE_CHECKSUM_FLAG else 8
+        self.raw.seek(footer_start - frame_count * entry_size)
+        table = self.raw.read(frame_count * entry_size)
+
+        frames = []
+        compressed_offset = 0
+        decompressed_offset = 0
+        for i in range(frame_count):
+            compressed_size, decompressed_size = struct.unpack_from("<II", table, i * entry_size)
+            frames.append(
+                (compressed_offset, compressed_size, decompressed_offset, decompressed_size)
+            )
+            compressed_offset += compressed_size
+            decompressed_offset += decompressed_size
+        return frames
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(offset, 0)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self.size:
+            return 0
+
+        frame_start, frame_data = self.frame_at(self._position)
+        start = self._position - frame_start
+        data = frame_data[start : start + len(buffer)]
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def frame_at(self, position: int) -> Tuple[int, bytes]:
+        """
+        Get the decompressed frame holding a position.
+
+        Args:
+            position: Offset in the decompressed log, below size
+
+        Returns:
+            Tuple of (decompressed offset of the frame, frame data)
+        """
+        index = bisect.bisect_right(self.frame_starts, position) - 1
+        if index != self._frame_index:
+            compressed_offset, compressed_size, _, decompressed_size = self.frames[index]
+            self.raw.seek(compressed_offset)
+            self._frame_data = _decompress_frame(self.raw.read(compressed_size), decompressed_size)
+            self._frame_index = index
+            self.frames_decompressed += 1
+        return self.frames[index][2], self._frame_data
+
+
+class SeekableLogView:
+    """
+    find() and slicing of a seekable zstd log at decompressed offsets.
+
+    Stands in for the mmap of a plain log in byte-range parsing. Lines are
+    read frame by frame, so reading a range decompresses each frame covering
+    it once.
+    """
+
+    def __init__(self, reader: SeekableZstdReader):
+        """
+        Initialize the view.
+
+        Args:
+            reader: Reader of the seekable zstd log
+        """
+        self.reader = reader
+
+    def __len__(self) -> int:
+        return self.reader.size
+
+    def __getitem__(self, key: slice) -> bytes:
+        start, stop, _ = key.indices(self.reader.size)
+        parts = []
+        while start < stop:
+            frame_start, frame_data = self.reader.frame_at(start)
+            part = frame_data[start - frame_start : stop - frame_start]
+            parts.append(part)
+            start += len(part)
+        return b"".join(parts)
+
+    def find(self, sub: bytes, start: int = 0) -> int:
+        """Find sub at or after start, like mmap.find(); -1 if it is not found."""
+        # Keep the bytes that may start a match straddling two frames
+        carry = b""
+        carry_start = start = max(start, 0)
+        while start < self.reader.size:
+            frame_start, frame_data = self.reader.frame_at(start)
+            window = carry + frame_data[start - frame_start :]
+            index = window.find(sub)
+            if index != -1:
+                return carry_start + index
+            carry = window[len(window) - len(sub) + 1 :] if len(sub) > 1 else b""
+            start = frame_start + len(frame_data)
+            carry_start = start - len(carry)
+        return -1
+
+
+class SizeLimitedReader(io.RawIOBase):
+    """Reader that fails once more than max_size bytes were read from a stream."""
+
+    def __init__(self, stream: BinaryIO, max_size: int):
+        """
+        Initialize the reader.
+
+        Args:
+            stream: Binary file object to read from
+            max_size: Maximum number of bytes to read
+        """
+        super().__init__()
+        self.stream = stream
+        self.max_size = max_size
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.stream.read(len(buffer))
+        self.bytes_read += len(data)
+        if self.bytes_read > self.max_size:
+            raise CompressedLogError(f"Log decompresses to more than {self.max_size:,} bytes")
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.stream.close()
+        super().close()
+
+
+def _open_zip_member(raw: BinaryIO) -> BinaryIO:
+    """Open the combat log inside a zip archive."""
+    archive = zipfile.ZipFile(raw)
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    logs = [info for info in members if info.filename.lower().endswith(LOG_SUFFIXES)]
+    if not (logs or members):
+        raise CompressedLogError("Zip archive contains no files")
+    member = (logs or members)[0]
+    if len(logs or members) > 1:
+        logger.warning(f"Zip archive has several logs, reading {member.filename}")
+    return archive.open(member)
+
+
+def decompress_stream(raw: BinaryIO, compression: Optional[str]) -> BinaryIO:
+    """
+    Wrap an open log file in a stream of its decompressed bytes.
+
+    Args:
+        raw: Binary file object of the log
+        compression: Result of detect_compression()
+
+    Returns:
+        Binary file object reading decompressed data (raw itself for plain logs)
+    """
+    if compression is None:
+        return raw
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == "zip":
+        return _open_zip_member(raw)
+    if compression == "zstd-seekable":
+        return io.BufferedReader(SeekableZstdReader(raw), buffer_size=1024 * 1024)
+    if compression == "zstd":
+        if not HAS_ZSTANDARD:
+            raise CompressedLogError(
+                "Streaming zstd logs needs the zstandard package; "
+                "seekable zstd logs can be read without it"
+            )
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    raise CompressedLogError(f"Unknown compression {compression!r}")
+
+
+@contextmanager
+def open_log(log_path: Union[str, Path], max_size: Optional[int] = None) -> Iterator[BinaryIO]:
+    """
+    Open a plain or compressed log for reading its decompressed bytes.
+
+    Args:
+        log_path: Path to the combat log file
+        max_size: Maximum number of decompressed bytes a compressed log may
+            have; reading past it raises CompressedLogError
+
+    Yields:
+        Binary file object of the decompressed log
+    """
+    with open(log_path, "rb") as raw:
+        stream = decompress_stream(raw, detect_compression(raw))
+        if max_size is not None and stream is not raw:
+            stream = io.BufferedReader(SizeLimitedReader(stream, max_size))
+        try:
+            yield stream
+        finally:
+            if stream is not raw:
+                stream.close()
+
+
+@contextmanager
+def map_log(log_path: Union[str, Path]) -> Iterator[Union[mmap.mmap, SeekableLogView]]:
+    """
+    Open a plain or seekable zstd log for random access to its decompressed bytes.
+
+    Args:
+        log_path: Path to the combat log file
+
+    Yields:
+        mmap of a plain log, or a SeekableLogView of a seekable zstd log
+
+    Raises:
+        CompressedLogError: For logs that can only be read from the start
+    """
+    with open(log_path, "rb") as raw:
+        compression = detect_compression(raw)
+        if compression is None:
+            with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
+        elif compression == "zstd-seekable":
+            yield SeekableLogView(SeekableZstdReader(raw))
+        else:
+            raise CompressedLogError(
+                f"{compression} logs can only be read as a stream; "
+                "byte ranges need a plain or seekable zstd log"
+            )
+
+
+def write_seekable_zstd(
+    source: BinaryIO, destination: BinaryIO, frame_size: int = 4 * 1024 * 1024, level: int = 3
+) -> int:
+    """
+    Compress a log into the zstd seekable format.
+
+    Frames end on line boundaries where possible, so every frame holds whole
+    lines of the log.
+
+    Args:
+        source: Binary file object of the plain log
+        destination: Binary file object to write the compressed log to
+        frame_size: Decompressed bytes per frame
+        level: zstd compression level
+
+    Returns:
+        Number of frames written
+    """
+    entries = []
+    pending = b""
+    while True:
+        data = source.read(frame_size)
+        pending += data
+        while len(pending) >= frame_size or (not data and pending):
+            cut = pending.rfind(b"\n", 0, frame_size) + 1 if data else len(pending)
+            if cut <= 0:
+                cut = min(frame_size, len(pending))
+            frame = _compress_frame(pending[:cut], level)
+            destination.write(frame)
+            entries.append(struct.pack("<II", len(frame), cut))
+            pending = pending[cut:]
+        if not data:
+            break
+
+    table = b"".join(entries) + SEEK_TABLE_FOOTER.pack(len(entries), 0, SEEKABLE_MAGIC)
+    destination.write(struct.pack("<II", SKIPPABLE_FRAME_MAGIC, len(table)))
+    destination.write(table)
+    return len(entries)
@@ -2,11 +2,19 @@
 Event classes and factory for WoW combat log events.
 """
 
+import logging
+import os
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Type
-from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from dataclasses import dataclass, field, fields
 from enum import Enum
 
+from .compressed import open_log
+from .schemas import EventSchema
+
+logger = logging.getLogger(__name__)
+
 try:
     from src.config.wow_data import is_flask_buff, is_food_buff, get_spec_name
 except ImportError:
@@ -94,6 +102,45 @@ class BaseEvent:
     dest_flags: Optional[int] = None
     dest_raid_flags: Optional[int] = None
 
+    # Epoch seconds decoded alongside timestamp (same value as timestamp.timestamp())
+    epoch: Optional[float] = None
+
+    # Location of the line in the log file, kept instead of raw_line in offset mode
+    raw_offset: Optional[int] = None
+    raw_length: Optional[int] = None
+
+    def get_epoch(self) -> float:
+        """Get the event time in epoch seconds without touching the datetime if possible."""
+        if self.epoch is not None:
+            return self.epoch
+        return self.timestamp.timestamp()
+
+    def read_raw_line(self, log_file=None) -> Optional[str]:
+        """
+        Get the raw log line, reading it back from the log file if only its offset was kept.
+
+        Args:
+            log_file: Path (of a plain or compressed log) or binary file object of
+                the decompressed log this event was parsed from
+
+        Returns:
+            Raw line, or None if it was dropped
+        """
+        if self.raw_line:
+            return self.raw_line
+        if self.raw_offset is None or log_file is None:
+            return None
+
+        if isinstance(log_file, (str, os.PathLike)):
+            with open_log(log_file) as f:
+                f.seek(self.raw_offset)
+                data = f.read(self.raw_length)
+        else:
+            log_file.seek(self.raw_offset)
+            data = log_file.read(self.raw_length)
+
+        return data.decode("utf-8", errors="ignore").rstrip()
+
     def is_player_source(self) -> bool:
         """Check if the source is a player."""
         if self.source_guid:
@@ -392,11 +439,335 @@ class CombatantInfo(BaseEvent):
         return all(item.has_enchant() for item in enchantable_slots if item.item_id > 0)
 
 
+# Slotted event variants
+#
+# Same fields and behaviour as the regular classes (and instances of them), but
+# values live in __slots__ instead of a per-instance __dict__, which keeps large
+# parsed encounters noticeably smaller in memory. The inherited dataclass
+# __init__ assigns every field, so no slot is ever left unset.
+
+
+def _slot_names(event_class: type) -> Tuple[str, ...]:
+    """Get the dataclass field names of an event class as slot names."""
+    return tuple(f.name for f in fields(event_class))
+
+
+class SlottedBaseEvent(BaseEvent):
+    """BaseEvent stored in slots."""
+
+    __slots__ = _slot_names(BaseEvent)
+
+
+class SlottedSpellEvent(SpellEvent):
+    """SpellEvent stored in slots."""
+
+    __slots__ = _slot_names(SpellEvent)
+
+
+class SlottedDamageEvent(DamageEvent):
+    """DamageEvent stored in slots."""
+
+    __slots__ = _slot_names(DamageEvent)
+
+
+class SlottedHealEvent(HealEvent):
+    """HealEvent stored in slots."""
+
+    __slots__ = _slot_names(HealEvent)
+
+
+class SlottedAuraEvent(AuraEvent):
+    """AuraEvent stored in slots."""
+
+    __slots__ = _slot_names(AuraEvent)
+
+
+class SlottedAbsorbEvent(AbsorbEvent):
+    """AbsorbEvent stored in slots."""
+
+    __slots__ = _slot_names(AbsorbEvent)
+
+
+SLOTTED_EVENT_CLASSES: Dict[Type[BaseEvent], Type[BaseEvent]] = {
+    BaseEvent: SlottedBaseEvent,
+    SpellEvent: SlottedSpellEvent,
+    DamageEvent: SlottedDamageEvent,
+    HealEvent: SlottedHealEvent,
+    AuraEvent: SlottedAuraEvent,
+    AbsorbEvent: SlottedAbsorbEvent,
+}
+
+
+# Lazy event variants
+#
+# Filter-heavy consumers (boundary detection, trash segmentation) mostly read
+# event_type and GUIDs. Lazy events set only those up front and keep a reference
+# to the tokenized line; every other field is decoded on first access.
+
+# Base fields decoded together (names are split into name/server/region)
+LAZY_BASE_FIELDS = (
+    "hide_caster",
+    "source_name",
+    "source_server",
+    "source_region",
+    "source_flags",
+    "source_raid_flags",
+    "dest_name",
+    "dest_server",
+    "dest_region",
+    "dest_flags",
+    "dest_raid_flags",
+)
+LAZY_SPELL_FIELDS = ("spell_id", "spell_name", "spell_school")
+
+
+class _LazyField:
+    """Non-data descriptor that decodes a lazy event's field group on first access."""
+
+    def __init__(self, group: str, name: str, default: Any):
+        self.group = group
+        self.name = name
+        self.default = default
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.default
+        instance._decode_group(self.group)
+        return instance.__dict__[self.name]
+
+
+class LazyEventMixin:
+    """
+    Mixin for events that decode their fields from the parsed line on demand.
+
+    Decoded values are stored on the instance, so after the first read a field
+    behaves exactly like a normal dataclass attribute (including assignment).
+    """
+
+    # group name -> ((field name, default), ...)
+    _lazy_groups: Dict[str, Tuple[Tuple[str, Any], ...]] = {}
+
+    @classmethod
+    def from_parsed_line(cls, parsed_line, string_pool=None) -> "LazyEventMixin":
+        """
+        Create a lazy event without decoding any deferred fields.
+
+        Args:
+            parsed_line: ParsedLine object from tokenizer
+            string_pool: Optional StringPool for the event type and GUIDs
+
+        Returns:
+            Lazy event instance
+        """
+        event = cls.__new__(cls)
+        values = event.__dict__
+        values["timestamp"] = parsed_line.timestamp
+        values["event_type"] = parsed_line.event_type
+        values["epoch"] = parsed_line.epoch
+
+        base_params = parsed_line.base_params
+        if len(base_params) >= 8:
+            values["source_guid"] = base_params[0]
+            values["dest_guid"] = base_params[4]
+            if string_pool is not None:
+                values["event_type"] = string_pool.intern(parsed_line.event_type)
+                values["source_guid"] = string_pool.intern(base_params[0])
+                values["dest_guid"] = string_pool.intern(base_params[4])
+        else:
+            values["source_guid"] = None
+            values["dest_guid"] = None
+
+        values["_parsed_line"] = parsed_line
+        return event
+
+    def _decode_group(self, group: str) -> None:
+        """Decode one group of deferred fields from the parsed line."""
+        values = self.__dict__
+        group_fields = self._lazy_groups[group]
+        # Fields assigned before the group was decoded keep their assigned values
+        assigned = {name: values[name] for name, _ in group_fields if name in values}
+
+        # Defaults first, so fields the decoder doesn't set never re-trigger decoding
+        for name, default in group_fields:
+            values[name] = default
+
+        parsed_line = values["_parsed_line"]
+        if group == "raw":
+            self.raw_line = parsed_line.raw_line
+        elif group == "base":
+            EventFactory._apply_base_params(self, parsed_line.base_params)
+        elif group == "spell":
+            if self.event_type.startswith("SPELL_"):
+                EventFactory._apply_spell_params(self, parsed_line.prefix_params)
+        elif group == "suffix":
+            self._decode_suffix(parsed_line.suffix_params)
+
+        values.update(assigned)
+
+    def _decode_suffix(self, params: List[Any]) -> None:
+        """Decode suffix fields; overridden by event types that have them."""
+
+
+def _install_lazy_fields(lazy_class: type, groups: Dict[str, Tuple[str, ...]]) -> type:
+    """Replace dataclass fields on a lazy event class with lazy descriptors."""
+    dataclass_fields = lazy_class.__dataclass_fields__
+    lazy_class._lazy_groups = {}
+    for group, names in groups.items():
+        lazy_class._lazy_groups[group] = tuple(
+            (name, dataclass_fields[name].default) for name in names
+        )
+        for name in names:
+            setattr(lazy_class, name, _LazyField(group, name, dataclass_fields[name].default))
+    return lazy_class
+
+
+class LazyBaseEvent(LazyEventMixin, BaseEvent):
+    """BaseEvent that decodes its fields on first access."""
+
+
+class LazySpellEvent(LazyEventMixin, SpellEvent):
+    """SpellEvent that decodes its fields on first access."""
+
+
+class LazyDamageEvent(LazyEventMixin, DamageEvent):
+    """DamageEvent that decodes its fields on first access."""
+
+    def _decode_suffix(self, params: List[Any]) -> None:
+        EventFactory._apply_damage_params(self, params)
+
+
+class LazyHealEvent(LazyEventMixin, HealEvent):
+    """HealEvent that decodes its fields on first access."""
+
+    def _decode_suffix(self, params: List[Any]) -> None:
+        EventFactory._apply_heal_params(self, params)
+
+
+class LazyAuraEvent(LazyEventMixin, AuraEvent):
+    """AuraEvent that decodes its fields on first access."""
+
+    def _decode_suffix(self, params: List[Any]) -> None:
+        EventFactory._apply_aura_params(self, params)
+
+
+_install_lazy_fields(LazyBaseEvent, {"raw": ("raw_line",), "base": LAZY_BASE_FIELDS})
+_install_lazy_fields(
+    LazySpellEvent,
+    {"raw": ("raw_line",), "base": LAZY_BASE_FIELDS, "spell": LAZY_SPELL_FIELDS},
+)
+_install_lazy_fields(
+    LazyDamageEvent,
+    {
+        "raw": ("raw_line",),
+        "base": LAZY_BASE_FIELDS,
+        "spell": LAZY_SPELL_FIELDS,
+        "suffix": (
+            "amount",
+            "overkill",
+            "school",
+            "resisted",
+            "blocked",
+            "absorbed",
+            "critical",
+            "glancing",
+            "crushing",
+        ),
+    },
+)
+_install_lazy_fields(
+    LazyHealEvent,
+    {
+        "raw": ("raw_line",),
+        "base": LAZY_BASE_FIELDS,
+        "spell": LAZY_SPELL_FIELDS,
+        "suffix": ("amount", "overhealing", "absorbed", "critical"),
+    },
+)
+_install_lazy_fields(
+    LazyAuraEvent,
+    {
+        "raw": ("raw_line",),
+        "base": LAZY_BASE_FIELDS,
+        "spell": LAZY_SPELL_FIELDS,
+        "suffix": ("aura_type", "stacks"),
+    },
+)
+
+LAZY_EVENT_CLASSES: Dict[Type[BaseEvent], Type[BaseEvent]] = {
+    BaseEvent: LazyBaseEvent,
+    SpellEvent: LazySpellEvent,
+    DamageEvent: LazyDamageEvent,
+    HealEvent: LazyHealEvent,
+    AuraEvent: LazyAuraEvent,
+}
+
+
+# (parsed_line, lazy, compact, string_pool) -> event
+EventConstructor = Callable[[Any, bool, bool, Any], BaseEvent]
+
+
+class EventProfile:
+    """
+    Per-event-type creation counts and time spent in EventFactory.create_event.
+
+    Pass one to create_event (or enable CombatLogParser(profile_events=True))
+    to find out which event types dominate parsing time.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+
+    def record(self, event_type: str, seconds: float) -> None:
+        """Add one created event and the time it took."""
+        self.counts[event_type] = self.counts.get(event_type, 0) + 1
+        self.seconds[event_type] = self.seconds.get(event_type, 0.0) + seconds
+
+    def clear(self) -> None:
+        """Reset all counters."""
+        self.counts.clear()
+        self.seconds.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get profiling data, event types ordered by total time spent.
+
+        Returns:
+            Dictionary with totals and per-event-type count, total and mean time
+        """
+        event_types = {}
+        for event_type in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            count = self.counts[event_type]
+            seconds = self.seconds[event_type]
+            event_types[event_type] = {
+                "count": count,
+                "total_ms": seconds * 1000.0,
+                "mean_us": seconds / count * 1_000_000.0,
+            }
+
+        return {
+            "events": sum(self.counts.values()),
+            "total_ms": sum(self.seconds.values()) * 1000.0,
+            "event_types": event_types,
+        }
+
+
 class EventFactory:
-    """Factory for creating specific event objects from parsed lines."""
+    """
+    Factory for creating specific event objects from parsed lines.
+
+    Event types are dispatched through a table keyed on the exact event type
+    string. Each entry is a constructor specialized for its type, with the
+    event class and the prefix/suffix handling resolved when the entry is
+    built, so no prefix or suffix checks run per line. Known event types are
+    compiled at import time and others on first sight.
+    """
 
     _event_classes: Dict[str, Type[BaseEvent]] = {}
 
+    # Exact event type -> specialized constructor
+    _constructors: Dict[str, EventConstructor] = {}
+
     @staticmethod
     def _safe_int(value: Any, default: int = 0) -> int:
         """Safely convert a value to int, returning default on failure."""
@@ -413,105 +784,205 @@ class EventFactory:
         cls._event_classes[event_type] = event_class
 
     @classmethod
-    def create_event(cls, parsed_line) -> BaseEvent:
+    def create_event(
+        cls,
+        parsed_line,
+        lazy: bool = False,
+        compact: bool = False,
+        string_pool=None,
+        profile: Optional[EventProfile] = None,
+    ) -> BaseEvent:
         """
         Create a specific event object from a parsed line.
 
         Args:
             parsed_line: ParsedLine object from tokenizer
+            lazy: Return a lazy event for combat events, decoding fields other
+                than event type, timestamp and GUIDs only when they are read
+            compact: Return slotted variants (SlottedDamageEvent etc.) for
+                combat and absorb events; ignored for lazy events
+            string_pool: Optional StringPool used to share GUID, name and spell
+                name strings between events
+            profile: Optional EventProfile that records the event type and the
+                time spent creating the event
 
         Returns:
             Appropriate event object
         """
         event_type = parsed_line.event_type
+        constructor = cls._constructors.get(event_type)
+        if constructor is None:
+            constructor = cls._constructors[event_type] = cls._build_constructor(event_type)
+
+        if profile is None:
+            return constructor(parsed_line, lazy, compact, string_pool)
+
+        start = time.perf_counter()
+        event = constructor(parsed_line, lazy, compact, string_pool)
+        profile.record(event_type, time.perf_counter() - start)
+        return event
 
+    @classmethod
+    def compile_event_types(cls, event_types) -> None:
+        """
+        Add dispatch table entries for event types that have none yet.
+
+        Args:
+            event_types: Iterable of exact event type strings
+        """
+        for event_type in event_types:
+            if event_type not in cls._constructors:
+                cls._constructors[event_type] = cls._build_constructor(event_type)
+
+    @classmethod
+    def _build_constructor(cls, event_type: str) -> EventConstructor:
+        """Build the specialized constructor for one event type."""
         # Special handling for meta events
         if event_type == "ENCOUNTER_START" or event_type == "ENCOUNTER_END":
-            return cls._create_encounter_event(parsed_line)
+            create_meta = cls._create_encounter_event
         elif event_type.startswith("CHALLENGE_MODE_"):
-            return cls._create_challenge_mode_event(parsed_line)
+            create_meta = cls._create_challenge_mode_event
         elif event_type == "COMBATANT_INFO":
-            return cls._create_combatant_info(parsed_line)
+            create_meta = cls._create_combatant_info
         elif event_type == "SPELL_ABSORBED":
-            return cls._create_absorb_event(parsed_line)
-
-        # Handle combat events - create correct base type first
-        if event_type.startswith("SPELL_"):
-            event = cls._create_spell_base_event(parsed_line)
+            return cls._build_absorb_constructor()
         else:
-            event = cls._create_base_event(parsed_line)
+            return cls._build_combat_constructor(event_type)
+
+        def create_meta_event(parsed_line, lazy, compact, string_pool):
+            return create_meta(parsed_line)
+
+        return create_meta_event
+
+    @classmethod
+    def _build_absorb_constructor(cls) -> EventConstructor:
+        """Build the constructor for SPELL_ABSORBED events."""
+        create_absorb = cls._create_absorb_event
+        intern_strings = cls._intern_absorb_strings
 
-        # Add suffix-specific data
+        def create_absorb_event(parsed_line, lazy, compact, string_pool):
+            event = create_absorb(parsed_line, SlottedAbsorbEvent if compact else AbsorbEvent)
+            if string_pool is not None:
+                intern_strings(event, string_pool)
+            return event
+
+        return create_absorb_event
+
+    @classmethod
+    def _build_combat_constructor(cls, event_type: str) -> EventConstructor:
+        """Build the constructor for a combat event type."""
+        event_class = cls._get_combat_event_class(event_type)
+        slotted_class = SLOTTED_EVENT_CLASSES[event_class]
+        lazy_class = LAZY_EVENT_CLASSES[event_class]
+
+        apply_base = cls._apply_base_params
+        apply_spell = cls._apply_spell_params if event_type.startswith("SPELL_") else None
+        apply_suffix = {
+            DamageEvent: cls._apply_damage_params,
+            HealEvent: cls._apply_heal_params,
+            AuraEvent: cls._apply_aura_params,
+        }.get(event_class)
+        intern_strings = cls._intern_strings
+
+        def create_combat_event(parsed_line, lazy, compact, string_pool):
+            if lazy:
+                return lazy_class.from_parsed_line(parsed_line, string_pool)
+
+            event = (slotted_class if compact else event_class)(
+                timestamp=parsed_line.timestamp,
+                event_type=parsed_line.event_type,
+                raw_line=parsed_line.raw_line,
+                epoch=parsed_line.epoch,
+            )
+
+            # Add base and spell parameters, then suffix-specific data
+            apply_base(event, parsed_line.base_params)
+            if apply_spell is not None:
+                apply_spell(event, parsed_line.prefix_params)
+            if apply_suffix is not None:
+                apply_suffix(event, parsed_line.suffix_params)
+
+            if string_pool is not None:
+                intern_strings(event, string_pool)
+
+            return event
+
+        return create_combat_event
+
+    @classmethod
+    def _intern_strings(cls, event: BaseEvent, string_pool) -> None:
+        """Replace repeated string fields of a combat event with pooled copies."""
+        intern = string_pool.intern
+        event.event_type = intern(event.event_type)
+        event.source_guid = intern(event.source_guid)
+        event.source_name = intern(event.source_name)
+        event.source_server = intern(event.source_server)
+        event.source_region = intern(event.source_region)
+        event.dest_guid = intern(event.dest_guid)
+        event.dest_name = intern(event.dest_name)
+        event.dest_server = intern(event.dest_server)
+        event.dest_region = intern(event.dest_region)
+
+        if isinstance(event, SpellEvent):
+            event.spell_name = intern(event.spell_name)
+        if isinstance(event, AuraEvent):
+            event.aura_type = intern(event.aura_type)
+
+    @classmethod
+    def _intern_absorb_strings(cls, event: AbsorbEvent, string_pool) -> None:
+        """Replace repeated string fields of an absorb event with pooled copies."""
+        intern = string_pool.intern
+        event.event_type = intern(event.event_type)
+        event.attacker_guid = intern(event.attacker_guid)
+        event.attacker_name = intern(event.attacker_name)
+        event.target_guid = intern(event.target_guid)
+        event.target_name = intern(event.target_name)
+        event.absorber_guid = intern(event.absorber_guid)
+        event.absorber_name = intern(event.absorber_name)
+        event.shield_spell_name = intern(event.shield_spell_name)
+
+    @classmethod
+    def _get_combat_event_class(cls, event_type: str) -> Type[BaseEvent]:
+        """Get the event class for a combat event type."""
         # Process all damage events to DamageEvent objects, handle deduplication at categorizer level
         if ("_DAMAGE" in event_type or event_type in ["RANGE_DAMAGE"]) and event_type not in [
             "DAMAGE_SPLIT",
         ]:
-            event = cls._add_damage_info(event, parsed_line.suffix_params)
+            return DamageEvent
         elif "_HEAL" in event_type and event_type != "SPELL_HEAL_ABSORBED":
-            event = cls._add_heal_info(event, parsed_line.suffix_params)
+            return HealEvent
         elif "_AURA_" in event_type:
-            event = cls._add_aura_info(event, parsed_line.suffix_params)
-
-        return event
+            return AuraEvent
+        elif event_type.startswith("SPELL_"):
+            return SpellEvent
+        return BaseEvent
 
     @classmethod
-    def _create_base_event(cls, parsed_line) -> BaseEvent:
-        """Create base event with common parameters."""
-        event = BaseEvent(
-            timestamp=parsed_line.timestamp,
-            event_type=parsed_line.event_type,
-            raw_line=parsed_line.raw_line,
-        )
-
-        # Add base parameters if available
+    def _apply_base_params(cls, event: BaseEvent, base_params: List[Any]) -> None:
+        """Set source/dest fields from base parameters and split character names."""
         # Standard combat events have 8 core parameters (no hide_caster):
         # sourceGUID, sourceName, sourceFlags, sourceRaidFlags,
         # destGUID, destName, destFlags, destRaidFlags
-        if len(parsed_line.base_params) >= 8:
-            event.source_guid = parsed_line.base_params[0]
-            event.source_name = parsed_line.base_params[1]
-            event.source_flags = cls._safe_int(parsed_line.base_params[2])
-            event.source_raid_flags = cls._safe_int(parsed_line.base_params[3])
-            event.dest_guid = parsed_line.base_params[4]
-            event.dest_name = parsed_line.base_params[5]
-            event.dest_flags = cls._safe_int(parsed_line.base_params[6])
-            event.dest_raid_flags = cls._safe_int(parsed_line.base_params[7])
+        if len(base_params) >= 8:
+            event.source_guid = base_params[0]
+            event.source_name = base_params[1]
+            event.source_flags = cls._safe_int(base_params[2])
+            event.source_raid_flags = cls._safe_int(base_params[3])
+            event.dest_guid = base_params[4]
+            event.dest_name = base_params[5]
+            event.dest_flags = cls._safe_int(base_params[6])
+            event.dest_raid_flags = cls._safe_int(base_params[7])
 
         # Parse character names into components
         event._parse_character_names()
 
-        return event
-
     @classmethod
-    def _create_spell_base_event(cls, parsed_line) -> SpellEvent:
-        """Create spell event with common and spell-specific parameters."""
-        event = SpellEvent(
-            timestamp=parsed_line.timestamp,
-            event_type=parsed_line.event_type,
-            raw_line=parsed_line.raw_line,
-        )
-
-        # Add base parameters if available
-        if len(parsed_line.base_params) >= 8:
-            event.source_guid = parsed_line.base_params[0]
-            event.source_name = parsed_line.base_params[1]
-            event.source_flags = cls._safe_int(parsed_line.base_params[2])
-            event.source_raid_flags = cls._safe_int(parsed_line.base_params[3])
-            event.dest_guid = parsed_line.base_params[4]
-            event.dest_name = parsed_line.base_params[5]
-            event.dest_flags = cls._safe_int(parsed_line.base_params[6])
-            event.dest_raid_flags = cls._safe_int(parsed_line.base_params[7])
-
-        # Add spell parameters if present
-        if parsed_line.prefix_params and len(parsed_line.prefix_params) >= 3:
-            event.spell_id = cls._safe_int(parsed_line.prefix_params[0])
-            event.spell_name = parsed_line.prefix_params[1]
-            event.spell_school = cls._safe_int(parsed_line.prefix_params[2])
-
-        # Parse character names into components
-        event._parse_character_names()
-
-        return event
+    def _apply_spell_params(cls, event: SpellEvent, prefix_params: List[Any]) -> None:
+        """Set spell fields from SPELL_ prefix parameters."""
+        if prefix_params and len(prefix_params) >= 3:
+            event.spell_id = cls._safe_int(prefix_params[0])
+            event.spell_name = prefix_params[1]
+            event.spell_school = cls._safe_int(prefix_params[2])
 
     @classmethod
     def _create_encounter_event(cls, parsed_line) -> EncounterEvent:
@@ -520,6 +991,7 @@ class EventFactory:
             timestamp=parsed_line.timestamp,
             event_type=parsed_line.event_type,
             raw_line=parsed_line.raw_line,
+            epoch=parsed_line.epoch,
         )
 
         params = parsed_line.suffix_params
@@ -547,6 +1019,7 @@ class EventFactory:
             timestamp=parsed_line.timestamp,
             event_type=parsed_line.event_type,
             raw_line=parsed_line.raw_line,
+            epoch=parsed_line.epoch,
         )
 
         params = parsed_line.suffix_params
@@ -577,6 +1050,7 @@ class EventFactory:
             timestamp=parsed_line.timestamp,
             event_type=parsed_line.event_type,
             raw_line=parsed_line.raw_line,
+            epoch=parsed_line.epoch,
         )
 
         # COMBATANT_INFO format: playerGUID, faction, strength, agility, stamina, intelligence,
@@ -674,12 +1148,15 @@ class EventFactory:
         return event
 
     @classmethod
-    def _create_absorb_event(cls, parsed_line) -> AbsorbEvent:
+    def _create_absorb_event(
+        cls, parsed_line, event_class: Type[AbsorbEvent] = AbsorbEvent
+    ) -> AbsorbEvent:
         """Create absorption event from SPELL_ABSORBED line."""
-        event = AbsorbEvent(
+        event = event_class(
             timestamp=parsed_line.timestamp,
             event_type=parsed_line.event_type,
             raw_line=parsed_line.raw_line,
+            epoch=parsed_line.epoch,
         )
 
         # SPELL_ABSORBED structure from our analysis:
@@ -719,38 +1196,8 @@ class EventFactory:
         return event
 
     @classmethod
-    def _add_damage_info(cls, event: BaseEvent, params: List[Any]) -> DamageEvent:
-        """Add damage-specific information to event."""
-        import logging
-
-        logger = logging.getLogger(__name__)
-
-        # Handle different event types properly
-        if event.event_type.startswith("SWING_"):
-            # SWING events use BaseEvent as base, create DamageEvent manually
-            damage_event = DamageEvent(
-                timestamp=event.timestamp,
-                event_type=event.event_type,
-                raw_line=event.raw_line,
-                source_guid=event.source_guid,
-                source_name=event.source_name,
-                source_flags=event.source_flags,
-                source_raid_flags=event.source_raid_flags,
-                dest_guid=event.dest_guid,
-                dest_name=event.dest_name,
-                dest_flags=event.dest_flags,
-                dest_raid_flags=event.dest_raid_flags,
-            )
-            logger.debug(
-                f"Created SWING DamageEvent: {event.event_type}, source: {event.source_guid}, dest: {event.dest_guid}"
-            )
-        else:
-            # SPELL_ events and others use event.__dict__
-            damage_event = DamageEvent(**event.__dict__)
-            logger.debug(
-                f"Created SPELL DamageEvent: {event.event_type}, source: {event.source_guid}, dest: {event.dest_guid}"
-            )
-
+    def _apply_damage_params(cls, event: DamageEvent, params: List[Any]) -> None:
+        """Set damage fields from suffix parameters."""
         # Detect Advanced Combat Logging by parameter count
         # Advanced Combat Logging inserts unit info (19 fields) before damage parameters
         damage_offset = 0
@@ -763,52 +1210,27 @@ class EventFactory:
         # For Advanced Combat Logging, these come after the 19 unit info fields
         min_params_needed = damage_offset + 9
         if len(params) >= min_params_needed:
-            damage_event.amount = cls._safe_int(params[damage_offset])  # Actual damage amount
-            damage_event.overkill = cls._safe_int(params[damage_offset + 1])  # Overkill amount
-            damage_event.school = cls._safe_int(params[damage_offset + 2])
-            damage_event.resisted = cls._safe_int(params[damage_offset + 3])
-            damage_event.blocked = cls._safe_int(params[damage_offset + 4])
-            damage_event.absorbed = cls._safe_int(params[damage_offset + 5])
-            damage_event.critical = bool(params[damage_offset + 6])
-            damage_event.glancing = bool(params[damage_offset + 7])
-            damage_event.crushing = bool(params[damage_offset + 8])
+            event.amount = cls._safe_int(params[damage_offset])  # Actual damage amount
+            event.overkill = cls._safe_int(params[damage_offset + 1])  # Overkill amount
+            event.school = cls._safe_int(params[damage_offset + 2])
+            event.resisted = cls._safe_int(params[damage_offset + 3])
+            event.blocked = cls._safe_int(params[damage_offset + 4])
+            event.absorbed = cls._safe_int(params[damage_offset + 5])
+            event.critical = bool(params[damage_offset + 6])
+            event.glancing = bool(params[damage_offset + 7])
+            event.crushing = bool(params[damage_offset + 8])
         elif len(params) >= damage_offset + 6:
             # Fallback for shorter parameter lists
-            damage_event.amount = cls._safe_int(params[damage_offset])
-            damage_event.overkill = cls._safe_int(params[damage_offset + 1])
-            damage_event.school = cls._safe_int(params[damage_offset + 2])
-            damage_event.resisted = cls._safe_int(params[damage_offset + 3])
-            damage_event.blocked = cls._safe_int(params[damage_offset + 4])
-            damage_event.absorbed = cls._safe_int(params[damage_offset + 5])
-
-        logger.debug(
-            f"Returning DamageEvent type: {type(damage_event).__name__}, amount: {damage_event.amount}"
-        )
-        return damage_event
+            event.amount = cls._safe_int(params[damage_offset])
+            event.overkill = cls._safe_int(params[damage_offset + 1])
+            event.school = cls._safe_int(params[damage_offset + 2])
+            event.resisted = cls._safe_int(params[damage_offset + 3])
+            event.blocked = cls._safe_int(params[damage_offset + 4])
+            event.absorbed = cls._safe_int(params[damage_offset + 5])
 
     @classmethod
-    def _add_heal_info(cls, event: BaseEvent, params: List[Any]) -> HealEvent:
-        """Add heal-specific information to event."""
-        # Handle different event types properly
-        if event.event_type.startswith("SWING_"):
-            # SWING events use BaseEvent as base, create HealEvent manually
-            heal_event = HealEvent(
-                timestamp=event.timestamp,
-                event_type=event.event_type,
-                raw_line=event.raw_line,
-                source_guid=event.source_guid,
-                source_name=event.source_name,
-                source_flags=event.source_flags,
-                source_raid_flags=event.source_raid_flags,
-                dest_guid=event.dest_guid,
-                dest_name=event.dest_name,
-                dest_flags=event.dest_flags,
-                dest_raid_flags=event.dest_raid_flags,
-            )
-        else:
-            # SPELL_ events and others use event.__dict__
-            heal_event = HealEvent(**event.__dict__)
-
+    def _apply_heal_params(cls, event: HealEvent, params: List[Any]) -> None:
+        """Set heal fields from suffix parameters."""
         # Detect Advanced Combat Logging by parameter count
         # Advanced Combat Logging inserts unit info (19 fields) before heal parameters
         heal_offset = 0
@@ -818,44 +1240,47 @@ class EventFactory:
             heal_offset = 19
 
         # Debug logging for heal parsing
-        import logging
-
-        logger = logging.getLogger(__name__)
-        logger.debug(f"Healing params count: {len(params)}, heal_offset: {heal_offset}")
-        if len(params) > heal_offset:
-            logger.debug(
-                f"Heal params at offset {heal_offset}: {params[heal_offset:heal_offset+5]}"
-            )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Healing params count: {len(params)}, heal_offset: {heal_offset}")
+            if len(params) > heal_offset:
+                logger.debug(
+                    f"Heal params at offset {heal_offset}: {params[heal_offset:heal_offset+5]}"
+                )
 
         # Heal parameters: amount, overhealing, absorbed, critical
         # For Advanced Combat Logging, these come after the 19 unit info fields
         min_params_needed = heal_offset + 4
         if len(params) >= min_params_needed:
-            heal_event.amount = cls._safe_int(
+            event.amount = cls._safe_int(
                 params[heal_offset]
             )  # Total healing including overheal
-            heal_event.overhealing = cls._safe_int(params[heal_offset + 1])  # Overhealing amount
-            heal_event.absorbed = cls._safe_int(params[heal_offset + 2])  # Absorbed healing
-            heal_event.critical = bool(params[heal_offset + 3])  # Critical heal flag
+            event.overhealing = cls._safe_int(params[heal_offset + 1])  # Overhealing amount
+            event.absorbed = cls._safe_int(params[heal_offset + 2])  # Absorbed healing
+            event.critical = bool(params[heal_offset + 3])  # Critical heal flag
         elif len(params) >= heal_offset + 2:
             # Fallback for shorter parameter lists
-            heal_event.amount = cls._safe_int(params[heal_offset])
-            heal_event.overhealing = (
+            event.amount = cls._safe_int(params[heal_offset])
+            event.overhealing = (
                 cls._safe_int(params[heal_offset + 1]) if len(params) > heal_offset + 1 else 0
             )
 
-        return heal_event
-
     @classmethod
-    def _add_aura_info(cls, event: BaseEvent, params: List[Any]) -> AuraEvent:
-        """Add aura-specific information to event."""
-        aura_event = AuraEvent(**event.__dict__)
-
+    def _apply_aura_params(cls, event: AuraEvent, params: List[Any]) -> None:
+        """Set aura fields from suffix parameters."""
         # Aura parameters: auraType, [amount/stacks for DOSE events]
         if len(params) >= 1:
-            aura_event.aura_type = params[0]
+            event.aura_type = params[0]
 
         if "DOSE" in event.event_type and len(params) >= 2:
-            aura_event.stacks = params[1] or 1
+            event.stacks = params[1] or 1
+
+
+def _known_event_types() -> List[str]:
+    """Event types compiled into the dispatch table at import time."""
+    event_types = [event_type.value for event_type in EventType]
+    event_types.extend(EventSchema.SPECIAL_EVENTS)
+    event_types.extend("SPELL" + suffix for suffix in EventSchema.SUFFIX_PARAMS)
+    return event_types
+
 
-        return aura_event
+EventFactory.compile_event_types(_known_event_types())
@@ -4,12 +4,16 @@ Main combat log parser that coordinates tokenization, event creation, and proces
 
 import os
 from pathlib import Path
-from typing import Iterator, List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import logging
 
+from .compressed import decompress_stream, detect_compression, open_log
 from .tokenizer import LineTokenizer, ParsedLine
-from .events import BaseEvent, EventFactory
+from .columnar import EventBatch, EventBatchBuilder
+from .events import BaseEvent, EventFactory, EventProfile
+from .string_pool import StringPool
+from .tail import LogTailer, TailCheckpoint
 from .schemas import EventSchema
 
 
@@ -23,17 +27,52 @@ class CombatLogParser:
     Handles file reading, line tokenization, and event creation.
     """
 
-    def __init__(self, buffer_size: int = 8192):
+    RAW_LINE_MODES = ("keep", "drop", "offset")
+
+    def __init__(
+        self,
+        buffer_size: int = 8192,
+        fast_tokenizer: bool = True,
+        lazy_events: bool = False,
+        compact_events: bool = False,
+        raw_line_mode: str = "keep",
+        intern_strings: bool = True,
+        profile_events: bool = False,
+    ):
         """
         Initialize the combat log parser.
 
         Args:
             buffer_size: Size of read buffer for file streaming
+            fast_tokenizer: Use the single-pass tokenizer fast path for flat lines
+            lazy_events: Create lazy combat events that only decode fields beyond
+                event type, timestamp and GUIDs when they are accessed
+            compact_events: Create slotted event variants to reduce memory
+            raw_line_mode: "keep" stores each event's raw line, "drop" discards it,
+                "offset" discards it but records raw_offset/raw_length in the file
+                so BaseEvent.read_raw_line() can read it back (parse_file only)
+            intern_strings: Share repeated GUID, name and spell name strings
+                between events through a StringPool owned by this parser
+            profile_events: Record per-event-type counts and creation time in
+                an EventProfile, reported by get_stats()
         """
-        self.tokenizer = LineTokenizer()
+        if raw_line_mode not in self.RAW_LINE_MODES:
+            raise ValueError(
+                f"Invalid raw_line_mode {raw_line_mode!r}, expected one of {self.RAW_LINE_MODES}"
+            )
+
+        self.fast_tokenizer = fast_tokenizer
+        self.lazy_events = lazy_events
+        self.compact_events = compact_events
+        self.raw_line_mode = raw_line_mode
+        self.intern_strings = intern_strings
+        self.string_pool = StringPool() if intern_strings else None
+        self.event_profile = EventProfile() if profile_events else None
+        self.tokenizer = LineTokenizer(fast_mode=fast_tokenizer)
         self.event_factory = EventFactory()
         self.buffer_size = buffer_size
         self.current_file = None
+        self.tailer = None
         self.events_processed = 0
         self.parse_errors = []
 
@@ -48,55 +87,207 @@ class CombatLogParser:
         Yields:
             BaseEvent objects
         """
+        for line, offset, length in self.iter_file_lines(file_path, progress_callback):
+            yield from self._process_line(line, offset, length)
+
+        logger.info(f"Completed parsing {self.current_file.name}: "
+                   f"{self.events_processed} events, {len(self.parse_errors)} errors")
+
+    def parse_range(
+        self,
+        file_path: str,
+        start_byte: int,
+        end_byte: Optional[int] = None,
+        progress_callback=None,
+    ) -> Iterator[BaseEvent]:
+        """
+        Parse only the lines between two byte offsets of a combat log.
+
+        The file is read from start_byte on, so parsing one encounter does not
+        depend on the size of the rest of the log. The tokenizer is primed with
+        the COMBAT_LOG_VERSION header at the top of the file, since whether
+        advanced logging is enabled changes how every combat event is parsed.
+
+        Args:
+            file_path: Path to the combat log file
+            start_byte: Offset of the first line to parse
+            end_byte: Offset to stop parsing at (end of file if None)
+            progress_callback: Optional callback for progress updates
+
+        Yields:
+            BaseEvent objects
+        """
+        if start_byte > 0:
+            self._read_header(file_path)
+
+        for line, offset, length in self.iter_file_lines(
+            file_path, progress_callback, start_byte, end_byte
+        ):
+            yield from self._process_line(line, offset, length)
+
+    def parse_encounter(
+        self, file_path: str, encounter, progress_callback=None
+    ) -> Iterator[BaseEvent]:
+        """
+        Parse a single encounter of a combat log.
+
+        Args:
+            file_path: Path to the combat log file
+            encounter: Entry from EncounterIndex.get_encounters(), or anything
+                else with start_byte/end_byte such as an EncounterBoundary
+            progress_callback: Optional callback for progress updates
+
+        Yields:
+            BaseEvent objects of the encounter
+        """
+        return self.parse_range(
+            file_path, encounter.start_byte, encounter.end_byte, progress_callback
+        )
+
+    def _read_header(self, file_path: str):
+        """Feed the COMBAT_LOG_VERSION header line to the tokenizer."""
+        with open_log(file_path) as f:
+            header = f.readline()
+        if b"COMBAT_LOG_VERSION" in header:
+            self.tokenizer.parse_line(header.decode('utf-8', errors='ignore').rstrip("\r\n"))
+
+    def iter_file_lines(
+        self,
+        file_path: str,
+        progress_callback=None,
+        start_byte: int = 0,
+        end_byte: Optional[int] = None,
+    ) -> Iterator[Tuple[str, int, int]]:
+        """
+        Read a combat log file line by line.
+
+        gzip, zstd and zip compressed logs are decompressed as they are read;
+        offsets then refer to the decompressed log.
+
+        Args:
+            file_path: Path to the combat log file
+            progress_callback: Optional callback for progress updates
+            start_byte: Offset of the first line to read
+            end_byte: Offset to stop reading at (end of file if None)
+
+        Yields:
+            Tuples of (decoded line, byte offset, length in bytes)
+        """
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"Combat log file not found: {file_path}")
 
         self.current_file = file_path
         file_size = file_path.stat().st_size
-        bytes_read = 0
-
-        logger.info(f"Starting parse of {file_path.name} ({file_size / 1024 / 1024:.1f} MB)")
 
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            line_buffer = ""
-            chunk_count = 0
+        # Read bytes so byte offsets of each line are known exactly
+        with open(file_path, 'rb') as raw:
+            compression = detect_compression(raw)
+            if compression is None and end_byte is not None:
+                end_byte = min(end_byte, file_size)
+            # Progress of compressed logs is measured in compressed bytes consumed
+            range_size = file_size if compression or end_byte is None else end_byte
+            range_size = max(range_size - (0 if compression else start_byte), 0)
+
+            description = f"{file_size / 1024 / 1024:.1f} MB"
+            if compression:
+                description += f" {compression} compressed"
+            if start_byte > 0 or end_byte is not None:
+                end = "end" if end_byte is None else end_byte
+                description = f"bytes {start_byte}-{end} of {description}"
+            logger.info(f"Starting parse of {file_path.name} ({description})")
+
+            f = decompress_stream(raw, compression)
+            try:
+                f.seek(start_byte)
+                yield from self._iter_stream_lines(
+                    f, start_byte, end_byte, progress_callback, raw, range_size
+                )
+            finally:
+                if f is not raw:
+                    f.close()
+
+    def _iter_stream_lines(
+        self, f, start_byte: int, end_byte: Optional[int], progress_callback, raw, range_size: int
+    ) -> Iterator[Tuple[str, int, int]]:
+        """Split a (decompressed) log stream into lines between two offsets."""
+        line_buffer = b""
+        line_offset = start_byte
+        chunk_count = 0
+        bytes_read = 0
 
-            while True:
+        while True:
+            if end_byte is None:
                 chunk = f.read(self.buffer_size)
-                if not chunk:
-                    # Process any remaining line
-                    if line_buffer:
-                        yield from self._process_line(line_buffer)
-                    break
-
-                bytes_read += len(chunk.encode('utf-8'))
-                chunk_count += 1
-
-                # Add chunk to buffer
-                line_buffer += chunk
+            else:
+                chunk = f.read(max(min(self.buffer_size, end_byte - start_byte - bytes_read), 0))
+            if not chunk:
+                # Process any remaining line
+                if line_buffer:
+                    line = line_buffer.decode('utf-8', errors='ignore')
+                    yield line, line_offset, len(line_buffer)
+                break
+
+            bytes_read += len(chunk)
+            chunk_count += 1
+
+            # Add chunk to buffer
+            line_buffer += chunk
+
+            # Process complete lines
+            lines = line_buffer.split(b'\n')
+            line_buffer = lines[-1]  # Keep incomplete line for next iteration
+
+            for line in lines[:-1]:
+                yield line.decode('utf-8', errors='ignore'), line_offset, len(line)
+                line_offset += len(line) + 1
+
+            # Update progress
+            if progress_callback and chunk_count % 100 == 0 and range_size:
+                done = bytes_read if f is raw else raw.tell()
+                progress_callback(done / range_size, done, range_size)
+
+    def follow_file(
+        self,
+        file_path: str,
+        checkpoint: Optional[TailCheckpoint] = None,
+        poll_interval: float = 1.0,
+        stop_event=None,
+        idle_timeout: Optional[float] = None,
+    ) -> Iterator[BaseEvent]:
+        """
+        Parse a combat log as it is being written.
 
-                # Process complete lines
-                lines = line_buffer.split('\n')
-                line_buffer = lines[-1]  # Keep incomplete line for next iteration
+        Only complete lines appended since the checkpoint are parsed; the
+        tailer (and its current checkpoint) is available as self.tailer.
 
-                for line in lines[:-1]:
-                    yield from self._process_line(line)
+        Args:
+            file_path: Combat log file or WoW Logs directory to follow
+            checkpoint: Position to resume from (start of the file if None)
+            poll_interval: Seconds between polls for new data
+            stop_event: Optional threading.Event that ends following when set
+            idle_timeout: Stop after this many seconds without new data
 
-                # Update progress
-                if progress_callback and chunk_count % 100 == 0:
-                    progress = bytes_read / file_size
-                    progress_callback(progress, bytes_read, file_size)
+        Yields:
+            BaseEvent objects for new lines
+        """
+        self.tailer = LogTailer(file_path, checkpoint=checkpoint, poll_interval=poll_interval)
 
-        logger.info(f"Completed parsing {self.current_file.name}: "
-                   f"{self.events_processed} events, {len(self.parse_errors)} errors")
+        for lines in self.tailer.follow(stop_event, idle_timeout):
+            self.current_file = Path(self.tailer.checkpoint.path)
+            for line, offset, length in lines:
+                yield from self._process_line(line, offset, length)
 
-    def _process_line(self, line: str) -> Iterator[BaseEvent]:
+    def _process_line(
+        self, line: str, offset: Optional[int] = None, length: Optional[int] = None
+    ) -> Iterator[BaseEvent]:
         """
         Process a single line and yield event if valid.
 
         Args:
             line: Raw line from combat log
+            offset: Byte offset of the line in the file, if known
+            length: Length of the line in bytes, if known
 
         Yields:
             BaseEvent if line parses successfully
@@ -110,9 +301,21 @@ class CombatLogParser:
             if not parsed_line:
                 return
 
+            if self.raw_line_mode != "keep":
+                parsed_line.raw_line = ""
+
             # Create event object
-            event = self.event_factory.create_event(parsed_line)
+            event = self.event_factory.create_event(
+                parsed_line,
+                lazy=self.lazy_events,
+                compact=self.compact_events,
+                string_pool=self.string_pool,
+                profile=self.event_profile,
+            )
             if event:
+                if self.raw_line_mode == "offset" and offset is not None:
+                    event.raw_offset = offset
+                    event.raw_length = length
                 self.events_processed += 1
                 yield event
 
@@ -151,12 +354,18 @@ class CombatLogParser:
             'file': str(self.current_file) if self.current_file else None,
             'events_processed': self.events_processed,
             'parse_errors': len(self.parse_errors),
-            'tokenizer_stats': self.tokenizer.get_stats()
+            'tokenizer_stats': self.tokenizer.get_stats(),
+            'string_pool_stats': self.string_pool.get_stats() if self.string_pool else None,
+            'event_profile': self.event_profile.get_stats() if self.event_profile else None,
         }
 
     def reset(self):
         """Reset parser state for new file."""
-        self.tokenizer = LineTokenizer()
+        self.tokenizer = LineTokenizer(fast_mode=self.fast_tokenizer)
+        if self.string_pool is not None:
+            self.string_pool.clear()
+        if self.event_profile is not None:
+            self.event_profile.clear()
         self.events_processed = 0
         self.parse_errors = []
         self.current_file = None
@@ -199,4 +408,89 @@ class StreamingParser:
 
         # Process remaining events
         if chunk:
-            event_handler(chunk)
\ No newline at end of file
+            event_handler(chunk)
+
+
+class BatchParser:
+    """
+    Columnar parser for vectorized processing of large combat log files.
+
+    Emits EventBatch objects (NumPy columns for timestamp, event type, source/dest
+    id, spell id, amounts and flags) instead of one object per event. Codes for
+    GUIDs and event types are shared by all batches from one parser.
+    """
+
+    def __init__(self, batch_size: int = 100000, buffer_size: int = 65536):
+        """
+        Initialize batch parser.
+
+        Args:
+            batch_size: Number of events per emitted batch
+            buffer_size: Size of read buffer for file streaming
+        """
+        self.parser = CombatLogParser(buffer_size=buffer_size)
+        self.builder = EventBatchBuilder()
+        self.batch_size = batch_size
+        self.events_processed = 0
+        self.batches_emitted = 0
+
+    def iter_batches(self, file_path: str, progress_callback=None) -> Iterator[EventBatch]:
+        """
+        Parse a file and yield columnar batches.
+
+        Args:
+            file_path: Path to combat log file
+            progress_callback: Optional progress callback
+
+        Yields:
+            EventBatch objects of up to batch_size events
+        """
+        tokenizer = self.parser.tokenizer
+        builder = self.builder
+
+        for line, _, _ in self.parser.iter_file_lines(file_path, progress_callback):
+            parsed_line = tokenizer.parse_line(line)
+            if not parsed_line:
+                continue
+
+            builder.add(parsed_line)
+            if len(builder) >= self.batch_size:
+                yield self._emit()
+
+        if len(builder):
+            yield self._emit()
+
+    def parse_file(self, file_path: str, progress_callback=None) -> EventBatch:
+        """
+        Parse a whole file into a single batch.
+
+        Args:
+            file_path: Path to combat log file
+            progress_callback: Optional progress callback
+
+        Returns:
+            EventBatch with every event in the file
+        """
+        return EventBatch.concatenate(self.iter_batches(file_path, progress_callback))
+
+    def _emit(self) -> EventBatch:
+        """Build the buffered rows into a batch."""
+        batch = self.builder.build()
+        self.events_processed += len(batch)
+        self.batches_emitted += 1
+        return batch
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get parsing statistics.
+
+        Returns:
+            Dictionary with parsing stats
+        """
+        return {
+            'events_processed': self.events_processed,
+            'batches_emitted': self.batches_emitted,
+            'unique_guids': len(self.builder.guids),
+            'event_types': len(self.builder.event_types),
+            'tokenizer_stats': self.parser.tokenizer.get_stats(),
+        }
@@ -0,0 +1,70 @@
+"""
+String interning for repeated combat log values.
+"""
+
+import sys
+from typing import Any, Dict
+
+
+class StringPool:
+    """
+    Deduplicates strings that repeat across a parse session.
+
+    GUIDs, player names and spell names appear on a large fraction of all lines,
+    but every tokenized line produces fresh string objects for them. Passing
+    them through the pool makes all events share a single copy of each value,
+    so retained events (e.g. CharacterEventStream.all_events) stop holding
+    thousands of duplicates. The pool lives as long as the parser that owns it.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._strings: Dict[str, str] = {}
+        self.lookups = 0
+        self.hits = 0
+        self.bytes_saved = 0
+
+    def intern(self, value: Any) -> Any:
+        """
+        Get the pooled copy of a string.
+
+        Args:
+            value: String to intern; None and non-string values are returned as is
+
+        Returns:
+            The shared copy of the string
+        """
+        if value.__class__ is not str:
+            return value
+
+        self.lookups += 1
+        pooled = self._strings.setdefault(value, value)
+        if pooled is not value:
+            self.hits += 1
+            self.bytes_saved += sys.getsizeof(value)
+        return pooled
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def clear(self):
+        """Drop all pooled strings and reset statistics."""
+        self._strings.clear()
+        self.lookups = 0
+        self.hits = 0
+        self.bytes_saved = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+
+        Returns:
+            Dictionary with pool size, lookups, hit rate and bytes saved
+        """
+        return {
+            "unique_strings": len(self._strings),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -0,0 +1,277 @@
+"""
+Tail-follow reading of a combat log that is still being written.
+
+LogTailer keeps a byte offset checkpoint and only reads complete lines appended
+since the last poll, so each refresh costs O(new bytes). It notices when WoW
+truncates the log or starts a new file and restarts from the beginning of it.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tuples of (decoded line, byte offset, length in bytes), as from iter_file_lines
+TailLine = Tuple[str, int, int]
+
+
+@dataclass
+class TailCheckpoint:
+    """Position in a followed log file."""
+
+    path: str
+    offset: int = 0  # Byte offset just past the last complete line read
+    inode: Optional[int] = None
+    head_size: int = 0  # Number of leading bytes covered by head_hash
+    head_hash: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TailCheckpoint":
+        """Create a checkpoint from a dictionary."""
+        return cls(**data)
+
+    def save(self, checkpoint_file: Path):
+        """Write the checkpoint to a JSON file, replacing it atomically."""
+        checkpoint_file = Path(checkpoint_file)
+        tmp_file = checkpoint_file.with_suffix(checkpoint_file.suffix + ".tmp")
+        tmp_file.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        os.replace(tmp_file, checkpoint_file)
+
+    @classmethod
+    def load(cls, checkpoint_file: Path) -> Optional["TailCheckpoint"]:
+        """Read a checkpoint file, or None if it does not exist or is invalid."""
+        try:
+            return cls.from_dict(json.loads(Path(checkpoint_file).read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f"No usable tail checkpoint in {checkpoint_file}: {e}")
+            return None
+
+
+class LogTailer:
+    """
+    Polls a combat log for appended lines.
+
+    The path may be a log file or the WoW Logs directory; for a directory the
+    most recently modified file matching the pattern is followed, and the
+    tailer switches over when WoW starts a new one.
+    """
+
+    HEAD_BYTES = 4096
+
+    def __init__(
+        self,
+        path: str,
+        checkpoint: Optional[TailCheckpoint] = None,
+        poll_interval: float = 1.0,
+        read_size: int = 1024 * 1024,
+        pattern: str = "WoWCombatLog*.txt",
+    ):
+        """
+        Initialize the tailer.
+
+        Args:
+            path: Combat log file, or directory containing combat logs
+            checkpoint: Position to resume from (start of the file if None)
+            poll_interval: Seconds to wait between polls when no data arrived
+            read_size: Bytes to read per read call
+            pattern: Glob for log files when path is a directory
+        """
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.read_size = read_size
+        self.pattern = pattern
+        self.checkpoint = checkpoint
+
+        # Unterminated line after checkpoint.offset, kept so it is not read twice
+        self._partial = b""
+
+        # Statistics
+        self.polls = 0
+        self.lines_read = 0
+        self.bytes_read = 0
+        self.rotations = 0
+
+    def _current_file(self) -> Optional[Path]:
+        """Get the log file that should be followed now."""
+        if not self.path.is_dir():
+            return self.path if self.path.exists() else None
+
+        candidates = [p for p in self.path.glob(self.pattern) if p.is_file()]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda p: p.stat().st_mtime)
+
+    def _head_hash(self, f, size: int) -> str:
+        """Hash the first size bytes of an open file."""
+        f.seek(0)
+        return hashlib.md5(f.read(size)).hexdigest()
+
+    def _is_rotated(self, f, stat: os.stat_result) -> bool:
+        """Check whether the checkpointed file was truncated or replaced."""
+        checkpoint = self.checkpoint
+        if checkpoint.inode is not None and stat.st_ino != checkpoint.inode:
+            return True
+        if stat.st_size < checkpoint.offset:
+            return True
+        if (
+            checkpoint.head_size
+            and self._head_hash(f, checkpoint.head_size) != checkpoint.head_hash
+        ):
+            return True
+        return False
+
+    def _restart(self, file_path: Path, reason: str):
+        """Start reading a file from the beginning."""
+        if self.checkpoint is not None:
+            self.rotations += 1
+            logger.info(f"Combat log {reason}, restarting at {file_path.name}")
+        self.checkpoint = TailCheckpoint(path=str(file_path))
+        self._partial = b""
+
+    def read_new_lines(self, include_partial: bool = False) -> List[TailLine]:
+        """
+        Read complete lines appended since the last call.
+
+        A trailing line without a newline is left for the next call unless
+        include_partial is set (for a final read of a file that is done).
+
+        Args:
+            include_partial: Also return an unterminated last line
+
+        Returns:
+            List of (decoded line, byte offset, length in bytes)
+        """
+        self.polls += 1
+        file_path = self._current_file()
+        if file_path is None:
+            return []
+
+        if self.checkpoint is None:
+            self._restart(file_path, "opened")
+        elif Path(self.checkpoint.path) != file_path:
+            self._restart(file_path, "switched to new file")
+
+        lines = []
+        with open(file_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if self._is_rotated(f, stat):
+                self._restart(file_path, "truncated or replaced")
+
+            checkpoint = self.checkpoint
+            checkpoint.inode = stat.st_ino
+            offset = checkpoint.offset
+            f.seek(offset + len(self._partial))
+
+            line_buffer = self._partial
+            remaining = stat.st_size - offset - len(line_buffer)
+            while remaining > 0:
+                chunk = f.read(min(self.read_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                self.bytes_read += len(chunk)
+
+                parts = (line_buffer + chunk).split(b"\n")
+                line_buffer = parts.pop()
+                for line in parts:
+                    lines.append(
+                        (line.rstrip(b"\r").decode("utf-8", errors="ignore"), offset, len(line))
+                    )
+                    offset += len(line) + 1
+
+            if include_partial and line_buffer:
+                lines.append(
+                    (
+                        line_buffer.rstrip(b"\r").decode("utf-8", errors="ignore"),
+                        offset,
+                        len(line_buffer),
+                    )
+                )
+                offset += len(line_buffer)
+                line_buffer = b""
+
+            self._partial = line_buffer
+            checkpoint.offset = offset
+            if checkpoint.head_size < self.HEAD_BYTES and offset > checkpoint.head_size:
+                checkpoint.head_size = min(offset, self.HEAD_BYTES)
+                checkpoint.head_hash = self._head_hash(f, checkpoint.head_size)
+
+        self.lines_read += len(lines)
+        return lines
+
+    def follow(
+        self, stop_event=None, idle_timeout: Optional[float] = None
+    ) -> Iterator[List[TailLine]]:
+        """
+        Yield batches of new lines as the log grows.
+
+        Args:
+            stop_event: Optional threading.Event that ends following when set
+            idle_timeout: Stop after this many seconds without new data
+
+        Yields:
+            Non-empty lists of (decoded line, byte offset, length in bytes)
+        """
+        last_data = time.monotonic()
+        while stop_event is None or not stop_event.is_set():
+            lines = self.read_new_lines()
+            if lines:
+                last_data = time.monotonic()
+                yield lines
+                continue
+
+            if idle_timeout is not None and time.monotonic() - last_data >= idle_timeout:
+                break
+            time.sleep(self.poll_interval)
+
+    async def follow_async(
+        self, stop_event: Optional[asyncio.Event] = None, idle_timeout: Optional[float] = None
+    ) -> AsyncIterator[List[TailLine]]:
+        """
+        Async version of follow() for use in event loops.
+
+        Args:
+            stop_event: Optional asyncio.Event that ends following when set
+            idle_timeout: Stop after this many seconds without new data
+
+        Yields:
+            Non-empty lists of (decoded line, byte offset, length in bytes)
+        """
+        last_data = time.monotonic()
+        while stop_event is None or not stop_event.is_set():
+            lines = self.read_new_lines()
+            if lines:
+                last_data = time.monotonic()
+                yield lines
+                continue
+
+            if idle_timeout is not None and time.monotonic() - last_data >= idle_timeout:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get tailing statistics.
+
+        Returns:
+            Dictionary with poll, line, byte and rotation counts
+        """
+        return {
+            "file": self.checkpoint.path if self.checkpoint else None,
+            "offset": self.checkpoint.offset if self.checkpoint else 0,
+            "polls": self.polls,
+            "lines_read": self.lines_read,
+            "bytes_read": self.bytes_read,
+            "rotations": self.rotations,
+        }
@@ -0,0 +1,118 @@
+"""
+Cached timestamp decoding for WoW combat log lines.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+
+class TimestampDecoder:
+    """
+    Decodes combat log timestamps like "9/18/2025 20:23:42.758-4".
+
+    Consecutive lines almost always share the same date, hour and minute, so the
+    "M/D/YYYY HH:MM" prefix is parsed with strptime once and cached; each line then
+    only decodes its seconds and milliseconds. Alongside the datetime, an epoch
+    float is produced so downstream code can work with plain numbers.
+
+    The trailing UTC offset ("-4", "+2") is always parsed. With tz_aware=True the
+    returned datetimes carry that offset and epochs are true UTC; by default
+    datetimes stay naive (matching the previous behaviour) and epochs equal
+    datetime.timestamp() of the naive value.
+    """
+
+    PREFIX_FORMAT = "%m/%d/%Y %H:%M"
+
+    def __init__(self, tz_aware: bool = False):
+        """
+        Initialize the decoder.
+
+        Args:
+            tz_aware: Attach the log's UTC offset to decoded datetimes
+        """
+        self.tz_aware = tz_aware
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        # Single-entry cache for the current minute
+        self._cached_key: Optional[Tuple[str, str]] = None
+        self._cached_fields: Tuple = ()
+        self._cached_epoch = 0.0
+        self._timezones: Dict[int, timezone] = {}
+
+    def decode(self, timestamp_str: str) -> Tuple[datetime, float, int]:
+        """
+        Decode a timestamp string.
+
+        Args:
+            timestamp_str: Timestamp as written in the log, including the offset
+
+        Returns:
+            Tuple of (datetime, epoch seconds, UTC offset in hours)
+
+        Raises:
+            ValueError: If the timestamp is malformed
+        """
+        colon = timestamp_str.rfind(":")
+        if colon == -1:
+            raise ValueError(f"Invalid timestamp: {timestamp_str}")
+
+        prefix = timestamp_str[:colon]
+        rest = timestamp_str[colon + 1 :]  # "42.758-4"
+        offset_str = rest[6:]
+
+        if rest[2:3] != "." or not offset_str:
+            raise ValueError(f"Invalid timestamp: {timestamp_str}")
+
+        seconds = int(rest[0:2])
+        millis = int(rest[3:6])
+        utc_offset = int(offset_str)
+
+        key = (prefix, offset_str)
+        if key != self._cached_key:
+            self.cache_misses += 1
+            base = datetime.strptime(prefix, self.PREFIX_FORMAT)
+            tzinfo = self._get_timezone(utc_offset) if self.tz_aware else None
+            base = base.replace(tzinfo=tzinfo)
+            self._cached_fields = (
+                base.year, base.month, base.day, base.hour, base.minute, tzinfo
+            )
+            self._cached_epoch = base.timestamp()
+            self._cached_key = key
+        else:
+            self.cache_hits += 1
+
+        year, month, day, hour, minute, tzinfo = self._cached_fields
+        timestamp = datetime(year, month, day, hour, minute, seconds, millis * 1000, tzinfo)
+        epoch = self._cached_epoch + seconds + millis / 1000.0
+
+        return timestamp, epoch, utc_offset
+
+    def decode_epoch(self, timestamp_str: str) -> float:
+        """
+        Decode a timestamp string straight to epoch seconds.
+
+        Args:
+            timestamp_str: Timestamp as written in the log, including the offset
+
+        Returns:
+            Epoch seconds
+        """
+        return self.decode(timestamp_str)[1]
+
+    def _get_timezone(self, utc_offset: int) -> timezone:
+        """Get a (shared) fixed-offset timezone for an offset in hours."""
+        tz = self._timezones.get(utc_offset)
+        if tz is None:
+            tz = timezone(timedelta(hours=utc_offset))
+            self._timezones[utc_offset] = tz
+        return tz
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get prefix cache statistics.
+
+        Returns:
+            Dictionary with cache hits and misses
+        """
+        return {"cache_hits": self.cache_hits, "cache_misses": self.cache_misses}
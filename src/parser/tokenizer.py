@@ -4,9 +4,11 @@ Line tokenizer for parsing WoW combat log lines.
 
 import re
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Union
 from dataclasses import dataclass
 
+from .timestamps import TimestampDecoder
+
 
 @dataclass
 class ParsedLine:
@@ -19,6 +21,8 @@ class ParsedLine:
     suffix_params: List[Any]
     advanced_params: Dict[str, Any]
     raw_line: str
+    epoch: Optional[float] = None  # Seconds since epoch, equal to timestamp.timestamp()
+    utc_offset: int = 0  # Hours, from the "-4"/"+2" timestamp suffix
 
 
 class LineTokenizer:
@@ -37,23 +41,41 @@ class LineTokenizer:
     # Standard base parameter count (after event type)
     BASE_PARAM_COUNT = 8  # sourceGUID through destRaidFlags
 
-    def __init__(self):
+    # Bare words that float() accepts (compared lowercase)
+    FLOAT_WORDS = {"nan", "inf", "infinity"}
+
+    def __init__(self, fast_mode: bool = True, tz_aware: bool = False):
+        """
+        Initialize the tokenizer.
+
+        Args:
+            fast_mode: Split and convert flat lines in a single pass, only using the
+                bracket/paren-aware splitter for lines containing '[' or '('
+            tz_aware: Produce timezone-aware timestamps using the log's UTC offset
+        """
+        self.fast_mode = fast_mode
+        self.timestamp_decoder = TimestampDecoder(tz_aware=tz_aware)
         self.line_count = 0
         self.error_count = 0
+        self.fast_path_count = 0
+        self.slow_path_count = 0
         self.advanced_logging_enabled = False
 
-    def parse_line(self, line: str) -> Optional[ParsedLine]:
+    def parse_line(self, line: Union[str, bytes]) -> Optional[ParsedLine]:
         """
         Parse a single combat log line into structured components.
 
         Args:
-            line: Raw line from combat log file
+            line: Raw line from combat log file (str or undecoded bytes)
 
         Returns:
             ParsedLine object or None if parsing fails
         """
         self.line_count += 1
 
+        if isinstance(line, (bytes, bytearray)):
+            line = line.decode("utf-8", errors="ignore")
+
         # Strip any trailing whitespace
         line = line.rstrip()
 
@@ -72,15 +94,18 @@ class LineTokenizer:
         # Parse timestamp
         try:
             # Convert timestamp format "9/18/2025 20:23:42.758-4" to datetime
-            # Remove timezone for simplicity (can add pytz later if needed)
-            timestamp_clean = timestamp_str.rsplit("-", 1)[0].rsplit("+", 1)[0]
-            timestamp = datetime.strptime(timestamp_clean, "%m/%d/%Y %H:%M:%S.%f")
+            timestamp, epoch, utc_offset = self.timestamp_decoder.decode(timestamp_str)
         except ValueError:
             self.error_count += 1
             return None
 
         # Split the rest by commas
-        params = self._split_params(rest)
+        params = self._split_params_fast(rest) if self.fast_mode else None
+        if params is None:
+            self.slow_path_count += 1
+            params = self._split_params(rest)
+        else:
+            self.fast_path_count += 1
         if not params:
             self.error_count += 1
             return None
@@ -136,6 +161,8 @@ class LineTokenizer:
             suffix_params=suffix_params,
             advanced_params={},  # Will be populated by event-specific parsers
             raw_line=line,
+            epoch=epoch,
+            utc_offset=utc_offset,
         )
 
     def _split_params(self, params_str: str) -> List[str]:
@@ -203,6 +230,96 @@ class LineTokenizer:
 
         return cleaned
 
+    def _split_params_fast(self, params_str: str) -> Optional[List[Any]]:
+        """
+        Split and convert a flat parameter string in a single pass.
+
+        Produces exactly the same values as _split_params, but splits with C-level
+        str.split instead of walking the line character by character. Quoted
+        fields are handled by splitting on quote characters first, so commas
+        inside names do not split the field.
+
+        Args:
+            params_str: Comma-separated parameter string
+
+        Returns:
+            List of parameter values, or None if the line needs the slow path
+            (nested arrays/tuples, escaped quotes or unbalanced quotes)
+        """
+        if "[" in params_str or "(" in params_str:
+            return None
+
+        if '"' not in params_str:
+            fields = params_str.split(",")
+        else:
+            if "\\" in params_str:
+                return None
+
+            pieces = params_str.split('"')
+            if len(pieces) % 2 == 0:
+                # Unbalanced quotes - let the slow path decide
+                return None
+
+            fields = []
+            current = ""
+            for index, piece in enumerate(pieces):
+                if index % 2:
+                    # Inside quotes: commas are part of the field
+                    current += '"' + piece + '"'
+                    continue
+
+                parts = piece.split(",")
+                if len(parts) == 1:
+                    current += piece
+                else:
+                    fields.append(current + parts[0])
+                    fields.extend(parts[1:-1])
+                    current = parts[-1]
+            fields.append(current)
+
+        # The slow path drops an empty trailing field
+        if not fields[-1]:
+            fields.pop()
+
+        convert = self._convert_fast
+        return [convert(field.strip()) for field in fields]
+
+    def _convert_fast(self, param: str) -> Any:
+        """
+        Convert a stripped parameter with the same rules as _split_params.
+
+        Cheap checks on the first character route GUIDs, names and keywords
+        straight through; only numeric-looking values hit int()/float().
+
+        Args:
+            param: Stripped parameter value
+
+        Returns:
+            Converted value
+        """
+        if not param:
+            return param
+
+        first = param[0]
+        if first == '"' and param[-1] == '"':
+            return param[1:-1]
+        if param == "nil":
+            return None
+
+        if first.isalpha():
+            # int() never accepts a leading letter and float() only accepts
+            # nan/inf/infinity, so everything else stays a string
+            if param == "true" or param == "false":
+                return param == "true"
+            if param.lower() in self.FLOAT_WORDS:
+                return float(param)
+            return param
+
+        try:
+            return int(param)
+        except ValueError:
+            return self._convert_param(param)
+
     def _convert_param(self, param: str) -> Any:
         """
         Convert parameter string to appropriate type.
@@ -457,10 +574,14 @@ class LineTokenizer:
         Get parsing statistics.
 
         Returns:
-            Dictionary with line_count and error_count
+            Dictionary with line counts, error count and fast/slow path split
         """
         return {
             "lines_processed": self.line_count,
             "errors": self.error_count,
             "success_rate": (self.line_count - self.error_count) / max(self.line_count, 1),
+            "fast_path_lines": self.fast_path_count,
+            "slow_path_lines": self.slow_path_count,
+            "timestamp_cache_hits": self.timestamp_decoder.cache_hits,
+            "timestamp_cache_misses": self.timestamp_decoder.cache_misses,
         }
@@ -0,0 +1,312 @@
+"""
+Encounter boundary index for combat log files.
+
+Finds CHALLENGE_MODE_* and ENCOUNTER_* marker lines with a single bytes-level
+scan of the memory-mapped log, turns them into top-level boundaries in one
+sorted sweep, and saves the markers next to the log so later runs (or runs on
+a log that has only grown) skip scanning what was already indexed.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Event type directly after the two spaces that follow the timestamp
+MARKER_PATTERN = re.compile(rb"  (CHALLENGE_MODE|ENCOUNTER)_(START|END),")
+
+
+@dataclass
+class EncounterBoundary:
+    """Represents the boundaries of an encounter in the log file."""
+
+    start_byte: int
+    end_byte: int
+    encounter_type: str  # "ENCOUNTER", "CHALLENGE_MODE", or "TRASH"
+    encounter_name: Optional[str] = None
+    encounter_id: Optional[int] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+
+@dataclass
+class BoundaryMarker:
+    """A CHALLENGE_MODE_* or ENCOUNTER_* line in the log."""
+
+    kind: str  # "ENCOUNTER" or "CHALLENGE_MODE"
+    is_start: bool
+    line_start: int
+    line_end: int  # Offset of the terminating newline (or end of file)
+    name: Optional[str] = None
+    encounter_id: Optional[int] = None
+
+
+def parse_marker_fields(kind: str, fields: bytes):
+    """
+    Extract the name and encounter ID following a marker event type.
+
+    ENCOUNTER_START/END lines are encounterID,"encounterName",...;
+    CHALLENGE_MODE_START lines are "zoneName",instanceID,...
+
+    Args:
+        kind: Marker kind
+        fields: Line bytes after the event type and comma
+
+    Returns:
+        Tuple of (name, encounter_id)
+    """
+    encounter_id = None
+    if kind == "ENCOUNTER":
+        id_field, _, fields = fields.partition(b",")
+        if id_field.isdigit():
+            encounter_id = int(id_field)
+
+    name = None
+    if fields.startswith(b'"'):
+        end = fields.find(b'"', 1)
+        if end != -1:
+            name = fields[1:end].decode("utf-8", errors="ignore")
+
+    return name, encounter_id
+
+
+def scan_markers(mm, start: int = 0) -> List[BoundaryMarker]:
+    """
+    Find all boundary marker lines from start to the end of the buffer.
+
+    Args:
+        mm: mmap or bytes of the log
+        start: Offset of a line start to scan from
+
+    Returns:
+        Markers in file order
+    """
+    markers = []
+    size = len(mm)
+
+    for match in MARKER_PATTERN.finditer(mm, start):
+        line_start = mm.rfind(b"\n", 0, match.start()) + 1
+        if mm[line_start : line_start + 1] == b"#":
+            continue
+
+        line_end = mm.find(b"\n", match.end())
+        if line_end == -1:
+            line_end = size
+
+        kind = match.group(1).decode("ascii")
+        is_start = match.group(2) == b"START"
+        name, encounter_id = (None, None)
+        if is_start:
+            name, encounter_id = parse_marker_fields(kind, mm[match.end() : line_end])
+
+        markers.append(
+            BoundaryMarker(
+                kind=kind,
+                is_start=is_start,
+                line_start=line_start,
+                line_end=line_end,
+                name=name,
+                encounter_id=encounter_id,
+            )
+        )
+
+    return markers
+
+
+def build_boundaries(markers: List[BoundaryMarker], file_size: int) -> List[EncounterBoundary]:
+    """
+    Turn markers into top-level boundaries in a single sweep.
+
+    Each Mythic+ run (CHALLENGE_MODE_START to END) is one boundary containing
+    its boss encounters; raid encounters outside a run are their own
+    boundaries. A start without a matching end runs until the next top-level
+    start marker, or the end of the file.
+
+    Args:
+        markers: Markers in file order
+        file_size: Size of the log file
+
+    Returns:
+        Boundaries sorted by start position
+    """
+    boundaries = []
+    challenge_mode = None
+    encounter = None
+
+    for marker in markers:
+        if marker.kind == "CHALLENGE_MODE":
+            if marker.is_start:
+                for unterminated in (challenge_mode, encounter):
+                    if unterminated:
+                        unterminated.end_byte = marker.line_start - 1
+                        boundaries.append(unterminated)
+                encounter = None
+                challenge_mode = EncounterBoundary(
+                    start_byte=marker.line_start,
+                    end_byte=file_size,
+                    encounter_type="CHALLENGE_MODE",
+                    encounter_name=marker.name or "Mythic+",
+                )
+            elif challenge_mode:
+                challenge_mode.end_byte = marker.line_end
+                boundaries.append(challenge_mode)
+                challenge_mode = None
+
+        elif challenge_mode:
+            # Boss encounters inside a Mythic+ run belong to the run
+            continue
+
+        elif marker.is_start:
+            if encounter:
+                encounter.end_byte = marker.line_start - 1
+                boundaries.append(encounter)
+            encounter = EncounterBoundary(
+                start_byte=marker.line_start,
+                end_byte=file_size,
+                encounter_type="ENCOUNTER",
+                encounter_name=marker.name or "Unknown",
+                encounter_id=marker.encounter_id,
+            )
+
+        elif encounter:
+            encounter.end_byte = marker.line_end
+            boundaries.append(encounter)
+            encounter = None
+
+    for unterminated in (challenge_mode, encounter):
+        if unterminated:
+            boundaries.append(unterminated)
+
+    boundaries.sort(key=lambda b: b.start_byte)
+    return boundaries
+
+
+class BoundaryIndex:
+    """
+    Boundary markers of one log file, persisted in a sidecar file.
+
+    The sidecar records how far the log was scanned together with its size,
+    mtime and a hash of its head. An unchanged log is not scanned at all; a
+    log that has grown is only scanned from its previously last line.
+    """
+
+    SIDECAR_SUFFIX = ".boundaries.json"
+    VERSION = 1
+    HEAD_HASH_BYTES = 64 * 1024
+
+    def __init__(self, log_path: Path, persist: bool = True):
+        """
+        Initialize the index.
+
+        Args:
+            log_path: Path to the combat log file
+            persist: Load and save the sidecar file next to the log
+        """
+        self.log_path = Path(log_path)
+        self.sidecar_path = self.log_path.with_name(self.log_path.name + self.SIDECAR_SUFFIX)
+        self.persist = persist
+
+        self.markers: List[BoundaryMarker] = []
+        self.file_size = 0
+        self.bytes_scanned = 0
+        self.loaded_from_sidecar = False
+
+    def get_boundaries(self) -> List[EncounterBoundary]:
+        """
+        Get top-level boundaries, scanning only what the sidecar does not cover.
+
+        Returns:
+            Boundaries sorted by start position
+        """
+        with open(self.log_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.file_size = stat.st_size
+            if self.file_size == 0:
+                return []
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                sidecar = self._load_sidecar(mm, stat) if self.persist else None
+
+                if sidecar and sidecar["mtime_ns"] == stat.st_mtime_ns:
+                    self.markers = sidecar["markers"]
+                elif sidecar:
+                    # Rescan the previously last line, which may have been incomplete
+                    resume = mm.rfind(b"\n", 0, sidecar["file_size"]) + 1
+                    self.markers = [m for m in sidecar["markers"] if m.line_start < resume]
+                    self.markers.extend(scan_markers(mm, resume))
+                    self.bytes_scanned = self.file_size - resume
+                else:
+                    self.markers = scan_markers(mm)
+                    self.bytes_scanned = self.file_size
+
+                if self.persist and (not sidecar or sidecar["mtime_ns"] != stat.st_mtime_ns):
+                    self._save_sidecar(mm, stat)
+
+        return build_boundaries(self.markers, self.file_size)
+
+    def _head_hash(self, mm, size: int) -> str:
+        """Hash the first bytes of the log."""
+        return hashlib.md5(mm[: min(size, self.HEAD_HASH_BYTES)]).hexdigest()
+
+    def _load_sidecar(self, mm, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Load the sidecar if it still describes a prefix of the log."""
+        try:
+            data = json.loads(self.sidecar_path.read_text(encoding="utf-8"))
+            if data.get("version") != self.VERSION:
+                return None
+            if data["file_size"] > stat.st_size:
+                return None
+            unchanged = data["file_size"] == stat.st_size and data["mtime_ns"] == stat.st_mtime_ns
+            if not unchanged and data["head_hash"] != self._head_hash(mm, data["file_size"]):
+                return None
+
+            data["markers"] = [BoundaryMarker(*fields) for fields in data["markers"]]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring boundary index {self.sidecar_path}: {e}")
+            return None
+
+        self.loaded_from_sidecar = True
+        return data
+
+    def _save_sidecar(self, mm, stat: os.stat_result):
+        """Write the markers next to the log; failures only cost a rescan later."""
+        data = {
+            "version": self.VERSION,
+            "file_size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "head_hash": self._head_hash(mm, stat.st_size),
+            "markers": [
+                [m.kind, m.is_start, m.line_start, m.line_end, m.name, m.encounter_id]
+                for m in self.markers
+            ],
+        }
+        tmp_path = self.sidecar_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp_path, self.sidecar_path)
+        except OSError as e:
+            logger.debug(f"Could not write boundary index {self.sidecar_path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get indexing statistics.
+
+        Returns:
+            Dictionary with marker count and bytes scanned in this run
+        """
+        return {
+            "markers": len(self.markers),
+            "file_size": self.file_size,
+            "bytes_scanned": self.bytes_scanned,
+            "loaded_from_sidecar": self.loaded_from_sidecar,
+        }
@@ -0,0 +1,409 @@
+"""
+Persisted index of the encounters in a combat log file.
+
+Built on the BoundaryIndex markers, each top-level encounter (raid pull or
+Mythic+ run) gets its byte range, timestamps, difficulty and participants.
+The index also keeps the pet summons the segmenter would have seen, so pets
+summoned before an encounter are still credited to their owners. Each entry
+has a content fingerprint, so an encounter that was already stored (e.g. from
+an earlier upload of the same log) is recognized without parsing it. The index
+is saved next to the log, so opening one encounter of a large log only needs
+the sidecar and a seek to the encounter's bytes with
+CombatLogParser.parse_encounter().
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..parser.events import ChallengeModeEvent, EncounterEvent, EventFactory
+from ..parser.tokenizer import LineTokenizer
+from .boundary_index import BoundaryIndex, EncounterBoundary
+from .work_planner import scan_summons
+
+logger = logging.getLogger(__name__)
+
+# Player GUID of a COMBATANT_INFO line, sent for everyone in the group at the start
+COMBATANT_PATTERN = re.compile(rb"  COMBATANT_INFO,(Player-[0-9]+-[0-9A-Fa-f]+),")
+# Any player GUID, for ranges logged without COMBATANT_INFO
+PLAYER_GUID_PATTERN = re.compile(rb"Player-[0-9]+-[0-9A-Fa-f]+")
+
+
+@dataclass
+class IndexedEncounter:
+    """One top-level encounter of a log and where to find it."""
+
+    encounter_type: str  # "ENCOUNTER" or "CHALLENGE_MODE"
+    name: str
+    start_byte: int
+    end_byte: int
+    encounter_id: Optional[int] = None
+    difficulty_id: Optional[int] = None
+    keystone_level: Optional[int] = None
+    pull_number: int = 1  # Pull of this boss in the log; raid encounters only
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    participants: List[str] = field(default_factory=list)
+    event_count: int = 0  # Lines in the encounter's byte range
+
+    @property
+    def fingerprint(self) -> str:
+        """Identify the encounter by its content, independent of its place in the log."""
+        return encounter_fingerprint(
+            self.encounter_type,
+            self.encounter_id,
+            self.start_time,
+            self.participants,
+            self.event_count,
+        )
+
+    @property
+    def duration(self) -> float:
+        """Seconds between the first and last line of the encounter."""
+        if self.start_time and self.end_time:
+            return (self.end_time - self.start_time).total_seconds()
+        return 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        data = asdict(self)
+        for key in ("start_time", "end_time"):
+            if data[key] is not None:
+                data[key] = data[key].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndexedEncounter":
+        """Create from a dictionary written by to_dict()."""
+        data = dict(data)
+        for key in ("start_time", "end_time"):
+            if data.get(key) is not None:
+                data[key] = datetime.fromisoformat(data[key])
+        return cls(**data)
+
+
+def encounter_fingerprint(
+    encounter_type: str,
+    encounter_id: Optional[int],
+    start_time: Optional[datetime],
+    participants: List[str],
+    event_count: int,
+) -> str:
+    """
+    Fingerprint an encounter for duplicate detection.
+
+    Args:
+        encounter_type: "ENCOUNTER" or "CHALLENGE_MODE"
+        encounter_id: Encounter ID (challenge mode ID for Mythic+ runs)
+        start_time: Timestamp of the encounter's first line
+        participants: Player GUIDs taking part, in any order
+        event_count: Lines in the encounter
+
+    Returns:
+        SHA-256 hex digest of the fields
+    """
+    key = "|".join(
+        [
+            encounter_type,
+            str(encounter_id),
+            start_time.isoformat() if start_time else "",
+            ",".join(sorted(participants)),
+            str(event_count),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def count_lines(mm, start: int, end: int) -> int:
+    """Count the lines between start and end (inclusive of a final unterminated line)."""
+    if end <= start:
+        return 0
+    data = mm[start:end]
+    return data.count(b"\n") + (0 if data.endswith(b"\n") else 1)
+
+
+def _line_at(mm, start: int, end: int) -> str:
+    """Decode the line starting at start, without reading past end."""
+    line_end = mm.find(b"\n", start, end)
+    return mm[start : line_end if line_end != -1 else end].decode("utf-8", errors="ignore")
+
+
+def _last_line_start(mm, start: int, end: int) -> int:
+    """Offset of the last non-empty line between start and end."""
+    while end > start and mm[end - 1 : end] in (b"\n", b"\r"):
+        end -= 1
+    return mm.rfind(b"\n", start, end) + 1
+
+
+def scan_participants(mm, start: int, end: int) -> List[str]:
+    """
+    Find the players taking part in an encounter.
+
+    Args:
+        mm: mmap or bytes of the log
+        start: Offset of the encounter's first line
+        end: Offset the encounter ends at
+
+    Returns:
+        Player GUIDs in order of first appearance
+    """
+    guids = [m.group(1) for m in COMBATANT_PATTERN.finditer(mm, start, end)]
+    if not guids:
+        guids = [m.group(0) for m in PLAYER_GUID_PATTERN.finditer(mm, start, end)]
+    return [guid.decode("ascii") for guid in dict.fromkeys(guids)]
+
+
+class EncounterIndex:
+    """
+    Encounter index of one log file, persisted in a sidecar file.
+
+    An unchanged log is served from the sidecar without being read. After the
+    log changes, boundaries come from the (incremental) BoundaryIndex and
+    entries whose byte range is unchanged are reused from the sidecar, so only
+    new or grown encounters are scanned.
+    """
+
+    SIDECAR_SUFFIX = ".encounters.json"
+    VERSION = 2
+
+    def __init__(self, log_path: Path, persist: bool = True):
+        """
+        Initialize the index.
+
+        Args:
+            log_path: Path to the combat log file
+            persist: Load and save the sidecar file next to the log
+        """
+        self.log_path = Path(log_path)
+        self.sidecar_path = self.log_path.with_name(self.log_path.name + self.SIDECAR_SUFFIX)
+        self.persist = persist
+
+        self.encounters: List[IndexedEncounter] = []
+        # (line offset, summoned GUID, (owner GUID, owner name)) in file order
+        self.summons: List[Tuple[int, str, Tuple[str, str]]] = []
+        self.encounters_scanned = 0
+        self.loaded_from_sidecar = False
+
+    def get_encounters(self) -> List[IndexedEncounter]:
+        """
+        Get the indexed encounters, building only what the sidecar does not cover.
+
+        Returns:
+            Encounters sorted by start position
+        """
+        stat = self.log_path.stat()
+        sidecar = self._load_sidecar() if self.persist else None
+        if (
+            sidecar
+            and sidecar["file_size"] == stat.st_size
+            and sidecar["mtime_ns"] == stat.st_mtime_ns
+        ):
+            self.loaded_from_sidecar = True
+            self.encounters = sidecar["encounters"]
+            self.summons = sidecar["summons"]
+            return self.encounters
+
+        if stat.st_size == 0:
+            self.encounters = []
+            self.summons = []
+            return self.encounters
+
+        boundaries = BoundaryIndex(self.log_path, persist=self.persist).get_boundaries()
+
+        with open(self.log_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                known: Dict[Tuple[str, int, int], IndexedEncounter] = {}
+                self.summons = []
+                resume = 0
+                if sidecar and sidecar["file_size"] <= len(mm):
+                    if sidecar["head_hash"] == self._head_hash(mm, sidecar["file_size"]):
+                        self.loaded_from_sidecar = True
+                        known = {
+                            (e.encounter_type, e.start_byte, e.end_byte): e
+                            for e in sidecar["encounters"]
+                        }
+                        # Rescan the previously last line, which may have been incomplete
+                        resume = mm.rfind(b"\n", 0, sidecar["file_size"]) + 1
+                        self.summons = [s for s in sidecar["summons"] if s[0] < resume]
+
+                self.summons.extend(scan_summons(mm, boundaries, resume))
+                self.encounters = self._build(mm, boundaries, known)
+                if self.persist:
+                    self._save_sidecar(mm, stat)
+
+        return self.encounters
+
+    def _build(
+        self,
+        mm,
+        boundaries: List[EncounterBoundary],
+        known: Dict[Tuple[str, int, int], IndexedEncounter],
+    ) -> List[IndexedEncounter]:
+        """Create an entry per top-level boundary, reusing known entries."""
+        tokenizer = LineTokenizer()
+        event_factory = EventFactory()
+        pull_counts: Dict[int, int] = {}
+        encounters = []
+
+        for boundary in boundaries:
+            if boundary.encounter_type not in ("ENCOUNTER", "CHALLENGE_MODE"):
+                continue
+
+            entry = known.get((boundary.encounter_type, boundary.start_byte, boundary.end_byte))
+            if entry is None:
+                entry = self._scan_entry(mm, boundary, tokenizer, event_factory)
+                self.encounters_scanned += 1
+
+            # Same numbering as UnifiedSegmenter: raid pulls per boss, in file order
+            if entry.encounter_type == "ENCOUNTER":
+                count = pull_counts.get(entry.encounter_id, 0) + 1
+                pull_counts[entry.encounter_id] = count
+                entry.pull_number = count
+
+            encounters.append(entry)
+
+        return encounters
+
+    def _scan_entry(
+        self,
+        mm,
+        boundary: EncounterBoundary,
+        tokenizer: LineTokenizer,
+        event_factory: EventFactory,
+    ) -> IndexedEncounter:
+        """Read the details of one encounter from the log."""
+        end = min(boundary.end_byte, len(mm))
+        entry = IndexedEncounter(
+            encounter_type=boundary.encounter_type,
+            name=boundary.encounter_name or "Unknown",
+            start_byte=boundary.start_byte,
+            end_byte=boundary.end_byte,
+            encounter_id=boundary.encounter_id,
+        )
+
+        parsed_line = tokenizer.parse_line(_line_at(mm, boundary.start_byte, end))
+        if parsed_line:
+            entry.start_time = parsed_line.timestamp
+            event = event_factory.create_event(parsed_line)
+            if isinstance(event, EncounterEvent):
+                entry.difficulty_id = event.difficulty_id
+            elif isinstance(event, ChallengeModeEvent):
+                entry.encounter_id = event.challenge_id
+                entry.keystone_level = event.keystone_level
+
+        parsed_line = tokenizer.parse_line(
+            _line_at(mm, _last_line_start(mm, boundary.start_byte, end), end)
+        )
+        if parsed_line:
+            entry.end_time = parsed_line.timestamp
+
+        entry.participants = scan_participants(mm, boundary.start_byte, end)
+        entry.event_count = count_lines(mm, boundary.start_byte, min(end + 1, len(mm)))
+        return entry
+
+    def _head_hash(self, mm, size: int) -> str:
+        """Hash the first bytes of the log."""
+        return hashlib.md5(mm[: min(size, BoundaryIndex.HEAD_HASH_BYTES)]).hexdigest()
+
+    def _load_sidecar(self) -> Optional[Dict[str, Any]]:
+        """Load the sidecar, if there is a readable one of this version."""
+        try:
+            data = json.loads(self.sidecar_path.read_text(encoding="utf-8"))
+            if data.get("version") != self.VERSION:
+                return None
+            if not {"file_size", "mtime_ns", "head_hash"} <= data.keys():
+                return None
+            data["encounters"] = [IndexedEncounter.from_dict(e) for e in data["encounters"]]
+            data["summons"] = [
+                (offset, guid, (owner_guid, owner_name))
+                for offset, guid, owner_guid, owner_name in data["summons"]
+            ]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring encounter index {self.sidecar_path}: {e}")
+            return None
+        return data
+
+    def _save_sidecar(self, mm, stat: os.stat_result):
+        """Write the entries next to the log; failures only cost a rescan later."""
+        data = {
+            "version": self.VERSION,
+            "file_size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "head_hash": self._head_hash(mm, stat.st_size),
+            "encounters": [e.to_dict() for e in self.encounters],
+            "summons": [
+                [offset, guid, owner_guid, owner_name]
+                for offset, guid, (owner_guid, owner_name) in self.summons
+            ],
+        }
+        tmp_path = self.sidecar_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp_path, self.sidecar_path)
+        except OSError as e:
+            logger.debug(f"Could not write encounter index {self.sidecar_path}: {e}")
+
+    def pet_owners_before(self, encounter: IndexedEncounter) -> Dict[str, Tuple[str, str]]:
+        """
+        Get the pet owners the segmenter knows when an encounter starts.
+
+        Args:
+            encounter: Entry from get_encounters()
+
+        Returns:
+            Dictionary of summoned GUID to (owner GUID, owner name)
+        """
+        return {
+            guid: owner for offset, guid, owner in self.summons if offset < encounter.start_byte
+        }
+
+    def find(
+        self,
+        name: Optional[str] = None,
+        encounter_id: Optional[int] = None,
+        pull_number: Optional[int] = None,
+    ) -> List[IndexedEncounter]:
+        """
+        Find indexed encounters by name, encounter ID or pull number.
+
+        Args:
+            name: Case-insensitive substring of the encounter name
+            encounter_id: Encounter ID (challenge mode ID for Mythic+ runs)
+            pull_number: Pull number of a raid encounter
+
+        Returns:
+            Matching encounters in file order
+        """
+        matches = []
+        for entry in self.encounters or self.get_encounters():
+            if name is not None and name.lower() not in entry.name.lower():
+                continue
+            if encounter_id is not None and entry.encounter_id != encounter_id:
+                continue
+            if pull_number is not None and entry.pull_number != pull_number:
+                continue
+            matches.append(entry)
+        return matches
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get indexing statistics.
+
+        Returns:
+            Dictionary with encounter count and entries scanned in this run
+        """
+        return {
+            "encounters": len(self.encounters),
+            "summons": len(self.summons),
+            "encounters_scanned": self.encounters_scanned,
+            "loaded_from_sidecar": self.loaded_from_sidecar,
+        }
@@ -0,0 +1,151 @@
+"""
+Live parsing of a combat log while a raid is in progress.
+
+Each poll reads only the lines appended since the last one and feeds them into
+a long-lived UnifiedSegmenter, so refreshing live analysis does not re-read the
+whole file.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..parser.events import EventFactory
+from ..parser.tail import LogTailer, TailCheckpoint
+from ..parser.tokenizer import LineTokenizer
+from ..segmentation.unified_segmenter import UnifiedSegmenter
+from ..models.unified_encounter import UnifiedEncounter
+
+logger = logging.getLogger(__name__)
+
+
+class LiveLogParser:
+    """
+    Follows a combat log and keeps segmented encounters up to date.
+
+    Resuming from a checkpoint skips the data before it, so a checkpoint file
+    is meant for processes that already handled that part (e.g. stored it).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        checkpoint: Optional[TailCheckpoint] = None,
+        checkpoint_file: Optional[Path] = None,
+        poll_interval: float = 1.0,
+    ):
+        """
+        Initialize the live parser.
+
+        Args:
+            path: Combat log file or WoW Logs directory to follow
+            checkpoint: Position to resume from (loaded from checkpoint_file if None)
+            checkpoint_file: JSON file the checkpoint is written to after each poll
+            poll_interval: Seconds between polls for new data
+        """
+        self.checkpoint_file = Path(checkpoint_file) if checkpoint_file else None
+        if checkpoint is None and self.checkpoint_file:
+            checkpoint = TailCheckpoint.load(self.checkpoint_file)
+
+        self.tailer = LogTailer(path, checkpoint=checkpoint, poll_interval=poll_interval)
+        self.tokenizer = LineTokenizer()
+        self.segmenter = UnifiedSegmenter()
+
+        self.total_events = 0
+        self.parse_errors: List[str] = []
+
+    @property
+    def completed_encounters(self) -> List[UnifiedEncounter]:
+        """Encounters that have ended so far."""
+        return self.segmenter.encounters
+
+    @property
+    def current_encounter(self) -> Optional[UnifiedEncounter]:
+        """Encounter in progress, if any."""
+        return self.segmenter.current_encounter
+
+    def poll(self, include_partial: bool = False) -> int:
+        """
+        Parse lines appended since the last poll.
+
+        Args:
+            include_partial: Also parse an unterminated last line (file is done)
+
+        Returns:
+            Number of new events processed
+        """
+        rotations = self.tailer.rotations
+        lines = self.tailer.read_new_lines(include_partial=include_partial)
+        if self.tailer.rotations != rotations:
+            # A new file starts with its own COMBAT_LOG_VERSION header
+            self.tokenizer.advanced_logging_enabled = False
+
+        new_events = 0
+        for line, _, _ in lines:
+            try:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    parsed = self.tokenizer.parse_line(line)
+                    if parsed:
+                        event = EventFactory.create_event(parsed)
+                        if event:
+                            self.segmenter.process_event(event)
+                            new_events += 1
+            except Exception as e:
+                if len(self.parse_errors) < 100:
+                    self.parse_errors.append(str(e))
+
+        self.total_events += new_events
+        if lines and self.checkpoint_file:
+            self.tailer.checkpoint.save(self.checkpoint_file)
+
+        return new_events
+
+    def follow(self, stop_event=None, idle_timeout: Optional[float] = None) -> Iterator[int]:
+        """
+        Poll until stopped, yielding after each batch of new data.
+
+        Args:
+            stop_event: Optional threading.Event that ends following when set
+            idle_timeout: Stop after this many seconds without new data
+
+        Yields:
+            Number of new events processed in each batch
+        """
+        last_data = time.monotonic()
+        while stop_event is None or not stop_event.is_set():
+            lines_read = self.tailer.lines_read
+            new_events = self.poll()
+            if self.tailer.lines_read != lines_read:
+                last_data = time.monotonic()
+                yield new_events
+                continue
+
+            if idle_timeout is not None and time.monotonic() - last_data >= idle_timeout:
+                break
+            time.sleep(self.tailer.poll_interval)
+
+    def finish(self) -> List[UnifiedEncounter]:
+        """
+        Finalize the open encounter and return all encounters.
+
+        Returns:
+            List of all encounters seen while following
+        """
+        return self.segmenter.get_encounters()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get live parsing statistics.
+
+        Returns:
+            Dictionary with event, encounter and tailing counts
+        """
+        return {
+            "total_events": self.total_events,
+            "parse_errors": len(self.parse_errors),
+            "completed_encounters": len(self.segmenter.encounters),
+            "in_encounter": self.segmenter.current_encounter is not None,
+            **self.tailer.get_stats(),
+        }
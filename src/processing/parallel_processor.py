@@ -2,52 +2,48 @@
 Parallel combat log processor for multi-threaded encounter analysis.
 """
 
+import io
 import os
 import mmap
-from dataclasses import dataclass
+import time
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
+from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import logging
 
+from ..parser.compressed import is_compressed, open_log
 from ..parser.parser import CombatLogParser
 from ..segmentation.encounters import EncounterSegmenter, Fight
 from ..segmentation.enhanced import EnhancedSegmenter
+from .boundary_index import BoundaryIndex, EncounterBoundary
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class EncounterBoundary:
-    """Represents the boundaries of an encounter in the log file."""
-
-    start_byte: int
-    end_byte: int
-    encounter_type: str  # "ENCOUNTER", "CHALLENGE_MODE", or "TRASH"
-    encounter_name: Optional[str] = None
-    encounter_id: Optional[int] = None
-    start_time: Optional[datetime] = None
-    end_time: Optional[datetime] = None
-
-
 class ParallelLogProcessor:
     """
     Processes combat logs using parallel processing for improved performance.
 
     Uses a two-pass approach:
     1. Fast scan to identify encounter boundaries
-    2. Parallel processing of each encounter segment
+    2. Parallel processing of each encounter segment, including its metrics
     """
 
-    def __init__(self, max_workers: Optional[int] = None):
+    def __init__(self, max_workers: Optional[int] = None, persist_index: bool = True):
         """
         Initialize the parallel processor.
 
         Args:
             max_workers: Maximum number of worker threads (defaults to CPU count)
+            persist_index: Keep the encounter boundary index in a sidecar file next
+                to the log so later runs skip the boundary scan
         """
         self.max_workers = max_workers or os.cpu_count()
+        self.persist_index = persist_index
+        self.boundary_index_stats: Dict[str, Any] = {}
+        self.stage_timings: Dict[str, float] = {}
         self.parse_errors: List[str] = []
 
     def process_file(self, log_path: Path) -> Tuple[List[Fight], Dict[str, Any]]:
@@ -62,13 +58,21 @@ class ParallelLogProcessor:
         """
         logger.info(f"Starting parallel processing of {log_path}")
 
+        if is_compressed(log_path):
+            # Byte-range workers map the log into memory, which needs it uncompressed
+            logger.info("Compressed log, parsing it as a stream with sequential processing")
+            with self._timed("parse"):
+                return self._fallback_sequential_processing(log_path)
+
         # Phase 1: Fast encounter boundary detection
-        boundaries = self._detect_encounter_boundaries(log_path)
+        with self._timed("boundaries"):
+            boundaries = self._detect_encounter_boundaries(log_path)
         logger.info(f"Detected {len(boundaries)} encounter segments")
 
         if not boundaries:
             logger.warning("No encounters found, falling back to sequential processing")
-            return self._fallback_sequential_processing(log_path)
+            with self._timed("parse"):
+                return self._fallback_sequential_processing(log_path)
 
         # Phase 2: Parallel processing of encounter segments
         fights, enhanced_data = self._process_encounters_parallel(log_path, boundaries)
@@ -90,149 +94,15 @@ class ParallelLogProcessor:
         Returns:
             List of top-level encounter boundaries
         """
-        # First pass: Find all CHALLENGE_MODE ranges
-        challenge_mode_ranges = []
-
-        # Second pass: Find all ENCOUNTER ranges
-        encounter_ranges = []
-
-        with open(log_path, "rb") as f:
-            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-                file_size = len(mm)
-
-                # Pass 1: Collect CHALLENGE_MODE ranges
-                current_pos = 0
-                current_challenge_mode = None
-
-                while current_pos < file_size:
-                    line_end = mm.find(b"\n", current_pos)
-                    if line_end == -1:
-                        line_end = file_size
-
-                    try:
-                        line = mm[current_pos:line_end].decode("utf-8", errors="ignore")
-
-                        if "CHALLENGE_MODE_START" in line and not line.strip().startswith("#"):
-                            if current_challenge_mode:
-                                # End previous if exists
-                                challenge_mode_ranges.append(current_challenge_mode)
-
-                            parts = line.split(",")
-                            zone_name = parts[1].strip('"') if len(parts) > 1 else "Mythic+"
-
-                            current_challenge_mode = {
-                                "start_byte": current_pos,
-                                "end_byte": file_size,
-                                "name": zone_name,
-                            }
-
-                        elif (
-                            "CHALLENGE_MODE_END" in line
-                            and not line.strip().startswith("#")
-                            and current_challenge_mode
-                        ):
-                            current_challenge_mode["end_byte"] = line_end
-                            challenge_mode_ranges.append(current_challenge_mode)
-                            current_challenge_mode = None
-
-                    except (UnicodeDecodeError, ValueError):
-                        pass
-
-                    current_pos = line_end + 1
-
-                # Handle unclosed challenge mode
-                if current_challenge_mode:
-                    challenge_mode_ranges.append(current_challenge_mode)
-
-                # Pass 2: Collect ENCOUNTER ranges
-                current_pos = 0
-                current_encounter = None
-
-                while current_pos < file_size:
-                    line_end = mm.find(b"\n", current_pos)
-                    if line_end == -1:
-                        line_end = file_size
-
-                    try:
-                        line = mm[current_pos:line_end].decode("utf-8", errors="ignore")
-
-                        if "ENCOUNTER_START" in line and not line.strip().startswith("#"):
-                            if current_encounter:
-                                # End previous if exists
-                                encounter_ranges.append(current_encounter)
-
-                            parts = line.split(",")
-                            encounter_name = parts[4] if len(parts) > 4 else "Unknown"
-                            encounter_id = (
-                                int(parts[3]) if len(parts) > 3 and parts[3].isdigit() else None
-                            )
-
-                            current_encounter = {
-                                "start_byte": current_pos,
-                                "end_byte": file_size,
-                                "name": encounter_name,
-                                "id": encounter_id,
-                            }
-
-                        elif (
-                            "ENCOUNTER_END" in line
-                            and not line.strip().startswith("#")
-                            and current_encounter
-                        ):
-                            current_encounter["end_byte"] = line_end
-                            encounter_ranges.append(current_encounter)
-                            current_encounter = None
-
-                    except (UnicodeDecodeError, ValueError):
-                        pass
-
-                    current_pos = line_end + 1
-
-                # Handle unclosed encounter
-                if current_encounter:
-                    encounter_ranges.append(current_encounter)
-
-        # Create boundaries from top-level segments
-        boundaries = []
-
-        # Add all M+ runs as boundaries (these contain their boss encounters)
-        for cm in challenge_mode_ranges:
-            boundaries.append(
-                EncounterBoundary(
-                    start_byte=cm["start_byte"],
-                    end_byte=cm["end_byte"],
-                    encounter_type="CHALLENGE_MODE",
-                    encounter_name=cm["name"],
-                )
-            )
-
-        # Add only standalone encounters (not within any M+ run)
-        for enc in encounter_ranges:
-            is_within_challenge_mode = False
-
-            for cm in challenge_mode_ranges:
-                if enc["start_byte"] >= cm["start_byte"] and enc["end_byte"] <= cm["end_byte"]:
-                    is_within_challenge_mode = True
-                    break
-
-            if not is_within_challenge_mode:
-                boundaries.append(
-                    EncounterBoundary(
-                        start_byte=enc["start_byte"],
-                        end_byte=enc["end_byte"],
-                        encounter_type="ENCOUNTER",
-                        encounter_name=enc["name"],
-                        encounter_id=enc["id"],
-                    )
-                )
-
-        # Sort boundaries by start position
-        boundaries.sort(key=lambda b: b.start_byte)
+        index = BoundaryIndex(log_path, persist=self.persist_index)
+        boundaries = index.get_boundaries()
+        self.boundary_index_stats = index.get_stats()
 
         logger.info(
             f"Detected {len(boundaries)} top-level boundaries: "
-            f"{len(challenge_mode_ranges)} M+ runs, "
-            f"{len([b for b in boundaries if b.encounter_type == 'ENCOUNTER'])} standalone raids"
+            f"{len([b for b in boundaries if b.encounter_type == 'CHALLENGE_MODE'])} M+ runs, "
+            f"{len([b for b in boundaries if b.encounter_type == 'ENCOUNTER'])} standalone raids "
+            f"({index.bytes_scanned:,} bytes scanned)"
         )
 
         return boundaries
@@ -250,59 +120,35 @@ class ParallelLogProcessor:
         Returns:
             Tuple of (fights, enhanced_data)
         """
-        all_fights = []
-        all_raid_encounters = []
-        all_mythic_plus_runs = []
+        results: List[Tuple[List[Fight], List[Any], List[Any]]] = [([], [], []) for _ in boundaries]
 
-        # Process encounters in parallel
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        # Process encounters in parallel; each worker also calculates its metrics
+        with self._timed("parse"), ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # Submit all encounter processing tasks
-            future_to_boundary = {
-                executor.submit(self._process_encounter_chunk, log_path, boundary): boundary
-                for boundary in boundaries
+            future_to_index = {
+                executor.submit(self._process_encounter_chunk, log_path, boundary): i
+                for i, boundary in enumerate(boundaries)
             }
 
-            # Collect results as they complete
-            for future in as_completed(future_to_boundary):
-                boundary = future_to_boundary[future]
+            # Collect results as they complete, keeping them in file order
+            for future in as_completed(future_to_index):
+                boundary = boundaries[future_to_index[future]]
                 try:
                     fights, raid_encounters, mythic_plus_runs, errors = future.result()
-                    all_fights.extend(fights)
-                    all_raid_encounters.extend(raid_encounters)
-                    all_mythic_plus_runs.extend(mythic_plus_runs)
+                    results[future_to_index[future]] = (fights, raid_encounters, mythic_plus_runs)
                     self.parse_errors.extend(errors)
 
                 except Exception as e:
                     logger.error(f"Error processing encounter {boundary.encounter_name}: {e}")
                     self.parse_errors.append(f"Encounter {boundary.encounter_name}: {str(e)}")
 
-        # Sort fights by start time
-        all_fights.sort(key=lambda f: f.start_time if f.start_time else datetime.min)
+        with self._timed("merge"):
+            all_fights = [fight for fights, _, _ in results for fight in fights]
+            all_raid_encounters = [raid for _, raids, _ in results for raid in raids]
+            all_mythic_plus_runs = [run for _, _, runs in results for run in runs]
 
-        # Post-process enhanced data to ensure character metrics are calculated
-        logger.info("Calculating character metrics for parallel-processed encounters...")
-
-        # Process M+ runs: aggregate character data and calculate metrics
-        for m_plus_run in all_mythic_plus_runs:
-            try:
-                # Aggregate character data across all segments
-                m_plus_run.aggregate_character_data()
-                # Calculate all metrics including character DPS/HPS
-                m_plus_run.calculate_metrics()
-                logger.debug(f"Calculated metrics for M+ run: {m_plus_run.dungeon_name}")
-            except Exception as e:
-                logger.error(f"Error calculating M+ metrics for {m_plus_run.dungeon_name}: {e}")
-                self.parse_errors.append(f"M+ metrics calculation failed: {str(e)}")
-
-        # Process raid encounters: calculate metrics
-        for raid_encounter in all_raid_encounters:
-            try:
-                # Calculate all metrics including character DPS/HPS
-                raid_encounter.calculate_metrics()
-                logger.debug(f"Calculated metrics for raid encounter: {raid_encounter.boss_name}")
-            except Exception as e:
-                logger.error(f"Error calculating raid metrics for {raid_encounter.boss_name}: {e}")
-                self.parse_errors.append(f"Raid metrics calculation failed: {str(e)}")
+            # Sort fights by start time (stable, so ties keep file order)
+            all_fights.sort(key=lambda f: f.start_time if f.start_time else datetime.min)
 
         logger.info(
             f"Character metrics calculated for {len(all_mythic_plus_runs)} M+ runs and {len(all_raid_encounters)} raid encounters"
@@ -366,6 +212,7 @@ class ParallelLogProcessor:
             # Finalize the segmenters
             fights = segmenter.finalize()
             raid_encounters, mythic_plus_runs = enhanced_segmenter.finalize()
+            chunk_errors.extend(self._calculate_metrics(raid_encounters, mythic_plus_runs))
 
             logger.debug(
                 f"Processed encounter {boundary.encounter_name}: "
@@ -379,6 +226,56 @@ class ParallelLogProcessor:
             chunk_errors.append(f"Chunk processing failed: {str(e)}")
             return [], [], [], chunk_errors
 
+    def _calculate_metrics(
+        self, raid_encounters: List[Any], mythic_plus_runs: List[Any]
+    ) -> List[str]:
+        """
+        Aggregate character data and calculate metrics for finished encounters.
+
+        Args:
+            raid_encounters: Raid encounters from the enhanced segmenter
+            mythic_plus_runs: Mythic+ runs from the enhanced segmenter
+
+        Returns:
+            List of errors
+        """
+        errors = []
+
+        # Process M+ runs: aggregate character data and calculate metrics
+        for m_plus_run in mythic_plus_runs:
+            try:
+                # Aggregate character data across all segments
+                m_plus_run.aggregate_character_data()
+                # Calculate all metrics including character DPS/HPS
+                m_plus_run.calculate_metrics()
+                logger.debug(f"Calculated metrics for M+ run: {m_plus_run.dungeon_name}")
+            except Exception as e:
+                logger.error(f"Error calculating M+ metrics for {m_plus_run.dungeon_name}: {e}")
+                errors.append(f"M+ metrics calculation failed: {str(e)}")
+
+        # Process raid encounters: calculate metrics
+        for raid_encounter in raid_encounters:
+            try:
+                # Calculate all metrics including character DPS/HPS
+                raid_encounter.calculate_metrics()
+                logger.debug(f"Calculated metrics for raid encounter: {raid_encounter.boss_name}")
+            except Exception as e:
+                logger.error(f"Error calculating raid metrics for {raid_encounter.boss_name}: {e}")
+                errors.append(f"Raid metrics calculation failed: {str(e)}")
+
+        return errors
+
+    @contextmanager
+    def _timed(self, stage: str):
+        """Add the wall time spent in a block to a processing stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[stage] = (
+                self.stage_timings.get(stage, 0.0) + time.perf_counter() - start
+            )
+
     def _fallback_sequential_processing(self, log_path: Path) -> Tuple[List[Fight], Dict[str, Any]]:
         """
         Fallback to sequential processing if no encounters are detected.
@@ -395,7 +292,8 @@ class ParallelLogProcessor:
         segmenter = EncounterSegmenter()
         enhanced_segmenter = EnhancedSegmenter()
 
-        with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
+        with open_log(log_path) as stream:
+            f = io.TextIOWrapper(stream, encoding="utf-8", errors="ignore")
             for line_num, line in enumerate(f, 1):
                 if line.strip():
                     try:
@@ -411,28 +309,7 @@ class ParallelLogProcessor:
 
         # Calculate character metrics for sequential processing too
         logger.info("Calculating character metrics for sequentially-processed encounters...")
-
-        # Process M+ runs: aggregate character data and calculate metrics
-        for m_plus_run in mythic_plus_runs:
-            try:
-                # Aggregate character data across all segments
-                m_plus_run.aggregate_character_data()
-                # Calculate all metrics including character DPS/HPS
-                m_plus_run.calculate_metrics()
-                logger.debug(f"Calculated metrics for M+ run: {m_plus_run.dungeon_name}")
-            except Exception as e:
-                logger.error(f"Error calculating M+ metrics for {m_plus_run.dungeon_name}: {e}")
-                self.parse_errors.append(f"M+ metrics calculation failed: {str(e)}")
-
-        # Process raid encounters: calculate metrics
-        for raid_encounter in raid_encounters:
-            try:
-                # Calculate all metrics including character DPS/HPS
-                raid_encounter.calculate_metrics()
-                logger.debug(f"Calculated metrics for raid encounter: {raid_encounter.boss_name}")
-            except Exception as e:
-                logger.error(f"Error calculating raid metrics for {raid_encounter.boss_name}: {e}")
-                self.parse_errors.append(f"Raid metrics calculation failed: {str(e)}")
+        self.parse_errors.extend(self._calculate_metrics(raid_encounters, mythic_plus_runs))
 
         logger.info(
             f"Character metrics calculated for {len(mythic_plus_runs)} M+ runs and {len(raid_encounters)} raid encounters"
@@ -452,5 +329,7 @@ class ParallelLogProcessor:
         return {
             "max_workers": self.max_workers,
             "parse_errors": len(self.parse_errors),
+            "boundary_index": self.boundary_index_stats,
+            "stage_timings": dict(self.stage_timings),
             "errors": self.parse_errors,
         }
@@ -0,0 +1,443 @@
+"""
+On-disk cache of segmented parse results for combat log files.
+
+Re-analyzing a log that was parsed a few minutes ago reloads the cached
+UnifiedSegmenter state instead of re-tokenizing the whole file. If the log has
+only grown since (raid still running), the cached prefix is reused and only the
+appended bytes are parsed.
+"""
+
+import gc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Optional imports - handle missing dependencies gracefully
+try:
+    import zstd
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+    zstd = None
+
+from ..parser.compressed import open_log
+from ..parser.events import EventFactory
+from ..parser.tokenizer import LineTokenizer
+from ..segmentation.unified_segmenter import UnifiedSegmenter
+from ..models.unified_encounter import UnifiedEncounter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedParse:
+    """A parse result loaded from the cache."""
+
+    log_path: str
+    parsed_bytes: int  # Offset just past the last complete line that was parsed
+    file_size: int
+    mtime_ns: int
+    total_events: int
+    parse_errors: List[str] = field(default_factory=list)
+
+    # Set by the COMBAT_LOG_VERSION header, which a resumed parse does not see again
+    advanced_logging_enabled: bool = False
+
+    # Resumable entries keep the segmenter; others only the finished encounters
+    segmenter: Optional[UnifiedSegmenter] = None
+    encounters: Optional[List[UnifiedEncounter]] = None
+
+    @property
+    def resumable(self) -> bool:
+        """Whether parsing can continue from parsed_bytes."""
+        return self.segmenter is not None
+
+
+@dataclass
+class ParseResult:
+    """Encounters from a (possibly cached) parse of a log file."""
+
+    encounters: List[UnifiedEncounter]
+    total_events: int
+    parse_errors: List[str]
+    cache_status: str  # "disabled", "miss", "hit" or "extended"
+    bytes_parsed: int = 0  # Bytes tokenized in this run
+
+
+class ParseCache:
+    """
+    Persistent cache of parse results keyed by log file path.
+
+    Each entry is one file: a small JSON header (size, mtime and hashes of the
+    parsed prefix) followed by the pickled segmenter state, compressed with
+    zstd (zlib if zstd is not installed). An entry is used when the file is
+    unchanged, or when it has grown and the parsed prefix still matches.
+
+    Entries contain pickled objects, so the cache directory must only be
+    writable by the user running the parser.
+    """
+
+    MAGIC = b"LTPC"
+    VERSION = 1
+    COMPRESSION_LEVEL = 3
+    HEAD_HASH_BYTES = 1024 * 1024
+    TAIL_HASH_BYTES = 64 * 1024
+    HEADER_STRUCT = struct.Struct("<4sHI")
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Initialize the parse cache.
+
+        Args:
+            cache_dir: Directory for cache entries (defaults to $LOOTHING_PARSE_CACHE_DIR
+                or ~/.cache/loothing-parser)
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get("LOOTHING_PARSE_CACHE_DIR") or (
+                Path.home() / ".cache" / "loothing-parser"
+            )
+        self.cache_dir = Path(cache_dir)
+
+        self.hits = 0
+        self.extensions = 0
+        self.misses = 0
+
+    def _entry_path(self, log_path: Path) -> Path:
+        """Get the cache entry path for a log file."""
+        key = hashlib.sha1(str(Path(log_path).resolve()).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.parse"
+
+    def _hash_range(self, log_path: Path, start: int, end: int) -> str:
+        """Calculate MD5 of a byte range of the log file."""
+        hash_md5 = hashlib.md5()
+        with open(log_path, "rb") as f:
+            f.seek(start)
+            hash_md5.update(f.read(end - start))
+        return hash_md5.hexdigest()
+
+    def _prefix_hashes(self, log_path: Path, parsed_bytes: int) -> Dict[str, str]:
+        """Hash the start and end of the parsed prefix."""
+        return {
+            "head_hash": self._hash_range(log_path, 0, min(parsed_bytes, self.HEAD_HASH_BYTES)),
+            "tail_hash": self._hash_range(
+                log_path, max(0, parsed_bytes - self.TAIL_HASH_BYTES), parsed_bytes
+            ),
+        }
+
+    def load(self, log_path: Path) -> Optional[CachedParse]:
+        """
+        Load a usable cache entry for a log file.
+
+        Args:
+            log_path: Path to the combat log file
+
+        Returns:
+            CachedParse if the file is unchanged, or has grown and the entry is
+            resumable; None otherwise
+        """
+        log_path = Path(log_path)
+        entry_path = self._entry_path(log_path)
+        if not entry_path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            with open(entry_path, "rb") as f:
+                magic, version, header_size = self.HEADER_STRUCT.unpack(
+                    f.read(self.HEADER_STRUCT.size)
+                )
+                if magic != self.MAGIC or version != self.VERSION:
+                    raise ValueError(f"Unsupported cache format {magic!r} v{version}")
+                header = json.loads(f.read(header_size).decode("utf-8"))
+
+                if not self._is_usable(log_path, header):
+                    self.misses += 1
+                    return None
+
+                payload = f.read()
+
+            data = self._decompress(payload, header["compression"])
+
+            # Unpickling creates many small objects; collection passes only slow it down
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                state = pickle.loads(data)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable parse cache {entry_path}: {e}")
+            self.misses += 1
+            return None
+
+        stat = log_path.stat()
+        if stat.st_size == header["file_size"] and stat.st_mtime_ns == header["mtime_ns"]:
+            self.hits += 1
+        else:
+            self.extensions += 1
+
+        return CachedParse(
+            log_path=header["log_path"],
+            parsed_bytes=header["parsed_bytes"],
+            file_size=header["file_size"],
+            mtime_ns=header["mtime_ns"],
+            total_events=header["total_events"],
+            parse_errors=state.get("parse_errors", []),
+            advanced_logging_enabled=header["advanced_logging_enabled"],
+            segmenter=state.get("segmenter"),
+            encounters=state.get("encounters"),
+        )
+
+    def _is_usable(self, log_path: Path, header: Dict[str, Any]) -> bool:
+        """Check an entry header against the current state of the log file."""
+        stat = log_path.stat()
+        if stat.st_size == header["file_size"] and stat.st_mtime_ns == header["mtime_ns"]:
+            return True
+
+        # Grown file: only resumable entries whose prefix is unchanged
+        parsed_bytes = header["parsed_bytes"]
+        if not header["resumable"] or stat.st_size < header["file_size"]:
+            return False
+        return self._prefix_hashes(log_path, parsed_bytes) == {
+            "head_hash": header["head_hash"],
+            "tail_hash": header["tail_hash"],
+        }
+
+    def save(
+        self,
+        log_path: Path,
+        parsed_bytes: int,
+        total_events: int,
+        parse_errors: Optional[List[str]] = None,
+        segmenter: Optional[UnifiedSegmenter] = None,
+        encounters: Optional[List[UnifiedEncounter]] = None,
+        advanced_logging_enabled: bool = False,
+    ) -> Path:
+        """
+        Store a parse result for a log file.
+
+        Pass the segmenter (before get_encounters() finalizes the open encounter)
+        to allow resuming when the file grows; otherwise pass the encounters.
+
+        Args:
+            log_path: Path to the combat log file
+            parsed_bytes: Offset just past the last parsed complete line
+            total_events: Number of events processed
+            parse_errors: Parse errors to keep with the result
+            segmenter: Segmenter state after parsing parsed_bytes
+            encounters: Finished encounters, for non-resumable entries
+            advanced_logging_enabled: Tokenizer ACL flag after parsing parsed_bytes
+
+        Returns:
+            Path of the cache entry
+        """
+        log_path = Path(log_path)
+        stat = log_path.stat()
+        state = {
+            "parse_errors": parse_errors or [],
+            "segmenter": segmenter,
+            "encounters": encounters if segmenter is None else None,
+        }
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        compression = "zstd" if HAS_ZSTD else "zlib"
+        payload = self._compress(data, compression)
+
+        header = {
+            "log_path": str(log_path.resolve()),
+            # Encounter-only entries are only valid for exactly the parsed bytes
+            "file_size": stat.st_size if segmenter is not None else parsed_bytes,
+            "mtime_ns": stat.st_mtime_ns,
+            "parsed_bytes": parsed_bytes,
+            "total_events": total_events,
+            "resumable": segmenter is not None,
+            "advanced_logging_enabled": advanced_logging_enabled,
+            "compression": compression,
+            "created_at": time.time(),
+            **self._prefix_hashes(log_path, parsed_bytes),
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(log_path)
+        tmp_path = entry_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(self.HEADER_STRUCT.pack(self.MAGIC, self.VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(payload)
+        os.replace(tmp_path, entry_path)
+
+        logger.debug(
+            f"Cached parse of {log_path.name}: {parsed_bytes:,} bytes, "
+            f"{len(data):,} -> {len(payload):,} bytes"
+        )
+        return entry_path
+
+    def _compress(self, data: bytes, compression: str) -> bytes:
+        """Compress a payload."""
+        if compression == "zstd":
+            return zstd.compress(data, self.COMPRESSION_LEVEL)
+        return zlib.compress(data, 1)
+
+    def _decompress(self, payload: bytes, compression: str) -> bytes:
+        """Decompress a payload."""
+        if compression == "zstd":
+            if not HAS_ZSTD:
+                raise ValueError("Parse cache entry needs zstd, which is not installed")
+            return zstd.decompress(payload)
+        return zlib.decompress(payload)
+
+    def clear(self, log_path: Optional[Path] = None):
+        """
+        Remove cache entries.
+
+        Args:
+            log_path: Only remove the entry for this log file (all entries if None)
+        """
+        if log_path is not None:
+            self._entry_path(log_path).unlink(missing_ok=True)
+        elif self.cache_dir.exists():
+            for entry_path in self.cache_dir.glob("*.parse"):
+                entry_path.unlink()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit, extension and miss counts
+        """
+        return {
+            "cache_dir": str(self.cache_dir),
+            "hits": self.hits,
+            "extensions": self.extensions,
+            "misses": self.misses,
+        }
+
+
+def parse_log_file(
+    log_path: Path,
+    cache: Optional[ParseCache] = None,
+    cached: Optional[CachedParse] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    buffer_size: int = 1024 * 1024,
+) -> ParseResult:
+    """
+    Parse and segment a log file, reusing and updating the parse cache.
+
+    Only complete lines are included in the cached state; a trailing line
+    without a newline (still being written) is parsed for this result but read
+    again on the next run.
+
+    Args:
+        log_path: Path to the combat log file
+        cache: Parse cache to use, or None to always parse the whole file
+        cached: Entry already loaded from the cache (loaded here if None)
+        progress_callback: Optional callback(bytes_done, total_bytes)
+        buffer_size: Read buffer size
+
+    Returns:
+        ParseResult with segmented encounters
+    """
+    log_path = Path(log_path)
+    if cached is None and cache is not None:
+        cached = cache.load(log_path)
+
+    if cached is not None and not cached.resumable:
+        return ParseResult(
+            encounters=cached.encounters or [],
+            total_events=cached.total_events,
+            parse_errors=list(cached.parse_errors),
+            cache_status="hit",
+        )
+
+    if cached is not None:
+        segmenter = cached.segmenter
+        offset = cached.parsed_bytes
+        total_events = cached.total_events
+        parse_errors = list(cached.parse_errors)
+    else:
+        segmenter = UnifiedSegmenter()
+        offset = 0
+        total_events = 0
+        parse_errors = []
+
+    tokenizer = LineTokenizer()
+    if cached is not None:
+        tokenizer.advanced_logging_enabled = cached.advanced_logging_enabled
+    start_offset = offset
+    file_size = log_path.stat().st_size
+
+    def process_line(line: bytes):
+        nonlocal total_events
+        try:
+            line_str = line.decode("utf-8", errors="ignore").strip()
+            if line_str and not line_str.startswith("#"):
+                parsed = tokenizer.parse_line(line_str)
+                if parsed:
+                    event = EventFactory.create_event(parsed)
+                    if event:
+                        segmenter.process_event(event)
+                        total_events += 1
+        except Exception as e:
+            if len(parse_errors) < 100:
+                parse_errors.append(str(e))
+
+    line_buffer = b""
+    with open_log(log_path) as f:
+        f.seek(offset)
+        while True:
+            chunk = f.read(buffer_size)
+            if not chunk:
+                break
+
+            lines = (line_buffer + chunk).split(b"\n")
+            line_buffer = lines.pop()
+            for line in lines:
+                process_line(line)
+                offset += len(line) + 1
+
+            if progress_callback:
+                progress_callback(
+                    offset + len(line_buffer) - start_offset, file_size - start_offset
+                )
+
+    if cache is not None and offset > start_offset:
+        cache.save(
+            log_path,
+            parsed_bytes=offset,
+            total_events=total_events,
+            parse_errors=parse_errors,
+            segmenter=segmenter,
+            advanced_logging_enabled=tokenizer.advanced_logging_enabled,
+        )
+
+    # Unterminated last line: include it now, re-read it once it is complete
+    if line_buffer:
+        process_line(line_buffer)
+
+    if cache is None:
+        cache_status = "disabled"
+    elif cached is None:
+        cache_status = "miss"
+    elif offset > start_offset:
+        cache_status = "extended"
+    else:
+        cache_status = "hit"
+
+    return ParseResult(
+        encounters=segmenter.get_encounters(),
+        total_events=total_events,
+        parse_errors=parse_errors,
+        cache_status=cache_status,
+        bytes_parsed=offset + len(line_buffer) - start_offset,
+    )
@@ -0,0 +1,146 @@
+"""
+Bounded producer/consumer pipeline between processing stages.
+
+A producer iterable (e.g. encounters yielded by the parallel processor) is
+drained on a background thread into a bounded queue, while the consumer
+(e.g. database storage) reads from the queue on the calling thread. When the
+consumer falls behind the queue fills up and the producer blocks, so at most
+queue_size items are ever waiting between the stages.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Marks the end of the produced items
+_DONE = object()
+
+
+class _Failure:
+    """Queue item carrying the exception that stopped the producer."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class BoundedPipeline:
+    """
+    Runs a producer and a consumer concurrently through a bounded queue.
+
+    A producer exception is raised to the consumer from its iterator after the
+    items produced before the failure, so the consumer can roll back. If the
+    consumer stops early or raises, the producer is stopped and closed.
+    """
+
+    # Seconds between checks whether a blocked producer should give up
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, queue_size: int = 4):
+        """
+        Initialize the pipeline.
+
+        Args:
+            queue_size: Maximum number of produced items waiting for the consumer
+        """
+        self.queue_size = max(queue_size, 1)
+        self.items_passed = 0
+        self.max_queue_depth = 0
+        self.producer_blocked_time = 0.0
+        self.consumer_wait_time = 0.0
+
+    def run(self, producer: Iterable[T], consumer: Callable[[Iterator[T]], R]) -> R:
+        """
+        Feed the producer's items to the consumer.
+
+        Args:
+            producer: Items to pass on; iterated on a background thread
+            consumer: Called on this thread with an iterator over the items
+
+        Returns:
+            The consumer's return value
+        """
+        items: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        errors = []
+
+        thread = threading.Thread(
+            target=self._produce, args=(producer, items, stop, errors), daemon=True
+        )
+        thread.start()
+        try:
+            result = consumer(self._consume(items))
+        finally:
+            stop.set()
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        return result
+
+    def _produce(self, producer: Iterable[Any], items: queue.Queue, stop: threading.Event, errors):
+        """Put produced items on the queue, blocking while it is full."""
+        iterator = iter(producer)
+        try:
+            for item in iterator:
+                if not self._put(items, item, stop):
+                    return
+        except Exception as e:
+            logger.error(f"Pipeline producer failed: {e}")
+            errors.append(e)
+            self._put(items, _Failure(e), stop)
+        else:
+            self._put(items, _DONE, stop)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    def _put(self, items: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """Put an item on the queue unless the consumer is gone."""
+        start = time.perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=self.POLL_INTERVAL)
+                    self.max_queue_depth = max(self.max_queue_depth, items.qsize())
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.producer_blocked_time += time.perf_counter() - start
+
+    def _consume(self, items: queue.Queue) -> Iterator[Any]:
+        """Yield items from the queue until the producer is done."""
+        while True:
+            start = time.perf_counter()
+            item = items.get()
+            self.consumer_wait_time += time.perf_counter() - start
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            self.items_passed += 1
+            yield item
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pipeline statistics.
+
+        Returns:
+            Dictionary with item count, peak queue depth and time each side waited
+        """
+        return {
+            "queue_size": self.queue_size,
+            "items_passed": self.items_passed,
+            "max_queue_depth": self.max_queue_depth,
+            "producer_blocked_time": self.producer_blocked_time,
+            "consumer_wait_time": self.consumer_wait_time,
+        }
@@ -0,0 +1,449 @@
+"""
+Shared-memory transfer of parse results from worker processes.
+
+Pickling whole encounters back to the parent spends most of its time on the
+event objects held in encounter and character event lists. Instead, a worker
+pickles the encounters with every event (and every TimestampedEvent wrapper)
+replaced by a reference into typed columns, one column per event field in the
+same spirit as EventCompressor._events_to_columnar: strings are interned into
+a string table and referenced by ID. The columns and string table are written
+to a multiprocessing.shared_memory block that the parent reads in place, so
+only the small remaining object graph goes through the result pipe.
+"""
+
+import io
+import logging
+import pickle
+from array import array
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from multiprocessing import resource_tracker, shared_memory
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from ..models.character_events import TimestampedEvent
+from ..parser.events import (
+    AbsorbEvent,
+    AuraEvent,
+    BaseEvent,
+    DamageEvent,
+    EncounterEvent,
+    HealEvent,
+    SpellEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+# Field kinds are stored as uint32 string IDs ("str"), int64 ("int", "datetime"),
+# float64 ("float") and int8 ("bool"). None is stored as NULL_INT for ints, NaN
+# for floats, -1 for bools and string ID 0 for strings.
+NULL_INT = -(2**63)
+
+# Naive datetimes are stored as microseconds since this point
+DATETIME_BASE = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+BASE_FIELD_KINDS = {
+    "timestamp": "datetime",
+    "event_type": "str",
+    "raw_line": "str",
+    "hide_caster": "bool",
+    "source_guid": "str",
+    "source_name": "str",
+    "source_server": "str",
+    "source_region": "str",
+    "source_flags": "int",
+    "source_raid_flags": "int",
+    "dest_guid": "str",
+    "dest_name": "str",
+    "dest_server": "str",
+    "dest_region": "str",
+    "dest_flags": "int",
+    "dest_raid_flags": "int",
+    "epoch": "float",
+    "raw_offset": "int",
+    "raw_length": "int",
+}
+SPELL_FIELD_KINDS = {
+    **BASE_FIELD_KINDS,
+    "spell_id": "int",
+    "spell_name": "str",
+    "spell_school": "int",
+}
+
+# Event classes stored in columns, by class code
+EVENT_FIELD_KINDS: Dict[Type[BaseEvent], Dict[str, str]] = {
+    BaseEvent: BASE_FIELD_KINDS,
+    SpellEvent: SPELL_FIELD_KINDS,
+    DamageEvent: {
+        **SPELL_FIELD_KINDS,
+        "amount": "int",
+        "overkill": "int",
+        "school": "int",
+        "resisted": "int",
+        "blocked": "int",
+        "absorbed": "int",
+        "critical": "bool",
+        "glancing": "bool",
+        "crushing": "bool",
+    },
+    HealEvent: {
+        **SPELL_FIELD_KINDS,
+        "amount": "int",
+        "overhealing": "int",
+        "absorbed": "int",
+        "critical": "bool",
+    },
+    AuraEvent: {**SPELL_FIELD_KINDS, "aura_type": "str", "stacks": "int"},
+    AbsorbEvent: {
+        **BASE_FIELD_KINDS,
+        "attacker_guid": "str",
+        "attacker_name": "str",
+        "target_guid": "str",
+        "target_name": "str",
+        "absorber_guid": "str",
+        "absorber_name": "str",
+        "shield_spell_id": "int",
+        "shield_spell_name": "str",
+        "shield_spell_school": "int",
+        "amount_absorbed": "int",
+    },
+    EncounterEvent: {
+        **BASE_FIELD_KINDS,
+        "encounter_id": "int",
+        "encounter_name": "str",
+        "difficulty_id": "int",
+        "group_size": "int",
+        "instance_id": "int",
+        "success": "bool",
+        "duration": "int",
+    },
+}
+EVENT_CLASSES: List[Type[BaseEvent]] = list(EVENT_FIELD_KINDS)
+EVENT_CLASS_CODES = {cls: code for code, cls in enumerate(EVENT_CLASSES)}
+EVENT_FIELDS = [
+    tuple((f.name, EVENT_FIELD_KINDS[cls][f.name]) for f in fields(cls)) for cls in EVENT_CLASSES
+]
+
+# TimestampedEvent rows; their datetime is always the wrapped event's timestamp
+WRAPPER_CODE = len(EVENT_CLASSES)
+WRAPPER_FIELDS = (("timestamp", "float"), ("event_code", "int"), ("event_row", "int"))
+WRAPPER_CATEGORY = "category"
+
+
+class ColumnTypeError(TypeError):
+    """A field value does not fit the column kind of its field."""
+
+
+@dataclass
+class SharedResult:
+    """Handle to a worker result whose events live in shared memory."""
+
+    shm_name: str
+    size: int
+    # (class code, field name, typecode, byte offset, count) per column
+    columns: List[Tuple[int, str, str, int, int]]
+    # Byte offsets of the string table's offsets array and UTF-8 data
+    strings_offset: int
+    string_data_offset: int
+    string_data_size: int
+    # Pickled object graph with events replaced by (class code, row) references
+    metadata: bytes
+    # (class code, field name, values) of columns whose values have no typed form
+    object_columns: List[Tuple[int, str, List[Any]]]
+
+
+class _ObjectColumn(list):
+    """Column values that were pickled as they are."""
+
+
+class _StringTable:
+    """Interned strings; ID 0 is None."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def intern(self, value: Any) -> int:
+        if value is None:
+            return 0
+        string_id = self.ids.get(value)
+        if string_id is None:
+            if type(value) is not str:
+                raise ColumnTypeError(f"expected str, got {type(value).__name__}")
+            self.strings.append(value)
+            string_id = self.ids[value] = len(self.strings)
+        return string_id
+
+
+class _ColumnPickler(pickle.Pickler):
+    """Pickler that collects events as column rows instead of pickling them."""
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.refs: Dict[int, Tuple[int, int]] = {}
+        self.rows: List[List[Tuple[Any, ...]]] = [[] for _ in range(WRAPPER_CODE + 1)]
+        self.field_counts = [len(class_fields) for class_fields in EVENT_FIELDS]
+        self.field_getters = [
+            itemgetter(*(name for name, _ in class_fields)) for class_fields in EVENT_FIELDS
+        ]
+
+    def _add_event(self, event: Any, code: int) -> Optional[Tuple[int, int]]:
+        values = event.__dict__
+        if len(values) != self.field_counts[code]:
+            return None
+        rows = self.rows[code]
+        ref = self.refs[id(event)] = (code, len(rows))
+        rows.append(self.field_getters[code](values))
+        return ref
+
+    def persistent_id(self, obj: Any):
+        ref = self.refs.get(id(obj))
+        if ref is not None:
+            return ref
+
+        obj_type = type(obj)
+        code = EVENT_CLASS_CODES.get(obj_type)
+        if code is not None:
+            return self._add_event(obj, code)
+
+        if obj_type is TimestampedEvent and obj.datetime is obj.event.timestamp:
+            event = obj.event
+            event_ref = self.refs.get(id(event))
+            if event_ref is None:
+                code = EVENT_CLASS_CODES.get(type(event))
+                event_ref = self._add_event(event, code) if code is not None else None
+                if event_ref is None:
+                    return None
+            rows = self.rows[WRAPPER_CODE]
+            ref = self.refs[id(obj)] = (WRAPPER_CODE, len(rows))
+            rows.append((obj.timestamp, event_ref[0], event_ref[1], obj.category))
+            return ref
+
+        return None
+
+
+def _encode_column(values: Tuple[Any, ...], kind: str, strings: _StringTable) -> array:
+    """Convert one column of field values to a typed array."""
+    types = set(map(type, values))
+    if kind == "str":
+        return array("I", [strings.intern(v) for v in values])
+    if kind == "int":
+        if not types <= {int, type(None)}:
+            raise ColumnTypeError(f"expected int, got {types}")
+        return array("q", [NULL_INT if v is None else v for v in values])
+    if kind == "float":
+        if not types <= {float, type(None)}:
+            raise ColumnTypeError(f"expected float, got {types}")
+        return array("d", [float("nan") if v is None else v for v in values])
+    if kind == "bool":
+        if not types <= {bool, type(None)}:
+            raise ColumnTypeError(f"expected bool, got {types}")
+        return array("b", [-1 if v is None else v for v in values])
+    if types != {datetime} or any(v.tzinfo is not None for v in values):
+        raise ColumnTypeError(f"expected naive datetime, got {types}")
+    return array("q", [(v - DATETIME_BASE) // ONE_MICROSECOND for v in values])
+
+
+def _decode_column(values: List[Any], kind: str, strings: List[Any]) -> List[Any]:
+    """Convert typed array values back to field values."""
+    if isinstance(values, _ObjectColumn):
+        return values
+    if kind == "str":
+        return [strings[v] for v in values]
+    if kind == "int":
+        return [None if v == NULL_INT else v for v in values]
+    if kind == "float":
+        return [None if v != v else v for v in values]
+    if kind == "bool":
+        return [None if v < 0 else v == 1 for v in values]
+    return [DATETIME_BASE + timedelta(microseconds=v) for v in values]
+
+
+def export_results(obj: Any) -> Union[bytes, SharedResult]:
+    """
+    Prepare a worker result for the parent, moving its events to shared memory.
+
+    Args:
+        obj: Picklable result, typically a list of encounters
+
+    Returns:
+        SharedResult handle, or plain pickled bytes when there are no events
+    """
+    metadata = io.BytesIO()
+    pickler = _ColumnPickler(metadata)
+    pickler.dump(obj)
+    if not pickler.refs:
+        return metadata.getvalue()
+
+    strings = _StringTable()
+    arrays = []
+    object_columns = []
+    for code, rows in enumerate(pickler.rows):
+        if not rows:
+            continue
+        class_fields = EVENT_FIELDS[code] if code < WRAPPER_CODE else WRAPPER_FIELDS
+        columns = list(zip(*rows))
+        if code == WRAPPER_CODE:
+            class_fields += ((WRAPPER_CATEGORY, "str"),)
+        for (name, kind), values in zip(class_fields, columns):
+            try:
+                arrays.append((code, name, _encode_column(values, kind, strings)))
+            except (ColumnTypeError, OverflowError) as e:
+                # Odd values (e.g. a GUID the tokenizer turned into a number) stay objects
+                logger.debug(f"Pickling column {name} of class {code}: {e}")
+                object_columns.append((code, name, list(values)))
+
+    string_data = bytearray()
+    string_offsets = array("q", [0])
+    for string in strings.strings:
+        string_data += string.encode("utf-8", errors="surrogatepass")
+        string_offsets.append(len(string_data))
+
+    # Lay out 8-byte aligned columns, then the string table
+    layout = []
+    offset = 0
+    for code, name, values in arrays:
+        layout.append((code, name, values.typecode, offset, len(values)))
+        offset += -(-len(values) * values.itemsize // 8) * 8
+    strings_offset = offset
+    string_data_offset = strings_offset + len(string_offsets) * string_offsets.itemsize
+    size = string_data_offset + len(string_data)
+
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        for (_, _, values), (_, _, _, start, _) in zip(arrays, layout):
+            data = values.tobytes()
+            shm.buf[start : start + len(data)] = data
+        shm.buf[strings_offset:string_data_offset] = string_offsets.tobytes()
+        shm.buf[string_data_offset:size] = string_data
+        result = SharedResult(
+            shm_name=shm.name,
+            size=size,
+            columns=layout,
+            strings_offset=strings_offset,
+            string_data_offset=string_data_offset,
+            string_data_size=len(string_data),
+            metadata=metadata.getvalue(),
+            object_columns=object_columns,
+        )
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+
+    # The parent unlinks the block once it has read it
+    shm.close()
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return result
+
+
+def _read_strings(buf: memoryview, result: SharedResult) -> List[Any]:
+    """Read the string table; index 0 is None."""
+    offsets = buf[result.strings_offset : result.string_data_offset].cast("q").tolist()
+    data = buf[result.string_data_offset : result.string_data_offset + result.string_data_size]
+    strings: List[Any] = [None]
+    for start, end in zip(offsets, offsets[1:]):
+        strings.append(str(data[start:end], "utf-8", "surrogatepass"))
+    return strings
+
+
+def _read_rows(buf: memoryview, result: SharedResult) -> List[List[Any]]:
+    """Rebuild the event and TimestampedEvent objects stored in the columns."""
+    strings = _read_strings(buf, result)
+    columns: Dict[int, Dict[str, List[Any]]] = {}
+    for code, name, typecode, offset, count in result.columns:
+        itemsize = array(typecode).itemsize
+        columns.setdefault(code, {})[name] = (
+            buf[offset : offset + count * itemsize].cast(typecode).tolist()
+        )
+    for code, name, values in result.object_columns:
+        columns.setdefault(code, {})[name] = _ObjectColumn(values)
+
+    objects: List[List[Any]] = [[] for _ in range(WRAPPER_CODE + 1)]
+    for code, cls in enumerate(EVENT_CLASSES):
+        class_columns = columns.get(code)
+        if not class_columns:
+            continue
+        names = [name for name, _ in EVENT_FIELDS[code]]
+        decoded = [
+            _decode_column(class_columns[name], kind, strings) for name, kind in EVENT_FIELDS[code]
+        ]
+        new = cls.__new__
+        rows = objects[code]
+        for values in zip(*decoded):
+            event = new(cls)
+            event.__dict__.update(zip(names, values))
+            rows.append(event)
+
+    wrapper_columns = columns.get(WRAPPER_CODE)
+    if wrapper_columns:
+        new = TimestampedEvent.__new__
+        rows = objects[WRAPPER_CODE]
+        for timestamp, event_code, event_row, category in zip(
+            _decode_column(wrapper_columns["timestamp"], "float", strings),
+            wrapper_columns["event_code"],
+            wrapper_columns["event_row"],
+            _decode_column(wrapper_columns[WRAPPER_CATEGORY], "str", strings),
+        ):
+            event = objects[event_code][event_row]
+            wrapper = new(TimestampedEvent)
+            wrapper.__dict__.update(
+                timestamp=timestamp, datetime=event.timestamp, event=event, category=category
+            )
+            rows.append(wrapper)
+
+    return objects
+
+
+class _ColumnUnpickler(pickle.Unpickler):
+    """Unpickler that resolves event references to rebuilt column rows."""
+
+    def __init__(self, file, objects: List[List[Any]]):
+        super().__init__(file)
+        self.objects = objects
+
+    def persistent_load(self, pid):
+        code, row = pid
+        return self.objects[code][row]
+
+
+def import_results(payload: Union[bytes, SharedResult]) -> Any:
+    """
+    Load a worker result, releasing its shared memory block.
+
+    Args:
+        payload: Value returned by export_results() in the worker
+
+    Returns:
+        The exported object
+    """
+    if isinstance(payload, bytes):
+        return pickle.loads(payload)
+
+    shm = shared_memory.SharedMemory(name=payload.shm_name)
+    try:
+        buf = shm.buf
+        try:
+            objects = _read_rows(buf, payload)
+        finally:
+            del buf
+        return _ColumnUnpickler(io.BytesIO(payload.metadata), objects).load()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def release_results(payload: SharedResult):
+    """
+    Free the shared memory block of a result that will not be imported.
+
+    Args:
+        payload: Value returned by export_results() in the worker
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=payload.shm_name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
@@ -5,34 +5,155 @@ This processor uses the modern unified data model with enhanced character tracki
 death analysis, and proper M+ hierarchical structure.
 """
 
+import gc
+import io
 import os
 import mmap
-from dataclasses import dataclass
+import time
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Collection, Iterator, List, Optional, Tuple, Dict, Any, Union
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 import logging
 
+from ..parser.compressed import is_compressed, map_log, open_log
 from ..parser.tokenizer import LineTokenizer
 from ..parser.events import EventFactory
+from ..parser.string_pool import StringPool
 from ..segmentation.unified_segmenter import UnifiedSegmenter
 from ..models.unified_encounter import UnifiedEncounter, EncounterType
+from .boundary_index import BoundaryIndex, BoundaryMarker, EncounterBoundary
+from .encounter_index import EncounterIndex
+from .shared_results import SharedResult, export_results, import_results, release_results
+from .work_planner import ChunkMerger, SeamState, WorkChunk, plan_chunks
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class EncounterBoundary:
-    """Represents the boundaries of an encounter in the log file."""
+def parse_byte_range(
+    log_path: Path,
+    start_byte: int,
+    end_byte: int,
+    raw_offsets: bool = False,
+    string_pool: Optional[StringPool] = None,
+    seam: Optional[SeamState] = None,
+) -> Tuple[List[UnifiedEncounter], int, List[str]]:
+    """
+    Parse the lines between two byte offsets of a log into encounters.
+
+    The log is memory-mapped independently (a seekable zstd log is read frame
+    by frame instead), so this can run in any thread or process. The tokenizer
+    is primed with the COMBAT_LOG_VERSION header at the top of the file, since
+    whether advanced logging is enabled changes how every following combat
+    event is parsed.
+
+    Args:
+        log_path: Path to a plain or seekable zstd combat log file
+        start_byte: Offset of the first line to parse (in the decompressed log)
+        end_byte: Offset to stop parsing at
+        raw_offsets: Drop each event's raw line, keeping raw_offset/raw_length
+            so it can be read back with read_raw_line()
+        string_pool: Optional StringPool to share repeated strings between events
+        seam: Segmenter state carried over from the preceding part of the log
+
+    Returns:
+        Tuple of (encounters, events_processed, errors)
+    """
+    tokenizer = LineTokenizer()
+    event_factory = EventFactory()
+    segmenter = UnifiedSegmenter()
+
+    errors = []
+    event_count = 0
+
+    with map_log(log_path) as mm:
+        header_end = mm.find(b"\n")
+        header = mm[: header_end if header_end != -1 else len(mm)]
+        if start_byte > 0 and b"COMBAT_LOG_VERSION" in header:
+            tokenizer.parse_line(header.decode("utf-8", errors="ignore"))
+
+        if seam is not None:
+            segmenter.pet_owners.update(seam.pet_owners)
+            if seam.run_start is not None:
+                # Reopen the Mythic+ run this range continues
+                run_end = mm.find(b"\n", seam.run_start)
+                run_line = mm[seam.run_start : run_end if run_end != -1 else len(mm)]
+                parsed_line = tokenizer.parse_line(run_line.decode("utf-8", errors="ignore"))
+                if parsed_line:
+                    segmenter.process_event(event_factory.create_event(parsed_line))
+                if segmenter.current_encounter:
+                    for guid, name in seam.characters.items():
+                        segmenter.current_encounter.add_character(guid, name)
+
+        current_pos = start_byte
+        while current_pos < end_byte and current_pos < len(mm):
+            # Find next line
+            line_end = mm.find(b"\n", current_pos)
+            if line_end == -1 or line_end > end_byte:
+                line_end = min(end_byte, len(mm))
+
+            try:
+                line = mm[current_pos:line_end].decode("utf-8", errors="ignore")
+                if line.strip() and not line.strip().startswith("#"):
+                    parsed_line = tokenizer.parse_line(line)
+                    if parsed_line:
+                        if raw_offsets:
+                            parsed_line.raw_line = ""
+                        event = event_factory.create_event(
+                            parsed_line, string_pool=string_pool
+                        )
+                        if event:
+                            if raw_offsets:
+                                event.raw_offset = current_pos
+                                event.raw_length = line_end - current_pos
+                            segmenter.process_event(event)
+                            event_count += 1
+
+            except Exception as e:
+                if len(errors) < 100:  # Limit error collection
+                    errors.append(f"Line {current_pos}: {str(e)}")
+
+            current_pos = line_end + 1
 
-    start_byte: int
-    end_byte: int
-    encounter_type: str  # "ENCOUNTER", "CHALLENGE_MODE", or "TRASH"
-    encounter_name: Optional[str] = None
-    encounter_id: Optional[int] = None
-    start_time: Optional[datetime] = None
-    end_time: Optional[datetime] = None
+    # Get the completed encounters from this range
+    return segmenter.get_encounters(), event_count, errors
+
+
+def _process_chunk_in_worker(
+    log_path: Path, chunk: WorkChunk
+) -> Tuple[Union[bytes, SharedResult], int, List[str]]:
+    """
+    Parse one chunk in a worker process.
+
+    Events keep raw offsets instead of raw lines and repeated strings are
+    pooled. Event data is handed to the parent through shared memory, so only
+    the rest of the encounters is pickled.
+
+    Returns:
+        Tuple of (exported encounters, events_processed, errors)
+    """
+    encounters, event_count, errors = parse_byte_range(
+        log_path,
+        chunk.start_byte,
+        chunk.end_byte,
+        raw_offsets=True,
+        string_pool=StringPool(),
+        seam=chunk.seam,
+    )
+    return export_results(encounters), event_count, errors
+
+
+def _load_encounters(payload: Union[bytes, SharedResult]) -> List[UnifiedEncounter]:
+    """Load encounters sent by a worker process."""
+    # Loading creates many objects and none of them are cyclic garbage
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return import_results(payload)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
 
 
 class UnifiedParallelProcessor:
@@ -41,7 +162,8 @@ class UnifiedParallelProcessor:
 
     Uses a two-pass approach:
     1. Fast scan to identify encounter boundaries
-    2. Parallel processing of each encounter segment using UnifiedSegmenter
+    2. Parallel processing of equally sized chunks of the whole log using
+       UnifiedSegmenter, merging encounters split across chunk seams
 
     Features:
     - Enhanced character tracking with ability breakdowns
@@ -50,16 +172,59 @@ class UnifiedParallelProcessor:
     - Talent/equipment data integration
     """
 
-    def __init__(self, max_workers: Optional[int] = None):
+    EXECUTOR_TYPES = ("thread", "process")
+
+    # Chunks planned per worker, so uneven chunks still keep every worker busy
+    CHUNKS_PER_WORKER = 4
+    MIN_CHUNK_BYTES = 1024 * 1024
+
+    # Chunks parsed ahead of the encounters handed out so far, per worker
+    IN_FLIGHT_PER_WORKER = 2
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        persist_index: bool = True,
+        executor_type: str = "thread",
+        chunk_bytes: Optional[int] = None,
+        max_log_bytes: Optional[int] = None,
+    ):
         """
         Initialize the unified parallel processor.
 
         Args:
-            max_workers: Maximum number of worker threads (defaults to CPU count)
+            max_workers: Maximum number of worker threads or processes (defaults to CPU count)
+            persist_index: Keep the encounter boundary index in a sidecar file next
+                to the log so later runs skip the boundary scan
+            executor_type: "thread" parses chunks in a thread pool; "process" parses
+                them in a process pool, which is not limited to one core by the GIL.
+                Events from process workers keep raw_offset/raw_length instead of
+                raw_line; use read_raw_line(log_path) to get the line back. Their
+                event data is returned through shared memory.
+            chunk_bytes: Target chunk size (defaults to splitting the log into
+                CHUNKS_PER_WORKER chunks per worker, but not below MIN_CHUNK_BYTES)
+            max_log_bytes: Maximum decompressed size of a compressed log; parsing
+                one that inflates past it fails with CompressedLogError
         """
+        if executor_type not in self.EXECUTOR_TYPES:
+            raise ValueError(
+                f"Invalid executor_type {executor_type!r}, expected one of {self.EXECUTOR_TYPES}"
+            )
+
         self.max_workers = max_workers or os.cpu_count()
+        self.persist_index = persist_index
+        self.executor_type = executor_type
+        self.chunk_bytes = chunk_bytes
+        self.max_log_bytes = max_log_bytes
+        self.result_bytes = 0
+        self.shared_bytes = 0
+        self.chunks_processed = 0
+        self.boundary_markers: List[BoundaryMarker] = []
+        self.boundary_index_stats: Dict[str, Any] = {}
+        self.stage_timings: Dict[str, float] = {}
         self.parse_errors: List[str] = []
         self.total_events = 0
+        self.encounters_skipped = 0
 
     def process_file(self, log_path: Path) -> List[UnifiedEncounter]:
         """
@@ -71,21 +236,123 @@ class UnifiedParallelProcessor:
         Returns:
             List of UnifiedEncounter objects
         """
+        encounters = list(self.iter_encounters(log_path))
+
+        # Sort encounters by start time (stable, so ties keep file order)
+        encounters.sort(key=lambda e: e.start_time if e.start_time else datetime.min)
+
+        logger.info(f"Parallel processing completed: {len(encounters)} encounters processed")
+        return encounters
+
+    def iter_encounters(
+        self,
+        log_path: Path,
+        known_fingerprints: Optional[Callable[[List[str]], Collection[str]]] = None,
+    ) -> Iterator[UnifiedEncounter]:
+        """
+        Process a combat log file, yielding each encounter as soon as it is complete.
+
+        Encounters are yielded in file order with their metrics calculated.
+        Only IN_FLIGHT_PER_WORKER chunks per worker are parsed ahead of the
+        encounters yielded so far, so a slow consumer (e.g. database storage)
+        holds back parsing instead of letting parsed encounters pile up.
+
+        Args:
+            log_path: Path to the combat log file
+            known_fingerprints: Called with the fingerprints of the log's
+                encounters from the EncounterIndex; encounters whose fingerprint
+                it returns are neither parsed nor yielded. Yielded encounters
+                carry their fingerprint. Compressed logs are not deduplicated.
+
+        Yields:
+            UnifiedEncounter objects
+        """
         logger.info(f"Starting unified parallel processing of {log_path}")
 
+        if is_compressed(log_path):
+            # Byte-range workers map the log into memory, which needs it uncompressed
+            logger.info("Compressed log, parsing it as a stream with sequential processing")
+            with self._timed("parse"):
+                yield from self._iter_sequential(log_path)
+            return
+
+        if known_fingerprints is not None:
+            yield from self._iter_new_encounters(log_path, known_fingerprints)
+            return
+
         # Phase 1: Fast encounter boundary detection
-        boundaries = self._detect_encounter_boundaries(log_path)
+        with self._timed("boundaries"):
+            boundaries = self._detect_encounter_boundaries(log_path)
         logger.info(f"Detected {len(boundaries)} top-level encounter segments")
 
         if not boundaries:
             logger.warning("No encounters found, falling back to sequential processing")
-            return self._fallback_sequential_processing(log_path)
+            with self._timed("parse"):
+                encounters = self._fallback_sequential_processing(log_path)
+            yield from encounters
+            return
+
+        # Phase 2: Parallel processing of the whole log in balanced chunks
+        with self._timed("planning"):
+            chunks = self._plan_chunks(log_path, boundaries)
+        yield from self._iter_chunks_parallel(log_path, chunks)
+
+    def _iter_new_encounters(
+        self, log_path: Path, known_fingerprints: Callable[[List[str]], Collection[str]]
+    ) -> Iterator[UnifiedEncounter]:
+        """
+        Process only the encounters whose fingerprint is not known yet.
 
-        # Phase 2: Parallel processing of encounter segments
-        encounters = self._process_encounters_parallel(log_path, boundaries)
+        Args:
+            log_path: Path to the combat log file
+            known_fingerprints: Returns the already known fingerprints among those given
 
-        logger.info(f"Parallel processing completed: {len(encounters)} encounters processed")
-        return encounters
+        Yields:
+            UnifiedEncounter objects in file order, with fingerprints
+        """
+        with self._timed("boundaries"):
+            index = EncounterIndex(log_path, persist=self.persist_index)
+            entries = index.get_encounters()
+            known = set(known_fingerprints([entry.fingerprint for entry in entries]))
+        entries_by_start = {(entry.start_time, entry.encounter_id): entry for entry in entries}
+
+        new_entries = [entry for entry in entries if entry.fingerprint not in known]
+        self.encounters_skipped = len(entries) - len(new_entries)
+        if self.encounters_skipped:
+            logger.info(
+                f"Skipping {self.encounters_skipped} of {len(entries)} encounters "
+                f"that are already stored"
+            )
+
+        if not new_entries and entries:
+            return
+
+        if self.encounters_skipped:
+            # Parse each new encounter on its own, with the pets summoned before it
+            chunks = [
+                WorkChunk(
+                    entry.start_byte,
+                    entry.end_byte + 1,
+                    SeamState(pet_owners=index.pet_owners_before(entry)),
+                )
+                for entry in new_entries
+            ]
+            encounters = self._iter_chunks_parallel(log_path, chunks)
+        else:
+            encounters = self.iter_encounters(log_path)
+
+        for encounter in encounters:
+            entry = entries_by_start.get((encounter.start_time, encounter.encounter_id))
+            if entry is not None:
+                encounter.fingerprint = entry.fingerprint
+                if encounter.pull_number != entry.pull_number:
+                    # Counted across the whole log, including skipped pulls
+                    encounter.pull_number = entry.pull_number
+                    if encounter.fights:
+                        encounter.fights[0].fight_name = (
+                            f"{encounter.encounter_name} - Pull {entry.pull_number}"
+                        )
+            yield encounter
 
     def _detect_encounter_boundaries(self, log_path: Path) -> List[EncounterBoundary]:
         """
@@ -101,287 +368,196 @@ class UnifiedParallelProcessor:
         Returns:
             List of top-level encounter boundaries
         """
-        challenge_mode_ranges = []
-        encounter_ranges = []
-
-        with open(log_path, "rb") as f:
-            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-                file_size = len(mm)
-
-                # Pass 1: Collect CHALLENGE_MODE ranges
-                current_pos = 0
-                current_challenge_mode = None
-
-                while current_pos < file_size:
-                    line_end = mm.find(b"\n", current_pos)
-                    if line_end == -1:
-                        line_end = file_size
-
-                    try:
-                        line = mm[current_pos:line_end].decode("utf-8", errors="ignore")
-
-                        if "CHALLENGE_MODE_START" in line and not line.strip().startswith("#"):
-                            if current_challenge_mode:
-                                challenge_mode_ranges.append(current_challenge_mode)
-
-                            parts = line.split(",")
-                            # Extract zone name from the event
-                            zone_name = "Mythic+"
-                            for i, part in enumerate(parts):
-                                if "CHALLENGE_MODE_START" in part and i + 1 < len(parts):
-                                    zone_name = parts[i + 1].strip('"')
-                                    break
-
-                            current_challenge_mode = {
-                                "start_byte": current_pos,
-                                "end_byte": file_size,
-                                "name": zone_name,
-                            }
-
-                        elif (
-                            "CHALLENGE_MODE_END" in line
-                            and not line.strip().startswith("#")
-                            and current_challenge_mode
-                        ):
-                            current_challenge_mode["end_byte"] = line_end
-                            challenge_mode_ranges.append(current_challenge_mode)
-                            current_challenge_mode = None
-
-                    except (UnicodeDecodeError, ValueError):
-                        pass
-
-                    current_pos = line_end + 1
-
-                # Handle unclosed challenge mode
-                if current_challenge_mode:
-                    challenge_mode_ranges.append(current_challenge_mode)
-
-                # Pass 2: Collect ENCOUNTER ranges
-                current_pos = 0
-                current_encounter = None
-
-                while current_pos < file_size:
-                    line_end = mm.find(b"\n", current_pos)
-                    if line_end == -1:
-                        line_end = file_size
-
-                    try:
-                        line = mm[current_pos:line_end].decode("utf-8", errors="ignore")
-
-                        if "ENCOUNTER_START" in line and not line.strip().startswith("#"):
-                            if current_encounter:
-                                encounter_ranges.append(current_encounter)
-
-                            parts = line.split(",")
-                            # Find the encounter name and ID in the event
-                            encounter_name = "Unknown"
-                            encounter_id = None
-
-                            for i, part in enumerate(parts):
-                                if "ENCOUNTER_START" in part:
-                                    # Encounter ID is usually 2 positions after ENCOUNTER_START
-                                    if i + 2 < len(parts):
-                                        try:
-                                            encounter_id = int(parts[i + 2])
-                                        except ValueError:
-                                            pass
-                                    # Encounter name is usually 3 positions after
-                                    if i + 3 < len(parts):
-                                        encounter_name = parts[i + 3].strip('"')
-                                    break
-
-                            current_encounter = {
-                                "start_byte": current_pos,
-                                "end_byte": file_size,
-                                "name": encounter_name,
-                                "id": encounter_id,
-                            }
-
-                        elif (
-                            "ENCOUNTER_END" in line
-                            and not line.strip().startswith("#")
-                            and current_encounter
-                        ):
-                            current_encounter["end_byte"] = line_end
-                            encounter_ranges.append(current_encounter)
-                            current_encounter = None
-
-                    except (UnicodeDecodeError, ValueError):
-                        pass
-
-                    current_pos = line_end + 1
-
-                # Handle unclosed encounter
-                if current_encounter:
-                    encounter_ranges.append(current_encounter)
-
-        # Create boundaries from top-level segments
-        boundaries = []
-
-        # Add all M+ runs as boundaries (these contain their boss encounters)
-        for cm in challenge_mode_ranges:
-            boundaries.append(
-                EncounterBoundary(
-                    start_byte=cm["start_byte"],
-                    end_byte=cm["end_byte"],
-                    encounter_type="CHALLENGE_MODE",
-                    encounter_name=cm["name"],
-                )
-            )
-
-        # Add only standalone encounters (not within any M+ run)
-        for enc in encounter_ranges:
-            is_within_challenge_mode = False
-
-            for cm in challenge_mode_ranges:
-                if enc["start_byte"] >= cm["start_byte"] and enc["end_byte"] <= cm["end_byte"]:
-                    is_within_challenge_mode = True
-                    break
-
-            if not is_within_challenge_mode:
-                boundaries.append(
-                    EncounterBoundary(
-                        start_byte=enc["start_byte"],
-                        end_byte=enc["end_byte"],
-                        encounter_type="ENCOUNTER",
-                        encounter_name=enc["name"],
-                        encounter_id=enc["id"],
-                    )
-                )
-
-        # Sort boundaries by start position
-        boundaries.sort(key=lambda b: b.start_byte)
+        index = BoundaryIndex(log_path, persist=self.persist_index)
+        boundaries = index.get_boundaries()
+        self.boundary_markers = index.markers
+        self.boundary_index_stats = index.get_stats()
 
         logger.info(
             f"Detected {len(boundaries)} top-level boundaries: "
             f"{len([b for b in boundaries if b.encounter_type == 'CHALLENGE_MODE'])} M+ runs, "
-            f"{len([b for b in boundaries if b.encounter_type == 'ENCOUNTER'])} standalone raids"
+            f"{len([b for b in boundaries if b.encounter_type == 'ENCOUNTER'])} standalone raids "
+            f"({index.bytes_scanned:,} bytes scanned)"
         )
 
         return boundaries
 
-    def _process_encounters_parallel(
+    def _plan_chunks(
         self, log_path: Path, boundaries: List[EncounterBoundary]
-    ) -> List[UnifiedEncounter]:
+    ) -> List[WorkChunk]:
         """
-        Process encounters in parallel using thread pool.
+        Split the log into size-balanced chunks with segment-safe seams.
 
         Args:
             log_path: Path to the combat log file
-            boundaries: List of encounter boundaries to process
+            boundaries: Top-level encounter boundaries
 
         Returns:
-            List of UnifiedEncounter objects
+            Chunks in file order covering the whole log
         """
-        all_encounters = []
-
-        # Process encounters in parallel
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all encounter processing tasks
-            future_to_boundary = {
-                executor.submit(self._process_encounter_chunk, log_path, boundary): boundary
-                for boundary in boundaries
-            }
-
-            # Collect results as they complete
-            for future in as_completed(future_to_boundary):
-                boundary = future_to_boundary[future]
-                try:
-                    encounters, events_processed, errors = future.result()
-                    all_encounters.extend(encounters)
-                    self.total_events += events_processed
-                    self.parse_errors.extend(errors)
+        with open(log_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                chunk_bytes = self.chunk_bytes or max(
+                    self.MIN_CHUNK_BYTES, len(mm) // (self.max_workers * self.CHUNKS_PER_WORKER)
+                )
+                chunks = plan_chunks(mm, self.boundary_markers, boundaries, chunk_bytes)
 
-                    logger.debug(
-                        f"Processed {boundary.encounter_name}: "
-                        f"{len(encounters)} encounters, {events_processed} events"
-                    )
+        logger.info(f"Planned {len(chunks)} chunks of about {chunk_bytes:,} bytes")
+        return chunks
 
-                except Exception as e:
-                    logger.error(f"Error processing encounter {boundary.encounter_name}: {e}")
-                    self.parse_errors.append(f"Encounter {boundary.encounter_name}: {str(e)}")
+    def _iter_chunks_parallel(
+        self, log_path: Path, chunks: List[WorkChunk]
+    ) -> Iterator[UnifiedEncounter]:
+        """
+        Process chunks in parallel using a thread or process pool.
 
-        # Sort encounters by start time
-        all_encounters.sort(key=lambda e: e.start_time if e.start_time else datetime.min)
+        Args:
+            log_path: Path to the combat log file
+            chunks: Planned chunks in file order
 
-        # Post-process: Calculate metrics for all encounters
-        logger.info("Calculating metrics for all encounters...")
-        for encounter in all_encounters:
+        Yields:
+            UnifiedEncounter objects in file order
+        """
+        if self.executor_type == "process":
+            executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(chunks)))
+            task = _process_chunk_in_worker
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            task = self._process_chunk
+
+        merger = ChunkMerger()
+        window = self.max_workers * self.IN_FLIGHT_PER_WORKER
+        futures: Dict[int, Future] = {}
+        next_submit = 0
+
+        with executor:
             try:
-                encounter.calculate_metrics()
-                logger.debug(
-                    f"Calculated metrics for {encounter.encounter_name} "
-                    f"({encounter.encounter_type.value})"
-                )
-            except Exception as e:
-                logger.error(f"Error calculating metrics for {encounter.encounter_name}: {e}")
-                self.parse_errors.append(f"Metrics calculation failed: {str(e)}")
+                for i, chunk in enumerate(chunks):
+                    # Keep a bounded number of chunks ahead of the one being merged
+                    while next_submit < len(chunks) and next_submit < i + window:
+                        futures[next_submit] = executor.submit(task, log_path, chunks[next_submit])
+                        next_submit += 1
+
+                    # Workers also finalize the encounters they complete
+                    with self._timed("parse"):
+                        encounters = self._collect_chunk(chunk, futures.pop(i))
+
+                    # Stitch encounters split across chunk seams back together
+                    with self._timed("merge"):
+                        merged_before = len(merger.merged)
+                        completed = merger.add(chunk, encounters)
+                    self._finalize_merged(merger.merged[merged_before:])
+                    yield from completed
+
+                with self._timed("merge"):
+                    merged_before = len(merger.merged)
+                    completed = merger.finish()
+                self._finalize_merged(merger.merged[merged_before:])
+                yield from completed
+
+            finally:
+                # Chunks left behind when the consumer stops early
+                for future in futures.values():
+                    if not future.cancel():
+                        self._discard_chunk(future)
+
+    def _collect_chunk(self, chunk: WorkChunk, future: Future) -> List[UnifiedEncounter]:
+        """
+        Wait for a chunk's result and load its encounters.
 
-        return all_encounters
+        Args:
+            chunk: Chunk the future parses
+            future: Future of the chunk task
+
+        Returns:
+            Encounters parsed from the chunk (empty if the chunk failed)
+        """
+        try:
+            encounters, events_processed, errors = future.result()
+            if isinstance(encounters, SharedResult):
+                self.result_bytes += len(encounters.metadata)
+                self.shared_bytes += encounters.size
+                encounters = _load_encounters(encounters)
+            elif isinstance(encounters, bytes):
+                self.result_bytes += len(encounters)
+                encounters = _load_encounters(encounters)
+            self.total_events += events_processed
+            self.parse_errors.extend(errors)
+            self.chunks_processed += 1
+
+            logger.debug(
+                f"Processed bytes {chunk.start_byte:,}-{chunk.end_byte:,}: "
+                f"{len(encounters)} encounters, {events_processed} events"
+            )
+            return encounters
 
-    def _process_encounter_chunk(
-        self, log_path: Path, boundary: EncounterBoundary
+        except Exception as e:
+            logger.error(f"Error processing chunk at byte {chunk.start_byte}: {e}")
+            self.parse_errors.append(f"Chunk at byte {chunk.start_byte}: {str(e)}")
+            return []
+
+    def _discard_chunk(self, future: Future):
+        """Release the shared memory of a chunk result that will not be used."""
+        try:
+            encounters = future.result()[0]
+            if isinstance(encounters, SharedResult):
+                release_results(encounters)
+        except Exception as e:
+            logger.debug(f"Ignoring abandoned chunk result: {e}")
+
+    def _finalize_merged(self, encounters: List[UnifiedEncounter]):
+        """Calculate metrics again for encounters merged across chunk seams."""
+        with self._timed("metrics"):
+            for encounter in encounters:
+                try:
+                    encounter.calculate_metrics()
+                    logger.debug(
+                        f"Calculated metrics for {encounter.encounter_name} "
+                        f"({encounter.encounter_type.value})"
+                    )
+                except Exception as e:
+                    logger.error(f"Error calculating metrics for {encounter.encounter_name}: {e}")
+                    self.parse_errors.append(f"Metrics calculation failed: {str(e)}")
+
+    def _process_chunk(
+        self, log_path: Path, chunk: WorkChunk
     ) -> Tuple[List[UnifiedEncounter], int, List[str]]:
         """
-        Process a single encounter chunk using UnifiedSegmenter.
+        Process a single chunk using UnifiedSegmenter.
 
         Args:
             log_path: Path to the combat log file
-            boundary: Encounter boundary to process
+            chunk: Chunk to process
 
         Returns:
             Tuple of (encounters, events_processed, errors)
         """
-        # Create independent tokenizer, event factory, and segmenter for this thread
-        tokenizer = LineTokenizer()
-        event_factory = EventFactory()
-        segmenter = UnifiedSegmenter()
-
-        chunk_errors = []
-        event_count = 0
-
         try:
-            with open(log_path, "rb") as f:
-                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-                    # Process lines in the boundary range
-                    current_pos = boundary.start_byte
-
-                    while current_pos < boundary.end_byte and current_pos < len(mm):
-                        # Find next line
-                        line_end = mm.find(b"\n", current_pos)
-                        if line_end == -1 or line_end > boundary.end_byte:
-                            line_end = min(boundary.end_byte, len(mm))
-
-                        try:
-                            line = mm[current_pos:line_end].decode("utf-8", errors="ignore")
-                            if line.strip() and not line.strip().startswith("#"):
-                                parsed_line = tokenizer.parse_line(line)
-                                if parsed_line:
-                                    event = event_factory.create_event(parsed_line)
-                                    if event:
-                                        segmenter.process_event(event)
-                                        event_count += 1
-
-                        except Exception as e:
-                            if len(chunk_errors) < 100:  # Limit error collection
-                                chunk_errors.append(f"Line {current_pos}: {str(e)}")
-
-                        current_pos = line_end + 1
-
-            # Get the completed encounters from this chunk
-            encounters = segmenter.get_encounters()
+            encounters, event_count, chunk_errors = parse_byte_range(
+                log_path, chunk.start_byte, chunk.end_byte, seam=chunk.seam
+            )
 
             logger.debug(
-                f"Chunk {boundary.encounter_name}: "
+                f"Chunk at byte {chunk.start_byte:,}: "
                 f"{event_count} events, {len(encounters)} encounters"
             )
 
             return encounters, event_count, chunk_errors
 
         except Exception as e:
-            logger.error(f"Failed to process encounter chunk {boundary.encounter_name}: {e}")
-            chunk_errors.append(f"Chunk processing failed: {str(e)}")
-            return [], 0, chunk_errors
+            logger.error(f"Failed to process chunk at byte {chunk.start_byte}: {e}")
+            return [], 0, [f"Chunk processing failed: {str(e)}"]
+
+    @contextmanager
+    def _timed(self, stage: str):
+        """Add the wall time spent in a block to a processing stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings[stage] = (
+                self.stage_timings.get(stage, 0.0) + time.perf_counter() - start
+            )
 
     def _fallback_sequential_processing(self, log_path: Path) -> List[UnifiedEncounter]:
         """
@@ -393,6 +569,18 @@ class UnifiedParallelProcessor:
         Returns:
             List of UnifiedEncounter objects
         """
+        return list(self._iter_sequential(log_path))
+
+    def _iter_sequential(self, log_path: Path) -> Iterator[UnifiedEncounter]:
+        """
+        Parse a plain or compressed log in one pass, yielding finished encounters.
+
+        Args:
+            log_path: Path to the combat log file
+
+        Yields:
+            UnifiedEncounter objects in file order
+        """
         logger.info("Using sequential processing fallback with UnifiedSegmenter")
 
         tokenizer = LineTokenizer()
@@ -400,8 +588,10 @@ class UnifiedParallelProcessor:
         segmenter = UnifiedSegmenter()
 
         event_count = 0
+        yielded = 0
 
-        with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
+        with open_log(log_path, max_size=self.max_log_bytes) as stream:
+            f = io.TextIOWrapper(stream, encoding="utf-8", errors="ignore")
             for line_num, line in enumerate(f, 1):
                 if line.strip() and not line.strip().startswith("#"):
                     try:
@@ -420,21 +610,25 @@ class UnifiedParallelProcessor:
                         if len(self.parse_errors) < 1000:  # Limit error collection
                             self.parse_errors.append(f"Line {line_num}: {str(e)}")
 
-        self.total_events = event_count
+                # Pass on encounters as soon as the segmenter finishes them
+                while yielded < len(segmenter.encounters):
+                    yield self._checked_metrics(segmenter.encounters[yielded])
+                    yielded += 1
 
-        # Get all encounters
+        # Finish any open encounter
         encounters = segmenter.get_encounters()
+        self.total_events = event_count
+        for encounter in encounters[yielded:]:
+            yield self._checked_metrics(encounter)
 
-        # Calculate metrics
-        logger.info(f"Calculating metrics for {len(encounters)} encounters...")
-        for encounter in encounters:
-            try:
-                encounter.calculate_metrics()
-            except Exception as e:
-                logger.error(f"Error calculating metrics for {encounter.encounter_name}: {e}")
-                self.parse_errors.append(f"Metrics calculation failed: {str(e)}")
-
-        return encounters
+    def _checked_metrics(self, encounter: UnifiedEncounter) -> UnifiedEncounter:
+        """Calculate an encounter's metrics, recording a failure as a parse error."""
+        try:
+            encounter.calculate_metrics()
+        except Exception as e:
+            logger.error(f"Error calculating metrics for {encounter.encounter_name}: {e}")
+            self.parse_errors.append(f"Metrics calculation failed: {str(e)}")
+        return encounter
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -445,7 +639,13 @@ class UnifiedParallelProcessor:
         """
         return {
             "max_workers": self.max_workers,
+            "executor_type": self.executor_type,
+            "chunks_processed": self.chunks_processed,
+            "result_bytes": self.result_bytes,
+            "shared_bytes": self.shared_bytes,
             "total_events": self.total_events,
             "parse_errors": len(self.parse_errors),
+            "boundary_index": self.boundary_index_stats,
+            "stage_timings": dict(self.stage_timings),
             "errors": self.parse_errors[:100] if self.parse_errors else [],  # Limit errors shown
         }
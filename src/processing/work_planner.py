@@ -0,0 +1,423 @@
+"""
+Work planning for parallel combat log parsing.
+
+Splits a log into chunks of roughly equal size that together cover the whole
+file. Seams only fall where UnifiedSegmenter state is easy to carry over:
+outside any encounter, at the start of a top-level encounter, or at a boss
+pull inside a Mythic+ run. Each chunk records the seam state it starts in,
+and ChunkMerger stitches the per-chunk encounters back together so the result
+matches a sequential parse.
+"""
+
+import bisect
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from ..models.combat_periods import CombatPeriodDetector
+from ..models.unified_encounter import EncounterType, UnifiedEncounter
+from ..parser.events import EventFactory
+from ..parser.tokenizer import LineTokenizer
+from ..segmentation.unified_segmenter import UnifiedSegmenter
+from .boundary_index import BoundaryMarker, EncounterBoundary
+
+logger = logging.getLogger(__name__)
+
+SUMMON_PATTERN = re.compile(rb"  SPELL_SUMMON,")
+
+# Player or summonable unit GUID and name as the source or destination of an event
+UNIT_PATTERN = re.compile(rb',((?:Player|Pet|Creature)-[0-9A-F-]+),"([^"]*)"')
+
+# Summoned GUIDs the segmenter maps to their owner
+SUMMON_GUID_PREFIXES = ("Pet-", "Creature-", "Vehicle-")
+
+
+@dataclass
+class SeamState:
+    """UnifiedSegmenter state at the start of a chunk."""
+
+    # Summoned GUID -> (owner GUID, owner name), from summons in earlier chunks
+    pet_owners: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+
+    # Offset of the CHALLENGE_MODE_START line of a Mythic+ run the chunk continues
+    run_start: Optional[int] = None
+
+    # Player GUID -> name of the run's characters created before the chunk, in
+    # creation order; includes players only seen through their pets
+    characters: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class WorkChunk:
+    """A byte range of the log to parse as one task."""
+
+    start_byte: int
+    end_byte: int  # Exclusive; the next chunk starts here
+    seam: SeamState = field(default_factory=SeamState)
+
+
+def _line_start_at_or_after(mm, offset: int) -> int:
+    """Get the first line start at or after offset (len(mm) if there is none)."""
+    if offset == 0 or mm[offset - 1 : offset] == b"\n":
+        return offset
+    newline = mm.find(b"\n", offset)
+    return len(mm) if newline == -1 else newline + 1
+
+
+def _containing_boundary(
+    boundaries: List[EncounterBoundary], starts: List[int], offset: int
+) -> Optional[EncounterBoundary]:
+    """Find the top-level boundary containing offset, if any."""
+    i = bisect.bisect_right(starts, offset) - 1
+    if i >= 0 and offset <= boundaries[i].end_byte:
+        return boundaries[i]
+    return None
+
+
+def scan_summons(
+    mm, boundaries: List[EncounterBoundary], start: int = 0
+) -> List[Tuple[int, str, Tuple[str, str]]]:
+    """
+    Find the summons the segmenter would record, i.e. those inside encounters.
+
+    Args:
+        mm: mmap or bytes of the log
+        boundaries: Top-level boundaries sorted by start position
+        start: Offset of a line start to scan from
+
+    Returns:
+        List of (line offset, summoned GUID, (owner GUID, owner name)) in file order
+    """
+    starts = [b.start_byte for b in boundaries]
+    tokenizer = LineTokenizer()
+    summons = []
+
+    for match in SUMMON_PATTERN.finditer(mm, start):
+        line_start = mm.rfind(b"\n", 0, match.start()) + 1
+        if mm[line_start : line_start + 1] == b"#":
+            continue
+        if _containing_boundary(boundaries, starts, line_start) is None:
+            continue
+
+        line_end = mm.find(b"\n", match.end())
+        line = mm[line_start : line_end if line_end != -1 else len(mm)]
+        try:
+            parsed_line = tokenizer.parse_line(line.decode("utf-8", errors="ignore"))
+            event = EventFactory.create_event(parsed_line) if parsed_line else None
+        except Exception as e:
+            logger.debug(f"Skipping unparseable summon at {line_start}: {e}")
+            continue
+
+        if event and event.dest_guid and event.dest_guid.startswith(SUMMON_GUID_PREFIXES):
+            owner_name = getattr(event, "source_name", "Unknown")
+            summons.append((line_start, event.dest_guid, (event.source_guid, owner_name)))
+
+    return summons
+
+
+def _scan_characters(
+    mm,
+    start: int,
+    end: int,
+    summons: List[Tuple[int, str, Tuple[str, str]]],
+    s: int,
+    pet_owners: Dict[str, Tuple[str, str]],
+    characters: Dict[str, str],
+) -> int:
+    """
+    Add the characters the segmenter creates for the lines in [start, end).
+
+    Players are added as they appear, and summoned units through their owner
+    after the players of the same line, matching the order the segmenter
+    creates them in.
+
+    Args:
+        mm: mmap or bytes of the log
+        start: Offset of a line start to scan from
+        end: Offset of a line start to scan to
+        summons: Summons from scan_summons
+        s: Index of the first summon not yet in pet_owners
+        pet_owners: Summoned GUID -> owner of the summons before start; updated in place
+        characters: Player GUID -> name in first-seen order; updated in place
+
+    Returns:
+        Index of the first summon not yet in pet_owners
+    """
+    line_end = -1
+    owners: List[Tuple[str, str]] = []
+    for match in UNIT_PATTERN.finditer(mm, start, end):
+        if match.start() > line_end:
+            for guid, name in owners:
+                characters.setdefault(guid, name)
+            owners = []
+            line_start = mm.rfind(b"\n", 0, match.start()) + 1
+            line_end = mm.find(b"\n", match.start())
+            if line_end == -1:
+                line_end = len(mm)
+            while s < len(summons) and summons[s][0] <= line_start:
+                pet_owners[summons[s][1]] = summons[s][2]
+                s += 1
+
+        guid = match.group(1).decode("ascii")
+        name = match.group(2).decode("utf-8", errors="ignore")
+        if guid.startswith("Player-"):
+            characters.setdefault(guid, name)
+        elif guid in pet_owners and pet_owners[guid][0].startswith("Player-"):
+            owner_guid, owner_name = pet_owners[guid]
+            owners.append((owner_guid, owner_name or name))
+
+    for guid, name in owners:
+        characters.setdefault(guid, name)
+    return s
+
+
+def plan_chunks(
+    mm,
+    markers: List[BoundaryMarker],
+    boundaries: List[EncounterBoundary],
+    chunk_bytes: int,
+) -> List[WorkChunk]:
+    """
+    Split a log into chunks of at least chunk_bytes, cut at segment-safe points.
+
+    Safe points are any line outside an encounter, the start of a top-level
+    boundary, and boss ENCOUNTER_START lines inside a Mythic+ run. A cut is
+    placed at the first safe point after each chunk_bytes stretch, so a long
+    Mythic+ run is split between its bosses while a raid pull stays whole.
+
+    Args:
+        mm: mmap or bytes of the log
+        markers: Boundary markers in file order
+        boundaries: Top-level boundaries sorted by start position
+        chunk_bytes: Target chunk size
+
+    Returns:
+        Chunks in file order covering the whole log
+    """
+    size = len(mm)
+    if size == 0:
+        return []
+
+    # Fixed safe points as (offset, run_start) sorted by offset
+    points = []
+    gaps = []
+    previous_end = 0
+    for boundary in boundaries:
+        points.append((boundary.start_byte, None))
+        if boundary.start_byte > previous_end:
+            gaps.append((previous_end, boundary.start_byte))
+        previous_end = max(previous_end, boundary.end_byte + 1)
+        if previous_end < size:
+            points.append((previous_end, None))
+    if previous_end < size:
+        gaps.append((previous_end, size))
+
+    starts = [b.start_byte for b in boundaries]
+    for marker in markers:
+        if marker.kind != "ENCOUNTER" or not marker.is_start:
+            continue
+        boundary = _containing_boundary(boundaries, starts, marker.line_start)
+        if (
+            boundary
+            and boundary.encounter_type == "CHALLENGE_MODE"
+            and marker.line_start > boundary.start_byte
+        ):
+            points.append((marker.line_start, boundary.start_byte))
+
+    points.sort(key=lambda point: point[0])
+    point_offsets = [offset for offset, _ in points]
+    gap_starts = [start for start, _ in gaps]
+
+    def next_cut(want: int) -> Optional[Tuple[int, Optional[int]]]:
+        """Get the first safe point at or after want."""
+        i = bisect.bisect_right(gap_starts, want) - 1
+        if i >= 0 and want < gaps[i][1]:
+            offset = _line_start_at_or_after(mm, want)
+            if offset < gaps[i][1]:
+                return offset, None
+
+        j = bisect.bisect_left(point_offsets, want)
+        return points[j] if j < len(points) else None
+
+    cuts = [(0, None)]
+    while True:
+        cut = next_cut(cuts[-1][0] + max(chunk_bytes, 1))
+        if cut is None or cut[0] >= size:
+            break
+        cuts.append(cut)
+
+    # Carry pet ownership, and the characters of a run split at a boss, across seams
+    summons = scan_summons(mm, boundaries)
+    chunks = []
+    pet_owners: Dict[str, Tuple[str, str]] = {}
+    scan_owners: Dict[str, Tuple[str, str]] = {}
+    characters: Dict[str, str] = {}
+    scanned_to = 0
+    s = 0
+    scan_s = 0
+    for i, (start, run_start) in enumerate(cuts):
+        while s < len(summons) and summons[s][0] < start:
+            pet_owners[summons[s][1]] = summons[s][2]
+            s += 1
+
+        seam = SeamState(dict(pet_owners), run_start)
+        if run_start is not None:
+            if scanned_to <= run_start:
+                characters, scanned_to = {}, run_start
+            scan_s = _scan_characters(
+                mm, scanned_to, start, summons, scan_s, scan_owners, characters
+            )
+            scanned_to = start
+            seam.characters = dict(characters)
+
+        end = cuts[i + 1][0] if i + 1 < len(cuts) else size
+        chunks.append(WorkChunk(start, end, seam))
+
+    return chunks
+
+
+def merge_continuation(encounter: UnifiedEncounter, continuation: UnifiedEncounter):
+    """
+    Append the next piece of a Mythic+ run that was split at a boss pull.
+
+    The continuation was parsed with the run reopened from its
+    CHALLENGE_MODE_START line and its earlier characters created up front, so
+    its first fight is a placeholder that ends where the continuation begins.
+
+    Args:
+        encounter: Run parsed up to the seam; updated in place
+        continuation: Run parsed from the seam
+    """
+    for guid, character in continuation.characters.items():
+        if guid in encounter.characters:
+            encounter.characters[guid].merge(character)
+        else:
+            encounter.characters[guid] = character
+
+    placeholder, fights = continuation.fights[0], continuation.fights[1:]
+    if encounter.current_fight is not None:
+        encounter.end_fight(placeholder.end_time)
+
+    for fight in fights:
+        fight.fight_id = len(encounter.fights) + 1
+        fight.players = {guid: encounter.characters[guid] for guid in fight.players}
+        encounter.fights.append(fight)
+    encounter.current_fight = continuation.current_fight
+
+    # Trash segments are numbered in order across the whole run
+    trash_count = 0
+    for fight in encounter.fights:
+        if "Trash" in fight.fight_name:
+            trash_count += 1
+            if fight.is_trash and trash_count > 1:
+                fight.fight_name = f"{encounter.encounter_name} - Trash ({trash_count})"
+
+    encounter.events.extend(continuation.events)
+    encounter.end_time = continuation.end_time
+    encounter.success = continuation.success
+    encounter.in_time = continuation.in_time
+
+
+class ChunkMerger:
+    """
+    Stitch per-chunk encounters together incrementally, in file order.
+
+    Each call to add() returns the encounters that can no longer change: all
+    but the last encounter of the chunk, which may still be continued by the
+    next chunk, plus the previously held-back encounter once it is known to
+    be complete. Encounters merged across seams are also collected in
+    merged, as their metrics need calculating again.
+    """
+
+    def __init__(self):
+        """Initialize the merger."""
+        self.merged: List[UnifiedEncounter] = []
+        self.pending: Optional[UnifiedEncounter] = None
+        self.pending_merged = False
+        self.pull_counts: Dict[int, int] = {}
+        self.detector = CombatPeriodDetector(gap_threshold=UnifiedSegmenter.COMBAT_GAP_THRESHOLD)
+
+    def add(self, chunk: WorkChunk, encounters: List[UnifiedEncounter]) -> List[UnifiedEncounter]:
+        """
+        Add the encounters parsed from the next chunk.
+
+        Args:
+            chunk: Chunk the encounters were parsed from
+            encounters: Encounters parsed from the chunk
+
+        Returns:
+            Encounters that are now complete, in file order
+        """
+        if chunk.seam.run_start is not None and self.pending is not None and encounters:
+            run, continuation = self.pending, encounters[0]
+            if (
+                run.encounter_type == EncounterType.MYTHIC_PLUS
+                and continuation.encounter_type == EncounterType.MYTHIC_PLUS
+                and run.start_time == continuation.start_time
+            ):
+                merge_continuation(run, continuation)
+                self.pending_merged = True
+                encounters = encounters[1:]
+
+        if not encounters:
+            return []
+
+        completed = self._release() + [self._number(e) for e in encounters[:-1]]
+        self.pending = encounters[-1]
+        return completed
+
+    def finish(self) -> List[UnifiedEncounter]:
+        """
+        Get the last held-back encounter after all chunks were added.
+
+        Returns:
+            Remaining encounters
+        """
+        return self._release()
+
+    def _release(self) -> List[UnifiedEncounter]:
+        """Complete the held-back encounter."""
+        encounter, self.pending = self.pending, None
+        if encounter is None:
+            return []
+
+        if self.pending_merged:
+            self.pending_merged = False
+            encounter.combat_periods = self.detector.detect_periods(encounter.events)
+            self.merged.append(encounter)
+        return [self._number(encounter)]
+
+    def _number(self, encounter: UnifiedEncounter) -> UnifiedEncounter:
+        """Number a raid pull by the earlier pulls of its boss in the log."""
+        if encounter.encounter_type == EncounterType.RAID:
+            count = self.pull_counts.get(encounter.encounter_id, 0) + 1
+            self.pull_counts[encounter.encounter_id] = count
+            encounter.pull_number = count
+            if encounter.fights:
+                encounter.fights[0].fight_name = f"{encounter.encounter_name} - Pull {count}"
+        return encounter
+
+
+def merge_chunk_results(
+    chunks: List[WorkChunk], results: List[List[UnifiedEncounter]]
+) -> Tuple[List[UnifiedEncounter], List[UnifiedEncounter]]:
+    """
+    Stitch per-chunk encounters into the encounters of the whole log.
+
+    Encounters parsed whole in one chunk were already finalized by their
+    worker; only the merged ones need their metrics calculated again.
+
+    Args:
+        chunks: Planned chunks in file order
+        results: Encounters parsed from each chunk
+
+    Returns:
+        Tuple of (encounters in file order, encounters merged across seams)
+    """
+    merger = ChunkMerger()
+    encounters: List[UnifiedEncounter] = []
+    for chunk, chunk_encounters in zip(chunks, results):
+        encounters.extend(merger.add(chunk, chunk_encounters))
+    encounters.extend(merger.finish())
+    return encounters, merger.merged
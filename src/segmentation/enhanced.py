@@ -339,7 +339,7 @@ class EnhancedSegmenter:
             bloodlust_spells = {32182, 80353, 2825, 90355, 160452, 264667, 390386}
             if event.spell_id in bloodlust_spells and event.event_type == "SPELL_CAST_SUCCESS":
                 self.current_raid.bloodlust_used = True
-                self.current_raid.bloodlust_time = event.timestamp.timestamp()
+                self.current_raid.bloodlust_time = event.get_epoch()
 
         # Track battle resurrections
         if event.event_type == "SPELL_RESURRECT":
@@ -35,6 +35,9 @@ class UnifiedSegmenter:
     - Combat period detection
     """
 
+    # Seconds without combat events that end a combat period
+    COMBAT_GAP_THRESHOLD = 5.0
+
     def __init__(self):
         """Initialize the unified segmenter."""
         # Current encounters
@@ -45,7 +48,7 @@ class UnifiedSegmenter:
         self.raid_pull_counts: Dict[int, int] = {}
 
         # Combat tracking
-        self.combat_detector = CombatPeriodDetector(gap_threshold=5.0)
+        self.combat_detector = CombatPeriodDetector(gap_threshold=self.COMBAT_GAP_THRESHOLD)
         self.death_analyzer = DeathAnalyzer()
 
         # Pet ownership mapping
@@ -279,7 +282,7 @@ class UnifiedSegmenter:
 
                 # Create death event
                 death = DeathEvent(
-                    timestamp=event.timestamp.timestamp(),
+                    timestamp=event.get_epoch(),
                     datetime=event.timestamp,
                     killing_blow=event if isinstance(event, DamageEvent) else None,
                     overkill=event.overkill if isinstance(event, DamageEvent) else 0,
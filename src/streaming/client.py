@@ -9,12 +9,14 @@ import asyncio
 import json
 import time
 import logging
+from dataclasses import replace
 from typing import Optional, Callable, Dict, Any
 from pathlib import Path
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
 from src.api.models import StreamMessage, StreamResponse, SessionStart
+from src.parser.tail import LogTailer, TailCheckpoint
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +65,7 @@ class CombatLogStreamer:
         # File streaming state
         self.file_position = 0
         self.last_file_size = 0
+        self.tailer: Optional[LogTailer] = None
 
         # Statistics
         self.stats = {
@@ -188,57 +191,63 @@ class CombatLogStreamer:
         start_position: int = 0,
         lines_per_batch: int = 100,
         batch_delay: float = 0.1,
+        checkpoint_file: Optional[str] = None,
+        poll_interval: float = 1.0,
     ):
         """
         Stream a combat log file to the server.
 
+        In follow mode only complete lines are sent, and a truncated or newly
+        started log (file_path may be the WoW Logs directory) is picked up
+        from its beginning.
+
         Args:
-            file_path: Path to combat log file
+            file_path: Path to combat log file or WoW Logs directory
             follow: Continue reading as file grows (tail -f mode)
             start_position: Byte position to start reading from
             lines_per_batch: Lines to send per batch
             batch_delay: Delay between batches
+            checkpoint_file: JSON file holding the offset after the last sent batch;
+                when it exists, streaming resumes from it instead of start_position
+            poll_interval: Seconds between checks for new data in follow mode
         """
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"Combat log file not found: {file_path}")
 
-        self.file_position = start_position
+        checkpoint = TailCheckpoint.load(checkpoint_file) if checkpoint_file else None
+        if checkpoint is None and start_position:
+            checkpoint = TailCheckpoint(path=str(file_path), offset=start_position)
+
+        self.tailer = LogTailer(file_path, checkpoint=checkpoint, poll_interval=poll_interval)
+        self.file_position = checkpoint.offset if checkpoint else 0
         logger.info(f"Starting to stream file: {file_path} (follow={follow})")
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                f.seek(self.file_position)
-
-                lines_batch = []
-                while True:
-                    line = f.readline()
-
-                    if line:
-                        # Process line
-                        if line.strip():  # Skip empty lines
-                            lines_batch.append(line)
-
-                            # Send batch when full
-                            if len(lines_batch) >= lines_per_batch:
-                                await self._send_batch(lines_batch)
-                                lines_batch = []
-                                await asyncio.sleep(batch_delay)
-
-                        self.file_position = f.tell()
-
-                    else:
-                        # End of file
-                        if lines_batch:
-                            # Send remaining lines
-                            await self._send_batch(lines_batch)
-                            lines_batch = []
-
-                        if not follow:
-                            break
-
-                        # In follow mode, wait and check for new data
-                        await asyncio.sleep(1.0)
+            while True:
+                lines = self.tailer.read_new_lines(include_partial=not follow)
+
+                for i in range(0, len(lines), lines_per_batch):
+                    batch = lines[i : i + lines_per_batch]
+                    lines_batch = [line for line, _, _ in batch if line.strip()]
+                    if lines_batch:
+                        await self._send_batch(lines_batch)
+
+                    # Checkpoint the end of the batch, not of everything read
+                    _, offset, length = batch[-1]
+                    self.file_position = min(offset + length + 1, self.tailer.checkpoint.offset)
+                    if checkpoint_file:
+                        replace(self.tailer.checkpoint, offset=self.file_position).save(
+                            Path(checkpoint_file)
+                        )
+                    await asyncio.sleep(batch_delay)
+
+                if not follow:
+                    break
+
+                if not lines:
+                    # In follow mode, wait and check for new data
+                    await asyncio.sleep(poll_interval)
 
         except Exception as e:
             logger.error(f"Error streaming file: {e}")
@@ -0,0 +1,131 @@
+"""
+Combat log lines and comparison helpers shared by the parser and processing tests.
+"""
+
+PRIEST = 'Player-1084-0A5F0002,"Holyone-Area52-US",0x512,0x0'
+MAGE = 'Player-1084-0A5F0001,"Frostbolt-Area52-US",0x512,0x0'
+UNIT_INFO = (
+    "0000000000000000,812345678,900000000,0,0,5043,0,0,0,1,0,0,-2345.12,-123.45,2215,1.2345,620,80"
+)
+
+
+def pull_lines(minute, boss_id, boss_name):
+    """Lines for one boss pull with advanced combat logging unit info."""
+    boss = f'Creature-0-4233-2657-12345-{boss_id}-0000000001,"{boss_name}",0x10a48,0x0'
+    prefix = f"9/15/2025 21:{minute:02d}"
+    return [
+        f'{prefix}:00.000-4  ENCOUNTER_START,{boss_id},"{boss_name}",16,20,2657',
+        f'{prefix}:01.000-4  SPELL_DAMAGE,{MAGE},{boss},116,"Frostbolt",0x10,'
+        f"Creature-0-4233-2657-12345-{boss_id}-0000000001,{UNIT_INFO},20000,0,16,0,0,0,1,nil,nil",
+        f'{prefix}:02.000-4  SPELL_HEAL,{PRIEST},{MAGE},2061,"Flash Heal",0x2,'
+        f"Player-1084-0A5F0001,{UNIT_INFO},12000,3000,0,1",
+        f'{prefix}:03.000-4  ENCOUNTER_END,{boss_id},"{boss_name}",16,20,1,3000',
+    ]
+
+
+FIRST_PULL = [
+    "9/15/2025 21:29:59.000-4  COMBAT_LOG_VERSION,22,ADVANCED_LOG_ENABLED,1,"
+    "BUILD_VERSION,11.2.0,PROJECT_ID,1",
+] + pull_lines(30, 2902, "Ulgrax the Devourer")
+SECOND_PULL = pull_lines(35, 2917, "The Bloodbound Horror")
+
+
+PET_GUID = "Creature-0-4233-2660-12345-78116-0000000001"
+PET = f'{PET_GUID},"Water Elemental",0x1114,0x0'
+TRASH = 'Creature-0-4233-2660-12345-216336-0000000001,"Ravenous Crawler",0x10a48,0x0'
+
+
+def run_lines():
+    """A Mythic+ run with trash, two bosses and a pet summoned before the first boss."""
+    prefix = "9/15/2025 21:33"
+    trash_damage = (
+        f'SPELL_DAMAGE,{MAGE},{TRASH},116,"Frostbolt",0x10,'
+        f"Creature-0-4233-2660-12345-216336-0000000001,{UNIT_INFO},7000,0,16,0,0,0,nil,nil,nil"
+    )
+    pet_damage = (
+        f'SPELL_DAMAGE,{PET},{TRASH},31707,"Waterbolt",0x10,'
+        f"Creature-0-4233-2660-12345-216336-0000000001,{UNIT_INFO},3000,0,16,0,0,0,nil,nil,nil"
+    )
+    lines = [
+        'CHALLENGE_MODE_START,"Ara-Kara, City of Echoes",2660,503,10,[10,9,147]',
+        f'SPELL_SUMMON,{MAGE},{PET},31687,"Summon Water Elemental",0x10',
+        trash_damage,
+        f'SPELL_AURA_APPLIED,{PRIEST},{MAGE},10060,"Power Infusion",0x2,BUFF',
+        'ENCOUNTER_START,2583,"Avanoxx",8,5,2660',
+        pet_damage,
+        f"UNIT_DIED,0000000000000000,nil,0x80000000,0x80000000,{PRIEST},0",
+        'ENCOUNTER_END,2583,"Avanoxx",8,5,1,90000',
+        trash_damage,
+        'ENCOUNTER_START,2584,"Anub\'zekt",8,5,2660',
+        pet_damage,
+        f'SPELL_AURA_REMOVED,{PRIEST},{MAGE},10060,"Power Infusion",0x2,BUFF',
+        'ENCOUNTER_END,2584,"Anub\'zekt",8,5,1,90000',
+        trash_damage,
+        "CHALLENGE_MODE_END,2660,1,10,1800000,300.5,2500.5",
+    ]
+    return [f"{prefix}:{i:02d}.000-4  {line}" for i, line in enumerate(lines)]
+
+
+TRASH_LINE = (
+    f'9/15/2025 21:59:00.000-4  SPELL_DAMAGE,{MAGE},{TRASH},116,"Frostbolt",0x10,'
+    f"Creature-0-4233-2660-12345-216336-0000000001,{UNIT_INFO},7000,0,16,0,0,0,nil,nil,nil"
+)
+
+LOG_LINES = (
+    FIRST_PULL
+    + [TRASH_LINE]
+    + run_lines()
+    + pull_lines(40, 2902, "Ulgrax the Devourer")
+    + [TRASH_LINE]
+    + pull_lines(45, 2902, "Ulgrax the Devourer")
+)
+
+
+# Swing, heal and aura dose lines to add to the sample_log_lines fixture
+EXTRA_LINES = [
+    '9/15/2025 21:30:23.500-4  SWING_DAMAGE,Player-1234-5678,"Testplayer-Area52-US",0x512,0x0,Creature-5678,"Ulgrax the Devourer",0x10a28,0x0,4000,0,1,0,0,0,nil,nil,nil',
+    '9/15/2025 21:30:23.600-4  SPELL_HEAL,Player-1234-5678,"Testplayer-Area52-US",0x512,0x0,Player-1234-5678,"Testplayer-Area52-US",0x512,0x0,2061,"Flash Heal",0x2,12000,3000,0,nil',
+    '9/15/2025 21:30:23.700-4  SPELL_AURA_APPLIED_DOSE,Player-1234-5678,"Testplayer-Area52-US",0x512,0x0,Player-1234-5678,"Testplayer-Area52-US",0x512,0x0,17,"Power Word: Shield",0x2,BUFF,3',
+]
+
+
+def summarize(encounters):
+    """Comparable per-encounter totals."""
+    summary = []
+    for encounter in encounters:
+        encounter.calculate_metrics()
+        summary.append(
+            (
+                encounter.encounter_name,
+                encounter.start_time,
+                encounter.end_time,
+                sorted(
+                    (guid, char.total_damage_done, char.total_healing_done)
+                    for guid, char in encounter.characters.items()
+                ),
+            )
+        )
+    return summary
+
+
+def describe(encounters):
+    """Fight layout, pull numbers and per-character details to compare parses."""
+    details = []
+    for encounter in encounters:
+        details.append(
+            (
+                encounter.pull_number,
+                [(f.fight_id, f.fight_name, f.end_time, list(f.players)) for f in encounter.fights],
+                len(encounter.combat_periods),
+                sorted(
+                    (
+                        guid,
+                        sorted(char.active_buffs),
+                        [len(death.recent_damage_taken) for death in char.enhanced_deaths],
+                        sorted((k, a.total_damage) for k, a in char.ability_damage.items()),
+                    )
+                    for guid, char in encounter.characters.items()
+                ),
+            )
+        )
+    return details
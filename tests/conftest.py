@@ -16,6 +16,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.database.schema import DatabaseManager, create_tables
 
+from tests.combat_logs import LOG_LINES
+
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -55,6 +57,14 @@ def sample_log_lines():
     ]
 
 
+@pytest.fixture
+def log_file(tmp_path):
+    """Log with raid pulls, trash between them and a Mythic+ run."""
+    path = tmp_path / "WoWCombatLog.txt"
+    path.write_text("\n".join(LOG_LINES) + "\n", encoding="utf-8")
+    return path
+
+
 # Pytest configuration
 def pytest_configure(config):
     """Configure pytest with custom markers."""
@@ -0,0 +1,159 @@
+"""
+Tests for vectorized metrics over columnar batches.
+
+Runs the same encounter through UnifiedSegmenter and BatchMetricsCalculator and
+checks that the per-character numbers agree.
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+np = pytest.importorskip("numpy")
+
+from src.analyzer.batch_metrics import (
+    BatchMetricsCalculator,
+    detect_combat_periods,
+    encounter_row_ranges,
+)
+from src.parser.parser import BatchParser, CombatLogParser
+from src.segmentation.unified_segmenter import UnifiedSegmenter
+
+MAGE = 'Player-1084-0A5F0001,"Frostbolt-Area52-US",0x512,0x0'
+PRIEST = 'Player-1084-0A5F0002,"Holyone-Area52-US",0x512,0x0'
+PET = 'Pet-0-4233-2657-12345-165189-0000000001,"Wolf",0x1112,0x0'
+BOSS = 'Creature-0-4233-2657-12345-215657-0000000001,"Ulgrax the Devourer",0x10a48,0x0'
+
+ENCOUNTER_LINES = [
+    '9/15/2025 21:30:00.000-4  ENCOUNTER_START,2902,"Ulgrax the Devourer",16,20,2657',
+    f"9/15/2025 21:30:00.100-4  SWING_DAMAGE,{PET},{BOSS},400,0,1,0,0,0,nil,nil,nil",
+    f'9/15/2025 21:30:00.200-4  SPELL_SUMMON,{MAGE},{PET},883,"Call Pet 1",0x1',
+    f"9/15/2025 21:30:01.000-4  SWING_DAMAGE,{PET},{BOSS},1500,0,1,0,0,0,1,nil,nil",
+    f"9/15/2025 21:30:01.000-4  SWING_DAMAGE_LANDED,{PET},{BOSS},1500,0,1,0,0,0,1,nil,nil",
+    f'9/15/2025 21:30:01.500-4  SPELL_DAMAGE,{MAGE},{BOSS},116,"Frostbolt",0x10,20000,0,16,0,0,0,1,nil,nil',
+    f'9/15/2025 21:30:02.000-4  SPELL_DAMAGE,{MAGE},{BOSS},116,"Frostbolt",0x10,18000,0,16,0,0,0,nil,nil,nil',
+    f"9/15/2025 21:30:02.500-4  SWING_DAMAGE_LANDED,{BOSS},{PRIEST},9000,0,1,0,0,0,nil,nil,nil",
+    f'9/15/2025 21:30:03.000-4  SPELL_HEAL,{PRIEST},{PRIEST},2061,"Flash Heal",0x2,12000,3000,0,1',
+    f'9/15/2025 21:30:03.100-4  SPELL_AURA_APPLIED,{PRIEST},{MAGE},17,"Power Word: Shield",0x2,BUFF',
+    f'9/15/2025 21:30:03.200-4  SPELL_DAMAGE,{BOSS},{MAGE},450000,"Crush",0x1,90000,5000,1,0,0,0,nil,nil,nil',
+    "9/15/2025 21:30:03.200-4  UNIT_DIED,nil,nil,0x0,0x0,"
+    'Player-1084-0A5F0001,"Frostbolt-Area52-US",0x512,0x0',
+    # Break in combat longer than the 5s gap threshold
+    f'9/15/2025 21:30:10.000-4  SPELL_HEAL,{PRIEST},{PRIEST},2061,"Flash Heal",0x2,8000,0,0,nil',
+    f'9/15/2025 21:30:11.000-4  SPELL_DAMAGE,{PET},{BOSS},16827,"Claw",0x1,700,0,1,0,0,0,nil,nil,nil',
+    '9/15/2025 21:30:12.000-4  ENCOUNTER_END,2902,"Ulgrax the Devourer",16,20,1,12000',
+]
+
+COMPARED_FIELDS = (
+    "total_damage_done",
+    "total_healing_done",
+    "total_damage_taken",
+    "total_healing_received",
+    "total_overhealing",
+    "total_overkill_done",
+    "total_overkill_taken",
+    "death_count",
+    "combat_time",
+    "time_alive",
+    "activity_percentage",
+)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Combat log file with one encounter."""
+    path = tmp_path / "WoWCombatLog.txt"
+    path.write_text("\n".join(ENCOUNTER_LINES), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def encounter(log_file):
+    """The encounter as built by UnifiedSegmenter."""
+    segmenter = UnifiedSegmenter()
+    for event in CombatLogParser().parse_file(str(log_file)):
+        segmenter.process_event(event)
+    return segmenter.get_encounters()[0]
+
+
+@pytest.fixture
+def encounter_batch(log_file):
+    """The encounter rows (between start and end) as a columnar batch."""
+    batch = BatchParser().parse_file(str(log_file))
+    [(first, last)] = encounter_row_ranges(batch)
+    return batch.select(slice(first + 1, last))
+
+
+class TestBatchMetricsCalculator:
+    """Test vectorized metrics against the object-based results."""
+
+    def test_matches_segmenter(self, encounter, encounter_batch):
+        """Totals, deaths and activity agree with EnhancedCharacter."""
+        results = BatchMetricsCalculator(encounter_batch).calculate(
+            encounter.duration, encounter.combat_periods
+        )
+
+        assert set(results) == set(encounter.characters)
+        for guid, character in encounter.characters.items():
+            metrics = results[guid]
+            assert metrics.character_name == character.character_name
+            for name in COMPARED_FIELDS:
+                assert getattr(metrics, name) == pytest.approx(getattr(character, name)), name
+            assert metrics.damage_done_count == len(character.damage_done)
+            assert metrics.get_combat_dps() == character.get_combat_dps()
+            assert metrics.get_hps(encounter.duration) == character.get_hps(encounter.duration)
+
+    def test_ability_breakdown_matches(self, encounter, encounter_batch):
+        """Per-spell totals, hits, crits and percentages agree."""
+        results = BatchMetricsCalculator(encounter_batch).calculate(encounter.duration)
+
+        for guid, character in encounter.characters.items():
+            metrics = results[guid]
+            for attribute in ("ability_damage", "ability_healing", "ability_damage_taken"):
+                expected = getattr(character, attribute)
+                actual = getattr(metrics, attribute)
+                assert set(actual) == set(expected)
+                for spell_id, ability in expected.items():
+                    assert actual[spell_id] == ability
+            assert metrics.dps_by_ability == pytest.approx(character.dps_by_ability)
+
+    def test_pet_and_swing_attribution(self, encounter_batch):
+        """Pet damage counts for the owner after the summon, duplicate swings once."""
+        mage = BatchMetricsCalculator(encounter_batch).calculate(12.0)["Player-1084-0A5F0001"]
+
+        # 20000 + 18000 Frostbolt, 1500 deduplicated swing, 700 Claw; the swing
+        # before SPELL_SUMMON is not attributed
+        assert mage.total_damage_done == 40200
+        assert mage.ability_damage[0].hit_count == 1
+        assert mage.ability_damage[0].crit_count == 1
+        assert mage.death_count == 1
+
+    def test_damage_by_period(self, encounter_batch):
+        """Damage and healing are split across detected combat periods."""
+        results = BatchMetricsCalculator(encounter_batch).calculate(12.0)
+
+        assert results["Player-1084-0A5F0001"].damage_by_period == [39500, 700]
+        assert results["Player-1084-0A5F0002"].healing_by_period == [9000, 8000]
+
+
+class TestCombatPeriods:
+    """Test vectorized combat period detection."""
+
+    def test_matches_detector(self, encounter, encounter_batch):
+        """Detected periods equal CombatPeriodDetector output."""
+        periods = detect_combat_periods(encounter_batch)
+
+        assert [(p.start_time, p.end_time, p.event_count) for p in periods] == [
+            (p.start_time, p.end_time, p.event_count) for p in encounter.combat_periods
+        ]
+        assert len(periods) == 2
+
+    def test_empty_batch(self, encounter_batch):
+        """An empty batch has no periods or characters."""
+        empty = encounter_batch.select(slice(0, 0))
+
+        assert detect_combat_periods(empty) == []
+        assert BatchMetricsCalculator(empty).calculate(0.0) == {}
@@ -0,0 +1,191 @@
+"""
+Tests for event block summaries and block pruning.
+"""
+
+from datetime import datetime
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.block_index import (
+    block_may_match,
+    bloom_may_contain,
+    event_type_mask,
+    iter_block_events,
+    spell_bloom,
+    store_event_blocks,
+)
+from src.database.compression import EventCompressor
+from src.database.dictionaries import CompressionDictionaryStore
+from src.database.schema import _migrate_event_block_index
+from src.models.character_events import TimestampedEvent
+from src.parser.events import DamageEvent, SpellEvent
+
+BASE_TIME = 1726450000.0
+
+
+def make_event(timestamp, event_type="SPELL_DAMAGE", spell_id=1234):
+    """Create a timestamped damage or cast event."""
+    fields = dict(
+        timestamp=datetime.fromtimestamp(timestamp),
+        event_type=event_type,
+        raw_line="test line",
+        source_guid="Player-1234-567890AB",
+        source_name="Testplayer",
+        dest_guid="Creature-5678-CDEF1234",
+        dest_name="Target",
+        spell_id=spell_id,
+        spell_name=f"Spell {spell_id}",
+    )
+    if event_type == "SPELL_DAMAGE":
+        event = DamageEvent(**fields, amount=1000)
+    else:
+        event = SpellEvent(**fields)
+    return TimestampedEvent(
+        timestamp=timestamp,
+        datetime=datetime.fromtimestamp(timestamp),
+        event=event,
+        category="damage_done",
+    )
+
+
+@pytest.fixture
+def stored_blocks(temp_db):
+    """Store a five minute encounter of 30000 events (30 blocks of 10s) for one character."""
+    temp_db.execute(
+        "INSERT OR IGNORE INTO guilds (guild_id, guild_name, server, region) "
+        "VALUES (1, 'Loothing', 'Stormrage', 'US')"
+    )
+    temp_db.execute(
+        "INSERT INTO encounters (encounter_id, guild_id, encounter_type, boss_name, start_time) "
+        "VALUES (1, 1, 'raid', 'Ulgrax the Devourer', ?)",
+        (BASE_TIME,),
+    )
+    temp_db.execute(
+        "INSERT INTO characters (character_id, guild_id, character_guid, character_name) "
+        "VALUES (1, 1, 'Player-1234-567890AB', 'Testplayer')"
+    )
+
+    events = []
+    for i in range(30000):
+        # One cast per block, and a spell only used in the second minute
+        event_type = "SPELL_CAST_SUCCESS" if i % 1000 == 500 else "SPELL_DAMAGE"
+        spell_id = 9999 if 6000 <= i < 12000 else 1000 + i % 50
+        events.append(make_event(BASE_TIME + i * 0.01, event_type, spell_id))
+
+    assert store_event_blocks(temp_db, 1, 1, events) == 30
+    temp_db.commit()
+    return temp_db, events
+
+
+def query_blocks(db, **filters):
+    """Run iter_block_events over stored blocks, returning events and counters."""
+    blocks = db.execute(
+        "SELECT block_id, start_time, end_time, event_type_mask, spell_bloom "
+        "FROM event_blocks WHERE encounter_id = 1 AND character_id = 1 ORDER BY block_index"
+    )
+    compressor = CompressionDictionaryStore(db).compressor_for_encounter(1)
+
+    def load_block(block):
+        data = db.execute(
+            "SELECT compressed_data FROM event_blocks WHERE block_id = ?", (block["block_id"],)
+        )
+        return compressor.decompress_events(data[0]["compressed_data"])
+
+    stats = {}
+    events = list(iter_block_events(blocks, load_block, stats=stats, **filters))
+    return events, stats
+
+
+class TestBlockSummaries:
+    """Test the event type bitmap and spell bloom filter."""
+
+    def test_bloom_has_no_false_negatives(self):
+        """Every added spell is reported as present."""
+        spells = range(100000, 100200)
+        bloom = spell_bloom(spells)
+        assert all(bloom_may_contain(bloom, spell_id) for spell_id in spells)
+
+    def test_bloom_rejects_most_absent_spells(self):
+        """Spells that were not added are mostly rejected."""
+        bloom = spell_bloom(range(100000, 100100))
+        false_positives = sum(bloom_may_contain(bloom, s) for s in range(200000, 210000))
+        assert false_positives < 100
+
+    def test_compressor_metadata(self):
+        """compress_events returns the block summary with its metadata."""
+        events = [make_event(BASE_TIME), make_event(BASE_TIME + 1, "SPELL_CAST_SUCCESS", 42)]
+        _, metadata = EventCompressor().compress_events(events)
+
+        assert metadata["event_type_mask"] == event_type_mask(["SPELL_DAMAGE", "SPELL_CAST_SUCCESS"])
+        assert bloom_may_contain(metadata["spell_bloom"], 42)
+        assert block_may_match(metadata, spell_ids={1234})
+
+    def test_legacy_blocks_never_pruned(self):
+        """Blocks without summaries match every event type and spell filter."""
+        block = {"start_time": 0.0, "end_time": 10.0, "event_type_mask": None, "spell_bloom": None}
+        assert block_may_match(block, 5.0, 6.0, event_type_mask(["UNIT_DIED"]), {1})
+        assert not block_may_match(block, 11.0, 12.0)
+
+
+class TestBlockPruning:
+    """Test reading only the blocks a query needs."""
+
+    def test_time_window(self, stored_blocks):
+        """A ten second window decompresses at most two blocks."""
+        db, events = stored_blocks
+        start, end = BASE_TIME + 125.0, BASE_TIME + 135.0
+
+        result, stats = query_blocks(db, start_time=start, end_time=end)
+
+        assert result == [e for e in events if start <= e.timestamp <= end]
+        assert stats["blocks_pruned"] == 28
+        assert stats["events_decompressed"] <= 2000
+
+    def test_event_type_filter(self, stored_blocks):
+        """Blocks without a wanted event type are skipped."""
+        db, events = stored_blocks
+        result, stats = query_blocks(db, event_types=["UNIT_DIED"])
+
+        assert result == []
+        assert stats["events_decompressed"] == 0
+
+    def test_spell_filter(self, stored_blocks):
+        """Only blocks whose bloom filter has the spell are read."""
+        db, events = stored_blocks
+        result, stats = query_blocks(db, spell_ids=[9999])
+
+        assert len(result) == 6000
+        assert [e.timestamp for e in result] == sorted(e.timestamp for e in result)
+        assert stats["events_decompressed"] <= 8000
+
+    def test_overlapping_blocks_merged(self):
+        """Events of overlapping blocks come out in timestamp order."""
+        blocks = {
+            1: [make_event(BASE_TIME + t) for t in (0, 2, 4, 6)],
+            2: [make_event(BASE_TIME + t) for t in (1, 3, 5)],
+        }
+        rows = [
+            {"block_id": 1, "start_time": BASE_TIME, "end_time": BASE_TIME + 6},
+            {"block_id": 2, "start_time": BASE_TIME + 1, "end_time": BASE_TIME + 5},
+        ]
+
+        result = list(iter_block_events(rows, lambda block: blocks[block["block_id"]]))
+        assert [e.timestamp - BASE_TIME for e in result] == [0, 1, 2, 3, 4, 5, 6]
+
+    def test_migration_adds_summary_columns(self, temp_db):
+        """Event block tables from before the summaries get the new columns."""
+        temp_db.execute("DROP TABLE event_blocks", fetch_results=False)
+        temp_db.execute(
+            "CREATE TABLE event_blocks (block_id INTEGER PRIMARY KEY, start_time REAL, end_time REAL)",
+            fetch_results=False,
+        )
+
+        _migrate_event_block_index(temp_db)
+
+        columns = {row["name"] for row in temp_db.execute("PRAGMA table_info(event_blocks)")}
+        assert {"event_type_mask", "spell_bloom"} <= columns
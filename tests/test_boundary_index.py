@@ -0,0 +1,127 @@
+"""
+Tests for the encounter boundary index used by the parallel processors.
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.boundary_index import BoundaryIndex, build_boundaries, scan_markers
+
+TS = "9/15/2025 21:30:00.000-4  "
+DAMAGE = (
+    TS + 'SPELL_DAMAGE,Player-1084-0A5F0001,"Frostbolt-Area52-US",0x512,0x0,'
+    'Creature-0-1-2-3-4-5,"Target",0x10a48,0x0,116,"Frostbolt",0x10,20000,0,16,0,0,0,1,nil,nil'
+)
+
+LOG_LINES = [
+    TS + "COMBAT_LOG_VERSION,22,ADVANCED_LOG_ENABLED,1,BUILD_VERSION,11.2.0,PROJECT_ID,1",
+    TS + 'CHALLENGE_MODE_START,"Ara-Kara, City of Echoes",2660,503,10,[10,9,147]',
+    TS + 'ENCOUNTER_START,2583,"Avanoxx",8,5,2660',
+    DAMAGE,
+    TS + 'ENCOUNTER_END,2583,"Avanoxx",8,5,1,90000',
+    TS + "CHALLENGE_MODE_END,2660,1,10,1800000,300.5,2500.5",
+    '# ENCOUNTER_START,1,"Commented",16,20,2657',
+    TS + 'ENCOUNTER_START,2898,"Sikran, Captain of the Sureki",16,20,2657',
+    DAMAGE,
+    TS + 'ENCOUNTER_END,2898,"Sikran, Captain of the Sureki",16,20,1,200000',
+    # Pull without ENCOUNTER_END (disconnect)
+    TS + 'ENCOUNTER_START,2902,"Ulgrax the Devourer",16,20,2657',
+    DAMAGE,
+    TS + 'ENCOUNTER_START,2917,"The Bloodbound Horror",16,20,2657',
+    DAMAGE,
+    TS + 'ENCOUNTER_END,2917,"The Bloodbound Horror",16,20,0,60000',
+]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Log with a Mythic+ run and raid encounters."""
+    path = tmp_path / "WoWCombatLog.txt"
+    path.write_bytes(("\n".join(LOG_LINES) + "\n").encode("utf-8"))
+    return path
+
+
+def line_offsets(data):
+    """Byte offset of the start of each line."""
+    offsets = [0]
+    for i, byte in enumerate(data):
+        if byte == ord("\n"):
+            offsets.append(i + 1)
+    return offsets
+
+
+class TestBoundaryScan:
+    """Test marker scanning and boundary building."""
+
+    def test_top_level_boundaries(self, log_file):
+        """M+ runs contain their bosses; raid pulls are standalone."""
+        data = log_file.read_bytes()
+        offsets = line_offsets(data)
+
+        boundaries = build_boundaries(scan_markers(data), len(data))
+
+        assert [(b.encounter_type, b.encounter_name, b.encounter_id) for b in boundaries] == [
+            ("CHALLENGE_MODE", "Ara-Kara, City of Echoes", None),
+            ("ENCOUNTER", "Sikran, Captain of the Sureki", 2898),
+            ("ENCOUNTER", "Ulgrax the Devourer", 2902),
+            ("ENCOUNTER", "The Bloodbound Horror", 2917),
+        ]
+        assert boundaries[0].start_byte == offsets[1]
+        assert boundaries[0].end_byte == offsets[6] - 1
+        assert boundaries[1].start_byte == offsets[7]
+
+        # The unterminated pull ends where the next one starts
+        assert boundaries[2].end_byte == offsets[12] - 1
+        assert boundaries[3].end_byte == offsets[15] - 1
+
+    def test_marker_text_in_spell_name_is_ignored(self):
+        """Only the event type position counts as a marker."""
+        line = DAMAGE.replace('"Frostbolt"', '"ENCOUNTER_START,Fake"').encode("utf-8")
+
+        assert scan_markers(line) == []
+
+
+class TestBoundaryIndex:
+    """Test the persisted sidecar index."""
+
+    def test_sidecar_skips_scan(self, log_file):
+        """A second run reuses the sidecar without scanning."""
+        first = BoundaryIndex(log_file)
+        boundaries = first.get_boundaries()
+        assert first.sidecar_path.exists()
+        assert first.get_stats()["bytes_scanned"] == log_file.stat().st_size
+
+        second = BoundaryIndex(log_file)
+        assert second.get_boundaries() == boundaries
+        assert second.get_stats()["loaded_from_sidecar"]
+        assert second.get_stats()["bytes_scanned"] == 0
+
+    def test_grown_log_scans_only_new_bytes(self, log_file):
+        """Appending to the log rescans from the previously last line only."""
+        with open(log_file, "ab") as f:
+            f.write((TS + 'ENCOUNTER_START,2902,"Ulgrax the Devourer",16,20,2657\n').encode())
+        BoundaryIndex(log_file).get_boundaries()
+        size_before = log_file.stat().st_size
+
+        with open(log_file, "ab") as f:
+            f.write((DAMAGE + "\n" + TS + 'ENCOUNTER_END,2902,"Ulgrax",16,20,1,1\n').encode())
+        index = BoundaryIndex(log_file)
+        boundaries = index.get_boundaries()
+
+        assert index.get_stats()["bytes_scanned"] < log_file.stat().st_size - size_before + 200
+        assert boundaries == BoundaryIndex(log_file, persist=False).get_boundaries()
+        assert boundaries[-1].end_byte == log_file.stat().st_size - 1
+
+    def test_rewritten_log_is_rescanned(self, log_file):
+        """A sidecar for different content is ignored."""
+        BoundaryIndex(log_file).get_boundaries()
+        log_file.write_bytes(("X" + "\n".join(LOG_LINES) + "\n\n").encode("utf-8"))
+
+        index = BoundaryIndex(log_file)
+        index.get_boundaries()
+
+        assert not index.get_stats()["loaded_from_sidecar"]
@@ -0,0 +1,234 @@
+"""
+Tests for chunked, resumable log uploads.
+"""
+
+import pytest
+
+import hashlib
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.api.v1.services.chunked_upload import ChunkedUpload, ChunkedUploadSession, ChunkError
+from src.database.storage import EventStorage
+
+from tests.combat_logs import FIRST_PULL, SECOND_PULL
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def split(data: bytes, size: int):
+    """Split data into (offset, chunk) pairs."""
+    return [(i, data[i : i + size]) for i in range(0, len(data), size)]
+
+
+@pytest.fixture
+def log_bytes():
+    """Two raid pulls as one log file."""
+    return ("\n".join(FIRST_PULL + SECOND_PULL) + "\n").encode("utf-8")
+
+
+def new_upload(tmp_path, data, declare_hash=True):
+    session = ChunkedUploadSession(
+        upload_id="upload-1",
+        file_name="WoWCombatLog.txt",
+        file_size=len(data),
+        file_hash=sha256(data) if declare_hash else None,
+    )
+    upload = ChunkedUpload(session, tmp_path)
+    session.save(upload.session_file)
+    return upload
+
+
+@pytest.fixture
+def storage(temp_db):
+    """EventStorage on SQLite, writing each encounter as a bare row with its fingerprint."""
+    temp_db.execute(
+        "INSERT OR IGNORE INTO guilds (guild_id, guild_name, server, region) "
+        "VALUES (1, 'Loothing', 'Stormrage', 'US')"
+    )
+    # The encounter table EventStorage writes to is not part of the SQLite schema
+    temp_db.execute(
+        "CREATE TABLE combat_encounters ("
+        "encounter_id INTEGER PRIMARY KEY, log_file_id INTEGER, boss_name TEXT)"
+    )
+    storage = EventStorage(temp_db)
+    storage.stored = []
+
+    def store_encounter(encounter, log_file_id, guild_id):
+        temp_db.execute(
+            "INSERT INTO combat_encounters (log_file_id, boss_name) VALUES (?, ?)",
+            (log_file_id, encounter.encounter_name),
+        )
+        fingerprint = sha256(f"{encounter.encounter_name}{encounter.start_time}".encode())
+        storage._store_encounter_fingerprint(guild_id, fingerprint, None, log_file_id)
+        storage.stored.append(encounter.encounter_name)
+        return 0
+
+    storage._store_unified_encounter_with_streams = store_encounter
+    return storage
+
+
+def count_rows(db, table):
+    return db.execute(f"SELECT COUNT(*) AS count FROM {table}")[0]["count"]
+
+
+class TestChunkedUpload:
+    """Test chunk validation, resumption and the rolling hash."""
+
+    def test_chunks_build_file_and_hash(self, tmp_path, log_bytes):
+        """Appending every chunk reproduces the file and its SHA-256."""
+        upload = new_upload(tmp_path, log_bytes)
+        for offset, chunk in split(log_bytes, 1000):
+            assert upload.append(offset, chunk, sha256(chunk))
+
+        assert upload.complete() == sha256(log_bytes)
+        assert upload.file_path.read_bytes() == log_bytes
+        assert upload.session.completed
+
+    def test_bad_checksum_rejected(self, tmp_path, log_bytes):
+        """A chunk whose checksum does not match is not written."""
+        upload = new_upload(tmp_path, log_bytes)
+        with pytest.raises(ChunkError) as error:
+            upload.append(0, log_bytes[:100], sha256(b"other"))
+
+        assert error.value.status_code == 422
+        assert upload.session.received_bytes == 0
+
+    def test_out_of_order_and_retransmit(self, tmp_path, log_bytes):
+        """Gaps are refused; a resent chunk that was already received is a no-op."""
+        upload = new_upload(tmp_path, log_bytes)
+        first, second = log_bytes[:100], log_bytes[100:200]
+
+        with pytest.raises(ChunkError):
+            upload.append(100, second, sha256(second))
+
+        assert upload.append(0, first, sha256(first))
+        assert not upload.append(0, first, sha256(first))
+        assert upload.session.received_bytes == 100
+
+    def test_incomplete_upload_cannot_complete(self, tmp_path, log_bytes):
+        """Completing before all data arrived fails."""
+        upload = new_upload(tmp_path, log_bytes)
+        upload.append(0, log_bytes[:100], sha256(log_bytes[:100]))
+
+        with pytest.raises(ChunkError):
+            upload.complete()
+
+    def test_declared_hash_mismatch(self, tmp_path, log_bytes):
+        """A file that does not match its declared hash fails the upload."""
+        upload = new_upload(tmp_path, log_bytes)
+        upload.session.file_hash = sha256(b"something else")
+        upload.append(0, log_bytes, sha256(log_bytes))
+
+        with pytest.raises(ChunkError):
+            upload.complete()
+        assert upload.error
+
+    def test_resume_from_session_file(self, tmp_path, log_bytes):
+        """A reloaded session continues at received_bytes with the same hash."""
+        upload = new_upload(tmp_path, log_bytes)
+        chunks = split(log_bytes, 500)
+        for offset, chunk in chunks[:2]:
+            upload.append(offset, chunk, sha256(chunk))
+
+        # Bytes of an interrupted write that was never recorded
+        with open(upload.file_path, "ab") as f:
+            f.write(b"garbage")
+
+        resumed = ChunkedUpload(ChunkedUploadSession.load(upload.session_file), tmp_path)
+        assert resumed.session.received_bytes == 1000
+        for offset, chunk in chunks[2:]:
+            resumed.append(offset, chunk, sha256(chunk))
+
+        assert resumed.complete() == sha256(log_bytes)
+
+
+class TestChunkedEncounters:
+    """Test processing encounters while the upload is in progress."""
+
+    def test_encounters_before_last_chunk(self, tmp_path, log_bytes):
+        """An encounter is yielded as soon as the chunk with its end has arrived."""
+        upload = new_upload(tmp_path, log_bytes)
+        first_end = len(("\n".join(FIRST_PULL) + "\n").encode("utf-8"))
+        encounters = upload.iter_encounters()
+
+        upload.append(0, log_bytes[:first_end], sha256(log_bytes[:first_end]))
+        first = next(encounters)
+        assert first.encounter_name == "Ulgrax the Devourer"
+
+        rest = log_bytes[first_end:]
+        upload.append(first_end, rest, sha256(rest))
+        upload.complete()
+
+        assert [e.encounter_name for e in encounters] == ["The Bloodbound Horror"]
+
+    def test_failed_upload_raises(self, tmp_path, log_bytes):
+        """Encounter iteration raises when the upload fails, so processing stops."""
+        upload = new_upload(tmp_path, log_bytes)
+        encounters = upload.iter_encounters()
+        threading.Timer(0.1, upload.fail, args=("connection lost",)).start()
+
+        with pytest.raises(ValueError):
+            list(encounters)
+
+    def test_idle_upload_fails(self, tmp_path, log_bytes):
+        """An upload that stops receiving data is failed, releasing its consumer."""
+        upload = new_upload(tmp_path, log_bytes)
+        upload.IDLE_TIMEOUT = 0.2
+        upload.POLL_INTERVAL = 0.05
+
+        with pytest.raises(ValueError, match="No data received"):
+            list(upload.iter_encounters())
+        assert upload.finished.is_set()
+
+
+class TestChunkedStorage:
+    """Test storing the encounters of a chunked upload."""
+
+    def test_hash_mismatch_stores_nothing(self, tmp_path, log_bytes, storage):
+        """Encounters stored before the hash turned out wrong are deleted again."""
+        upload = new_upload(tmp_path, log_bytes)
+        upload.session.file_hash = sha256(b"something else")
+        upload.append(0, log_bytes, sha256(log_bytes))
+        with pytest.raises(ChunkError):
+            upload.complete()
+
+        with pytest.raises(ValueError):
+            storage.store_unified_encounter_stream(
+                upload.iter_encounters(),
+                str(upload.file_path),
+                guild_id=1,
+                file_hash=upload.session.file_hash,
+            )
+
+        assert storage.stored == ["Ulgrax the Devourer", "The Bloodbound Horror"]
+        for table in ("combat_encounters", "encounter_fingerprints", "log_files"):
+            assert count_rows(storage.db, table) == 0
+        assert not storage.file_cache
+
+    def test_interrupted_store_is_replaced(self, tmp_path, log_bytes, storage):
+        """Storing an upload again (e.g. after a restart) replaces the rows of the interrupted store."""
+        upload = new_upload(tmp_path, log_bytes)
+        upload.append(0, log_bytes, sha256(log_bytes))
+        file_hash = upload.complete()
+
+        # What a store that was interrupted after its first encounter left behind
+        log_file_path = str(upload.file_path)
+        log_file_id = storage._register_partial_log_file(log_file_path, f"partial:{log_file_path}", 1)
+        storage._store_unified_encounter_with_streams(next(upload.iter_encounters()), log_file_id, 1)
+        storage.db.commit()
+
+        result = storage.store_unified_encounter_stream(
+            upload.iter_encounters(), log_file_path, guild_id=1, file_hash=file_hash
+        )
+
+        assert result["encounters_stored"] == 2
+        assert count_rows(storage.db, "combat_encounters") == 2
+        assert count_rows(storage.db, "encounter_fingerprints") == 2
+        rows = storage.db.execute("SELECT file_hash FROM log_files")
+        assert [row["file_hash"] for row in rows] == [file_hash]
@@ -0,0 +1,142 @@
+"""
+Tests for columnar event batches.
+
+Verifies that EventBatch columns carry the same values as the event objects
+built by EventFactory, and that BatchParser batches share lookup codes.
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+np = pytest.importorskip("numpy")
+
+from src.parser.columnar import (
+    KIND_ABSORB,
+    KIND_DAMAGE,
+    KIND_HEAL,
+    EventBatch,
+    EventBatchBuilder,
+)
+from src.parser.events import DamageEvent, EventFactory, HealEvent, SpellEvent
+from src.parser.parser import BatchParser
+from src.parser.tokenizer import LineTokenizer
+
+from tests.combat_logs import EXTRA_LINES
+
+
+ABSORB_LINE = (
+    '9/15/2025 21:30:23.800-4  SPELL_ABSORBED,Creature-5678,"Ulgrax the Devourer",0x10a48,0x0,'
+    'Player-1234-5678,"Testplayer-Area52-US",0x512,0x0,Player-9999-0001,"Priest-Area52-US",'
+    '0x512,0x0,17,"Power Word: Shield",0x2,2500,30000,nil'
+)
+
+
+@pytest.fixture
+def parsed_lines(sample_log_lines):
+    """Tokenized sample lines plus swing, heal, aura and absorb lines."""
+    tokenizer = LineTokenizer()
+    lines = sample_log_lines + EXTRA_LINES + [ABSORB_LINE]
+    return [tokenizer.parse_line(line) for line in lines]
+
+
+@pytest.fixture
+def batch(parsed_lines):
+    """Single batch built from the parsed lines."""
+    builder = EventBatchBuilder()
+    for parsed in parsed_lines:
+        builder.add(parsed)
+    return builder.build()
+
+
+class TestEventBatchBuilder:
+    """Test building batches from tokenized lines."""
+
+    def test_columns_match_events(self, parsed_lines, batch):
+        """Each row carries the same values as the corresponding event object."""
+        assert len(batch) == len(parsed_lines)
+
+        for row, parsed in enumerate(parsed_lines):
+            event = EventFactory.create_event(parsed)
+
+            assert batch.event_types[batch.event_type[row]] == event.event_type
+            assert batch.timestamp[row] == pytest.approx(event.get_epoch())
+            if isinstance(event.dest_guid, str):
+                assert batch.guids[batch.dest_id[row]] == event.dest_guid
+            if isinstance(event, SpellEvent):
+                assert batch.spell_id[row] == (event.spell_id or 0)
+            if isinstance(event, DamageEvent):
+                assert batch.amount[row] == event.amount
+                assert batch.overkill[row] == event.overkill
+                assert batch.absorbed[row] == event.absorbed
+            if isinstance(event, HealEvent):
+                assert batch.amount[row] == event.amount
+                assert batch.overhealing[row] == event.overhealing
+
+    def test_absorb_row_uses_shield_owner(self, batch):
+        """SPELL_ABSORBED rows are attributed to the shield caster and spell."""
+        row = int(np.flatnonzero(batch.kind_mask(KIND_ABSORB))[0])
+
+        assert batch.guids[batch.source_id[row]] == "Player-9999-0001"
+        assert batch.spell_id[row] == 17
+        assert batch.amount[row] == 2500
+
+    def test_masks_and_select(self, batch):
+        """Kind and event type masks select the expected rows."""
+        damage = batch.select(batch.kind_mask(KIND_DAMAGE))
+
+        assert len(damage) == 2
+        assert int(damage.amount.sum()) == 5678 + 4000
+        assert int(batch.event_type_mask("SPELL_HEAL").sum()) == 1
+        assert int(batch.select(batch.kind_mask(KIND_HEAL)).amount[0]) == 12000
+        assert len(batch.event_type_mask("SPELL_MISSED")) == len(batch)
+        assert not batch.event_type_mask("SPELL_MISSED").any()
+
+    def test_empty_build(self):
+        """Building with no rows gives empty columns."""
+        batch = EventBatchBuilder().build()
+
+        assert len(batch) == 0
+        assert len(batch.kind_mask(KIND_DAMAGE)) == 0
+
+
+class TestBatchParser:
+    """Test the columnar parser entry point."""
+
+    def test_batches_share_codes(self, sample_log_lines, tmp_path):
+        """Batches from one parser share lookup tables and concatenate in order."""
+        log_file = tmp_path / "WoWCombatLog.txt"
+        lines = sample_log_lines + EXTRA_LINES
+        log_file.write_text("\n".join(lines), encoding="utf-8")
+
+        parser = BatchParser(batch_size=3)
+        batches = list(parser.iter_batches(str(log_file)))
+
+        assert [len(b) for b in batches] == [3, 3, 3, 2]
+        assert all(b.guids is batches[0].guids for b in batches)
+
+        combined = EventBatch.concatenate(batches)
+        single = BatchParser().parse_file(str(log_file))
+        assert len(combined) == len(lines)
+        assert np.array_equal(combined.timestamp, single.timestamp)
+        assert np.array_equal(combined.amount, single.amount)
+
+        player_id = combined.guid_id("Player-1234-5678")
+        assert player_id >= 0
+        assert int((combined.source_id == player_id).sum()) == 3
+
+        stats = parser.get_stats()
+        assert stats["events_processed"] == len(lines)
+        assert stats["batches_emitted"] == 4
+
+    def test_parse_file_totals(self, sample_log_lines, tmp_path):
+        """parse_file returns one batch with the same damage total as the objects."""
+        log_file = tmp_path / "WoWCombatLog.txt"
+        log_file.write_text("\n".join(sample_log_lines + EXTRA_LINES), encoding="utf-8")
+
+        batch = BatchParser().parse_file(str(log_file))
+
+        assert int(batch.amount[batch.kind_mask(KIND_DAMAGE)].sum()) == 9678
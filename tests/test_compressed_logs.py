@@ -0,0 +1,211 @@
+"""
+Tests for parsing gzip, zstd and zip compressed combat logs as streams.
+"""
+
+import gzip
+import io
+import zipfile
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser.compressed import (
+    HAS_ZSTANDARD,
+    HAS_ZSTD,
+    CompressedLogError,
+    SeekableLogView,
+    SeekableZstdReader,
+    detect_compression,
+    map_log,
+    open_log,
+    write_seekable_zstd,
+)
+from src.parser.parser import CombatLogParser
+from src.processing.encounter_index import EncounterIndex
+from src.processing.unified_parallel_processor import UnifiedParallelProcessor, parse_byte_range
+
+from tests.combat_logs import LOG_LINES, summarize
+
+LOG_DATA = ("\n".join(LOG_LINES) + "\n").encode("utf-8")
+
+needs_zstd = pytest.mark.skipif(not (HAS_ZSTD or HAS_ZSTANDARD), reason="zstd not installed")
+
+
+def write_zip(path, data):
+    """Write data as the single log inside a zip archive."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("WoWCombatLog.txt", data)
+
+
+def write_seekable(path, data, frame_size=512):
+    """Write data as a seekable zstd log with small frames."""
+    with open(path, "wb") as f:
+        return write_seekable_zstd(io.BytesIO(data), f, frame_size=frame_size)
+
+
+@pytest.fixture
+def plain_log(tmp_path):
+    """Uncompressed log with raid pulls and a Mythic+ run."""
+    path = tmp_path / "WoWCombatLog.txt"
+    path.write_bytes(LOG_DATA)
+    return path
+
+
+@pytest.fixture(params=["gzip", "zip", "zstd-seekable"])
+def compressed_log(request, tmp_path):
+    """The same log, compressed each supported way."""
+    if request.param == "gzip":
+        path = tmp_path / "WoWCombatLog.txt.gz"
+        path.write_bytes(gzip.compress(LOG_DATA))
+    elif request.param == "zip":
+        path = tmp_path / "WoWCombatLog.zip"
+        write_zip(path, LOG_DATA)
+    else:
+        if not (HAS_ZSTD or HAS_ZSTANDARD):
+            pytest.skip("zstd not installed")
+        path = tmp_path / "WoWCombatLog.txt.zst"
+        write_seekable(path, LOG_DATA)
+    return path
+
+
+class TestCompressedLogs:
+    """Test that compressed logs parse like the plain log."""
+
+    def test_detect_compression(self, compressed_log, plain_log):
+        """The compression is recognized from the file contents."""
+        with open(plain_log, "rb") as f:
+            assert detect_compression(f) is None
+        with open(compressed_log, "rb") as f:
+            assert detect_compression(f) in ("gzip", "zip", "zstd-seekable")
+            assert f.tell() == 0
+        with open_log(compressed_log) as f:
+            assert f.read() == LOG_DATA
+
+    def test_parse_file_matches_plain(self, compressed_log, plain_log):
+        """parse_file yields the same events, with offsets into the decompressed log."""
+        plain = list(CombatLogParser(raw_line_mode="offset").parse_file(plain_log))
+        compressed = list(CombatLogParser(raw_line_mode="offset").parse_file(compressed_log))
+
+        assert [(e.event_type, e.timestamp, e.raw_offset) for e in compressed] == [
+            (e.event_type, e.timestamp, e.raw_offset) for e in plain
+        ]
+        assert compressed[-1].read_raw_line(compressed_log) == LOG_LINES[-1]
+
+    def test_processor_matches_plain(self, compressed_log, plain_log):
+        """The parallel processor parses compressed logs as a stream."""
+        processor = UnifiedParallelProcessor(max_workers=2, persist_index=False)
+        plain = UnifiedParallelProcessor(max_workers=2, persist_index=False).process_file(plain_log)
+
+        encounters = processor.process_file(compressed_log)
+
+        assert summarize(encounters) == summarize(plain)
+        assert processor.total_events == len(LOG_LINES)
+
+    def test_decompressed_size_limit(self, compressed_log):
+        """Reading a log that inflates past max_size fails."""
+        with open_log(compressed_log, max_size=len(LOG_DATA)) as f:
+            assert f.read() == LOG_DATA
+        with open_log(compressed_log, max_size=len(LOG_DATA) - 1) as f:
+            with pytest.raises(CompressedLogError):
+                f.read()
+
+    def test_processor_stops_at_size_limit(self, compressed_log):
+        """The processor refuses to parse a log past its decompressed size limit."""
+        processor = UnifiedParallelProcessor(persist_index=False, max_log_bytes=1024)
+
+        with pytest.raises(CompressedLogError):
+            processor.process_file(compressed_log)
+
+
+@needs_zstd
+class TestSeekableZstd:
+    """Test random access to seekable zstd logs."""
+
+    def test_seek_decompresses_only_needed_frames(self, tmp_path):
+        """Reading from an offset decompresses just the frames it covers."""
+        path = tmp_path / "WoWCombatLog.txt.zst"
+        frame_count = write_seekable(path, LOG_DATA)
+
+        with open(path, "rb") as raw:
+            reader = SeekableZstdReader(raw)
+            reader.seek(len(LOG_DATA) - 100)
+            data = reader.read(100)
+
+        assert data == LOG_DATA[-100:]
+        assert reader.size == len(LOG_DATA)
+        assert frame_count > 3
+        assert reader.frames_decompressed <= 2
+
+    def test_frames_hold_whole_lines(self, tmp_path):
+        """Frames are cut at line ends."""
+        path = tmp_path / "WoWCombatLog.txt.zst"
+        write_seekable(path, LOG_DATA)
+
+        with open(path, "rb") as raw:
+            frames = SeekableZstdReader(raw).frames
+
+        for _, _, start, size in frames:
+            assert LOG_DATA[start + size - 1 : start + size] == b"\n"
+
+    def test_parse_encounter_from_seekable_log(self, tmp_path, plain_log):
+        """A single encounter parses from the compressed log by its offsets."""
+        path = tmp_path / "WoWCombatLog.txt.zst"
+        write_seekable(path, LOG_DATA)
+        entry = EncounterIndex(plain_log, persist=False).get_encounters()[2]
+
+        compressed = list(CombatLogParser().parse_encounter(path, entry))
+        plain = list(CombatLogParser().parse_encounter(plain_log, entry))
+
+        assert [(e.event_type, e.timestamp) for e in compressed] == [
+            (e.event_type, e.timestamp) for e in plain
+        ]
+        assert compressed[2].amount == 12000
+
+    def test_parse_byte_range_from_seekable_log(self, tmp_path, plain_log):
+        """Byte-range parsing reads a seekable log at decompressed offsets."""
+        path = tmp_path / "WoWCombatLog.txt.zst"
+        write_seekable(path, LOG_DATA)
+        entry = EncounterIndex(plain_log, persist=False).get_encounters()[2]
+
+        compressed, compressed_events, _ = parse_byte_range(path, entry.start_byte, entry.end_byte)
+        plain, plain_events, _ = parse_byte_range(plain_log, entry.start_byte, entry.end_byte)
+
+        assert summarize(compressed) == summarize(plain)
+        assert compressed_events == plain_events > 0
+
+    def test_view_matches_mmap(self, tmp_path, plain_log):
+        """find() and slices of the view match the plain log, across frame ends."""
+        path = tmp_path / "WoWCombatLog.txt.zst"
+        write_seekable(path, LOG_DATA, frame_size=64)
+
+        with map_log(path) as view, map_log(plain_log) as mm:
+            assert isinstance(view, SeekableLogView)
+            assert len(view) == len(mm)
+            assert view[100:1000] == mm[100:1000]
+            for start in (0, 63, 64, 500):
+                assert view.find(b"\n", start) == mm.find(b"\n", start)
+                assert view.find(b"SPELL_DAMAGE", start) == mm.find(b"SPELL_DAMAGE", start)
+            assert view.find(b"not in the log") == -1
+
+    def test_stream_only_compression_has_no_byte_ranges(self, tmp_path):
+        """gzip logs cannot be mapped for byte-range parsing."""
+        path = tmp_path / "WoWCombatLog.txt.gz"
+        path.write_bytes(gzip.compress(LOG_DATA))
+
+        with pytest.raises(CompressedLogError):
+            parse_byte_range(path, 0, 100)
+
+    @pytest.mark.skipif(HAS_ZSTANDARD, reason="zstandard streams plain zstd logs")
+    def test_plain_zstd_needs_zstandard(self, tmp_path):
+        """Without zstandard only the seekable variant can be streamed."""
+        import zstd
+
+        path = tmp_path / "WoWCombatLog.txt.zst"
+        path.write_bytes(zstd.compress(LOG_DATA, 3))
+
+        with pytest.raises(CompressedLogError):
+            list(CombatLogParser().parse_file(path))
@@ -15,7 +15,16 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.database.compression import EventCompressor, compression_stats
+from src.database.compression import (
+    EventCompressor,
+    StringTable,
+    compression_stats,
+    train_dictionary,
+)
+from src.database import compression
+from src.database.block_format import decode_varints, encode_varints, zigzag_decode, zigzag_encode
+from src.database.block_index import store_event_blocks
+from src.database.dictionaries import CompressionDictionaryStore, guild_scope
 from src.models.character_events import TimestampedEvent, CharacterEventStream
 from src.parser.events import BaseEvent, DamageEvent, SpellEvent
 
@@ -542,5 +551,242 @@ class TestCompressionStats:
         assert len(decompressed_events) == len(sample_events)
 
 
+def mixed_block(block_number, size=100):
+    """Create a block of mixed events like test_different_event_types_compression."""
+    base_time = 1726450000.0 + block_number * size * 0.1
+    event_types = ["SPELL_CAST_START", "SPELL_DAMAGE", "SPELL_HEAL", "UNIT_DIED", "SWING_DAMAGE"]
+    events = []
+
+    for i in range(size):
+        timestamp = base_time + i * 0.1
+        fields = dict(
+            timestamp=datetime.fromtimestamp(timestamp),
+            event_type=event_types[i % 5],
+            raw_line="test line",
+            source_guid=f"Player-{i % 5}-567890AB",
+            source_name=f"Player{i % 5}",
+            dest_guid="Creature-5678-CDEF1234",
+            dest_name="Target",
+            spell_id=1234 + (i * 7 + block_number) % 10,
+            spell_name=f"Spell {(i * 7 + block_number) % 10}",
+        )
+        if fields["event_type"] == "SPELL_DAMAGE":
+            event = DamageEvent(**fields, amount=1000 + (i * 37 + block_number) % 8000)
+        else:
+            event = SpellEvent(**fields)
+
+        events.append(
+            TimestampedEvent(
+                timestamp=timestamp,
+                datetime=datetime.fromtimestamp(timestamp),
+                category="mixed",
+                event=event,
+            )
+        )
+
+    return events
+
+
+class TestDictionaryCompression:
+    """Test trained dictionaries and shared string tables."""
+
+    def test_shared_string_table_round_trip(self):
+        """Blocks written with a shared table are read back with it."""
+        table = StringTable()
+        writer = EventCompressor(string_table=table)
+        compressed = [writer.compress_events(mixed_block(n))[0] for n in range(3)]
+
+        # Strings are stored once for all blocks
+        assert len(table) < 30
+
+        reader = EventCompressor(string_table=StringTable.from_bytes(table.to_bytes()))
+        for n, data in enumerate(compressed):
+            events = reader.decompress_events(data)
+            original = mixed_block(n)
+            assert [e.timestamp for e in events] == [e.timestamp for e in original]
+            assert [e.event.source_name for e in events] == [e.event.source_name for e in original]
+
+        with pytest.raises(ValueError):
+            EventCompressor().decompress_events(compressed[0])
+
+    def test_dictionary_ratio_and_throughput(self):
+        """A trained dictionary improves the ratio of small blocks without slowing reads."""
+        pytest.importorskip("zstandard")
+
+        trainer = EventCompressor(string_table=StringTable())
+        dictionary = train_dictionary([trainer.serialize_events(mixed_block(n)) for n in range(40)])
+        assert dictionary
+
+        blocks = [mixed_block(n) for n in range(40, 60)]
+        plain = EventCompressor()
+        trained = EventCompressor(dictionary=dictionary, string_table=StringTable())
+
+        results = {}
+        for name, compressor in (("plain", plain), ("trained", trained)):
+            uncompressed = sum(len(EventCompressor().serialize_events(b)) for b in blocks)
+            data = [compressor.compress_events(b)[0] for b in blocks]
+
+            start_time = time.perf_counter()
+            event_count = sum(len(compressor.decompress_events(d)) for d in data)
+            elapsed = time.perf_counter() - start_time
+
+            results[name] = (sum(map(len, data)) / uncompressed, event_count / elapsed)
+
+        plain_ratio, plain_rate = results["plain"]
+        trained_ratio, trained_rate = results["trained"]
+        print(
+            f"ratio {plain_ratio:.3f} -> {trained_ratio:.3f}, "
+            f"decompress {plain_rate:,.0f} -> {trained_rate:,.0f} events/s"
+        )
+
+        assert trained_ratio < plain_ratio * 0.6
+        assert trained_rate > plain_rate * 0.5
+
+    def test_unknown_dictionary(self):
+        """Reading a block needs the dictionary it was written with."""
+        pytest.importorskip("zstandard")
+
+        trainer = EventCompressor(string_table=StringTable())
+        dictionary = train_dictionary([trainer.serialize_events(mixed_block(n)) for n in range(40)])
+        table = StringTable()
+        data, metadata = EventCompressor(dictionary=dictionary, string_table=table).compress_events(
+            mixed_block(0)
+        )
+
+        assert metadata["dictionary_id"]
+        with pytest.raises(ValueError):
+            EventCompressor(string_table=table).decompress_events(data)
+        reader = EventCompressor(string_table=table, dictionary_lookup={metadata["dictionary_id"]: dictionary}.get)
+        assert len(reader.decompress_events(data)) == 100
+
+    def test_versioned_store(self, temp_db):
+        """Dictionaries are versioned per scope and old blocks stay readable."""
+        pytest.importorskip("zstandard")
+
+        temp_db.execute(
+            "INSERT OR IGNORE INTO guilds (guild_id, guild_name, server, region) "
+            "VALUES (1, 'Loothing', 'Stormrage', 'US')"
+        )
+        for encounter_id in (1, 2):
+            temp_db.execute(
+                "INSERT INTO encounters (encounter_id, guild_id, encounter_type, boss_name, start_time) "
+                "VALUES (?, 1, 'raid', 'Ulgrax the Devourer', 0)",
+                (encounter_id,),
+            )
+        temp_db.execute(
+            "INSERT INTO characters (character_id, guild_id, character_guid, character_name) "
+            "VALUES (1, 1, 'Player-1234-567890AB', 'Testplayer')"
+        )
+
+        # Blocks written before any dictionary exists
+        for n in range(20):
+            store_event_blocks(temp_db, 1, 1, mixed_block(n), first_block_index=n)
+
+        store = CompressionDictionaryStore(temp_db)
+        first = store.train_from_stored_blocks(guild_scope(1), guild_id=1)
+        second = store.train_from_stored_blocks(guild_scope(1), guild_id=1)
+        assert first and second
+        assert store.latest(guild_scope(1))[0] == second
+
+        # New encounters of the guild use its newest dictionary
+        store_event_blocks(temp_db, 2, 1, mixed_block(99))
+        rows = temp_db.execute(
+            "SELECT encounter_id, compressed_data FROM event_blocks ORDER BY block_id"
+        )
+        reader = CompressionDictionaryStore(temp_db).compressor_for_encounter(2)
+        assert reader.dictionary_id == second
+        assert len(reader.decompress_events(rows[-1]["compressed_data"])) == 100
+
+        old_reader = CompressionDictionaryStore(temp_db).compressor_for_encounter(1)
+        assert len(old_reader.decompress_events(rows[0]["compressed_data"])) == 100
+
+
+class TestBlockFormatV2:
+    """Test the typed binary column block format."""
+
+    def test_varint_zigzag_round_trip(self):
+        """Varints and zigzag encoding cover the full 64 bit range."""
+        np = pytest.importorskip("numpy")
+        values = np.array([0, 1, -1, 63, -64, 127, 128, 2**31, -(2**31), 2**63 - 1, -(2**63)], dtype=np.int64)
+
+        encoded = encode_varints(zigzag_encode(values))
+        assert len(encoded) < values.nbytes
+        assert zigzag_decode(decode_varints(encoded, len(values))).tolist() == values.tolist()
+
+    def test_round_trip_fields(self, compressor, sample_events):
+        """Timestamps, flags and the critical bit survive a v2 block."""
+        pytest.importorskip("numpy")
+        compressed, _ = compressor.compress_events(sample_events)
+        events = compressor.decompress_events(compressed)
+
+        for original, decompressed in zip(sample_events, events):
+            assert decompressed.timestamp == original.timestamp
+            assert decompressed.datetime == original.datetime
+            assert decompressed.event.source_flags == original.event.source_flags
+            assert decompressed.event.dest_guid == original.event.dest_guid
+        assert events[1].event.critical
+        assert events[1].event.amount == 5000
+        assert type(events[2].event) is BaseEvent
+
+    def test_reads_v1_blocks(self, monkeypatch):
+        """Blocks written in the msgpack layout are still read."""
+        pytest.importorskip("numpy")
+        block = mixed_block(0)
+
+        monkeypatch.setattr(compression, "HAS_NUMPY", False)
+        v1_data, _ = EventCompressor().compress_events(block)
+        monkeypatch.undo()
+        v2_data, _ = EventCompressor().compress_events(block)
+
+        reader = EventCompressor()
+        v1_events = reader.decompress_events(v1_data)
+        v2_events = reader.decompress_events(v2_data)
+        assert [e.event.event_type for e in v1_events] == [e.event.event_type for e in v2_events]
+        assert [e.timestamp for e in v1_events] == [e.timestamp for e in v2_events]
+        assert reader.decompress_columns(v1_data)["spell_ids"].tolist() == (
+            reader.decompress_columns(v2_data)["spell_ids"].tolist()
+        )
+
+    def test_decompress_columns(self, compressor):
+        """A block decodes to NumPy columns without event objects."""
+        pytest.importorskip("numpy")
+        block = mixed_block(3)
+        columns = compressor.decompress_columns(compressor.compress_events(block)[0])
+
+        assert columns["timestamps"].tolist() == [e.timestamp for e in block]
+        assert columns["event_types"].tolist() == [e.event.event_type for e in block]
+        assert columns["amounts"].sum() == sum(getattr(e.event, "amount", 0) for e in block)
+
+    def test_time_window(self, compressor):
+        """Only events inside a time window are rebuilt."""
+        block = mixed_block(0)
+        compressed, _ = compressor.compress_events(block)
+
+        events = compressor.decompress_events(compressed, block[10].timestamp, block[19].timestamp)
+        assert [e.timestamp for e in events] == [e.timestamp for e in block[10:20]]
+
+    def test_v2_size_and_throughput(self, monkeypatch):
+        """v2 blocks are smaller than v1 blocks and decompress faster."""
+        pytest.importorskip("numpy")
+        blocks = [mixed_block(n, size=1000) for n in range(10)]
+
+        def measure():
+            compressor = EventCompressor()
+            data = [compressor.compress_events(b)[0] for b in blocks]
+            start_time = time.perf_counter()
+            for d in data:
+                compressor.decompress_events(d)
+            return sum(map(len, data)), time.perf_counter() - start_time
+
+        monkeypatch.setattr(compression, "HAS_NUMPY", False)
+        v1_size, v1_time = measure()
+        monkeypatch.undo()
+        v2_size, v2_time = measure()
+        print(f"compressed {v1_size:,} -> {v2_size:,} bytes, decompress {v1_time:.3f}s -> {v2_time:.3f}s")
+
+        assert v2_size < v1_size
+        assert v2_time < v1_time
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,175 @@
+"""
+Tests for the persisted encounter index and encounter-selective parsing.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database.storage import EventStorage
+from src.parser.parser import CombatLogParser
+from src.processing.encounter_index import EncounterIndex
+from src.processing.parse_cache import parse_log_file
+from src.processing.unified_parallel_processor import UnifiedParallelProcessor
+from src.segmentation.unified_segmenter import UnifiedSegmenter
+
+from tests.combat_logs import MAGE, PRIEST, describe, pull_lines, summarize
+
+
+def parse_indexed(log_path, index, entry):
+    """Parse one indexed encounter the way the analyze command does."""
+    segmenter = UnifiedSegmenter()
+    segmenter.pet_owners.update(index.pet_owners_before(entry))
+    if entry.encounter_type == "ENCOUNTER":
+        segmenter.raid_pull_counts[entry.encounter_id] = entry.pull_number - 1
+    for event in CombatLogParser().parse_encounter(log_path, entry):
+        segmenter.process_event(event)
+    return segmenter.get_encounters()
+
+
+class TestEncounterIndex:
+    """Test building and persisting the index."""
+
+    def test_entries_describe_encounters(self, log_file):
+        """Each raid pull and Mythic+ run gets an entry with its details."""
+        entries = EncounterIndex(log_file).get_encounters()
+
+        assert [(e.encounter_type, e.name, e.pull_number) for e in entries] == [
+            ("ENCOUNTER", "Ulgrax the Devourer", 1),
+            ("CHALLENGE_MODE", "Ara-Kara, City of Echoes", 1),
+            ("ENCOUNTER", "Ulgrax the Devourer", 2),
+            ("ENCOUNTER", "Ulgrax the Devourer", 3),
+        ]
+        pull, run = entries[0], entries[1]
+        assert (pull.encounter_id, pull.difficulty_id, pull.duration) == (2902, 16, 3.0)
+        assert (run.encounter_id, run.keystone_level, run.duration) == (503, 10, 14.0)
+        assert pull.participants == [MAGE.split(",")[0], PRIEST.split(",")[0]]
+
+        data = log_file.read_bytes()
+        assert data[pull.start_byte :].startswith(b"9/15/2025 21:30:00.000-4  ENCOUNTER_START")
+
+    def test_unchanged_log_served_from_sidecar(self, log_file):
+        """A second index of the same log reads nothing but the sidecar."""
+        first = EncounterIndex(log_file).get_encounters()
+
+        index = EncounterIndex(log_file)
+        entries = index.get_encounters()
+
+        assert entries == first
+        assert index.get_stats()["loaded_from_sidecar"]
+        assert index.get_stats()["encounters_scanned"] == 0
+        assert index.summons
+
+    def test_grown_log_scans_only_new_encounters(self, log_file):
+        """Appending a pull only scans the new encounter."""
+        EncounterIndex(log_file).get_encounters()
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("\n".join(pull_lines(50, 2917, "The Bloodbound Horror")) + "\n")
+
+        index = EncounterIndex(log_file)
+        entries = index.get_encounters()
+
+        assert [e.name for e in entries][-1] == "The Bloodbound Horror"
+        assert index.get_stats()["encounters_scanned"] == 1
+        assert len(index.summons) == 1
+
+
+class TestParseEncounter:
+    """Test parsing single encounters by byte range."""
+
+    def test_encounters_match_full_parse(self, log_file):
+        """Every encounter parsed alone matches the same encounter of a full parse."""
+        index = EncounterIndex(log_file, persist=False)
+        sequential = parse_log_file(log_file).encounters
+
+        for entry, expected in zip(index.get_encounters(), sequential):
+            encounters = parse_indexed(log_file, index, entry)
+            assert summarize(encounters) == summarize([expected])
+            assert describe(encounters) == describe([expected])
+
+    def test_parse_range_reads_only_the_range(self, log_file):
+        """A range parse yields the range's events with their offsets in the file."""
+        entry = EncounterIndex(log_file, persist=False).get_encounters()[2]
+        parser = CombatLogParser(raw_line_mode="offset")
+
+        events = list(parser.parse_range(log_file, entry.start_byte, entry.end_byte))
+
+        assert [e.event_type for e in events] == [
+            "ENCOUNTER_START",
+            "SPELL_DAMAGE",
+            "SPELL_HEAL",
+            "ENCOUNTER_END",
+        ]
+        assert events[0].raw_offset == entry.start_byte
+        assert events[-1].read_raw_line(log_file).startswith("9/15/2025 21:40:03.000-4")
+        # The header primes advanced logging, so the heal's amount is parsed
+        assert events[2].amount == 12000
+
+
+class TestEncounterFingerprints:
+    """Test encounter-level duplicate detection."""
+
+    def test_fingerprints_survive_appending(self, log_file):
+        """Encounters keep their fingerprints when the log grows."""
+        before = [e.fingerprint for e in EncounterIndex(log_file).get_encounters()]
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("\n".join(pull_lines(50, 2917, "The Bloodbound Horror")) + "\n")
+
+        after = [e.fingerprint for e in EncounterIndex(log_file).get_encounters()]
+
+        assert after[: len(before)] == before
+        assert len(set(after)) == len(after)
+
+    def test_known_encounters_are_skipped(self, log_file):
+        """Only encounters with unknown fingerprints are parsed, numbered as in the full log."""
+        entries = EncounterIndex(log_file, persist=False).get_encounters()
+        sequential = parse_log_file(log_file).encounters
+        processor = UnifiedParallelProcessor(max_workers=2, persist_index=False)
+
+        encounters = list(
+            processor.iter_encounters(log_file, known_fingerprints=lambda fps: fps[:2])
+        )
+
+        assert processor.encounters_skipped == 2
+        assert [e.pull_number for e in encounters] == [2, 3]
+        assert [e.fingerprint for e in encounters] == [e.fingerprint for e in entries[2:]]
+        assert summarize(encounters) == summarize(sequential[2:])
+
+    def test_new_log_gets_fingerprints(self, log_file):
+        """Without known encounters the whole log is parsed and fingerprinted."""
+        entries = EncounterIndex(log_file, persist=False).get_encounters()
+        processor = UnifiedParallelProcessor(max_workers=2, persist_index=False)
+
+        encounters = list(processor.iter_encounters(log_file, known_fingerprints=lambda _: []))
+
+        assert [e.fingerprint for e in encounters] == [e.fingerprint for e in entries]
+
+    def test_schema_has_fingerprint_table(self, temp_db):
+        """create_tables() creates the fingerprint table, one row per guild and fingerprint."""
+        columns = {row["name"] for row in temp_db.execute("PRAGMA table_info(encounter_fingerprints)")}
+        assert {"guild_id", "fingerprint", "encounter_id", "log_file_id"} <= columns
+
+        primary_key = [
+            row["name"]
+            for row in sorted(
+                temp_db.execute("PRAGMA table_info(encounter_fingerprints)"), key=lambda r: r["pk"]
+            )
+            if row["pk"]
+        ]
+        assert primary_key == ["guild_id", "fingerprint"]
+
+    def test_storage_finds_stored_fingerprints(self, temp_db):
+        """EventStorage reads back the fingerprints it stored, per guild."""
+        temp_db.execute(
+            "INSERT OR IGNORE INTO guilds (guild_id, guild_name, server, region) "
+            "VALUES (1, 'Loothing', 'Stormrage', 'US')"
+        )
+        storage = EventStorage(temp_db)
+        storage._store_encounter_fingerprint(1, "a" * 64, None, None)
+        # Storing an encounter a second time keeps its first fingerprint row
+        storage._store_encounter_fingerprint(1, "a" * 64, None, None)
+        temp_db.commit()
+
+        assert storage.get_known_fingerprints(1, ["a" * 64, "b" * 64]) == {"a" * 64}
+        assert storage.get_known_fingerprints(2, ["a" * 64]) == set()
@@ -0,0 +1,255 @@
+"""
+Tests for event creation in EventFactory.
+
+Verifies that lazy and slotted events carry exactly the same values as the
+eagerly built dataclasses, that raw lines can be dropped or referenced by
+file offset, and that repeated strings are shared through the string pool.
+"""
+
+import pickle
+from dataclasses import asdict
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser.events import (
+    AuraEvent,
+    BaseEvent,
+    DamageEvent,
+    EventFactory,
+    EventProfile,
+    HealEvent,
+    LazyDamageEvent,
+    LazyEventMixin,
+    SlottedDamageEvent,
+)
+from src.parser.parser import CombatLogParser
+from src.parser.string_pool import StringPool
+from src.parser.tokenizer import LineTokenizer
+
+from tests.combat_logs import EXTRA_LINES
+
+
+@pytest.fixture
+def parsed_lines(sample_log_lines):
+    """Tokenized sample lines plus swing, heal and aura lines."""
+    tokenizer = LineTokenizer()
+    return [tokenizer.parse_line(line) for line in sample_log_lines + EXTRA_LINES]
+
+
+class TestLazyEvents:
+    """Test lazy event materialization."""
+
+    def test_lazy_matches_eager(self, parsed_lines):
+        """Lazy events decode to the same class and field values as eager events."""
+        for parsed in parsed_lines:
+            eager = EventFactory.create_event(parsed)
+            lazy = EventFactory.create_event(parsed, lazy=True)
+
+            assert isinstance(lazy, type(eager))
+            assert asdict(lazy) == asdict(eager)
+
+    def test_fields_decoded_on_access(self, parsed_lines):
+        """Only type, timestamp and GUIDs are set until other fields are read."""
+        damage_line = next(p for p in parsed_lines if p.event_type == "SPELL_DAMAGE")
+        event = EventFactory.create_event(damage_line, lazy=True)
+
+        assert isinstance(event, LazyDamageEvent)
+        assert event.source_guid == "Player-1234"
+        assert "source_name" not in event.__dict__
+        assert "amount" not in event.__dict__
+
+        assert event.amount == 5678
+        assert "amount" in event.__dict__
+        assert "source_name" not in event.__dict__
+        assert event.source_name == "Testplayer"
+
+    def test_swing_names_keep_server(self, parsed_lines):
+        """Swing damage events carry the parsed server and region."""
+        swing_line = next(p for p in parsed_lines if p.event_type == "SWING_DAMAGE")
+        event = EventFactory.create_event(swing_line)
+
+        assert event.source_name == "Testplayer"
+        assert event.source_server == "Area52"
+
+    def test_assignment_after_decode(self, parsed_lines):
+        """Assigned values stick and are not overwritten by later decoding."""
+        heal_line = next(p for p in parsed_lines if p.event_type == "SPELL_HEAL")
+        event = EventFactory.create_event(heal_line, lazy=True)
+
+        event.overhealing = 0
+        assert isinstance(event, HealEvent)
+        assert event.overhealing == 0
+        assert event.effective_healing == event.amount
+
+    def test_meta_events_are_eager(self, parsed_lines):
+        """Encounter events are always built eagerly."""
+        encounter_line = next(p for p in parsed_lines if p.event_type == "ENCOUNTER_START")
+        event = EventFactory.create_event(encounter_line, lazy=True)
+
+        assert not isinstance(event, LazyEventMixin)
+        assert event.encounter_id == 2902
+
+    def test_pickle_roundtrip(self, parsed_lines):
+        """Lazy events survive pickling before any field is decoded."""
+        damage_line = next(p for p in parsed_lines if p.event_type == "SPELL_DAMAGE")
+        event = pickle.loads(pickle.dumps(EventFactory.create_event(damage_line, lazy=True)))
+
+        assert isinstance(event, DamageEvent)
+        assert event.amount == 5678
+
+    def test_parser_option(self, sample_log_lines):
+        """CombatLogParser(lazy_events=True) yields lazy combat events."""
+        events = CombatLogParser(lazy_events=True).parse_lines(sample_log_lines)
+
+        assert any(isinstance(event, LazyEventMixin) for event in events)
+        assert len(events) == len(CombatLogParser().parse_lines(sample_log_lines))
+
+
+class TestCompactEvents:
+    """Test slotted event variants and raw_line modes."""
+
+    def test_compact_matches_eager(self, parsed_lines):
+        """Slotted events are instances of the regular classes with equal fields."""
+        for parsed in parsed_lines:
+            eager = EventFactory.create_event(parsed)
+            compact = EventFactory.create_event(parsed, compact=True)
+
+            assert isinstance(compact, type(eager))
+            assert asdict(compact) == asdict(eager)
+
+    def test_compact_uses_slots(self, parsed_lines):
+        """Slotted events keep their fields out of the instance dict."""
+        damage_line = next(p for p in parsed_lines if p.event_type == "SPELL_DAMAGE")
+        event = EventFactory.create_event(damage_line, compact=True)
+
+        assert isinstance(event, SlottedDamageEvent)
+        assert event.__dict__ == {}
+        assert pickle.loads(pickle.dumps(event)) == event
+
+    def test_raw_line_offset(self, sample_log_lines, tmp_path):
+        """Offset mode drops raw_line but can read it back from the file."""
+        log_file = tmp_path / "WoWCombatLog.txt"
+        log_file.write_bytes("\r\n".join(sample_log_lines).encode("utf-8"))
+
+        events = list(
+            CombatLogParser(compact_events=True, raw_line_mode="offset").parse_file(str(log_file))
+        )
+
+        assert len(events) == len(sample_log_lines)
+        for event, line in zip(events, sample_log_lines):
+            assert event.raw_line == ""
+            assert event.read_raw_line(log_file) == line
+
+    def test_raw_line_drop(self, sample_log_lines):
+        """Drop mode leaves no raw line or offset."""
+        events = CombatLogParser(raw_line_mode="drop").parse_lines(sample_log_lines)
+
+        assert all(event.raw_line == "" and event.raw_offset is None for event in events)
+        assert events[0].read_raw_line() is None
+
+    def test_invalid_raw_line_mode(self):
+        """Unknown raw_line modes are rejected."""
+        with pytest.raises(ValueError):
+            CombatLogParser(raw_line_mode="compress")
+
+
+class TestStringPool:
+    """Test string interning across a parse session."""
+
+    def test_intern_returns_shared_copy(self):
+        """Equal strings resolve to one object; None passes through."""
+        pool = StringPool()
+        first = pool.intern("".join(["Player-", "1234"]))
+        second = pool.intern("".join(["Player-", "1234"]))
+
+        assert first is second
+        assert pool.intern(None) is None
+        assert pool.get_stats()["hits"] == 1
+        assert pool.get_stats()["unique_strings"] == 1
+
+    def test_events_share_strings(self, sample_log_lines):
+        """Events from one parser share GUID and name objects."""
+        lines = sample_log_lines + EXTRA_LINES
+        events = CombatLogParser().parse_lines(lines)
+        player_events = [e for e in events if e.source_guid == "Player-1234-5678"]
+
+        assert len(player_events) == 3
+        assert player_events[0].source_guid is player_events[1].source_guid
+        assert player_events[0].source_name is player_events[2].dest_name
+
+    def test_interning_keeps_values(self, parsed_lines):
+        """Interned events are equal to events created without a pool."""
+        pool = StringPool()
+        for parsed in parsed_lines:
+            plain = EventFactory.create_event(parsed)
+            assert asdict(EventFactory.create_event(parsed, string_pool=pool)) == asdict(plain)
+
+    def test_parser_stats(self, sample_log_lines):
+        """Pool hit rates are reported in CombatLogParser.get_stats()."""
+        parser = CombatLogParser()
+        parser.parse_lines(sample_log_lines)
+        stats = parser.get_stats()["string_pool_stats"]
+
+        assert stats["lookups"] > 0
+        assert 0.0 < stats["hit_rate"] <= 1.0
+        assert CombatLogParser(intern_strings=False).get_stats()["string_pool_stats"] is None
+
+
+class TestEventDispatch:
+    """Test the per-event-type dispatch table and profiling."""
+
+    def test_known_types_precompiled(self):
+        """Common event types have constructors before any line is parsed."""
+        for event_type in ("SPELL_DAMAGE", "SWING_DAMAGE", "SPELL_AURA_APPLIED", "ENCOUNTER_END"):
+            assert event_type in EventFactory._constructors
+
+    def test_unknown_type_compiled_on_first_sight(self):
+        """Event types outside the known set get an entry when first created."""
+        tokenizer = LineTokenizer()
+        parsed = tokenizer.parse_line(
+            '9/15/2025 21:30:23.800-4  SPELL_EMPOWER_END,Player-1234-5678,"Testplayer-Area52-US",0x512,0x0,0000000000000000,nil,0x80000000,0x80000000,357208,"Fire Breath",0x4,3'
+        )
+        EventFactory._constructors.pop("SPELL_EMPOWER_END", None)
+
+        event = EventFactory.create_event(parsed)
+
+        assert "SPELL_EMPOWER_END" in EventFactory._constructors
+        assert event.spell_id == 357208
+        assert event.spell_name == "Fire Breath"
+
+    def test_dispatch_classes(self, parsed_lines):
+        """Each event type maps to the class its prefix and suffix imply."""
+        events = {p.event_type: EventFactory.create_event(p) for p in parsed_lines}
+
+        assert type(events["SPELL_DAMAGE"]) is DamageEvent
+        assert type(events["SWING_DAMAGE"]) is DamageEvent
+        assert type(events["SPELL_HEAL"]) is HealEvent
+        assert type(events["SPELL_AURA_APPLIED_DOSE"]) is AuraEvent
+        assert events["SPELL_AURA_APPLIED_DOSE"].stacks == 3
+        assert isinstance(events["ENCOUNTER_START"], BaseEvent)
+
+    def test_profile_counts(self, parsed_lines):
+        """EventProfile counts every created event under its type."""
+        profile = EventProfile()
+        for parsed in parsed_lines:
+            EventFactory.create_event(parsed, profile=profile)
+
+        stats = profile.get_stats()
+        assert stats["events"] == len(parsed_lines)
+        assert stats["event_types"]["SPELL_DAMAGE"]["count"] == sum(
+            1 for p in parsed_lines if p.event_type == "SPELL_DAMAGE"
+        )
+        assert all(entry["total_ms"] >= 0.0 for entry in stats["event_types"].values())
+
+    def test_parser_profile_option(self, sample_log_lines):
+        """CombatLogParser(profile_events=True) reports the profile in get_stats()."""
+        parser = CombatLogParser(profile_events=True)
+        events = parser.parse_lines(sample_log_lines)
+
+        assert parser.get_stats()["event_profile"]["events"] == len(events)
+        assert CombatLogParser().get_stats()["event_profile"] is None
@@ -0,0 +1,114 @@
+"""
+Tests for the on-disk parse cache.
+
+Checks that cached and resumed parses produce the same encounters as parsing
+the whole file, and that changed files are not served from the cache.
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.parse_cache import ParseCache, parse_log_file
+
+from tests.combat_logs import FIRST_PULL, SECOND_PULL, summarize
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Parse cache in a temporary directory."""
+    return ParseCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Combat log with one finished pull."""
+    path = tmp_path / "WoWCombatLog.txt"
+    path.write_text("\n".join(FIRST_PULL) + "\n", encoding="utf-8")
+    return path
+
+
+class TestParseCache:
+    """Test cached and incremental parsing."""
+
+    def test_hit_returns_same_encounters(self, cache, log_file):
+        """A second parse of an unchanged file is served from the cache."""
+        first = parse_log_file(log_file, cache)
+        second = parse_log_file(log_file, ParseCache(cache.cache_dir))
+
+        assert first.cache_status == "miss"
+        assert second.cache_status == "hit"
+        assert second.bytes_parsed == 0
+        assert summarize(second.encounters) == summarize(first.encounters)
+        assert second.total_events == first.total_events
+
+    def test_appended_log_only_parses_new_bytes(self, cache, log_file, tmp_path):
+        """A grown log resumes from the cached prefix and matches a full parse."""
+        parse_log_file(log_file, cache)
+        prefix_size = log_file.stat().st_size
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("\n".join(SECOND_PULL) + "\n")
+
+        resumed = parse_log_file(log_file, ParseCache(cache.cache_dir))
+        full = parse_log_file(log_file)
+
+        assert resumed.cache_status == "extended"
+        assert resumed.bytes_parsed == log_file.stat().st_size - prefix_size
+        assert len(resumed.encounters) == 2
+        assert summarize(resumed.encounters) == summarize(full.encounters)
+        assert resumed.total_events == full.total_events
+
+        # Heals after the resume point still use the advanced logging layout
+        priest = resumed.encounters[1].characters["Player-1084-0A5F0002"]
+        assert priest.total_healing_done == 9000
+
+    def test_partial_last_line_is_reparsed(self, cache, log_file):
+        """An unterminated last line is not included in the cached state."""
+        line = SECOND_PULL[0]
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(line[:20])
+        parse_log_file(log_file, cache)
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(line[20:] + "\n" + "\n".join(SECOND_PULL[1:]) + "\n")
+        resumed = parse_log_file(log_file, ParseCache(cache.cache_dir))
+
+        assert resumed.cache_status == "extended"
+        assert summarize(resumed.encounters) == summarize(parse_log_file(log_file).encounters)
+
+    def test_modified_prefix_invalidates(self, cache, log_file):
+        """Rewriting the parsed part of the file causes a full reparse."""
+        parse_log_file(log_file, cache)
+        log_file.write_text(
+            "\n".join(FIRST_PULL).replace("Frostbolt", "Frostfire") + "\n\n", encoding="utf-8"
+        )
+
+        result = parse_log_file(log_file, ParseCache(cache.cache_dir))
+
+        assert result.cache_status == "miss"
+
+    def test_encounter_only_entry(self, cache, log_file):
+        """Entries without segmenter state are used only for the unchanged file."""
+        encounters = parse_log_file(log_file).encounters
+        cache.save(log_file, log_file.stat().st_size, 3, encounters=encounters)
+
+        cached = cache.load(log_file)
+        assert cached is not None and not cached.resumable
+        assert summarize(parse_log_file(log_file, cache, cached).encounters) == summarize(
+            encounters
+        )
+
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("\n".join(SECOND_PULL) + "\n")
+        assert cache.load(log_file) is None
+        assert cache.get_stats()["misses"] == 1
+
+    def test_corrupt_entry_is_ignored(self, cache, log_file):
+        """An unreadable cache file counts as a miss."""
+        parse_log_file(log_file, cache)
+        cache._entry_path(log_file).write_bytes(b"LTPC garbage")
+
+        assert cache.load(log_file) is None
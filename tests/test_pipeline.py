@@ -0,0 +1,98 @@
+"""
+Tests for the bounded producer/consumer pipeline and streaming encounters.
+"""
+
+import time
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.pipeline import BoundedPipeline
+from src.processing.unified_parallel_processor import UnifiedParallelProcessor
+
+from tests.combat_logs import describe
+
+
+class TestBoundedPipeline:
+    """Test queueing between producer and consumer."""
+
+    def test_passes_items_in_order(self):
+        """Every produced item reaches the consumer in order."""
+        pipeline = BoundedPipeline(queue_size=2)
+
+        result = pipeline.run(range(50), list)
+
+        assert result == list(range(50))
+        assert pipeline.get_stats()["items_passed"] == 50
+
+    def test_slow_consumer_bounds_queue(self):
+        """A slow consumer blocks the producer instead of letting items pile up."""
+        pipeline = BoundedPipeline(queue_size=2)
+        produced = []
+
+        def producer():
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        def consumer(items):
+            seen = []
+            for item in items:
+                time.sleep(0.01)
+                # At most the queue, the item being put and the item in hand
+                assert len(produced) - len(seen) <= 2 + 1 + 1
+                seen.append(item)
+            return seen
+
+        assert pipeline.run(producer(), consumer) == list(range(10))
+        assert pipeline.get_stats()["max_queue_depth"] <= 2
+
+    def test_producer_error_reaches_consumer(self):
+        """The consumer gets the items before a producer failure, then the error."""
+        pipeline = BoundedPipeline()
+        seen = []
+
+        def producer():
+            yield 1
+            raise ValueError("bad chunk")
+
+        def consumer(items):
+            for item in items:
+                seen.append(item)
+
+        with pytest.raises(ValueError, match="bad chunk"):
+            pipeline.run(producer(), consumer)
+        assert seen == [1]
+
+    def test_consumer_stop_closes_producer(self):
+        """A consumer that stops early shuts the producer down."""
+        pipeline = BoundedPipeline(queue_size=1)
+        closed = []
+
+        def producer():
+            try:
+                for i in range(1000):
+                    yield i
+            finally:
+                closed.append(True)
+
+        assert pipeline.run(producer(), lambda items: next(iter(items))) == 0
+        assert closed == [True]
+
+
+class TestStreamingEncounters:
+    """Test encounters streamed from the parallel processor."""
+
+    def test_iter_encounters_matches_process_file(self, log_file):
+        """Streaming through a pipeline gives the same encounters as process_file."""
+        processor = UnifiedParallelProcessor(max_workers=2, persist_index=False, chunk_bytes=1)
+        pipeline = BoundedPipeline(queue_size=1)
+
+        streamed = pipeline.run(processor.iter_encounters(log_file), list)
+        processed = processor.process_file(log_file)
+
+        assert describe(streamed) == describe(processed)
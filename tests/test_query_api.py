@@ -17,7 +17,14 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.database.schema import DatabaseManager, create_tables
-from src.database.query import QueryAPI, CharacterMetrics, EncounterSummary, SpellUsage
+from src.database.query import (
+    QueryAPI,
+    QueryCache,
+    CharacterMetrics,
+    EncounterSummary,
+    SpellUsage,
+    estimate_size,
+)
 from src.database.storage import EventStorage
 from src.segmentation.enhanced import EnhancedSegmenter
 from src.parser.parser import CombatLogParser
@@ -422,6 +429,79 @@ class TestQueryCaching:
         assert "ttl_seconds" in cache_stats
 
 
+class TestQueryCacheEviction:
+    """Test LRU order, the byte budget and per-prefix TTLs of QueryCache."""
+
+    def test_lru_order(self):
+        """The least recently used entry is evicted first."""
+        cache = QueryCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_budget(self):
+        """Entries are evicted by size, not only by count."""
+        value = "x" * 1000
+        cache = QueryCache(max_size=1000, max_bytes=estimate_size(value) * 5)
+        for i in range(4):
+            cache.put(f"small:{i}", value)
+        cache.put("large", "y" * 1000)
+
+        stats = cache.stats()
+        assert stats["bytes"] <= stats["max_bytes"]
+        assert stats["size"] == 5
+        cache.put("another", value)
+        assert cache.get("small:0") is None
+        assert cache.get("another") == value
+
+    def test_oversized_entry_rejected(self):
+        """A value larger than a quarter of the budget is not cached."""
+        cache = QueryCache(max_bytes=10_000)
+        cache.put("small", 1)
+        cache.put("events:huge", list(range(10_000)))
+
+        assert cache.get("events:huge") is None
+        assert cache.get("small") == 1
+        assert cache.stats()["rejections"] == 1
+
+    def test_replace_updates_bytes(self):
+        """Replacing an entry charges only the new value."""
+        cache = QueryCache()
+        cache.put("key", "x" * 1000)
+        cache.put("key", 1)
+
+        assert cache.stats()["bytes"] == estimate_size(1)
+
+    def test_prefix_ttl(self, monkeypatch):
+        """Keys expire after the TTL configured for their prefix."""
+        now = [1000.0]
+        monkeypatch.setattr(time, "time", lambda: now[0])
+        cache = QueryCache(ttl_seconds=300, prefix_ttls={"recent": 10})
+        cache.put("recent:10", [1])
+        cache.put("encounter:1", {"id": 1})
+
+        now[0] += 60
+        assert cache.get("recent:10") is None
+        assert cache.get("encounter:1") == {"id": 1}
+
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["bytes"] == estimate_size({"id": 1})
+
+    def test_list_size_scales_with_length(self):
+        """Long lists are sized from a sample, in proportion to their length."""
+        short = estimate_size([{"amount": i} for i in range(100)])
+        long = estimate_size([{"amount": i} for i in range(10_000)])
+
+        assert 50 < long / short < 200
+
+
 class TestQueryPerformance:
     """Test query performance and optimization."""
 
@@ -0,0 +1,227 @@
+"""
+Tests for the query result cache shared between API workers.
+"""
+
+import base64
+import pickle
+import threading
+import time
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.cache.redis_client import CacheBackend, CacheManager, DiskBackend, MemoryBackend
+from src.cache.query_results import SharedQueryCache
+from src.database.query import EncounterSummary, QueryCache, shared_query
+
+
+def run_concurrently(count, target):
+    """Call target from count threads started together and return their results."""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestDiskBackend:
+    """Test the on-disk stand-in for Redis."""
+
+    def test_shared_between_instances(self, tmp_path):
+        """A value written through one backend is read through another."""
+        DiskBackend(tmp_path).set_raw("key", "value")
+        assert DiskBackend(tmp_path).get_raw("key") == "value"
+
+    def test_ttl(self, tmp_path):
+        """Expired values are gone."""
+        backend = DiskBackend(tmp_path)
+        backend.set_raw("key", "value", ttl=0.05)
+        time.sleep(0.1)
+        assert backend.get_raw("key") is None
+
+    def test_add_only_if_absent(self, tmp_path):
+        """add_raw sets a key once, and again after it expired."""
+        first, second = DiskBackend(tmp_path), DiskBackend(tmp_path)
+        assert first.add_raw("lock", "1", ttl=0.05)
+        assert not second.add_raw("lock", "2", ttl=0.05)
+        time.sleep(0.1)
+        assert second.add_raw("lock", "2")
+        assert first.get_raw("lock") == "2"
+
+    def test_cache_manager_fallback(self, tmp_path):
+        """Without Redis the cache manager uses the disk backend when given a directory."""
+        assert CacheManager(cache_dir=str(tmp_path)).backend_type == "disk"
+        assert CacheManager(cache_dir=str(tmp_path)).shared_between_processes
+        assert not CacheManager().shared_between_processes
+
+    def test_backend_needs_raw_access(self):
+        """A backend without the synchronous string methods cannot be created."""
+
+        class AsyncOnlyBackend(CacheBackend):
+            async def get(self, key):
+                return None
+
+            async def set(self, key, value, ttl=None):
+                return True
+
+            async def delete(self, key):
+                return True
+
+            async def exists(self, key):
+                return False
+
+            async def health_check(self):
+                return True
+
+        with pytest.raises(TypeError):
+            AsyncOnlyBackend()
+
+
+class TestSharedQueryCache:
+    """Test sharing and coalescing of query results."""
+
+    def test_round_trip(self):
+        """Dataclass results come back equal."""
+        cache = SharedQueryCache(MemoryBackend())
+        summary = EncounterSummary(
+            1, "raid", "Ulgrax the Devourer", "Heroic", None, None, True, 300.0, 20, 20
+        )
+        cache.put("encounter:1", summary)
+        assert cache.get("encounter:1") == summary
+
+    def test_coalesce_threads(self):
+        """Concurrent identical queries in one process run once."""
+        cache = SharedQueryCache(MemoryBackend())
+        calls = []
+
+        def query():
+            calls.append(1)
+            time.sleep(0.2)
+            return [1, 2, 3]
+
+        results = run_concurrently(8, lambda i: cache.get_or_compute("top:dps", query))
+
+        assert results == [[1, 2, 3]] * 8
+        assert len(calls) == 1
+        assert cache.get_or_compute("top:dps", query) == [1, 2, 3]
+        assert len(calls) == 1
+
+    def test_coalesce_processes(self, tmp_path):
+        """Workers with separate caches on one backend directory run a query once."""
+        caches = [
+            SharedQueryCache(DiskBackend(tmp_path), poll_interval=0.01, secret=b"workers")
+            for _ in range(4)
+        ]
+        calls = []
+
+        def query():
+            calls.append(1)
+            time.sleep(0.3)
+            return {"count": 42}
+
+        results = run_concurrently(4, lambda i: caches[i].get_or_compute("count:all", query))
+
+        assert results == [{"count": 42}] * 4
+        assert len(calls) == 1
+
+    def test_failed_query_not_shared(self):
+        """Waiting callers run the query themselves when the first caller fails."""
+        cache = SharedQueryCache(MemoryBackend())
+        calls = []
+
+        def query():
+            calls.append(1)
+            time.sleep(0.1)
+            if len(calls) == 1:
+                raise RuntimeError("connection lost")
+            return "ok"
+
+        def call(i):
+            try:
+                return cache.get_or_compute("guild:1", query)
+            except RuntimeError:
+                return "error"
+
+        results = run_concurrently(3, call)
+        assert results.count("error") == 1
+        assert results.count("ok") == 2
+
+    def test_none_not_stored(self):
+        """None results are not cached."""
+        cache = SharedQueryCache(MemoryBackend())
+        calls = []
+        cache.get_or_compute("encounter:404", lambda: calls.append(1))
+        cache.get_or_compute("encounter:404", lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_unsigned_entries_ignored(self):
+        """Entries not signed with the cache's secret are never unpickled."""
+        backend = MemoryBackend()
+        SharedQueryCache(backend, secret=b"other").put("guild:1", {"name": "Loothing"})
+        cache = SharedQueryCache(backend, secret=b"workers")
+        assert cache.get("guild:1") is None
+
+        payload = base64.b64encode(pickle.dumps({"name": "Forged"})).decode("ascii")
+        backend.set_raw(cache._backend_key("guild:1", cache._generation()), payload)
+        assert cache.get("guild:1") is None
+
+    def test_wait_for_other_process_is_capped(self):
+        """A query locked by a process that does not finish runs here after max_wait."""
+        backend = MemoryBackend()
+        cache = SharedQueryCache(backend, poll_interval=0.01, max_wait=0.1)
+        backend.add_raw(f"{cache._backend_key('top:dps', cache._generation())}:lock", "1", 30)
+
+        start = time.monotonic()
+        assert cache.get_or_compute("top:dps", lambda: [1, 2, 3]) == [1, 2, 3]
+        assert time.monotonic() - start < 1.0
+
+    def test_invalidate(self):
+        """invalidate() drops every shared result."""
+        cache = SharedQueryCache(MemoryBackend())
+        cache.put("guild:1", {"name": "Loothing"})
+        cache.invalidate()
+        assert cache.get("guild:1") is None
+
+
+class TestSharedQueryDecorator:
+    """Test routing QueryAPI methods through the shared cache."""
+
+    class FakeQueryAPI:
+        def __init__(self, shared_cache):
+            self.shared_cache = shared_cache
+            self.cache = QueryCache()
+            self.calls = 0
+
+        @shared_query("encounters")
+        def get_encounters(self, limit=20, guild_id=None):
+            self.calls += 1
+            return [guild_id] * limit
+
+    def test_instances_share_results(self):
+        """A new instance (as routers create per request) reuses another's result."""
+        shared = SharedQueryCache(MemoryBackend())
+        first, second = self.FakeQueryAPI(shared), self.FakeQueryAPI(shared)
+
+        assert first.get_encounters(2, guild_id=1) == [1, 1]
+        assert second.get_encounters(2, guild_id=1) == [1, 1]
+        assert second.get_encounters(3, guild_id=1) == [1, 1, 1]
+        assert (first.calls, second.calls) == (1, 1)
+
+    def test_without_shared_cache(self):
+        """Methods run directly when there is no shared cache."""
+        api = self.FakeQueryAPI(None)
+        api.get_encounters(1)
+        api.get_encounters(1)
+        assert api.calls == 2
@@ -0,0 +1,79 @@
+"""
+Tests for shared-memory transfer of parse results from worker processes.
+"""
+
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser.events import BaseEvent, DamageEvent
+from src.processing.shared_results import SharedResult, export_results, import_results
+from src.processing.unified_parallel_processor import parse_byte_range
+
+from tests.combat_logs import FIRST_PULL, SECOND_PULL, summarize
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Combat log with two boss pulls."""
+    path = tmp_path / "WoWCombatLog.txt"
+    path.write_text("\n".join(FIRST_PULL + SECOND_PULL) + "\n", encoding="utf-8")
+    return path
+
+
+class TestSharedResults:
+    """Test exporting and importing worker results."""
+
+    def test_encounters_round_trip(self, log_file):
+        """Events come back equal, shared between lists, and the block is released."""
+        encounters, _, _ = parse_byte_range(log_file, 0, log_file.stat().st_size, raw_offsets=True)
+        expected = summarize(encounters)
+
+        payload = export_results(encounters)
+        assert isinstance(payload, SharedResult)
+        loaded = import_results(payload)
+
+        assert summarize(loaded) == expected
+        assert [e.events for e in loaded] == [e.events for e in encounters]
+        mage = loaded[0].characters["Player-1084-0A5F0001"]
+        assert mage.damage_done[0] is mage.all_events[0].event
+        assert mage.all_events[0].datetime is mage.damage_done[0].timestamp
+        assert any(event is mage.damage_done[0] for event in loaded[0].events)
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=payload.shm_name)
+
+    def test_untyped_values_are_kept(self):
+        """A field value that does not fit its column is passed through as is."""
+        events = [
+            BaseEvent(
+                timestamp=datetime(2025, 9, 15, 21, 30, 0, 123000),
+                event_type="UNIT_DIED",
+                raw_line="",
+                source_guid=0,
+                dest_flags=0x512,
+            ),
+            DamageEvent(
+                timestamp=datetime(2025, 9, 15, 21, 30, 1),
+                event_type="SPELL_DAMAGE",
+                raw_line="",
+                source_guid="Player-1084-0A5F0001",
+                hide_caster=False,
+                spell_name="Frostbolt",
+                amount=20000,
+                critical=True,
+                epoch=1757986201.0,
+            ),
+        ]
+
+        assert import_results(export_results(events)) == events
+
+    def test_results_without_events_are_pickled(self):
+        """Nothing is put in shared memory when there are no events."""
+        assert isinstance(export_results([]), bytes)
+        assert import_results(export_results([])) == []
@@ -0,0 +1,137 @@
+"""
+Tests for tail-follow parsing of a growing combat log.
+"""
+
+import pytest
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.parser.parser import CombatLogParser
+from src.parser.tail import LogTailer, TailCheckpoint
+from src.processing.live_parser import LiveLogParser
+
+from tests.combat_logs import FIRST_PULL, SECOND_PULL
+
+
+def append(path, text):
+    """Append text to a file as WoW would."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Empty combat log."""
+    path = tmp_path / "WoWCombatLog.txt"
+    path.write_text("", encoding="utf-8")
+    return path
+
+
+class TestLogTailer:
+    """Test offset tracking and rotation handling."""
+
+    def test_reads_only_new_complete_lines(self, log_file):
+        """Each poll returns lines appended since the last one; partial lines wait."""
+        tailer = LogTailer(log_file)
+        append(log_file, "line one\nline two\nline th")
+
+        assert [line for line, _, _ in tailer.read_new_lines()] == ["line one", "line two"]
+        assert tailer.read_new_lines() == []
+
+        append(log_file, "ree\r\n")
+        [(line, offset, length)] = tailer.read_new_lines()
+        assert line == "line three"
+        assert log_file.read_bytes()[offset : offset + length] == b"line three\r"
+        assert tailer.checkpoint.offset == log_file.stat().st_size
+        assert tailer.get_stats()["bytes_read"] == log_file.stat().st_size
+
+    def test_resume_from_checkpoint(self, log_file, tmp_path):
+        """A saved checkpoint continues after the last line read."""
+        append(log_file, "first\nsecond\n")
+        tailer = LogTailer(log_file)
+        tailer.read_new_lines()
+        checkpoint_file = tmp_path / "tail.json"
+        tailer.checkpoint.save(checkpoint_file)
+
+        append(log_file, "third\n")
+        resumed = LogTailer(log_file, checkpoint=TailCheckpoint.load(checkpoint_file))
+
+        assert [line for line, _, _ in resumed.read_new_lines()] == ["third"]
+        assert resumed.rotations == 0
+
+    def test_truncation_restarts(self, log_file):
+        """A truncated file is read again from the start."""
+        append(log_file, "old line one\nold line two\n")
+        tailer = LogTailer(log_file)
+        tailer.read_new_lines()
+
+        log_file.write_text("new\n", encoding="utf-8")
+
+        assert [line for line, _, _ in tailer.read_new_lines()] == ["new"]
+        assert tailer.rotations == 1
+
+    def test_rewritten_file_restarts(self, log_file):
+        """A file rewritten past the old offset is detected by its head hash."""
+        append(log_file, "old line\n")
+        tailer = LogTailer(log_file)
+        tailer.read_new_lines()
+
+        log_file.write_text("different start\nmore\n", encoding="utf-8")
+
+        assert [line for line, _, _ in tailer.read_new_lines()] == ["different start", "more"]
+        assert tailer.rotations == 1
+
+    def test_directory_switches_to_new_log(self, tmp_path):
+        """Following a directory picks up a newly started log file."""
+        logs = tmp_path / "Logs"
+        logs.mkdir()
+        first = logs / "WoWCombatLog-091525_213000.txt"
+        first.write_text("a\n", encoding="utf-8")
+        tailer = LogTailer(logs)
+        assert [line for line, _, _ in tailer.read_new_lines()] == ["a"]
+
+        second = logs / "WoWCombatLog-091525_223000.txt"
+        second.write_text("b\n", encoding="utf-8")
+        newer = first.stat().st_mtime + 10
+        os.utime(second, (newer, newer))
+
+        assert [line for line, _, _ in tailer.read_new_lines()] == ["b"]
+        assert tailer.checkpoint.path == str(second)
+        assert tailer.rotations == 1
+
+
+class TestLiveParsing:
+    """Test feeding tailed lines into the parser and segmenter."""
+
+    def test_follow_file_yields_events(self, log_file):
+        """CombatLogParser.follow_file parses the lines present until idle."""
+        append(log_file, "\n".join(FIRST_PULL) + "\n")
+
+        events = list(CombatLogParser().follow_file(str(log_file), idle_timeout=0))
+
+        assert [e.event_type for e in events][-1] == "ENCOUNTER_END"
+        assert len(events) == len(FIRST_PULL)
+
+    def test_live_parser_matches_full_parse(self, log_file, tmp_path):
+        """Encounters built poll by poll equal a one-shot parse."""
+        live = LiveLogParser(log_file, checkpoint_file=tmp_path / "tail.json")
+
+        append(log_file, "\n".join(FIRST_PULL) + "\n" + SECOND_PULL[0] + "\n")
+        live.poll()
+        assert len(live.completed_encounters) == 1
+        assert live.current_encounter is not None
+
+        append(log_file, "\n".join(SECOND_PULL[1:]) + "\n")
+        assert live.poll() == len(SECOND_PULL) - 1
+        assert live.poll() == 0
+
+        encounters = live.finish()
+        assert len(encounters) == 2
+        priest = encounters[1].characters["Player-1084-0A5F0002"]
+        assert priest.total_healing_done == 9000
+        assert TailCheckpoint.load(tmp_path / "tail.json").offset == log_file.stat().st_size
+        assert live.get_stats()["total_events"] == len(FIRST_PULL) + len(SECOND_PULL)
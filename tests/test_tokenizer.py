@@ -0,0 +1,119 @@
+"""
+Tests for the combat log line tokenizer.
+
+Verifies that the single-pass fast path produces exactly the same parsed
+lines as the bracket/paren-aware slow path, and that cached timestamp
+decoding matches strptime.
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from datetime import datetime, timedelta, timezone
+
+from src.parser.timestamps import TimestampDecoder
+from src.parser.tokenizer import LineTokenizer
+
+
+EXTRA_LINES = [
+    '9/15/2025 21:30:22.123-4  ENCOUNTER_START,2917,"Sikran, Captain of the Sureki",16,20,2657',
+    '9/15/2025 21:30:26.000-4  SPELL_AURA_APPLIED,Player-1234,"Testplayer",0x512,0x0,Player-1234,"Testplayer",0x512,0x0,17,"Power Word: Shield",0x2,BUFF',
+    '9/15/2025 21:30:26.000-4  COMBATANT_INFO,Player-1234,1,100,2000,30000,40000,0,0,0,1200,1200,1200,50,0,800,800,800,0,1500,700,700,350,12000,63,[(103123,125555,1)],(0,0,0,0),[(212083,623,(),(7979,6652),(10222,1520))],[Player-1234,1459,1],0,0,0,0',
+    "9/15/2025 21:30:26.000-4  TEST_EVENT,a,,b,\"\",nan,Infinity,1e5,-3,0x1F,true,false,nil,1_0,",
+    '9/15/2025 21:30:26.000-4  TEST_EVENT,"escaped \\" quote",c',
+]
+
+
+@pytest.fixture
+def all_lines(sample_log_lines):
+    """Sample lines plus edge cases for splitting and conversion."""
+    return sample_log_lines + EXTRA_LINES
+
+
+class TestFastPath:
+    """Test the single-pass tokenizer fast path."""
+
+    def test_fast_path_matches_slow_path(self, all_lines):
+        """Fast and slow tokenizers should produce identical parsed lines."""
+        slow = LineTokenizer(fast_mode=False)
+        fast = LineTokenizer(fast_mode=True)
+
+        for line in all_lines:
+            assert repr(fast.parse_line(line)) == repr(slow.parse_line(line))
+
+    def test_quoted_commas_stay_in_field(self):
+        """Commas inside quoted names must not split the field."""
+        tokenizer = LineTokenizer()
+        parsed = tokenizer.parse_line(EXTRA_LINES[0])
+
+        assert parsed.suffix_params[1] == "Sikran, Captain of the Sureki"
+        assert parsed.suffix_params[2] == 16
+
+    def test_nested_lines_use_slow_path(self):
+        """Lines with arrays or tuples fall back to the slow path."""
+        tokenizer = LineTokenizer()
+        parsed = tokenizer.parse_line(EXTRA_LINES[2])
+
+        assert parsed.suffix_params[24] == [(103123, 125555, 1)]
+        assert tokenizer.get_stats()["slow_path_lines"] == 1
+        assert tokenizer.get_stats()["fast_path_lines"] == 0
+
+    def test_bytes_input(self, sample_log_lines):
+        """Undecoded bytes lines parse the same as str lines."""
+        tokenizer = LineTokenizer()
+        for line in sample_log_lines:
+            from_bytes = tokenizer.parse_line(line.encode("utf-8"))
+            assert repr(from_bytes) == repr(tokenizer.parse_line(line))
+
+
+class TestTimestampDecoder:
+    """Test cached timestamp decoding."""
+
+    def test_matches_strptime(self, sample_log_lines):
+        """Decoded datetimes and epochs match strptime on the naive timestamp."""
+        decoder = TimestampDecoder()
+        for line in sample_log_lines:
+            ts = line.split("  ", 1)[0]
+            expected = datetime.strptime(ts.rsplit("-", 1)[0], "%m/%d/%Y %H:%M:%S.%f")
+
+            timestamp, epoch, utc_offset = decoder.decode(ts)
+
+            assert timestamp == expected
+            assert epoch == expected.timestamp()
+            assert utc_offset == -4
+
+    def test_prefix_cache(self):
+        """Lines within the same minute reuse the cached prefix."""
+        decoder = TimestampDecoder()
+        decoder.decode("9/15/2025 21:30:22.123-4")
+        decoder.decode("9/15/2025 21:30:59.999-4")
+        decoder.decode("9/15/2025 21:31:00.000-4")
+
+        assert decoder.get_stats() == {"cache_hits": 1, "cache_misses": 2}
+
+    def test_tz_aware(self):
+        """With tz_aware the log's UTC offset is attached to the datetime."""
+        decoder = TimestampDecoder(tz_aware=True)
+        timestamp, epoch, utc_offset = decoder.decode("9/15/2025 21:30:22.500+2")
+
+        assert utc_offset == 2
+        assert timestamp.tzinfo == timezone(timedelta(hours=2))
+        assert epoch == timestamp.timestamp()
+        assert timestamp.astimezone(timezone.utc).hour == 19
+
+    def test_invalid_timestamp(self):
+        """Malformed timestamps raise ValueError."""
+        decoder = TimestampDecoder()
+        with pytest.raises(ValueError):
+            decoder.decode("not a timestamp")
+
+    def test_parsed_line_epoch(self, sample_log_lines):
+        """Tokenizer exposes the epoch and offset on parsed lines."""
+        parsed = LineTokenizer().parse_line(sample_log_lines[0])
+
+        assert parsed.epoch == parsed.timestamp.timestamp()
+        assert parsed.utc_offset == -4
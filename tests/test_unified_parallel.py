@@ -0,0 +1,90 @@
+"""
+Tests for the unified parallel processor's thread and process pool modes.
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.parallel_processor import ParallelLogProcessor
+from src.processing.parse_cache import parse_log_file
+from src.processing.unified_parallel_processor import UnifiedParallelProcessor
+
+from tests.combat_logs import FIRST_PULL, SECOND_PULL, summarize
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Combat log with two boss pulls."""
+    path = tmp_path / "WoWCombatLog.txt"
+    path.write_text("\n".join(FIRST_PULL + SECOND_PULL) + "\n", encoding="utf-8")
+    return path
+
+
+class TestUnifiedParallelProcessor:
+    """Test that parallel modes match a sequential parse."""
+
+    @pytest.mark.parametrize("executor_type", ["thread", "process"])
+    def test_matches_sequential_parse(self, log_file, executor_type):
+        """Each chunk sees the advanced logging header, so healing is parsed."""
+        processor = UnifiedParallelProcessor(
+            max_workers=2, persist_index=False, executor_type=executor_type
+        )
+
+        encounters = processor.process_file(log_file)
+
+        assert summarize(encounters) == summarize(parse_log_file(log_file).encounters)
+        assert encounters[1].characters["Player-1084-0A5F0002"].total_healing_done == 9000
+        assert processor.total_events == len(FIRST_PULL + SECOND_PULL)
+
+    def test_process_results_keep_raw_offsets(self, log_file):
+        """Events from worker processes read their raw line back from the log."""
+        processor = UnifiedParallelProcessor(
+            max_workers=2, persist_index=False, executor_type="process"
+        )
+
+        encounters = processor.process_file(log_file)
+
+        event = encounters[1].events[0]
+        assert event.raw_line == ""
+        assert event.read_raw_line(log_file) == SECOND_PULL[1]
+        assert processor.get_stats()["result_bytes"] > 0
+        assert processor.get_stats()["shared_bytes"] > 0
+
+    def test_stage_timings(self, log_file):
+        """Every stage of a parallel parse is timed."""
+        processor = UnifiedParallelProcessor(max_workers=2, persist_index=False)
+
+        processor.process_file(log_file)
+
+        timings = processor.get_stats()["stage_timings"]
+        assert set(timings) == {"boundaries", "planning", "parse", "merge", "metrics"}
+        assert all(seconds >= 0 for seconds in timings.values())
+
+    def test_invalid_executor_type(self):
+        """Unknown executor types are rejected."""
+        with pytest.raises(ValueError):
+            UnifiedParallelProcessor(executor_type="fiber")
+
+
+class TestParallelLogProcessor:
+    """Test the enhanced-segmenter parallel processor."""
+
+    def test_metrics_calculated_by_workers_in_file_order(self, log_file):
+        """Encounters come back in log order with their metrics already calculated."""
+        processor = ParallelLogProcessor(max_workers=2, persist_index=False)
+
+        fights, enhanced_data = processor.process_file(log_file)
+
+        raids = enhanced_data["raid_encounters"]
+        assert [raid.boss_name for raid in raids] == [
+            "Ulgrax the Devourer",
+            "The Bloodbound Horror",
+        ]
+        assert [raid.combat_length for raid in raids] == [3.0, 3.0]
+        assert [raid.raid_size for raid in raids] == [2, 2]
+        assert [fight.start_time for fight in fights] == [raid.start_time for raid in raids]
+        assert set(processor.get_stats()["stage_timings"]) == {"boundaries", "parse", "merge"}
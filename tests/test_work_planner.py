@@ -0,0 +1,133 @@
+"""
+Tests for size-balanced chunk planning and seam merging of parallel parses.
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.processing.boundary_index import BoundaryIndex
+from src.processing.parse_cache import parse_log_file
+from src.processing.unified_parallel_processor import UnifiedParallelProcessor
+from src.processing.work_planner import plan_chunks
+
+from tests.combat_logs import (
+    FIRST_PULL,
+    MAGE,
+    PET_GUID,
+    TRASH,
+    UNIT_INFO,
+    describe,
+    summarize,
+)
+
+HUNTER = 'Player-1084-0A5F0003,"Arrowhead-Area52-US",0x512,0x0'
+WOLF = 'Pet-0-4233-2657-12345-165189-0100000001,"Wolf",0x1112,0x0'
+
+
+def pet_seam_lines():
+    """A raid pull where a pet is summoned, then a run its owner only appears in through it."""
+    trash = "Creature-0-4233-2660-12345-216336-0000000001"
+    prefix = "9/15/2025 21:33"
+    lines = [
+        'CHALLENGE_MODE_START,"Ara-Kara, City of Echoes",2660,503,10,[10,9,147]',
+        f'SPELL_DAMAGE,{WOLF},{TRASH},17253,"Bite",0x1,{trash},{UNIT_INFO},'
+        "2000,0,1,0,0,0,nil,nil,nil",
+        f'SPELL_DAMAGE,{MAGE},{TRASH},116,"Frostbolt",0x10,{trash},{UNIT_INFO},'
+        "7000,0,16,0,0,0,nil,nil,nil",
+        'ENCOUNTER_START,2583,"Avanoxx",8,5,2660',
+        f'SPELL_DAMAGE,{MAGE},{TRASH},116,"Frostbolt",0x10,{trash},{UNIT_INFO},'
+        "7000,0,16,0,0,0,nil,nil,nil",
+        'ENCOUNTER_END,2583,"Avanoxx",8,5,1,90000',
+        "CHALLENGE_MODE_END,2660,1,10,1800000,300.5,2500.5",
+    ]
+    summon = f'9/15/2025 21:30:01.500-4  SPELL_SUMMON,{HUNTER},{WOLF},883,"Call Pet 1",0x1'
+    return (
+        FIRST_PULL[:3]
+        + [summon]
+        + FIRST_PULL[3:]
+        + [f"{prefix}:{i:02d}.000-4  {line}" for i, line in enumerate(lines)]
+    )
+
+
+class TestPlanChunks:
+    """Test chunk placement."""
+
+    def test_chunks_cover_file_at_safe_points(self, log_file):
+        """Chunks are contiguous, and seams inside the run are boss pulls."""
+        index = BoundaryIndex(log_file, persist=False)
+        boundaries = index.get_boundaries()
+        data = log_file.read_bytes()
+
+        chunks = plan_chunks(data, index.markers, boundaries, 1)
+
+        assert chunks[0].start_byte == 0
+        assert chunks[-1].end_byte == len(data)
+        assert all(a.end_byte == b.start_byte for a, b in zip(chunks, chunks[1:]))
+
+        run = next(b for b in boundaries if b.encounter_type == "CHALLENGE_MODE")
+        inside = [c for c in chunks if run.start_byte < c.start_byte <= run.end_byte]
+        assert len(inside) == 2
+        for chunk in inside:
+            assert chunk.seam.run_start == run.start_byte
+            assert (
+                b"  ENCOUNTER_START,"
+                in data[chunk.start_byte : data.index(b"\n", chunk.start_byte)]
+            )
+            assert PET_GUID in chunk.seam.pet_owners
+
+    def test_large_chunks_do_not_split(self, log_file):
+        """A chunk size beyond the file gives a single chunk."""
+        index = BoundaryIndex(log_file, persist=False)
+        data = log_file.read_bytes()
+
+        chunks = plan_chunks(data, index.markers, index.get_boundaries(), len(data))
+
+        assert [(c.start_byte, c.end_byte) for c in chunks] == [(0, len(data))]
+
+
+class TestSeamMerge:
+    """Test that split parses match a sequential parse."""
+
+    @pytest.mark.parametrize("executor_type", ["thread", "process"])
+    def test_split_parse_matches_sequential(self, log_file, executor_type):
+        """Splitting at every safe point still gives the sequential result."""
+        processor = UnifiedParallelProcessor(
+            max_workers=2, persist_index=False, executor_type=executor_type, chunk_bytes=1
+        )
+
+        encounters = processor.process_file(log_file)
+        sequential = parse_log_file(log_file)
+
+        assert summarize(encounters) == summarize(sequential.encounters)
+        assert describe(encounters) == describe(sequential.encounters)
+        assert processor.total_events == sequential.total_events
+        assert processor.get_stats()["chunks_processed"] > len(encounters)
+
+        run = encounters[1]
+        assert [f.fight_name for f in run.fights][-1] == "Ara-Kara, City of Echoes - Trash (3)"
+        assert run.characters[MAGE.split(",")[0]].total_damage_done == 3 * 7000 + 2 * 3000
+        assert [e.pull_number for e in encounters] == [1, 1, 2, 3]
+
+    def test_pet_owner_crosses_seam(self, tmp_path):
+        """A character only seen through their pet before a seam is carried across it."""
+        log_file = tmp_path / "WoWCombatLog.txt"
+        log_file.write_text("\n".join(pet_seam_lines()) + "\n", encoding="utf-8")
+        processor = UnifiedParallelProcessor(
+            max_workers=2, persist_index=False, executor_type="thread", chunk_bytes=1
+        )
+
+        encounters = processor.process_file(log_file)
+        sequential = parse_log_file(log_file)
+
+        assert summarize(encounters) == summarize(sequential.encounters)
+        assert describe(encounters) == describe(sequential.encounters)
+
+        run = encounters[1]
+        hunter, mage = HUNTER.split(",")[0], MAGE.split(",")[0]
+        assert list(run.characters) == list(sequential.encounters[1].characters)
+        assert list(run.characters) == [hunter, mage]
+        assert list(run.fights[1].players) == [hunter, mage]